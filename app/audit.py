@@ -0,0 +1,40 @@
+"""
+Request actor for the tindahan change history
+"""
+
+from contextvars import ContextVar
+from typing import Optional
+
+# Request header naming who made a change; recorded on the history events it writes
+ACTOR_HEADER = "x-actor"
+# Longest actor kept; longer values are cut to fit the column
+ACTOR_MAX_LENGTH = 100
+
+_actor: ContextVar[Optional[str]] = ContextVar("actor", default=None)
+
+
+def current_actor() -> Optional[str]:
+    """Who is making changes in the current request, or None for the sweeps and unnamed clients."""
+    return _actor.get()
+
+
+class ActorMiddleware:
+    """ASGI middleware exposing the X-Actor request header to the controllers."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        actor = None
+        for name, value in scope["headers"]:
+            if name == ACTOR_HEADER.encode():
+                actor = value.decode("latin-1").strip()[:ACTOR_MAX_LENGTH] or None
+        token = _actor.set(actor)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _actor.reset(token)
@@ -0,0 +1,194 @@
+"""
+Read-through cache for tindahan reads with tag-based invalidation
+"""
+
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+import os
+import pickle
+import time
+
+from app.models.cache import CacheStats
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "60"))
+
+# Tags attached to cached list pages: pages whose membership can change
+# when a store is activated/deactivated, and pages that new rows append to
+ACTIVE_LISTS_TAG = "tindahan:lists:active"
+LIST_TAIL_TAG = "tindahan:lists:tail"
+
+
+def tindahan_tag(tindahan_id: int) -> str:
+    """Tag for every cache entry that contains a given tindahan."""
+    return f"tindahan:{tindahan_id}"
+
+
+class CacheBackend(ABC):
+    """Interface for cache stores; async so networked caches can implement it."""
+
+    name = "abstract"
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]:
+        """Return the cached value, or None on a miss."""
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, tags: Iterable[str], generation: int) -> None:
+        """Store a value loaded when generation() returned `generation`.
+
+        Skipped if anything was invalidated since, so a slow read cannot
+        cache data that a concurrent write already replaced.
+        """
+
+    @abstractmethod
+    async def invalidate(self, tags: Iterable[str]) -> int:
+        """Drop every entry carrying any of the tags; returns the number dropped."""
+
+    @abstractmethod
+    async def generation(self) -> int:
+        """Counter that changes on every invalidation."""
+
+    @abstractmethod
+    async def clear(self) -> None:
+        """Drop every entry."""
+
+    @abstractmethod
+    def stats(self) -> CacheStats:
+        """Current counters."""
+
+
+class LRUCache(CacheBackend):
+    """In-process LRU cache bounded by entry count and TTL."""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, ttl_seconds: float = CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Tuple[str, ...], Any]]" = OrderedDict()
+        self._tags: Dict[str, Set[str]] = {}
+        self._generation = 0
+        self._stats = CacheStats(backend=self.name, max_entries=max_entries, ttl_seconds=ttl_seconds)
+
+    def _encode(self, value: Any) -> Any:
+        return value
+
+    def _decode(self, value: Any) -> Any:
+        return value
+
+    def _drop(self, key: str) -> None:
+        _, tags, _ = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self._stats.misses += 1
+            return None
+        if entry[0] <= time.monotonic():
+            self._drop(key)
+            self._stats.evictions += 1
+            self._stats.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self._stats.hits += 1
+        return self._decode(entry[2])
+
+    async def set(self, key: str, value: Any, tags: Iterable[str], generation: int) -> None:
+        if generation != self._generation or self.max_entries <= 0:
+            return
+        if key in self._entries:
+            self._drop(key)
+        tags = tuple(tags)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, tags, self._encode(value))
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._drop(next(iter(self._entries)))
+            self._stats.evictions += 1
+
+    async def invalidate(self, tags: Iterable[str]) -> int:
+        self._generation += 1
+        dropped = 0
+        for tag in tags:
+            for key in list(self._tags.get(tag, ())):
+                self._drop(key)
+                dropped += 1
+        self._stats.invalidations += dropped
+        return dropped
+
+    async def generation(self) -> int:
+        return self._generation
+
+    async def clear(self) -> None:
+        self._generation += 1
+        self._entries.clear()
+        self._tags.clear()
+
+    def stats(self) -> CacheStats:
+        stats = self._stats.model_copy()
+        stats.entries = len(self._entries)
+        return stats
+
+
+class LocalSharedCache(LRUCache):
+    """Stand-in for a shared cache such as Redis.
+
+    Values are serialized on write and rebuilt on every read, as they would be
+    over the network, so callers never share mutable objects through it.
+    """
+
+    name = "shared-local"
+
+    def _encode(self, value: Any) -> Any:
+        return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def _decode(self, value: Any) -> Any:
+        return pickle.loads(value)
+
+
+class NullCache(LRUCache):
+    """Cache that stores nothing; every read goes to the database."""
+
+    name = "none"
+
+    def __init__(self):
+        super().__init__(max_entries=0, ttl_seconds=0.0)
+
+
+BACKENDS = {backend.name: backend for backend in (LRUCache, LocalSharedCache, NullCache)}
+
+_cache: CacheBackend = BACKENDS[CACHE_BACKEND]()
+
+
+def get_cache() -> CacheBackend:
+    """The active cache backend."""
+    return _cache
+
+
+def set_cache_backend(backend: CacheBackend) -> None:
+    """Replace the active cache backend, e.g. with a client for a shared cache."""
+    global _cache
+    _cache = backend
+
+
+async def invalidate_tindahan(ids: Iterable[int], membership_changed: bool = False, created: bool = False) -> None:
+    """Drop cached reads affected by writes to the given tindahan.
+
+    membership_changed: is_active flipped, so active-only list pages shift.
+    created: rows were appended, so the last page of every list may grow.
+    """
+    tags = [tindahan_tag(tindahan_id) for tindahan_id in ids]
+    if membership_changed:
+        tags.append(ACTIVE_LISTS_TAG)
+    if created:
+        tags.append(LIST_TAIL_TAG)
+    await _cache.invalidate(tags)
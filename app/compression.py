@@ -0,0 +1,61 @@
+"""
+Response compression for text bodies: pages, JSON and streamed CSV/NDJSON
+"""
+
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware
+import os
+
+# Smallest body worth compressing, in bytes
+GZIP_MIN_SIZE = int(os.getenv("GZIP_MIN_SIZE", "500"))
+# zlib level: 6 gets nearly all of level 9's savings for a fraction of the CPU
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/x-ndjson", "application/javascript", "image/svg+xml")
+
+
+def is_compressible(status: int, headers: Headers) -> bool:
+    """Text content, and not a byte-range download, whose offsets refer to the uncompressed file."""
+    if status == 206 or "accept-ranges" in headers:
+        return False
+    return headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware:
+    """gzip for clients that accept it, limited to text responses.
+
+    Files that are already compressed (XLSX, images) and resumable
+    downloads pass through untouched. The choice is made when the response
+    starts: text goes through Starlette's GZipMiddleware, anything else
+    straight to the client.
+    """
+
+    def __init__(self, app, minimum_size: int = GZIP_MIN_SIZE, compresslevel: int = GZIP_LEVEL):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.compresslevel = compresslevel
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        if "gzip" not in headers.get("accept-encoding", "") or "range" in headers:
+            await self.app(scope, receive, send)
+            return
+
+        async def choose_encoding(scope, receive, gzip_send) -> None:
+            target = send
+
+            async def send_chosen(message) -> None:
+                nonlocal target
+                if message["type"] == "http.response.start" and is_compressible(
+                    message["status"], Headers(raw=message["headers"])
+                ):
+                    target = gzip_send
+                await target(message)
+
+            await self.app(scope, receive, send_chosen)
+
+        gzip = GZipMiddleware(choose_encoding, minimum_size=self.minimum_size, compresslevel=self.compresslevel)
+        await gzip(scope, receive, send)
@@ -0,0 +1,159 @@
+"""
+Analytics controller for per-zone charts served from the maintained counters
+"""
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+from typing import Dict, List, Optional, Tuple
+from datetime import date, datetime, timedelta
+
+from app.models.store import ComplianceStatus
+from app.models.inspection import ViolationType
+from app.models.analytics import (
+    AnalyticsTrends, TrendBucket, TrendPoint, ZoneAnalytics, ZoneStatusCounter, ZoneTrend,
+    ZoneViolationCounter, ZoneViolationDaily
+)
+
+# Buckets shown when a trend request gives no start date
+DEFAULT_TREND_PERIODS = {TrendBucket.DAY: 30, TrendBucket.WEEK: 12, TrendBucket.MONTH: 12}
+# Most buckets per zone in one trend response
+MAX_TREND_POINTS = 400
+
+
+def _average_hours(seconds: int, resolved: int) -> Optional[float]:
+    """Mean time to resolution in hours, or None when nothing was resolved."""
+    return round(seconds / resolved / 3600, 2) if resolved else None
+
+
+def bucket_start(day: date, bucket: TrendBucket) -> date:
+    """First day of the bucket a day falls in."""
+    if bucket == TrendBucket.WEEK:
+        return day - timedelta(days=day.weekday())
+    if bucket == TrendBucket.MONTH:
+        return day.replace(day=1)
+    return day
+
+
+def _next_bucket(start: date, bucket: TrendBucket) -> date:
+    """First day of the bucket after the one starting at start."""
+    if bucket == TrendBucket.WEEK:
+        return start + timedelta(days=7)
+    if bucket == TrendBucket.MONTH:
+        return (start + timedelta(days=31)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+def _default_trend_start(date_to: date, bucket: TrendBucket) -> date:
+    """Start of the default window: the last DEFAULT_TREND_PERIODS buckets up to date_to."""
+    start = bucket_start(date_to, bucket)
+    for _ in range(DEFAULT_TREND_PERIODS[bucket] - 1):
+        start = bucket_start(start - timedelta(days=1), bucket)
+    return start
+
+
+async def get_zone_analytics(db: AsyncSession, barangay_zone: Optional[str] = None) -> List[ZoneAnalytics]:
+    """Store and violation breakdown per zone from the maintained counters."""
+    query = select(ZoneStatusCounter.barangay_zone, ZoneStatusCounter.compliance_status, ZoneStatusCounter.count)
+    if barangay_zone is not None:
+        query = query.where(ZoneStatusCounter.barangay_zone == barangay_zone)
+    statuses: Dict[str, Dict[ComplianceStatus, int]] = {}
+    for zone, status, count in (await db.execute(query)).all():
+        statuses.setdefault(zone, {})[status] = count
+
+    query = select(
+        ZoneViolationCounter.barangay_zone, ZoneViolationCounter.violation_type, ZoneViolationCounter.severity,
+        ZoneViolationCounter.recorded, ZoneViolationCounter.resolved, ZoneViolationCounter.resolution_seconds,
+    )
+    if barangay_zone is not None:
+        query = query.where(ZoneViolationCounter.barangay_zone == barangay_zone)
+    # zone -> [recorded, resolved, resolution seconds, by type, by severity]
+    violations: Dict[str, list] = {}
+    for zone, violation_type, severity, recorded, resolved, seconds in (await db.execute(query)).all():
+        totals = violations.setdefault(zone, [0, 0, 0, {}, {}])
+        totals[0] += recorded
+        totals[1] += resolved
+        totals[2] += seconds
+        if recorded:
+            totals[3][violation_type] = totals[3].get(violation_type, 0) + recorded
+            totals[4][severity] = totals[4].get(severity, 0) + recorded
+
+    analytics = []
+    for zone in sorted(statuses.keys() | violations.keys()):
+        by_status = {status: statuses.get(zone, {}).get(status, 0) for status in ComplianceStatus}
+        recorded, resolved, seconds, by_type, by_severity = violations.get(zone, [0, 0, 0, {}, {}])
+        if not any(by_status.values()) and not recorded:
+            continue
+        analytics.append(ZoneAnalytics(
+            barangay_zone=zone,
+            total_tindahan=sum(by_status.values()),
+            tindahan_by_status=by_status,
+            violations_recorded=recorded,
+            violations_resolved=resolved,
+            violations_by_type={violation_type: by_type.get(violation_type, 0) for violation_type in ViolationType},
+            violations_by_severity=dict(sorted(by_severity.items())),
+            avg_resolution_hours=_average_hours(seconds, resolved),
+        ))
+    return analytics
+
+
+async def get_zone_trends(
+    db: AsyncSession,
+    bucket: TrendBucket = TrendBucket.DAY,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    barangay_zone: Optional[str] = None
+) -> AnalyticsTrends:
+    """Violations recorded and resolved per zone and bucket over [date_from, date_to] inclusive.
+
+    Every zone gets a point for every bucket in the range, zero when idle.
+    """
+    date_to = date_to or datetime.utcnow().date()
+    date_from = date_from or _default_trend_start(date_to, bucket)
+    if date_from > date_to:
+        raise ValueError("date_from must not be after date_to")
+
+    periods = []
+    start = bucket_start(date_from, bucket)
+    while start <= date_to:
+        periods.append(start)
+        if len(periods) > MAX_TREND_POINTS:
+            raise ValueError(f"Range spans more than {MAX_TREND_POINTS} {bucket.value} buckets; use a larger bucket")
+        start = _next_bucket(start, bucket)
+
+    query = select(
+        ZoneViolationDaily.barangay_zone, ZoneViolationDaily.day, ZoneViolationDaily.recorded,
+        ZoneViolationDaily.resolved, ZoneViolationDaily.resolution_seconds,
+    ).where(ZoneViolationDaily.day >= date_from, ZoneViolationDaily.day <= date_to)
+    if barangay_zone is not None:
+        query = query.where(ZoneViolationDaily.barangay_zone == barangay_zone)
+
+    # (zone, bucket start) -> [recorded, resolved, resolution seconds]
+    buckets: Dict[Tuple[str, date], List[int]] = {}
+    zones = set()
+    for zone, day, recorded, resolved, seconds in (await db.execute(query)).all():
+        if not recorded and not resolved:
+            continue
+        zones.add(zone)
+        totals = buckets.setdefault((zone, bucket_start(day, bucket)), [0, 0, 0])
+        totals[0] += recorded
+        totals[1] += resolved
+        totals[2] += seconds
+
+    return AnalyticsTrends(
+        bucket=bucket,
+        date_from=date_from,
+        date_to=date_to,
+        zones=[
+            ZoneTrend(barangay_zone=zone, points=[
+                TrendPoint(
+                    period_start=period,
+                    violations_recorded=recorded,
+                    violations_resolved=resolved,
+                    avg_resolution_hours=_average_hours(seconds, resolved),
+                )
+                for period in periods
+                for recorded, resolved, seconds in [buckets.get((zone, period), [0, 0, 0])]
+            ])
+            for zone in sorted(zones)
+        ],
+    )
@@ -0,0 +1,498 @@
+"""
+Compliance controller for incrementally maintained dashboard metrics and zone analytics
+"""
+
+from sqlalchemy import case, delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+from typing import Dict, Iterable, List, Optional, Tuple
+from datetime import date, datetime
+
+from app.models.store import Tindahan, ComplianceStatus
+from app.models.inspection import Inspection, InspectionStatus, Violation, ViolationType
+from app.models.compliance_report import ComplianceCounter, ComplianceMetrics, PermitExpiryCounter
+from app.models.analytics import ZoneStatusCounter, ZoneViolationCounter, ZoneViolationDaily
+
+TOTAL_TINDAHAN = "total_tindahan"
+PENDING_INSPECTIONS = "pending_inspections"
+TOTAL_VIOLATIONS = "total_violations"
+RESOLVED_VIOLATIONS = "resolved_violations"
+# Active tindahan whose permit expired before the day in EXPIRED_PERMITS_THROUGH (stored as
+# date.toordinal()); the expiry sweep rolls both forward, so the dashboard never sums past days
+EXPIRED_PERMITS = "expired_permits"
+EXPIRED_PERMITS_THROUGH = "expired_permits_through"
+PENDING_INSPECTION_STATUSES = (InspectionStatus.SCHEDULED, InspectionStatus.IN_PROGRESS)
+
+# (is_active, compliance_status, permit expiry day, barangay_zone) of a tindahan row
+TindahanSnapshot = Tuple[bool, ComplianceStatus, Optional[date], str]
+
+# (barangay_zone, violation_type, severity, day recorded, day resolved or None,
+# seconds to resolution) of a violation row
+ViolationSnapshot = Tuple[str, ViolationType, int, date, Optional[date], int]
+
+# [recorded, resolved, resolution_seconds] deltas of a zone violation counter row
+ViolationDeltas = Dict[tuple, List[int]]
+
+
+def _status_counter(status: ComplianceStatus) -> str:
+    """Counter name for a compliance status."""
+    return f"status:{ComplianceStatus(status).value}"
+
+
+def _day(value: Optional[datetime]) -> Optional[date]:
+    """Reduce a timestamp (or SQL date string) to its day bucket."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    return value.date() if isinstance(value, datetime) else value
+
+
+def _insert(db: AsyncSession):
+    """Dialect-specific insert construct supporting ON CONFLICT upserts."""
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+
+def _seconds_between(db: AsyncSession, start, end):
+    """SQL expression for the seconds from one timestamp column to another."""
+    if db.get_bind().dialect.name == "postgresql":
+        return func.extract("epoch", end - start)
+    return (func.julianday(end) - func.julianday(start)) * 86400
+
+
+def make_tindahan_snapshot(
+    is_active: bool,
+    compliance_status: ComplianceStatus,
+    permit_expiry_date: Optional[datetime],
+    barangay_zone: str,
+) -> TindahanSnapshot:
+    """Build a counter snapshot from raw tindahan column values."""
+    return (bool(is_active), ComplianceStatus(compliance_status), _day(permit_expiry_date), barangay_zone)
+
+
+def tindahan_snapshot(tindahan: Optional[Tindahan]) -> Optional[TindahanSnapshot]:
+    """Capture the fields of a tindahan (or row) that feed the compliance counters."""
+    if tindahan is None:
+        return None
+    return make_tindahan_snapshot(
+        tindahan.is_active, tindahan.compliance_status, tindahan.permit_expiry_date, tindahan.barangay_zone
+    )
+
+
+def violation_snapshot(violation: Optional[Violation], barangay_zone: str) -> Optional[ViolationSnapshot]:
+    """Capture the fields of a violation (or row) that feed the counters and zone analytics.
+
+    The zone is that of the tindahan the violation's inspection belongs to.
+    """
+    if violation is None:
+        return None
+    resolved_day = None
+    seconds = 0
+    if violation.is_resolved:
+        # Timestamps are stored without their UTC offset, so compare them as stored
+        resolved_at = (violation.resolution_date or violation.created_at).replace(tzinfo=None)
+        resolved_day = resolved_at.date()
+        seconds = max(0, round((resolved_at - violation.created_at).total_seconds()))
+    return (
+        barangay_zone, ViolationType(violation.violation_type), violation.severity,
+        violation.created_at.date(), resolved_day, seconds,
+    )
+
+
+async def _bump_counters(db: AsyncSession, deltas: Dict[str, int]) -> None:
+    """Add deltas to the named counters in a single upsert statement."""
+    deltas = {name: delta for name, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    insert = _insert(db)
+    stmt = insert(ComplianceCounter).values([{"name": name, "value": delta} for name, delta in deltas.items()])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["name"],
+        set_={"value": ComplianceCounter.value + stmt.excluded.value},
+    )
+    await db.execute(stmt)
+
+
+async def _expired_through(db: AsyncSession) -> Optional[date]:
+    """Day the running expired permit total counts up to, locking its row; None before the counters are built."""
+    result = await db.execute(
+        select(ComplianceCounter.value).where(ComplianceCounter.name == EXPIRED_PERMITS_THROUGH).with_for_update()
+    )
+    value = result.scalar_one_or_none()
+    return date.fromordinal(value) if value is not None else None
+
+
+async def _expiring_between(db: AsyncSession, start: date, end: date) -> int:
+    """Active tindahan whose permit expires on a day from start up to (not including) end."""
+    result = await db.execute(
+        select(func.coalesce(func.sum(PermitExpiryCounter.count), 0))
+        .where(PermitExpiryCounter.expiry_date >= start, PermitExpiryCounter.expiry_date < end)
+    )
+    return int(result.scalar_one())
+
+
+async def _bump_expiry_counters(db: AsyncSession, deltas: Dict[date, int]) -> None:
+    """Add deltas to the per-day permit expiry counters, and to the running expired total for days it already covers."""
+    deltas = {day: delta for day, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    through = await _expired_through(db)
+    if through is not None:
+        await _bump_counters(db, {EXPIRED_PERMITS: sum(delta for day, delta in deltas.items() if day < through)})
+    insert = _insert(db)
+    stmt = insert(PermitExpiryCounter).values([{"expiry_date": day, "count": delta} for day, delta in deltas.items()])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["expiry_date"],
+        set_={"count": PermitExpiryCounter.count + stmt.excluded.count},
+    )
+    await db.execute(stmt)
+
+
+async def _bump_zone_status_counters(db: AsyncSession, deltas: Dict[Tuple[str, ComplianceStatus], int]) -> None:
+    """Add deltas to the per-zone compliance status counters."""
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    insert = _insert(db)
+    stmt = insert(ZoneStatusCounter).values([
+        {"barangay_zone": zone, "compliance_status": status, "count": delta}
+        for (zone, status), delta in deltas.items()
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["barangay_zone", "compliance_status"],
+        set_={"count": ZoneStatusCounter.count + stmt.excluded.count},
+    )
+    await db.execute(stmt)
+
+
+async def _bump_zone_violations(db: AsyncSession, model, keys: Tuple[str, ...], deltas: ViolationDeltas) -> None:
+    """Add [recorded, resolved, resolution_seconds] deltas to the rows of a zone violation counter table."""
+    deltas = {key: delta for key, delta in deltas.items() if any(delta)}
+    if not deltas:
+        return
+    insert = _insert(db)
+    stmt = insert(model).values([
+        {**dict(zip(keys, key)), "recorded": recorded, "resolved": resolved, "resolution_seconds": seconds}
+        for key, (recorded, resolved, seconds) in deltas.items()
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(keys),
+        set_={
+            "recorded": model.recorded + stmt.excluded.recorded,
+            "resolved": model.resolved + stmt.excluded.resolved,
+            "resolution_seconds": model.resolution_seconds + stmt.excluded.resolution_seconds,
+        },
+    )
+    await db.execute(stmt)
+
+
+async def apply_tindahan_change(
+    db: AsyncSession,
+    before: Optional[TindahanSnapshot],
+    after: Optional[TindahanSnapshot],
+) -> None:
+    """Update counters for a tindahan moving from one snapshot to another.
+
+    Must be called inside the transaction that writes the tindahan row.
+    """
+    await apply_tindahan_changes(db, [(before, after)])
+
+
+async def apply_tindahan_changes(
+    db: AsyncSession,
+    changes: Iterable[Tuple[Optional[TindahanSnapshot], Optional[TindahanSnapshot]]],
+) -> None:
+    """Update counters for many (before, after) tindahan changes at once."""
+    counters: Dict[str, int] = {}
+    expiry: Dict[date, int] = {}
+    zone_status: Dict[Tuple[str, ComplianceStatus], int] = {}
+    for before, after in changes:
+        if before == after:
+            continue
+        for snapshot, sign in ((before, -1), (after, 1)):
+            if snapshot is None:
+                continue
+            is_active, status, expiry_day, zone = snapshot
+            if not is_active:
+                continue
+            counters[TOTAL_TINDAHAN] = counters.get(TOTAL_TINDAHAN, 0) + sign
+            name = _status_counter(status)
+            counters[name] = counters.get(name, 0) + sign
+            if expiry_day is not None:
+                expiry[expiry_day] = expiry.get(expiry_day, 0) + sign
+            zone_status[zone, status] = zone_status.get((zone, status), 0) + sign
+
+    await _bump_counters(db, counters)
+    await _bump_expiry_counters(db, expiry)
+    await _bump_zone_status_counters(db, zone_status)
+
+
+async def apply_status_transitions(
+    db: AsyncSession,
+    transitions: Dict[Tuple[str, ComplianceStatus, ComplianceStatus], int],
+) -> None:
+    """Update counters for active tindahan whose status alone changed, given counts per (zone, from, to)."""
+    counters: Dict[str, int] = {}
+    zone_status: Dict[Tuple[str, ComplianceStatus], int] = {}
+    for (zone, from_status, to_status), count in transitions.items():
+        for status, sign in ((from_status, -count), (to_status, count)):
+            name = _status_counter(status)
+            counters[name] = counters.get(name, 0) + sign
+            zone_status[zone, status] = zone_status.get((zone, status), 0) + sign
+    await _bump_counters(db, counters)
+    await _bump_zone_status_counters(db, zone_status)
+
+
+async def apply_inspection_change(
+    db: AsyncSession,
+    before: Optional[InspectionStatus],
+    after: Optional[InspectionStatus],
+) -> None:
+    """Update the pending inspection counter for an inspection status change."""
+    await apply_inspection_changes(db, [(before, after)])
+
+
+async def apply_inspection_changes(
+    db: AsyncSession,
+    changes: Iterable[Tuple[Optional[InspectionStatus], Optional[InspectionStatus]]],
+) -> None:
+    """Update the pending inspection counter for many status changes at once."""
+    delta = sum(
+        int(after in PENDING_INSPECTION_STATUSES) - int(before in PENDING_INSPECTION_STATUSES)
+        for before, after in changes
+    )
+    await _bump_counters(db, {PENDING_INSPECTIONS: delta})
+
+
+async def apply_violation_change(
+    db: AsyncSession,
+    before: Optional[ViolationSnapshot],
+    after: Optional[ViolationSnapshot],
+) -> None:
+    """Update violation counters for a violation moving from one snapshot to another.
+
+    Must be called inside the transaction that writes the violation row.
+    """
+    await apply_violation_changes(db, [(before, after)])
+
+
+async def apply_violation_changes(
+    db: AsyncSession,
+    changes: Iterable[Tuple[Optional[ViolationSnapshot], Optional[ViolationSnapshot]]],
+) -> None:
+    """Update violation counters for many (before, after) changes at once."""
+    counters: Dict[str, int] = {}
+    by_type: ViolationDeltas = {}
+    by_day: ViolationDeltas = {}
+    for before, after in changes:
+        if before == after:
+            continue
+        for snapshot, sign in ((before, -1), (after, 1)):
+            if snapshot is None:
+                continue
+            zone, violation_type, severity, recorded_day, resolved_day, seconds = snapshot
+            counters[TOTAL_VIOLATIONS] = counters.get(TOTAL_VIOLATIONS, 0) + sign
+            totals = by_type.setdefault((zone, violation_type, severity), [0, 0, 0])
+            totals[0] += sign
+            by_day.setdefault((zone, recorded_day), [0, 0, 0])[0] += sign
+            if resolved_day is not None:
+                counters[RESOLVED_VIOLATIONS] = counters.get(RESOLVED_VIOLATIONS, 0) + sign
+                for deltas in (totals, by_day.setdefault((zone, resolved_day), [0, 0, 0])):
+                    deltas[1] += sign
+                    deltas[2] += sign * seconds
+
+    await _bump_counters(db, counters)
+    await _bump_zone_violations(db, ZoneViolationCounter, ("barangay_zone", "violation_type", "severity"), by_type)
+    await _bump_zone_violations(db, ZoneViolationDaily, ("barangay_zone", "day"), by_day)
+
+
+async def move_tindahan_violations(db: AsyncSession, moves: Dict[int, Tuple[str, str]]) -> None:
+    """Re-bucket the violations of tindahan whose zone changed; moves maps id to (old zone, new zone)."""
+    moves = {tindahan_id: zones for tindahan_id, zones in moves.items() if zones[0] != zones[1]}
+    if not moves:
+        return
+    result = await db.execute(
+        select(
+            Inspection.tindahan_id, Violation.violation_type, Violation.severity, Violation.is_resolved,
+            Violation.resolution_date, Violation.created_at,
+        )
+        .join(Inspection, Inspection.id == Violation.inspection_id)
+        .where(Inspection.tindahan_id.in_(moves))
+    )
+    changes = []
+    for row in result.all():
+        from_zone, to_zone = moves[row.tindahan_id]
+        changes.append((violation_snapshot(row, from_zone), violation_snapshot(row, to_zone)))
+    await apply_violation_changes(db, changes)
+
+
+async def roll_expired_permits(db: AsyncSession, today: Optional[date] = None) -> int:
+    """Move the running expired permit total forward to today; returns the permits newly counted.
+
+    Reads only the per-day counters of the days since the last roll. Runs
+    inside the caller's transaction.
+    """
+    today = today or datetime.utcnow().date()
+    through = await _expired_through(db)
+    if through is None or through >= today:
+        return 0
+    expired = await _expiring_between(db, through, today)
+    await _bump_counters(db, {EXPIRED_PERMITS: expired, EXPIRED_PERMITS_THROUGH: today.toordinal() - through.toordinal()})
+    return expired
+
+
+async def rebuild_compliance_counters(db: AsyncSession) -> None:
+    """Recompute every counter from the source tables in one transaction."""
+    await db.execute(delete(ComplianceCounter))
+    await db.execute(delete(PermitExpiryCounter))
+    await db.execute(delete(ZoneStatusCounter))
+    await db.execute(delete(ZoneViolationCounter))
+    await db.execute(delete(ZoneViolationDaily))
+
+    counters: Dict[str, int] = {TOTAL_TINDAHAN: 0, PENDING_INSPECTIONS: 0, TOTAL_VIOLATIONS: 0, RESOLVED_VIOLATIONS: 0}
+    counters.update({_status_counter(status): 0 for status in ComplianceStatus})
+
+    result = await db.execute(
+        select(Tindahan.compliance_status, func.count())
+        .where(Tindahan.is_active == True)
+        .group_by(Tindahan.compliance_status)
+    )
+    for status, count in result.all():
+        counters[_status_counter(status)] = count
+        counters[TOTAL_TINDAHAN] += count
+
+    result = await db.execute(
+        select(func.count()).select_from(Inspection).where(Inspection.status.in_(PENDING_INSPECTION_STATUSES))
+    )
+    counters[PENDING_INSPECTIONS] = result.scalar_one()
+
+    resolved = func.coalesce(func.sum(case((Violation.is_resolved == True, 1), else_=0)), 0)
+    result = await db.execute(select(func.count(), resolved).select_from(Violation))
+    counters[TOTAL_VIOLATIONS], counters[RESOLVED_VIOLATIONS] = (int(value) for value in result.one())
+
+    expiry_day = func.date(Tindahan.permit_expiry_date)
+    result = await db.execute(
+        select(expiry_day, func.count())
+        .where(Tindahan.is_active == True, Tindahan.permit_expiry_date.is_not(None))
+        .group_by(expiry_day)
+    )
+    expiring = {_day(day): count for day, count in result.all()}
+    db.add_all([PermitExpiryCounter(expiry_date=day, count=count) for day, count in expiring.items()])
+
+    today = datetime.utcnow().date()
+    counters[EXPIRED_PERMITS] = sum(count for day, count in expiring.items() if day < today)
+    counters[EXPIRED_PERMITS_THROUGH] = today.toordinal()
+    db.add_all([ComplianceCounter(name=name, value=value) for name, value in counters.items()])
+
+    result = await db.execute(
+        select(Tindahan.barangay_zone, Tindahan.compliance_status, func.count())
+        .where(Tindahan.is_active == True)
+        .group_by(Tindahan.barangay_zone, Tindahan.compliance_status)
+    )
+    db.add_all([
+        ZoneStatusCounter(barangay_zone=zone, compliance_status=status, count=count)
+        for zone, status, count in result.all()
+    ])
+    await _rebuild_zone_violations(db)
+
+    await db.commit()
+
+
+async def _rebuild_zone_violations(db: AsyncSession) -> None:
+    """Fill the empty zone violation tables from grouped scans of the violation table."""
+    resolved_at = func.coalesce(Violation.resolution_date, Violation.created_at)
+    seconds = _seconds_between(db, Violation.created_at, resolved_at)
+    latency = case((seconds > 0, func.round(seconds)), else_=0)
+    is_resolved = case((Violation.is_resolved == True, 1), else_=0)
+
+    def grouped(*columns, aggregates):
+        return (
+            select(*columns, *aggregates)
+            .select_from(Violation)
+            .join(Inspection, Inspection.id == Violation.inspection_id)
+            .join(Tindahan, Tindahan.id == Inspection.tindahan_id)
+            .group_by(*columns)
+        )
+
+    result = await db.execute(grouped(
+        Tindahan.barangay_zone, Violation.violation_type, Violation.severity,
+        aggregates=(func.count(), func.sum(is_resolved), func.sum(is_resolved * latency)),
+    ))
+    db.add_all([
+        ZoneViolationCounter(
+            barangay_zone=zone, violation_type=violation_type, severity=severity,
+            recorded=recorded, resolved=int(resolved), resolution_seconds=int(total_seconds),
+        )
+        for zone, violation_type, severity, recorded, resolved, total_seconds in result.all()
+    ])
+
+    by_day: ViolationDeltas = {}
+    result = await db.execute(grouped(Tindahan.barangay_zone, func.date(Violation.created_at), aggregates=(func.count(),)))
+    for zone, day, count in result.all():
+        by_day[zone, _day(day)] = [count, 0, 0]
+    result = await db.execute(
+        grouped(Tindahan.barangay_zone, func.date(resolved_at), aggregates=(func.count(), func.sum(latency)))
+        .where(Violation.is_resolved == True)
+    )
+    for zone, day, count, total_seconds in result.all():
+        deltas = by_day.setdefault((zone, _day(day)), [0, 0, 0])
+        deltas[1:] = [count, int(total_seconds or 0)]
+    db.add_all([
+        ZoneViolationDaily(barangay_zone=zone, day=day, recorded=recorded, resolved=resolved, resolution_seconds=seconds)
+        for (zone, day), (recorded, resolved, seconds) in by_day.items()
+    ])
+
+
+async def ensure_compliance_counters(db: AsyncSession) -> None:
+    """Build the counters once if they have never been initialized.
+
+    Also rebuilds when a counter added later is missing, or a table added
+    after the counters is still empty but its source table is not, e.g.
+    right after upgrading an existing database.
+    """
+    result = await db.execute(
+        select(func.count())
+        .select_from(ComplianceCounter)
+        .where(ComplianceCounter.name.in_((TOTAL_TINDAHAN, EXPIRED_PERMITS_THROUGH)))
+    )
+    if result.scalar_one() < 2:
+        await rebuild_compliance_counters(db)
+        return
+    for counter, source in (
+        (select(ZoneStatusCounter.barangay_zone), select(Tindahan.id).where(Tindahan.is_active == True)),
+        (select(ZoneViolationCounter.barangay_zone), select(Violation.id)),
+    ):
+        if (await db.execute(counter.limit(1))).first() is None and (await db.execute(source.limit(1))).first() is not None:
+            await rebuild_compliance_counters(db)
+            return
+
+
+async def get_compliance_metrics(db: AsyncSession) -> ComplianceMetrics:
+    """Get dashboard metrics from the maintained counters."""
+    result = await db.execute(select(ComplianceCounter.name, ComplianceCounter.value))
+    counters = dict(result.all())
+
+    # Permits that expired since the sweep last rolled the running total forward, usually none
+    expired_permits = counters.get(EXPIRED_PERMITS, 0)
+    today = datetime.utcnow().date()
+    if EXPIRED_PERMITS_THROUGH in counters and counters[EXPIRED_PERMITS_THROUGH] < today.toordinal():
+        expired_permits += await _expiring_between(db, date.fromordinal(counters[EXPIRED_PERMITS_THROUGH]), today)
+
+    total = counters.get(TOTAL_TINDAHAN, 0)
+    compliant = counters.get(_status_counter(ComplianceStatus.COMPLIANT), 0)
+    return ComplianceMetrics(
+        total_tindahan=total,
+        compliant_tindahan=compliant,
+        warning_tindahan=counters.get(_status_counter(ComplianceStatus.WARNING), 0),
+        violation_tindahan=counters.get(_status_counter(ComplianceStatus.VIOLATION), 0),
+        suspended_tindahan=counters.get(_status_counter(ComplianceStatus.SUSPENDED), 0),
+        expired_permits=expired_permits,
+        pending_inspections=counters.get(PENDING_INSPECTIONS, 0),
+        total_violations=counters.get(TOTAL_VIOLATIONS, 0),
+        resolved_violations=counters.get(RESOLVED_VIOLATIONS, 0),
+        compliance_rate=round(compliant / total * 100, 2) if total else 0.0,
+    )
@@ -0,0 +1,251 @@
+"""
+Duplicate controller: scans for duplicate tindahan registrations, lists suggested merges and merges them
+"""
+
+from sqlalchemy import delete, insert, or_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime
+import asyncio
+import json
+import os
+import time
+
+from app.cache import invalidate_tindahan
+from app.database import async_read_session
+from app.dedupe import DUPLICATE_MAX_BLOCK_SIZE, DUPLICATE_MIN_SCORE, StoreRecord, find_duplicates
+from app.models.store import Tindahan, TindahanResponse
+from app.models.inspection import Inspection
+from app.models.history import TindahanEventKind
+from app.models.duplicate import (
+    TindahanDuplicate, DuplicateStatus, DuplicateSuggestion, DuplicateScanResponse, DuplicateMergeResponse
+)
+from app.controllers.compliance_controller import apply_tindahan_change, move_tindahan_violations, tindahan_snapshot
+from app.controllers.status_controller import refresh_compliance_status
+from app.controllers.history_controller import record_tindahan_change, tindahan_state
+
+# Seconds between scheduled duplicate scans; the scheduler runs more often than a full scan is worth
+DUPLICATE_SCAN_INTERVAL_SECONDS = float(os.getenv("DUPLICATE_SCAN_INTERVAL_SECONDS", "3600"))
+# Suggestion rows written or deleted per statement
+DUPLICATE_WRITE_BATCH_SIZE = 1000
+
+# Fields a merge copies from the duplicate when the kept registration has none, filled as a group
+MERGE_FILL_FIELDS = (
+    ("contact_number",),
+    ("latitude", "longitude"),
+    ("business_permit_number", "permit_issued_date", "permit_expiry_date"),
+)
+
+_last_scan: Optional[float] = None
+
+
+async def _load_stores() -> List[StoreRecord]:
+    """Every active tindahan, read from the replica so the scan holds no write lock."""
+    async with async_read_session() as db:
+        result = await db.execute(
+            select(
+                Tindahan.id, Tindahan.business_name, Tindahan.owner_name, Tindahan.address, Tindahan.contact_number,
+                Tindahan.barangay_zone, Tindahan.business_permit_number, Tindahan.latitude, Tindahan.longitude
+            )
+            .where(Tindahan.is_active == True)
+        )
+        return [StoreRecord.from_row(row) for row in result.all()]
+
+
+async def scan_duplicates(
+    db: AsyncSession,
+    min_score: float = DUPLICATE_MIN_SCORE,
+    max_block_size: int = DUPLICATE_MAX_BLOCK_SIZE
+) -> DuplicateScanResponse:
+    """Compare all active stores and bring the suggested merges up to date, in one transaction.
+
+    New pairs are suggested, suggestions that no longer match (a store was
+    edited, merged or deactivated) are removed, and pairs already merged or
+    dismissed are left alone.
+    """
+    global _last_scan
+    started = time.perf_counter()
+    stores = await _load_stores()
+    # Scoring is pure Python; a thread lets queued requests run between its time slices
+    matches, stats = await asyncio.to_thread(find_duplicates, stores, min_score, max_block_size)
+
+    result = await db.execute(select(TindahanDuplicate.id, TindahanDuplicate.tindahan_id, TindahanDuplicate.duplicate_id, TindahanDuplicate.status))
+    existing: Dict[Tuple[int, int], Tuple[int, DuplicateStatus]] = {
+        (row.tindahan_id, row.duplicate_id): (row.id, row.status) for row in result.all()
+    }
+    now = datetime.utcnow()
+    added: List[Dict] = []
+    refreshed: List[Dict] = []
+    found = set()
+    for match in matches:
+        pair = (match.tindahan_id, match.duplicate_id)
+        found.add(pair)
+        values = {"score": match.score, "reasons": json.dumps(match.reasons), "updated_at": now}
+        if pair not in existing:
+            added.append({
+                **values, "tindahan_id": match.tindahan_id, "duplicate_id": match.duplicate_id,
+                "barangay_zone": match.barangay_zone, "status": DuplicateStatus.SUGGESTED, "created_at": now,
+            })
+        elif existing[pair][1] == DuplicateStatus.SUGGESTED:
+            refreshed.append({**values, "id": existing[pair][0]})
+    stale = [
+        suggestion_id for pair, (suggestion_id, status) in existing.items()
+        if status == DuplicateStatus.SUGGESTED and pair not in found
+    ]
+
+    for start in range(0, len(added), DUPLICATE_WRITE_BATCH_SIZE):
+        await db.execute(insert(TindahanDuplicate), added[start:start + DUPLICATE_WRITE_BATCH_SIZE])
+    for start in range(0, len(refreshed), DUPLICATE_WRITE_BATCH_SIZE):
+        await db.execute(update(TindahanDuplicate), refreshed[start:start + DUPLICATE_WRITE_BATCH_SIZE])
+    for start in range(0, len(stale), DUPLICATE_WRITE_BATCH_SIZE):
+        await db.execute(delete(TindahanDuplicate).where(TindahanDuplicate.id.in_(stale[start:start + DUPLICATE_WRITE_BATCH_SIZE])))
+    await db.commit()
+    _last_scan = time.monotonic()
+
+    return DuplicateScanResponse(
+        stores=stats.stores,
+        candidate_pairs=stats.candidate_pairs,
+        skipped_blocks=stats.skipped_blocks,
+        suggested=len(added) + len(refreshed),
+        added=len(added),
+        removed=len(stale),
+        duration_seconds=round(time.perf_counter() - started, 3),
+    )
+
+
+async def sweep_duplicate_tindahan(db: AsyncSession, interval: float = DUPLICATE_SCAN_INTERVAL_SECONDS) -> int:
+    """Scheduled duplicate scan, at most once per `interval`; returns the number of new suggestions."""
+    if _last_scan is not None and time.monotonic() - _last_scan < interval:
+        return 0
+    return (await scan_duplicates(db)).added
+
+
+async def _suggestions(db: AsyncSession, rows: List[TindahanDuplicate]) -> List[DuplicateSuggestion]:
+    """Suggestion responses with both stores, loaded in one query."""
+    ids = {row.tindahan_id for row in rows} | {row.duplicate_id for row in rows}
+    if not ids:
+        return []
+    result = await db.execute(select(Tindahan).where(Tindahan.id.in_(ids)))
+    stores = {tindahan.id: TindahanResponse.model_validate(tindahan) for tindahan in result.scalars().all()}
+    return [
+        DuplicateSuggestion(
+            id=row.id,
+            score=row.score,
+            reasons=json.loads(row.reasons),
+            status=row.status,
+            created_at=row.created_at,
+            tindahan=stores[row.tindahan_id],
+            duplicate=stores[row.duplicate_id],
+        )
+        for row in rows
+    ]
+
+
+async def get_duplicate_suggestions(
+    db: AsyncSession,
+    barangay_zone: Optional[str] = None,
+    min_score: float = DUPLICATE_MIN_SCORE,
+    skip: int = 0,
+    limit: int = 50
+) -> List[DuplicateSuggestion]:
+    """Suggested merges, most similar first."""
+    query = select(TindahanDuplicate).where(
+        TindahanDuplicate.status == DuplicateStatus.SUGGESTED,
+        TindahanDuplicate.score >= min_score,
+    )
+    if barangay_zone:
+        query = query.where(TindahanDuplicate.barangay_zone == barangay_zone)
+    result = await db.execute(query.order_by(TindahanDuplicate.score.desc(), TindahanDuplicate.id).offset(skip).limit(limit))
+    return await _suggestions(db, result.scalars().all())
+
+
+async def _pending_suggestion(db: AsyncSession, suggestion_id: int) -> Optional[TindahanDuplicate]:
+    suggestion = (await db.execute(select(TindahanDuplicate).where(TindahanDuplicate.id == suggestion_id))).scalar_one_or_none()
+    if suggestion is not None and suggestion.status != DuplicateStatus.SUGGESTED:
+        raise ValueError(f"Suggestion {suggestion_id} is already {suggestion.status.value}")
+    return suggestion
+
+
+async def dismiss_duplicate(db: AsyncSession, suggestion_id: int) -> Optional[DuplicateSuggestion]:
+    """Mark a suggested pair as separate stores; None if the suggestion does not exist."""
+    suggestion = await _pending_suggestion(db, suggestion_id)
+    if suggestion is None:
+        return None
+    suggestion.status = DuplicateStatus.DISMISSED
+    suggestion.updated_at = datetime.utcnow()
+    dismissed = (await _suggestions(db, [suggestion]))[0]
+    await db.commit()
+    return dismissed
+
+
+async def merge_duplicate(db: AsyncSession, suggestion_id: int, keep_id: Optional[int] = None) -> Optional[DuplicateMergeResponse]:
+    """Merge one registration of a suggested pair into the other, in one transaction.
+
+    The earlier registration is kept unless `keep_id` names the other. Fields
+    it lacks are copied from the duplicate, the duplicate's inspections (and
+    with them its violations) are re-pointed to it, and the duplicate is
+    deactivated. Returns None if the suggestion does not exist.
+    """
+    suggestion = await _pending_suggestion(db, suggestion_id)
+    if suggestion is None:
+        return None
+    pair = (suggestion.tindahan_id, suggestion.duplicate_id)
+    keep_id = pair[0] if keep_id is None else keep_id
+    if keep_id not in pair:
+        raise ValueError(f"Tindahan {keep_id} is not part of suggestion {suggestion_id}")
+    duplicate_id = pair[1] if keep_id == pair[0] else pair[0]
+
+    result = await db.execute(select(Tindahan).where(Tindahan.id.in_(pair)))
+    stores = {tindahan.id: tindahan for tindahan in result.scalars().all()}
+    keep, duplicate = stores[keep_id], stores[duplicate_id]
+    if not keep.is_active or not duplicate.is_active:
+        raise ValueError("Both registrations must be active to merge")
+
+    now = datetime.utcnow()
+    keep_before, duplicate_before = tindahan_snapshot(keep), tindahan_snapshot(duplicate)
+    keep_state = tindahan_state(keep.model_dump())
+    for fields in MERGE_FILL_FIELDS:
+        if all(getattr(keep, name) in (None, "") for name in fields) and any(getattr(duplicate, name) is not None for name in fields):
+            for name in fields:
+                setattr(keep, name, getattr(duplicate, name))
+    if duplicate.last_inspection_date and (keep.last_inspection_date is None or duplicate.last_inspection_date > keep.last_inspection_date):
+        keep.last_inspection_date = duplicate.last_inspection_date
+    keep.updated_at = now
+    duplicate.is_active = False
+    duplicate.updated_at = now
+
+    await apply_tindahan_change(db, keep_before, tindahan_snapshot(keep))
+    await apply_tindahan_change(db, duplicate_before, tindahan_snapshot(duplicate))
+    # Violations are counted in their store's zone; move them before their inspections change store
+    await move_tindahan_violations(db, {duplicate_id: (duplicate.barangay_zone, keep.barangay_zone)})
+    moved = await db.execute(
+        update(Inspection)
+        .where(Inspection.tindahan_id == duplicate_id)
+        .values(tindahan_id=keep_id, updated_at=now)
+        .execution_options(synchronize_session=None)
+    )
+    await record_tindahan_change(db, keep_id, TindahanEventKind.UPDATED, keep_state, tindahan_state(keep.model_dump()), now)
+    await record_tindahan_change(db, duplicate_id, TindahanEventKind.DEACTIVATED, {"is_active": True}, {"is_active": False}, now)
+    await refresh_compliance_status(db, [keep_id])
+
+    suggestion.status = DuplicateStatus.MERGED
+    suggestion.updated_at = now
+    # Other suggestions involving the deactivated store no longer apply
+    await db.execute(
+        delete(TindahanDuplicate)
+        .where(
+            TindahanDuplicate.status == DuplicateStatus.SUGGESTED,
+            TindahanDuplicate.id != suggestion_id,
+            or_(TindahanDuplicate.tindahan_id == duplicate_id, TindahanDuplicate.duplicate_id == duplicate_id),
+        )
+        .execution_options(synchronize_session=None)
+    )
+    await db.refresh(keep)
+    await db.commit()
+    await invalidate_tindahan([keep_id, duplicate_id], membership_changed=True)
+    return DuplicateMergeResponse(
+        kept=TindahanResponse.model_validate(keep),
+        merged_id=duplicate_id,
+        inspections_moved=moved.rowcount,
+    )
@@ -0,0 +1,227 @@
+"""
+Export controller: the durable job queue behind asynchronous file exports
+"""
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+from typing import List, Optional
+from datetime import datetime, timedelta
+import os
+
+from app.models.compliance_report import ComplianceReport
+from app.models.export import ExportFormat, ExportJob, ExportJobResponse, ExportJobStatus, ExportKind, ExportRequest
+
+# Directory finished export files are written to
+EXPORT_DIR = os.getenv("EXPORT_DIR", "exports")
+# Hours a finished file is kept before the sweep deletes it
+EXPORT_RETENTION_HOURS = float(os.getenv("EXPORT_RETENTION_HOURS", "24"))
+# A running job whose worker has not reported for this long is presumed lost
+EXPORT_STALE_SECONDS = float(os.getenv("EXPORT_STALE_SECONDS", "120"))
+# Attempts before a repeatedly lost job is failed instead of requeued
+EXPORT_MAX_ATTEMPTS = 3
+
+MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv",
+    ExportFormat.XLSX: "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    ExportFormat.PDF: "application/pdf",
+}
+
+
+def export_path(job_id: int, export_format: ExportFormat) -> str:
+    """Where the file of a job is written."""
+    return os.path.join(EXPORT_DIR, f"export-{job_id}.{export_format.value}")
+
+
+def export_filename(job: ExportJob) -> str:
+    """File name offered to the client on download."""
+    return f"{job.kind.value}-{job.id}.{job.format.value}"
+
+
+def export_response(job: ExportJob) -> ExportJobResponse:
+    """Job status, with a download link once the file is ready."""
+    response = ExportJobResponse.model_validate(job)
+    if job.status == ExportJobStatus.COMPLETED:
+        response.download_url = f"/api/v1/exports/{job.id}/download"
+    return response
+
+
+async def enqueue_export(db: AsyncSession, request: ExportRequest) -> Optional[ExportJob]:
+    """Queue an export; returns None when the requested report does not exist."""
+    zone = request.barangay_zone
+    if request.kind == ExportKind.COMPLIANCE_REPORT:
+        if request.report_id is None:
+            raise ValueError("report_id is required for compliance_report exports")
+        report = await db.get(ComplianceReport, request.report_id)
+        if report is None:
+            return None
+        if report.barangay_zone is not None:
+            if zone is not None and zone != report.barangay_zone:
+                raise ValueError(f"Report {report.id} only covers zone '{report.barangay_zone}'")
+            zone = report.barangay_zone
+    elif request.report_id is not None:
+        raise ValueError("report_id only applies to compliance_report exports")
+
+    job = ExportJob(
+        kind=request.kind,
+        format=request.format,
+        barangay_zone=zone,
+        active_only=request.active_only,
+        report_id=request.report_id,
+        requested_by=request.requested_by,
+    )
+    db.add(job)
+    await db.flush()
+    await db.refresh(job)
+    await db.commit()
+    return job
+
+
+async def get_export_job(db: AsyncSession, job_id: int) -> Optional[ExportJob]:
+    """Get an export job by ID."""
+    return await db.get(ExportJob, job_id)
+
+
+async def get_export_job_list(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    status: Optional[ExportJobStatus] = None
+) -> List[ExportJob]:
+    """Get export jobs, newest first."""
+    query = select(ExportJob)
+    if status is not None:
+        query = query.where(ExportJob.status == status)
+    query = query.order_by(ExportJob.id.desc()).offset(skip).limit(limit)
+    result = await db.execute(query)
+    return list(result.scalars().all())
+
+
+async def claim_export_job(db: AsyncSession) -> Optional[ExportJob]:
+    """Take the oldest queued job and mark it running.
+
+    The status check in the UPDATE makes the claim atomic, so workers in
+    other processes polling the same table never start the same job twice.
+    """
+    while True:
+        job_id = (
+            await db.execute(
+                select(ExportJob.id).where(ExportJob.status == ExportJobStatus.QUEUED).order_by(ExportJob.id).limit(1)
+            )
+        ).scalar_one_or_none()
+        if job_id is None:
+            await db.rollback()
+            return None
+        now = datetime.utcnow()
+        result = await db.execute(
+            update(ExportJob)
+            .where(ExportJob.id == job_id, ExportJob.status == ExportJobStatus.QUEUED)
+            .values(status=ExportJobStatus.RUNNING, attempts=ExportJob.attempts + 1, started_at=now, heartbeat_at=now)
+        )
+        if result.rowcount == 1:
+            job = await db.get(ExportJob, job_id, populate_existing=True)
+            await db.commit()
+            return job
+        await db.commit()
+
+
+async def heartbeat_export_job(db: AsyncSession, job_id: int) -> None:
+    """Record that the worker running a job is still alive."""
+    await db.execute(
+        update(ExportJob)
+        .where(ExportJob.id == job_id, ExportJob.status == ExportJobStatus.RUNNING)
+        .values(heartbeat_at=datetime.utcnow())
+    )
+    await db.commit()
+
+
+async def finish_export_job(
+    db: AsyncSession,
+    job_id: int,
+    rows_written: Optional[int] = None,
+    size_bytes: Optional[int] = None,
+    error: Optional[str] = None
+) -> None:
+    """Mark a running job completed, or failed when an error is given."""
+    values = {"finished_at": datetime.utcnow(), "heartbeat_at": None}
+    if error is None:
+        values.update(status=ExportJobStatus.COMPLETED, rows_written=rows_written, size_bytes=size_bytes, error=None)
+    else:
+        values.update(status=ExportJobStatus.FAILED, error=error[:1000])
+    await db.execute(
+        update(ExportJob).where(ExportJob.id == job_id, ExportJob.status == ExportJobStatus.RUNNING).values(**values)
+    )
+    await db.commit()
+
+
+async def requeue_export_job(db: AsyncSession, job_id: int) -> None:
+    """Put a running job back in the queue, e.g. after its worker process died."""
+    await db.execute(
+        update(ExportJob)
+        .where(ExportJob.id == job_id, ExportJob.status == ExportJobStatus.RUNNING)
+        .values(status=ExportJobStatus.QUEUED, heartbeat_at=None)
+    )
+    await db.commit()
+
+
+async def requeue_stale_exports(
+    db: AsyncSession,
+    now: Optional[datetime] = None,
+    stale_seconds: float = EXPORT_STALE_SECONDS,
+    max_attempts: int = EXPORT_MAX_ATTEMPTS
+) -> int:
+    """Recover jobs left running by a worker that stopped heartbeating; returns the number touched.
+
+    Jobs with attempts left go back to the queue, the rest are failed.
+    """
+    now = now or datetime.utcnow()
+    stale = (
+        ExportJob.status == ExportJobStatus.RUNNING,
+        ExportJob.heartbeat_at < now - timedelta(seconds=stale_seconds),
+    )
+    # Checked with a read first so idle polls never take the write lock
+    if (await db.execute(select(ExportJob.id).where(*stale).limit(1))).first() is None:
+        await db.rollback()
+        return 0
+    requeued = await db.execute(
+        update(ExportJob)
+        .where(*stale, ExportJob.attempts < max_attempts)
+        .values(status=ExportJobStatus.QUEUED, heartbeat_at=None)
+    )
+    failed = await db.execute(
+        update(ExportJob)
+        .where(*stale)
+        .values(
+            status=ExportJobStatus.FAILED, heartbeat_at=None, finished_at=now,
+            error=f"Worker stopped responding ({max_attempts} attempts)",
+        )
+    )
+    await db.commit()
+    return requeued.rowcount + failed.rowcount
+
+
+async def expire_exports(
+    db: AsyncSession,
+    now: Optional[datetime] = None,
+    retention_hours: float = EXPORT_RETENTION_HOURS
+) -> int:
+    """Delete files of exports finished before the retention window; returns the number expired."""
+    cutoff = (now or datetime.utcnow()) - timedelta(hours=retention_hours)
+    result = await db.execute(
+        select(ExportJob.id, ExportJob.format)
+        .where(ExportJob.status == ExportJobStatus.COMPLETED, ExportJob.finished_at < cutoff)
+    )
+    expired = result.all()
+    for job_id, export_format in expired:
+        try:
+            os.remove(export_path(job_id, export_format))
+        except FileNotFoundError:
+            pass
+    if expired:
+        await db.execute(
+            update(ExportJob)
+            .where(ExportJob.id.in_([job_id for job_id, _ in expired]), ExportJob.status == ExportJobStatus.COMPLETED)
+            .values(status=ExportJobStatus.EXPIRED)
+        )
+    await db.commit()
+    return len(expired)
@@ -0,0 +1,229 @@
+"""
+History controller: the tindahan change-event stream, its reads and its compaction
+"""
+
+from itertools import groupby
+from sqlalchemy import delete, func, insert, literal, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+from datetime import date, datetime, timedelta
+import asyncio
+import json
+import os
+
+from app.audit import current_actor
+from app.models.store import Tindahan
+from app.models.history import TindahanEvent, TindahanEventKind, TindahanHistoryEntry, TindahanHistoryPage
+
+# Days events are kept as they were written; older ones are folded into monthly snapshots
+HISTORY_RETENTION_DAYS = int(os.getenv("HISTORY_RETENTION_DAYS", "90"))
+# Uncompacted events whose stores are folded per compaction transaction
+HISTORY_COMPACT_BATCH_SIZE = 1000
+# Events returned per history page when the client does not ask for fewer
+HISTORY_PAGE_LIMIT = 50
+
+# Tindahan fields tracked by the history, in model order
+TINDAHAN_HISTORY_FIELDS = [name for name in Tindahan.model_fields if name not in ("id", "version", "registered_at", "updated_at")]
+TINDAHAN_HISTORY_COLUMNS = [Tindahan.__table__.c[name] for name in TINDAHAN_HISTORY_FIELDS]
+# Events that hold every field rather than only the changed ones
+FULL_STATE_KINDS = (TindahanEventKind.CREATED, TindahanEventKind.SNAPSHOT)
+# Compiled inline so the planner can match the partial index on uncompacted events
+_SNAPSHOT = literal(TindahanEventKind.SNAPSHOT, TindahanEvent.__table__.c.kind.type, literal_execute=True)
+
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Cannot encode {type(value).__name__} in a history event")
+
+
+def _encode(changes: Mapping[str, Any]) -> str:
+    return json.dumps(changes, default=_json_default, separators=(",", ":"))
+
+
+def tindahan_state(values: Mapping[str, Any]) -> Dict[str, Any]:
+    """Tracked fields of a tindahan row or insert values; fields a new row leaves unset are None."""
+    return {name: values.get(name) for name in TINDAHAN_HISTORY_FIELDS}
+
+
+def changed_fields(before: Mapping[str, Any], after: Mapping[str, Any]) -> Dict[str, Any]:
+    """New values of the tracked fields that differ between two states."""
+    return {name: after[name] for name in TINDAHAN_HISTORY_FIELDS if name in after and after[name] != before.get(name)}
+
+
+def tindahan_event(
+    tindahan_id: int,
+    kind: TindahanEventKind,
+    changes: Mapping[str, Any],
+    now: Optional[datetime] = None
+) -> Dict[str, Any]:
+    """Insert values of one history event, attributed to the current request's actor."""
+    return {
+        "tindahan_id": tindahan_id,
+        "kind": kind,
+        "changes": _encode(changes),
+        "actor": current_actor(),
+        "created_at": now or datetime.utcnow(),
+    }
+
+
+async def record_tindahan_events(db: AsyncSession, events: List[Dict[str, Any]]) -> None:
+    """Append history events with one executemany INSERT, inside the caller's transaction."""
+    if events:
+        await db.execute(insert(TindahanEvent), events)
+
+
+async def record_tindahan_change(
+    db: AsyncSession,
+    tindahan_id: int,
+    kind: TindahanEventKind,
+    before: Mapping[str, Any],
+    after: Mapping[str, Any],
+    now: Optional[datetime] = None
+) -> None:
+    """Append one event with the fields that differ between before and after; nothing if none do."""
+    changes = changed_fields(before, after)
+    if changes:
+        await record_tindahan_events(db, [tindahan_event(tindahan_id, kind, changes, now)])
+
+
+def _fold(state: Dict[str, Any], kind: TindahanEventKind, changes: Dict[str, Any]) -> Dict[str, Any]:
+    """State after applying one event to the state before it."""
+    if kind in FULL_STATE_KINDS:
+        return dict(changes)
+    state.update(changes)
+    return state
+
+
+async def get_tindahan_history(
+    db: AsyncSession,
+    tindahan_id: int,
+    limit: int = HISTORY_PAGE_LIMIT,
+    before_id: Optional[int] = None
+) -> Optional[TindahanHistoryPage]:
+    """A page of a tindahan's changes, newest first; None if the tindahan does not exist.
+
+    Previous values are rebuilt by folding the events since the last
+    snapshot or registration before the page, which compaction keeps to the
+    retention window.
+    """
+    if (await db.execute(select(Tindahan.id).where(Tindahan.id == tindahan_id))).scalar_one_or_none() is None:
+        return None
+
+    query = select(TindahanEvent).where(TindahanEvent.tindahan_id == tindahan_id)
+    if before_id is not None:
+        query = query.where(TindahanEvent.id < before_id)
+    events = (await db.execute(query.order_by(TindahanEvent.id.desc()).limit(limit + 1))).scalars().all()
+    has_more = len(events) > limit
+    events = list(reversed(events[:limit]))
+    if not events:
+        return TindahanHistoryPage(tindahan_id=tindahan_id, events=[], next_before_id=None)
+
+    base_id = (
+        select(func.max(TindahanEvent.id))
+        .where(
+            TindahanEvent.tindahan_id == tindahan_id,
+            TindahanEvent.kind.in_(FULL_STATE_KINDS),
+            TindahanEvent.id < events[0].id,
+        )
+        .scalar_subquery()
+    )
+    earlier = await db.execute(
+        select(TindahanEvent.kind, TindahanEvent.changes)
+        .where(
+            TindahanEvent.tindahan_id == tindahan_id,
+            TindahanEvent.id < events[0].id,
+            TindahanEvent.id >= func.coalesce(base_id, 0),
+        )
+        .order_by(TindahanEvent.id)
+    )
+    state: Dict[str, Any] = {}
+    for kind, changes in earlier.all():
+        state = _fold(state, kind, json.loads(changes))
+
+    entries = []
+    for event in events:
+        changes = json.loads(event.changes)
+        previous = {} if event.kind in FULL_STATE_KINDS else {name: state[name] for name in changes if name in state}
+        state = _fold(state, event.kind, changes)
+        entries.append(TindahanHistoryEntry(
+            id=event.id,
+            kind=event.kind,
+            actor=event.actor,
+            created_at=event.created_at,
+            changes=changes,
+            previous=previous,
+        ))
+    entries.reverse()
+    return TindahanHistoryPage(
+        tindahan_id=tindahan_id,
+        events=entries,
+        next_before_id=entries[-1].id if has_more else None,
+    )
+
+
+def _compact_store(rows: list) -> Tuple[List[Dict[str, Any]], List[int]]:
+    """Snapshot updates and event ids to delete for one store's events older than the cutoff, in id order.
+
+    Each month that still has plain events is reduced to its last row, which
+    becomes a snapshot of the state at the end of the month.
+    """
+    snapshots: List[Dict[str, Any]] = []
+    removed: List[int] = []
+    state: Dict[str, Any] = {}
+    for _, month_rows in groupby(rows, key=lambda row: (row.created_at.year, row.created_at.month)):
+        month_rows = list(month_rows)
+        for row in month_rows:
+            state = _fold(state, row.kind, json.loads(row.changes))
+        if all(row.kind == TindahanEventKind.SNAPSHOT for row in month_rows):
+            continue
+        snapshots.append({"id": month_rows[-1].id, "kind": TindahanEventKind.SNAPSHOT, "changes": _encode(state), "actor": None})
+        removed.extend(row.id for row in month_rows[:-1])
+    return snapshots, removed
+
+
+async def compact_tindahan_history(
+    db: AsyncSession,
+    now: Optional[datetime] = None,
+    retention_days: int = HISTORY_RETENTION_DAYS,
+    batch_size: int = HISTORY_COMPACT_BATCH_SIZE
+) -> int:
+    """Fold history events older than the retention window into monthly snapshots; returns the number removed.
+
+    Snapshots keep the id and time of the last event they replace, so the
+    stream stays in id order and each store keeps one row per past month.
+    """
+    cutoff = (now or datetime.utcnow()) - timedelta(days=retention_days)
+    removed = 0
+    while True:
+        result = await db.execute(
+            select(TindahanEvent.tindahan_id)
+            .where(TindahanEvent.kind != _SNAPSHOT, TindahanEvent.created_at < cutoff)
+            .order_by(TindahanEvent.created_at)
+            .limit(batch_size)
+        )
+        tindahan_ids = set(result.scalars().all())
+        if not tindahan_ids:
+            await db.rollback()
+            return removed
+
+        result = await db.execute(
+            select(TindahanEvent.id, TindahanEvent.tindahan_id, TindahanEvent.kind, TindahanEvent.changes, TindahanEvent.created_at)
+            .where(TindahanEvent.tindahan_id.in_(tindahan_ids), TindahanEvent.created_at < cutoff)
+            .order_by(TindahanEvent.tindahan_id, TindahanEvent.id)
+        )
+        snapshots: List[Dict[str, Any]] = []
+        obsolete: List[int] = []
+        for _, rows in groupby(result.all(), key=lambda row: row.tindahan_id):
+            store_snapshots, store_removed = _compact_store(list(rows))
+            snapshots.extend(store_snapshots)
+            obsolete.extend(store_removed)
+
+        await db.execute(update(TindahanEvent), snapshots)
+        for start in range(0, len(obsolete), batch_size):
+            await db.execute(delete(TindahanEvent).where(TindahanEvent.id.in_(obsolete[start:start + batch_size])))
+        await db.commit()
+        removed += len(obsolete)
+        # Let queued API requests take the write lock between batches
+        await asyncio.sleep(0)
@@ -0,0 +1,257 @@
+"""
+Inspection controller for compliance inspection and violation operations
+"""
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlmodel import select
+from typing import List, Optional
+from datetime import datetime, timedelta
+import os
+
+from app.cache import invalidate_tindahan
+from app.models.store import Tindahan
+from app.models.history import TindahanEventKind
+from app.models.inspection import (
+    Inspection, InspectionCreate, InspectionUpdate, InspectionResponse, InspectionStatus,
+    Violation, ViolationCreate, ViolationUpdate, ViolationResponse, ViolationType
+)
+from app.controllers.compliance_controller import apply_inspection_change, apply_violation_change, violation_snapshot
+from app.controllers.status_controller import refresh_compliance_status
+from app.controllers.history_controller import record_tindahan_events, tindahan_event
+
+# Days between routine inspections of the same tindahan
+INSPECTION_INTERVAL_DAYS = int(os.getenv("INSPECTION_INTERVAL_DAYS", "180"))
+
+
+async def _load_inspection(db: AsyncSession, inspection_id: int) -> Optional[Inspection]:
+    """Load an inspection with its violations in one extra IN query."""
+    result = await db.execute(
+        select(Inspection)
+        .where(Inspection.id == inspection_id)
+        .options(selectinload(Inspection.violations))
+    )
+    return result.scalar_one_or_none()
+
+
+async def _record_completion(db: AsyncSession, inspection: Inspection) -> None:
+    """Stamp the tindahan of a newly completed inspection as inspected and set its next due date."""
+    inspected = {
+        "last_inspection_date": inspection.inspection_date,
+        "next_inspection_due": inspection.inspection_date + timedelta(days=INSPECTION_INTERVAL_DAYS),
+    }
+    await db.execute(
+        update(Tindahan)
+        .where(Tindahan.id == inspection.tindahan_id)
+        .values(**inspected, updated_at=inspection.updated_at, version=Tindahan.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    await record_tindahan_events(db, [
+        tindahan_event(inspection.tindahan_id, TindahanEventKind.UPDATED, inspected, inspection.updated_at)
+    ])
+
+
+async def create_inspection(db: AsyncSession, inspection: InspectionCreate) -> Optional[InspectionResponse]:
+    """Schedule or record a new inspection; returns None if the tindahan does not exist."""
+    result = await db.execute(select(Tindahan.id).where(Tindahan.id == inspection.tindahan_id))
+    if result.scalar_one_or_none() is None:
+        return None
+
+    db_inspection = Inspection(**inspection.model_dump())
+    db.add(db_inspection)
+    await db.flush()
+    completed = db_inspection.status == InspectionStatus.COMPLETED
+    if completed:
+        await _record_completion(db, db_inspection)
+    await apply_inspection_change(db, None, db_inspection.status)
+    created = await _load_inspection(db, db_inspection.id)
+    await db.commit()
+    if completed:
+        await invalidate_tindahan([db_inspection.tindahan_id])
+    return InspectionResponse.model_validate(created)
+
+
+async def get_inspection(db: AsyncSession, inspection_id: int) -> Optional[InspectionResponse]:
+    """Get a specific inspection with its violations."""
+    inspection = await _load_inspection(db, inspection_id)
+    return InspectionResponse.model_validate(inspection) if inspection else None
+
+
+async def get_inspection_list(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    tindahan_id: Optional[int] = None,
+    inspector_name: Optional[str] = None,
+    status: Optional[InspectionStatus] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    min_severity: Optional[int] = None
+) -> List[InspectionResponse]:
+    """Get inspections, newest first, with violations loaded in a single IN query.
+
+    Always issues exactly two queries regardless of page size.
+    """
+    query = select(Inspection).options(selectinload(Inspection.violations))
+    if tindahan_id is not None:
+        query = query.where(Inspection.tindahan_id == tindahan_id)
+    if inspector_name is not None:
+        query = query.where(Inspection.inspector_name == inspector_name)
+    if status is not None:
+        query = query.where(Inspection.status == status)
+    if date_from is not None:
+        query = query.where(Inspection.inspection_date >= date_from)
+    if date_to is not None:
+        query = query.where(Inspection.inspection_date <= date_to)
+    if min_severity is not None:
+        query = query.where(
+            select(Violation.id)
+            .where(Violation.inspection_id == Inspection.id, Violation.severity >= min_severity)
+            .exists()
+        )
+
+    query = query.order_by(Inspection.id.desc()).offset(skip).limit(limit)
+    result = await db.execute(query)
+    return [InspectionResponse.model_validate(inspection) for inspection in result.scalars().all()]
+
+
+async def update_inspection(db: AsyncSession, inspection_id: int, inspection_update: InspectionUpdate) -> Optional[InspectionResponse]:
+    """Update an inspection record."""
+    db_inspection = await _load_inspection(db, inspection_id)
+    if not db_inspection:
+        return None
+
+    before = db_inspection.status
+    update_data = inspection_update.model_dump(exclude_unset=True)
+    for field, value in update_data.items():
+        setattr(db_inspection, field, value)
+    db_inspection.updated_at = datetime.utcnow()
+
+    completed = before != InspectionStatus.COMPLETED and db_inspection.status == InspectionStatus.COMPLETED
+    if completed:
+        await _record_completion(db, db_inspection)
+
+    await apply_inspection_change(db, before, db_inspection.status)
+    await db.commit()
+    if completed:
+        await invalidate_tindahan([db_inspection.tindahan_id])
+    return InspectionResponse.model_validate(db_inspection)
+
+
+async def cancel_inspection(db: AsyncSession, inspection_id: int) -> bool:
+    """Cancel an inspection (set status to CANCELLED)."""
+    result = await db.execute(select(Inspection).where(Inspection.id == inspection_id))
+    db_inspection = result.scalar_one_or_none()
+
+    if not db_inspection:
+        return False
+
+    before = db_inspection.status
+    db_inspection.status = InspectionStatus.CANCELLED
+    db_inspection.updated_at = datetime.utcnow()
+    await apply_inspection_change(db, before, db_inspection.status)
+    await db.commit()
+    return True
+
+
+def _set_resolution_date(violation: Violation) -> None:
+    """Stamp a resolved violation that has no resolution date yet; an open (or reopened) one has none."""
+    if not violation.is_resolved:
+        violation.resolution_date = None
+    elif violation.resolution_date is None:
+        violation.resolution_date = datetime.utcnow()
+
+
+async def create_violation(db: AsyncSession, violation: ViolationCreate) -> Optional[ViolationResponse]:
+    """Record a violation; returns None if the inspection does not exist."""
+    result = await db.execute(
+        select(Tindahan.id, Tindahan.barangay_zone)
+        .join(Inspection, Inspection.tindahan_id == Tindahan.id)
+        .where(Inspection.id == violation.inspection_id)
+    )
+    store = result.one_or_none()
+    if store is None:
+        return None
+
+    db_violation = Violation(**violation.model_dump())
+    _set_resolution_date(db_violation)
+    db.add(db_violation)
+    await apply_violation_change(db, None, violation_snapshot(db_violation, store.barangay_zone))
+    status_changes = await refresh_compliance_status(db, [store.id])
+    await db.refresh(db_violation)
+    await db.commit()
+    if status_changes:
+        await invalidate_tindahan([store.id])
+    return ViolationResponse.model_validate(db_violation)
+
+
+async def get_violation(db: AsyncSession, violation_id: int) -> Optional[ViolationResponse]:
+    """Get a specific violation by ID."""
+    result = await db.execute(select(Violation).where(Violation.id == violation_id))
+    violation = result.scalar_one_or_none()
+    return ViolationResponse.model_validate(violation) if violation else None
+
+
+async def get_violation_list(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    tindahan_id: Optional[int] = None,
+    inspection_id: Optional[int] = None,
+    violation_type: Optional[ViolationType] = None,
+    is_resolved: Optional[bool] = None,
+    min_severity: Optional[int] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None
+) -> List[ViolationResponse]:
+    """Get violations, newest first, in a single query."""
+    query = select(Violation)
+    if tindahan_id is not None:
+        query = query.join(Inspection, Inspection.id == Violation.inspection_id).where(Inspection.tindahan_id == tindahan_id)
+    if inspection_id is not None:
+        query = query.where(Violation.inspection_id == inspection_id)
+    if violation_type is not None:
+        query = query.where(Violation.violation_type == violation_type)
+    if is_resolved is not None:
+        query = query.where(Violation.is_resolved == is_resolved)
+    if min_severity is not None:
+        query = query.where(Violation.severity >= min_severity)
+    if date_from is not None:
+        query = query.where(Violation.created_at >= date_from)
+    if date_to is not None:
+        query = query.where(Violation.created_at <= date_to)
+
+    query = query.order_by(Violation.id.desc()).offset(skip).limit(limit)
+    result = await db.execute(query)
+    return [ViolationResponse.model_validate(violation) for violation in result.scalars().all()]
+
+
+async def update_violation(db: AsyncSession, violation_id: int, violation_update: ViolationUpdate) -> Optional[ViolationResponse]:
+    """Update a violation, e.g. to record its resolution."""
+    result = await db.execute(
+        select(Violation, Tindahan.id, Tindahan.barangay_zone)
+        .join(Inspection, Inspection.id == Violation.inspection_id)
+        .join(Tindahan, Tindahan.id == Inspection.tindahan_id)
+        .where(Violation.id == violation_id)
+    )
+    row = result.one_or_none()
+
+    if not row:
+        return None
+
+    db_violation, tindahan_id, zone = row
+    before = violation_snapshot(db_violation, zone)
+    update_data = violation_update.model_dump(exclude_unset=True)
+    for field, value in update_data.items():
+        setattr(db_violation, field, value)
+    _set_resolution_date(db_violation)
+    db_violation.updated_at = datetime.utcnow()
+
+    await apply_violation_change(db, before, violation_snapshot(db_violation, zone))
+    status_changes = await refresh_compliance_status(db, [tindahan_id])
+    await db.refresh(db_violation)
+    await db.commit()
+    if status_changes:
+        await invalidate_tindahan([tindahan_id])
+    return ViolationResponse.model_validate(db_violation)
@@ -0,0 +1,120 @@
+"""
+Planning controller: daily inspector routes for scheduled inspections
+"""
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+from typing import List, Optional
+from datetime import date, datetime, time, timedelta
+
+from app.models.store import Tindahan
+from app.models.inspection import Inspection, InspectionStatus
+from app.models.planning import InspectionPlan, InspectionPlanRequest, InspectorRoute, PlannedStop
+from app.planner import Route, Visit, plan_routes, working_days
+
+# Time of day written to inspections when a plan is applied
+PLANNED_VISIT_TIME = time(8, 0)
+
+
+async def _load_visits(db: AsyncSession, until: date, zones: Optional[List[str]]) -> List[Visit]:
+    """Scheduled inspections of active stores due before `until`, with their store's location."""
+    query = (
+        select(
+            Inspection.id, Inspection.tindahan_id, Inspection.inspection_type, Inspection.inspection_date,
+            Tindahan.business_name, Tindahan.barangay_zone, Tindahan.latitude, Tindahan.longitude
+        )
+        .join(Tindahan, Tindahan.id == Inspection.tindahan_id)
+        .where(
+            Inspection.status == InspectionStatus.SCHEDULED,
+            Inspection.inspection_date < datetime.combine(until, time.min),
+            Tindahan.is_active == True,
+        )
+    )
+    if zones:
+        query = query.where(Tindahan.barangay_zone.in_(zones))
+    result = await db.execute(query)
+    return [
+        Visit(
+            inspection_id=row.id,
+            tindahan_id=row.tindahan_id,
+            business_name=row.business_name,
+            barangay_zone=row.barangay_zone,
+            inspection_type=row.inspection_type,
+            due=row.inspection_date,
+            latitude=row.latitude,
+            longitude=row.longitude,
+        )
+        for row in result.all()
+    ]
+
+
+def _route_response(route: Route) -> InspectorRoute:
+    stops = [
+        PlannedStop(
+            inspection_id=visit.inspection_id,
+            tindahan_id=visit.tindahan_id,
+            business_name=visit.business_name,
+            barangay_zone=visit.barangay_zone,
+            inspection_type=visit.inspection_type,
+            due=visit.due,
+            latitude=visit.latitude,
+            longitude=visit.longitude,
+            leg_m=round(leg, 1) if leg is not None else None,
+        )
+        for visit, leg in zip(route.visits, route.legs)
+    ]
+    return InspectorRoute(
+        inspector_name=route.inspector_name,
+        day=route.day,
+        zones=route.zones,
+        distance_m=round(route.distance_m, 1),
+        stops=stops,
+    )
+
+
+async def plan_inspections(db: AsyncSession, request: InspectionPlanRequest, today: Optional[date] = None) -> InspectionPlan:
+    """Plan routes over the requested working days without changing any inspection."""
+    start = request.start_date or today or datetime.utcnow().date()
+    days = working_days(start, request.days)
+    visits = await _load_visits(db, days[-1] + timedelta(days=1), request.zones)
+    routes, unplanned = plan_routes(visits, request.inspectors, days, request.stops_per_day)
+
+    responses = [_route_response(route) for route in routes]
+    return InspectionPlan(
+        start_date=start,
+        days=len(days),
+        candidates=len(visits),
+        planned=sum(len(route.stops) for route in responses),
+        unplanned_inspection_ids=[visit.inspection_id for visit in unplanned],
+        distance_m=round(sum(route.distance_m for route in responses), 1),
+        applied=False,
+        routes=responses,
+    )
+
+
+async def apply_inspection_plan(db: AsyncSession, plan: InspectionPlan) -> InspectionPlan:
+    """Assign each planned inspection its inspector and day, in one transaction.
+
+    Planning reads from the replica and takes no write lock; inspections
+    completed or cancelled since then are left as they are.
+    """
+    values = [
+        {
+            "id": stop.inspection_id,
+            "inspector_name": route.inspector_name,
+            "inspection_date": datetime.combine(route.day, PLANNED_VISIT_TIME),
+        }
+        for route in plan.routes for stop in route.stops
+    ]
+    if values:
+        now = datetime.utcnow()
+        await db.execute(
+            update(Inspection)
+            .where(Inspection.status == InspectionStatus.SCHEDULED)
+            .execution_options(synchronize_session=None),
+            [{**value, "updated_at": now} for value in values]
+        )
+        await db.commit()
+    plan.applied = bool(values)
+    return plan
@@ -0,0 +1,263 @@
+"""
+Report controller for materialized compliance report snapshots
+"""
+
+from sqlalchemy import case, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime
+import json
+
+from app.models.store import Tindahan, ComplianceStatus
+from app.models.inspection import Inspection, Violation
+from app.models.compliance_report import (
+    ComplianceReport, ComplianceReportGenerate, ComplianceReportResponse, ComplianceMetrics, ReportType
+)
+from app.controllers.compliance_controller import PENDING_INSPECTION_STATUSES
+
+# Calendar reports that are rolled up from stored monthly snapshots
+ROLLUP_MONTHS = {ReportType.QUARTERLY: 3, ReportType.ANNUAL: 12}
+
+# Metrics describing the state of stores at the end of a period; the rest are
+# counts of events inside the period and are summed when rolling up
+STOCK_METRICS = (
+    "total_tindahan", "compliant_tindahan", "warning_tindahan",
+    "violation_tindahan", "suspended_tindahan", "expired_permits",
+)
+FLOW_METRICS = ("pending_inspections", "total_violations", "resolved_violations")
+
+STATUS_METRICS = {
+    ComplianceStatus.COMPLIANT: "compliant_tindahan",
+    ComplianceStatus.WARNING: "warning_tindahan",
+    ComplianceStatus.VIOLATION: "violation_tindahan",
+    ComplianceStatus.SUSPENDED: "suspended_tindahan",
+}
+
+
+def _add_months(value: datetime, months: int) -> datetime:
+    """First day of the month `months` after the month of value."""
+    years, month_index = divmod(value.month - 1 + months, 12)
+    return datetime(value.year + years, month_index + 1, 1)
+
+
+def report_period(report_type: ReportType, start: datetime, end: Optional[datetime]) -> Tuple[datetime, datetime]:
+    """Normalize a requested period to [start, end) for the report type."""
+    if report_type == ReportType.MONTHLY:
+        period_start = datetime(start.year, start.month, 1)
+        return period_start, _add_months(period_start, 1)
+    if report_type == ReportType.QUARTERLY:
+        period_start = datetime(start.year, (start.month - 1) // 3 * 3 + 1, 1)
+        return period_start, _add_months(period_start, 3)
+    if report_type == ReportType.ANNUAL:
+        period_start = datetime(start.year, 1, 1)
+        return period_start, _add_months(period_start, 12)
+    if end is None or end <= start:
+        raise ValueError("report_period_end must be after report_period_start")
+    return start, end
+
+
+def _metrics_from_counts(counts: Dict[str, int]) -> ComplianceMetrics:
+    """Build metrics from raw counts, deriving the compliance rate."""
+    total = counts.get("total_tindahan", 0)
+    compliant = counts.get("compliant_tindahan", 0)
+    return ComplianceMetrics(
+        **{name: counts.get(name, 0) for name in STOCK_METRICS + FLOW_METRICS},
+        compliance_rate=round(compliant / total * 100, 2) if total else 0.0,
+    )
+
+
+async def compute_zone_counts(
+    db: AsyncSession,
+    start: datetime,
+    end: datetime,
+    zone: Optional[str] = None
+) -> Dict[str, Dict[str, int]]:
+    """Aggregate raw metric counts per barangay zone for [start, end).
+
+    One grouped query per source table; no rows are loaded into Python.
+    Store counts reflect the current state, which is what the stored snapshot
+    preserves for later rollups.
+    """
+    counts: Dict[str, Dict[str, int]] = {}
+
+    def zone_counts(name: str) -> Dict[str, int]:
+        return counts.setdefault(name, dict.fromkeys(STOCK_METRICS + FLOW_METRICS, 0))
+
+    expired = func.sum(case((Tindahan.permit_expiry_date < end, 1), else_=0))
+    query = (
+        select(Tindahan.barangay_zone, Tindahan.compliance_status, func.count(), expired)
+        .where(Tindahan.is_active == True)
+        .group_by(Tindahan.barangay_zone, Tindahan.compliance_status)
+    )
+    if zone is not None:
+        query = query.where(Tindahan.barangay_zone == zone)
+    for row_zone, status, count, expired_count in (await db.execute(query)).all():
+        row = zone_counts(row_zone)
+        row["total_tindahan"] += count
+        row[STATUS_METRICS[ComplianceStatus(status)]] += count
+        row["expired_permits"] += int(expired_count or 0)
+
+    query = (
+        select(Tindahan.barangay_zone, func.count())
+        .select_from(Inspection)
+        .join(Tindahan, Tindahan.id == Inspection.tindahan_id)
+        .where(
+            Inspection.status.in_(PENDING_INSPECTION_STATUSES),
+            Inspection.inspection_date >= start,
+            Inspection.inspection_date < end,
+        )
+        .group_by(Tindahan.barangay_zone)
+    )
+    if zone is not None:
+        query = query.where(Tindahan.barangay_zone == zone)
+    for row_zone, count in (await db.execute(query)).all():
+        zone_counts(row_zone)["pending_inspections"] = count
+
+    resolved = func.sum(case((Violation.is_resolved == True, 1), else_=0))
+    query = (
+        select(Tindahan.barangay_zone, func.count(), resolved)
+        .select_from(Violation)
+        .join(Inspection, Inspection.id == Violation.inspection_id)
+        .join(Tindahan, Tindahan.id == Inspection.tindahan_id)
+        .where(Violation.created_at >= start, Violation.created_at < end)
+        .group_by(Tindahan.barangay_zone)
+    )
+    if zone is not None:
+        query = query.where(Tindahan.barangay_zone == zone)
+    for row_zone, count, resolved_count in (await db.execute(query)).all():
+        row = zone_counts(row_zone)
+        row["total_violations"] = count
+        row["resolved_violations"] = int(resolved_count or 0)
+
+    return counts
+
+
+async def compute_metrics(db: AsyncSession, start: datetime, end: datetime, zone: Optional[str] = None) -> ComplianceMetrics:
+    """Compute metrics for a period, for one zone or the whole barangay."""
+    totals: Dict[str, int] = {}
+    for row in (await compute_zone_counts(db, start, end, zone)).values():
+        for name, value in row.items():
+            totals[name] = totals.get(name, 0) + value
+    return _metrics_from_counts(totals)
+
+
+def rollup_metrics(monthly: List[ComplianceMetrics]) -> ComplianceMetrics:
+    """Combine consecutive monthly metrics: stock values from the last month, flows summed."""
+    counts = {name: getattr(monthly[-1], name) for name in STOCK_METRICS}
+    counts.update({name: sum(getattr(metrics, name) for metrics in monthly) for name in FLOW_METRICS})
+    return _metrics_from_counts(counts)
+
+
+async def _monthly_snapshot(
+    db: AsyncSession,
+    month_start: datetime,
+    zone: Optional[str],
+    generated_by: str
+) -> ComplianceMetrics:
+    """Reuse the stored monthly snapshot for a month, generating it if missing or taken before month end."""
+    month_end = _add_months(month_start, 1)
+    query = (
+        select(ComplianceReport)
+        .where(
+            ComplianceReport.report_type == ReportType.MONTHLY,
+            ComplianceReport.barangay_zone == zone if zone is not None else ComplianceReport.barangay_zone.is_(None),
+            ComplianceReport.report_period_start == month_start,
+        )
+        .order_by(ComplianceReport.id.desc())
+        .limit(1)
+    )
+    snapshot = (await db.execute(query)).scalar_one_or_none()
+    if snapshot and snapshot.metrics and snapshot.created_at >= month_end:
+        return ComplianceMetrics.model_validate_json(snapshot.metrics)
+
+    metrics = await compute_metrics(db, month_start, month_end, zone)
+    if month_end <= datetime.utcnow():
+        db.add(ComplianceReport(
+            report_type=ReportType.MONTHLY,
+            report_period_start=month_start,
+            report_period_end=month_end,
+            barangay_zone=zone,
+            generated_by=generated_by,
+            summary=_summarize(metrics),
+            metrics=metrics.model_dump_json(),
+        ))
+    return metrics
+
+
+def _summarize(metrics: ComplianceMetrics) -> str:
+    """One-line summary of report metrics."""
+    return (
+        f"{metrics.compliant_tindahan} of {metrics.total_tindahan} active tindahan compliant "
+        f"({metrics.compliance_rate}%); {metrics.total_violations} violations recorded, "
+        f"{metrics.resolved_violations} resolved; {metrics.expired_permits} expired permits."
+    )
+
+
+def _report_response(report: ComplianceReport) -> ComplianceReportResponse:
+    """Convert a stored report, decoding its JSON metrics."""
+    data = report.model_dump()
+    data["metrics"] = ComplianceMetrics.model_validate_json(report.metrics) if report.metrics else None
+    return ComplianceReportResponse.model_validate(data)
+
+
+async def generate_report(db: AsyncSession, request: ComplianceReportGenerate) -> ComplianceReportResponse:
+    """Compute and store a compliance report snapshot.
+
+    Quarterly and annual reports are rolled up from monthly snapshots, which
+    are generated and stored on first use so later rollups skip raw tables.
+    """
+    if request.report_type == ReportType.ZONE_SPECIFIC and not request.barangay_zone:
+        raise ValueError("barangay_zone is required for zone-specific reports")
+    start, end = report_period(request.report_type, request.report_period_start, request.report_period_end)
+
+    if request.report_type in ROLLUP_MONTHS:
+        monthly = [
+            await _monthly_snapshot(db, _add_months(start, offset), request.barangay_zone, request.generated_by)
+            for offset in range(ROLLUP_MONTHS[request.report_type])
+        ]
+        metrics = rollup_metrics(monthly)
+    else:
+        metrics = await compute_metrics(db, start, end, request.barangay_zone)
+
+    db_report = ComplianceReport(
+        report_type=request.report_type,
+        report_period_start=start,
+        report_period_end=end,
+        barangay_zone=request.barangay_zone,
+        generated_by=request.generated_by,
+        summary=request.summary or _summarize(metrics),
+        recommendations=request.recommendations,
+        metrics=metrics.model_dump_json(),
+    )
+    db.add(db_report)
+    await db.flush()
+    await db.refresh(db_report)
+    await db.commit()
+    return _report_response(db_report)
+
+
+async def get_report(db: AsyncSession, report_id: int) -> Optional[ComplianceReportResponse]:
+    """Get a stored report by ID."""
+    result = await db.execute(select(ComplianceReport).where(ComplianceReport.id == report_id))
+    report = result.scalar_one_or_none()
+    return _report_response(report) if report else None
+
+
+async def get_report_list(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    report_type: Optional[ReportType] = None,
+    barangay_zone: Optional[str] = None
+) -> List[ComplianceReportResponse]:
+    """Get stored reports, newest first."""
+    query = select(ComplianceReport)
+    if report_type is not None:
+        query = query.where(ComplianceReport.report_type == report_type)
+    if barangay_zone is not None:
+        query = query.where(ComplianceReport.barangay_zone == barangay_zone)
+
+    query = query.order_by(ComplianceReport.id.desc()).offset(skip).limit(limit)
+    result = await db.execute(query)
+    return [_report_response(report) for report in result.scalars().all()]
@@ -0,0 +1,172 @@
+"""
+Status controller: derives tindahan compliance status from open violations and permits
+"""
+
+from sqlalchemy import and_, case, func, literal, or_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from datetime import datetime, timedelta
+import asyncio
+import os
+
+from app.cache import invalidate_tindahan
+from app.models.store import Tindahan, ComplianceStatus
+from app.models.inspection import Inspection, Violation
+from app.models.compliance_report import ComplianceStatusChange, ComplianceRecomputeResponse
+from app.models.history import TindahanEventKind
+from app.controllers.compliance_controller import apply_status_transitions
+from app.controllers.history_controller import record_tindahan_events, tindahan_event
+
+# Days after permit expiry before a store with an expired permit is in VIOLATION
+PERMIT_GRACE_DAYS = int(os.getenv("PERMIT_GRACE_DAYS", "30"))
+# Lowest severity of an open violation that puts a store in VIOLATION; milder ones give WARNING
+VIOLATION_SEVERITY = int(os.getenv("VIOLATION_SEVERITY", "3"))
+# Stores evaluated per transaction by the bulk recompute, by id range
+RECOMPUTE_CHUNK_SIZE = int(os.getenv("RECOMPUTE_CHUNK_SIZE", "5000"))
+
+
+def _status(value: ComplianceStatus):
+    """Status literal bound with the column's type, so it is stored like the column values."""
+    return literal(value, Tindahan.__table__.c.compliance_status.type)
+
+
+def derived_status_expression(open_severity, now: datetime, grace_days: int = PERMIT_GRACE_DAYS):
+    """SQL expression for the status the rules give a tindahan row.
+
+    open_severity is the highest severity among the store's unresolved
+    violations (NULL when there are none). SUSPENDED is set by hand and is
+    never changed by the rules.
+    """
+    return case(
+        (Tindahan.compliance_status == ComplianceStatus.SUSPENDED, _status(ComplianceStatus.SUSPENDED)),
+        (
+            or_(open_severity >= VIOLATION_SEVERITY, Tindahan.permit_expiry_date < now - timedelta(days=grace_days)),
+            _status(ComplianceStatus.VIOLATION),
+        ),
+        (or_(open_severity.is_not(None), Tindahan.permit_expiry_date < now), _status(ComplianceStatus.WARNING)),
+        else_=_status(ComplianceStatus.COMPLIANT),
+    )
+
+
+def derive_compliance_status(
+    current: ComplianceStatus,
+    open_severity: Optional[int],
+    permit_expiry_date: Optional[datetime],
+    now: datetime,
+    grace_days: int = PERMIT_GRACE_DAYS
+) -> ComplianceStatus:
+    """The rules of derived_status_expression for one store already in memory."""
+    if current == ComplianceStatus.SUSPENDED:
+        return ComplianceStatus.SUSPENDED
+    expired = permit_expiry_date is not None and permit_expiry_date < now
+    if (open_severity is not None and open_severity >= VIOLATION_SEVERITY) or (
+        expired and permit_expiry_date < now - timedelta(days=grace_days)
+    ):
+        return ComplianceStatus.VIOLATION
+    if open_severity is not None or expired:
+        return ComplianceStatus.WARNING
+    return ComplianceStatus.COMPLIANT
+
+
+async def _apply_status_rules(
+    db: AsyncSession,
+    tindahan_filter: Callable,
+    now: datetime,
+    grace_days: int = PERMIT_GRACE_DAYS
+) -> List[ComplianceStatusChange]:
+    """Set the derived status on active tindahan matched by tindahan_filter(id column) whose status is out of date.
+
+    One grouped query finds the stores to change and at most three UPDATEs
+    write them; counters are updated per (zone, from, to) transition and
+    each change is appended to the store's history. Runs
+    inside the caller's transaction and returns the changes.
+    """
+    open_severity = (
+        select(Inspection.tindahan_id, func.max(Violation.severity).label("severity"))
+        .join(Violation, Violation.inspection_id == Inspection.id)
+        .where(Violation.is_resolved == False, tindahan_filter(Inspection.tindahan_id))
+        .group_by(Inspection.tindahan_id)
+        .subquery()
+    )
+    derived = derived_status_expression(open_severity.c.severity, now, grace_days)
+    result = await db.execute(
+        select(Tindahan.id, Tindahan.barangay_zone, Tindahan.compliance_status, derived.label("derived_status"))
+        .outerjoin(open_severity, open_severity.c.tindahan_id == Tindahan.id)
+        .where(Tindahan.is_active == True, tindahan_filter(Tindahan.id), derived != Tindahan.compliance_status)
+    )
+    rows = result.all()
+    if not rows:
+        return []
+
+    by_status: Dict[ComplianceStatus, List[int]] = {}
+    transitions: Dict[Tuple[str, ComplianceStatus, ComplianceStatus], int] = {}
+    for row in rows:
+        by_status.setdefault(row.derived_status, []).append(row.id)
+        key = (row.barangay_zone, row.compliance_status, row.derived_status)
+        transitions[key] = transitions.get(key, 0) + 1
+    for status, ids in by_status.items():
+        await db.execute(
+            update(Tindahan)
+            .where(Tindahan.id.in_(ids))
+            .values(compliance_status=status, updated_at=now, version=Tindahan.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+    await apply_status_transitions(db, transitions)
+    await record_tindahan_events(db, [
+        tindahan_event(row.id, TindahanEventKind.STATUS_DERIVED, {"compliance_status": row.derived_status}, now)
+        for row in rows
+    ])
+    return [
+        ComplianceStatusChange(tindahan_id=row.id, from_status=row.compliance_status, to_status=row.derived_status)
+        for row in rows
+    ]
+
+
+async def refresh_compliance_status(
+    db: AsyncSession,
+    tindahan_ids: Iterable[int],
+    now: Optional[datetime] = None,
+    grace_days: int = PERMIT_GRACE_DAYS
+) -> List[ComplianceStatusChange]:
+    """Re-derive the status of a few stores, e.g. after one of their violations was written.
+
+    Must be called inside the writing transaction, after the write is flushed;
+    the caller commits and invalidates cached rows.
+    """
+    ids = set(tindahan_ids)
+    if not ids:
+        return []
+    await db.flush()
+    return await _apply_status_rules(db, lambda column: column.in_(ids), now or datetime.utcnow(), grace_days)
+
+
+async def recompute_compliance_statuses(
+    db: AsyncSession,
+    now: Optional[datetime] = None,
+    chunk_size: int = RECOMPUTE_CHUNK_SIZE,
+    grace_days: int = PERMIT_GRACE_DAYS
+) -> ComplianceRecomputeResponse:
+    """Re-derive the status of every active store, e.g. after a rule change.
+
+    Stores are processed in id ranges of chunk_size, each evaluated with set-
+    based SQL and committed as its own short transaction.
+    """
+    now = now or datetime.utcnow()
+    bounds = (await db.execute(select(func.min(Tindahan.id), func.max(Tindahan.id)))).one()
+    scanned = (await db.execute(select(func.count()).where(Tindahan.is_active == True))).scalar_one()
+    await db.rollback()
+    changes: List[ComplianceStatusChange] = []
+    if bounds[0] is not None:
+        for low in range(bounds[0], bounds[1] + 1, chunk_size):
+            def in_chunk(column, low=low, high=low + chunk_size):
+                return and_(column >= low, column < high)
+
+            chunk_changes = await _apply_status_rules(db, in_chunk, now, grace_days)
+            await db.commit()
+            if chunk_changes:
+                await invalidate_tindahan([change.tindahan_id for change in chunk_changes])
+                changes.extend(chunk_changes)
+            # Let queued API requests take the write lock between chunks
+            await asyncio.sleep(0)
+    return ComplianceRecomputeResponse(scanned=scanned, changed=len(changes), changes=changes)
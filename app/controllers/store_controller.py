@@ -2,56 +2,248 @@
 Store controller for business logic operations
 """
 
+from sqlalchemy import column, func, insert, literal_column, table, update
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlmodel import select
-from typing import List, Optional
+from typing import AsyncIterator, Dict, FrozenSet, List, Optional, Set, Tuple
+from datetime import datetime
+from functools import lru_cache
+import re
 from fastapi import HTTPException
+from pydantic import TypeAdapter
+from typing_extensions import TypedDict
 
-from app.models.store import Tindahan, TindahanCreate, TindahanUpdate, TindahanResponse
+from app.geo import ZoneBoundaries, bounding_box, haversine_m
+from app.cache import ACTIVE_LISTS_TAG, LIST_TAIL_TAG, get_cache, invalidate_tindahan, tindahan_tag
+from app.models.search import POSTGRES_SEARCH_EXPRESSION
+from app.models.store import (
+    Tindahan, TindahanCreate, TindahanUpdate, TindahanResponse,
+    TindahanBulkUpdate, TindahanBulkResult, TindahanListPage, TindahanNearbyResponse, TindahanOutOfZoneResponse,
+    BusinessType, ComplianceStatus
+)
+from app.models.history import TindahanEventKind
+from app.controllers.compliance_controller import (
+    TindahanSnapshot, apply_tindahan_change, apply_tindahan_changes, make_tindahan_snapshot, move_tindahan_violations,
+    tindahan_snapshot
+)
+from app.controllers.status_controller import refresh_compliance_status
+from app.controllers.history_controller import (
+    TINDAHAN_HISTORY_COLUMNS, changed_fields, record_tindahan_change, record_tindahan_events, tindahan_event,
+    tindahan_state
+)
+from app.utils.helpers import make_etag
+
+# Rows written per transaction by the bulk endpoints
+BULK_CHUNK_SIZE = 1000
+
+# Full-text search: relevance weights for business_name, owner_name and address,
+# and the number of index matches ranked per query (bounds latency for common words)
+SEARCH_WEIGHTS = (3.0, 2.0, 1.0)
+SEARCH_CANDIDATES = 200
+
+tindahan_fts = table("tindahan_fts", column("rowid"))
+tindahan_rtree = table("tindahan_rtree", column("id"), column("min_lat"), column("max_lat"), column("min_lon"), column("max_lon"))
+
+# Rows per batch when scanning store locations against zone boundaries
+LOCATION_SCAN_BATCH_SIZE = 5000
+
+# Status rows are inserted with, before the rules derive each store's own
+NEW_TINDAHAN_STATUS = Tindahan.model_fields["compliance_status"].default
+
+# Lean list reads: the response columns in field order, and a serializer for
+# plain row dicts typed like TindahanResponse (same JSON, no model instances)
+TINDAHAN_RESPONSE_COLUMNS = [Tindahan.__table__.c[name] for name in TindahanResponse.model_fields]
+TindahanRow = TypedDict("TindahanRow", {name: field.annotation for name, field in TindahanResponse.model_fields.items()})
+tindahan_rows_adapter = TypeAdapter(List[TindahanRow])
 
 
 async def create_tindahan(db: AsyncSession, tindahan: TindahanCreate) -> TindahanResponse:
     """Create a new tindahan registration."""
     db_tindahan = Tindahan(**tindahan.model_dump())
     db.add(db_tindahan)
-    await db.commit()
+    await apply_tindahan_change(db, None, tindahan_snapshot(db_tindahan))
+    await db.flush()
+    await record_tindahan_events(db, [
+        tindahan_event(db_tindahan.id, TindahanEventKind.CREATED, tindahan_state(db_tindahan.model_dump()), db_tindahan.registered_at)
+    ])
+    # A store registered with an expired permit starts out in WARNING or VIOLATION
+    await refresh_compliance_status(db, [db_tindahan.id])
     await db.refresh(db_tindahan)
+    await db.commit()
+    await invalidate_tindahan([db_tindahan.id], created=True)
     return TindahanResponse.model_validate(db_tindahan)
 
 
 async def get_tindahan(db: AsyncSession, tindahan_id: int) -> Optional[TindahanResponse]:
-    """Get a specific tindahan by ID."""
+    """Get a specific tindahan by ID, from the read cache when possible."""
+    cache = get_cache()
+    key = f"tindahan:get:{tindahan_id}"
+    cached = await cache.get(key)
+    if cached is not None:
+        return cached
+
+    generation = await cache.generation()
     result = await db.execute(select(Tindahan).where(Tindahan.id == tindahan_id))
     tindahan = result.scalar_one_or_none()
-    return TindahanResponse.model_validate(tindahan) if tindahan else None
+    if not tindahan:
+        return None
+    response = TindahanResponse.model_validate(tindahan)
+    await cache.set(key, response, [tindahan_tag(tindahan_id)], generation)
+    return response
 
 
-async def get_tindahan_list(db: AsyncSession, skip: int = 0, limit: int = 100, active_only: bool = True) -> List[TindahanResponse]:
-    """Get all tindahan with pagination."""
-    query = select(Tindahan)
+def _tindahan_list_query(query, skip: int, limit: int, active_only: bool, after_id: Optional[int]):
+    """Apply the list filters and id ordering shared by the list reads."""
+    if active_only:
+        query = query.where(Tindahan.is_active == True)
+    if after_id is not None:
+        query = query.where(Tindahan.id > after_id)
+    return query.order_by(Tindahan.id).offset(skip).limit(limit)
+
+
+def _tindahan_list_tags(ids: List[int], limit: int, active_only: bool) -> List[str]:
+    """Cache tags of a list page."""
+    tags = [tindahan_tag(tindahan_id) for tindahan_id in ids]
+    if active_only:
+        tags.append(ACTIVE_LISTS_TAG)
+    # Rows are ordered by id, so new registrations can only change a short last page
+    if len(ids) < limit:
+        tags.append(LIST_TAIL_TAG)
+    return tags
+
+
+async def get_tindahan_list(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    active_only: bool = True,
+    after_id: Optional[int] = None
+) -> List[TindahanResponse]:
+    """Get all tindahan with pagination, from the read cache when possible.
+
+    When after_id is given, rows are fetched by keyset (id > after_id) so deep
+    pages cost the same as the first one.
+    """
+    cache = get_cache()
+    key = f"tindahan:list:{skip}:{limit}:{active_only}:{after_id}"
+    cached = await cache.get(key)
+    if cached is not None:
+        return cached
+
+    generation = await cache.generation()
+    result = await db.execute(_tindahan_list_query(select(Tindahan), skip, limit, active_only, after_id))
+    tindahan_list = [TindahanResponse.model_validate(tindahan) for tindahan in result.scalars().all()]
+    tags = _tindahan_list_tags([tindahan.id for tindahan in tindahan_list], limit, active_only)
+    await cache.set(key, tindahan_list, tags, generation)
+    return tindahan_list
+
+
+async def get_tindahan_list_json(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    active_only: bool = True,
+    after_id: Optional[int] = None
+) -> TindahanListPage:
+    """Get a page of tindahan encoded straight to JSON, from the read cache when possible.
+
+    Selects only the response columns as plain rows and serializes them with
+    a prebuilt adapter, skipping ORM hydration and model validation. The body
+    is byte-for-byte what serializing the same List[TindahanResponse] gives.
+    """
+    cache = get_cache()
+    key = f"tindahan:list-json:{skip}:{limit}:{active_only}:{after_id}"
+    cached = await cache.get(key)
+    if cached is not None:
+        return cached
+
+    generation = await cache.generation()
+    result = await db.execute(_tindahan_list_query(select(*TINDAHAN_RESPONSE_COLUMNS), skip, limit, active_only, after_id))
+    rows = [row._asdict() for row in result.all()]
+    page = TindahanListPage(
+        body=tindahan_rows_adapter.dump_json(rows),
+        count=len(rows),
+        last_id=rows[-1]["id"] if rows else None,
+        etag=make_etag((row["id"], row["updated_at"]) for row in rows),
+    )
+    await cache.set(key, page, _tindahan_list_tags([row["id"] for row in rows], limit, active_only), generation)
+    return page
+
+
+async def get_tindahan_page(
+    db: AsyncSession,
+    page: int = 1,
+    page_size: int = 24,
+    zone: Optional[str] = None,
+    status: Optional[ComplianceStatus] = None,
+    business_type: Optional[BusinessType] = None
+) -> Tuple[List[TindahanResponse], bool]:
+    """A numbered page of active tindahan in id order, optionally filtered, and whether another page follows."""
+    query = select(Tindahan).where(Tindahan.is_active == True)
+    if zone:
+        query = query.where(Tindahan.barangay_zone == zone)
+    if status is not None:
+        query = query.where(Tindahan.compliance_status == status)
+    if business_type is not None:
+        query = query.where(Tindahan.business_type == business_type)
+    result = await db.execute(query.order_by(Tindahan.id).offset((page - 1) * page_size).limit(page_size + 1))
+    rows = result.scalars().all()
+    return [TindahanResponse.model_validate(tindahan) for tindahan in rows[:page_size]], len(rows) > page_size
+
+
+async def stream_tindahan(db: AsyncSession, active_only: bool = True, batch_size: int = 500) -> AsyncIterator[List[TindahanResponse]]:
+    """Stream all tindahan in id order, batch by batch, from a server-side cursor."""
+    query = select(Tindahan.__table__)
     if active_only:
         query = query.where(Tindahan.is_active == True)
     
-    query = query.offset(skip).limit(limit)
-    result = await db.execute(query)
-    tindahan_list = result.scalars().all()
-    return [TindahanResponse.model_validate(tindahan) for tindahan in tindahan_list]
+    result = await db.stream(query.order_by(Tindahan.id).execution_options(yield_per=batch_size))
+    async for rows in result.partitions():
+        yield [TindahanResponse.model_validate(dict(row._mapping)) for row in rows]
 
 
-async def update_tindahan(db: AsyncSession, tindahan_id: int, tindahan_update: TindahanUpdate) -> Optional[TindahanResponse]:
-    """Update a tindahan registration."""
+async def update_tindahan(
+    db: AsyncSession,
+    tindahan_id: int,
+    tindahan_update: TindahanUpdate,
+    expected_version: Optional[int] = None
+) -> Optional[TindahanResponse]:
+    """Update a tindahan registration.
+
+    With `expected_version`, the UPDATE only matches that version of the
+    row and StaleDataError is raised when it has moved on, so a client
+    cannot overwrite a change it has not seen.
+    """
     result = await db.execute(select(Tindahan).where(Tindahan.id == tindahan_id))
     db_tindahan = result.scalar_one_or_none()
     
     if not db_tindahan:
         return None
+    if expected_version is not None:
+        # The flush matches on the loaded version, so compare against the client's instead
+        set_committed_value(db_tindahan, "version", expected_version)
     
+    before = tindahan_snapshot(db_tindahan)
+    before_state = tindahan_state(db_tindahan.model_dump())
+    was_active = db_tindahan.is_active
+    was_zone = db_tindahan.barangay_zone
     update_data = tindahan_update.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_tindahan, field, value)
+    db_tindahan.updated_at = datetime.utcnow()
     
-    await db.commit()
+    await apply_tindahan_change(db, before, tindahan_snapshot(db_tindahan))
+    await record_tindahan_change(
+        db, tindahan_id, TindahanEventKind.UPDATED, before_state, tindahan_state(db_tindahan.model_dump()), db_tindahan.updated_at
+    )
+    await move_tindahan_violations(db, {tindahan_id: (was_zone, db_tindahan.barangay_zone)})
+    if "permit_expiry_date" in update_data and "compliance_status" not in update_data:
+        await refresh_compliance_status(db, [tindahan_id])
     await db.refresh(db_tindahan)
+    await db.commit()
+    await invalidate_tindahan([tindahan_id], membership_changed=was_active != db_tindahan.is_active)
     return TindahanResponse.model_validate(db_tindahan)
 
 
@@ -63,13 +255,364 @@ async def delete_tindahan(db: AsyncSession, tindahan_id: int) -> bool:
     if not db_tindahan:
         return False
     
+    before = tindahan_snapshot(db_tindahan)
+    was_active = db_tindahan.is_active
     db_tindahan.is_active = False
+    db_tindahan.updated_at = datetime.utcnow()
+    await apply_tindahan_change(db, before, tindahan_snapshot(db_tindahan))
+    await record_tindahan_change(
+        db, tindahan_id, TindahanEventKind.DEACTIVATED, {"is_active": was_active}, {"is_active": False}, db_tindahan.updated_at
+    )
     await db.commit()
+    await invalidate_tindahan([tindahan_id], membership_changed=was_active)
     return True
 
 
 async def get_tindahan_by_name(db: AsyncSession, name: str) -> Optional[TindahanResponse]:
-    """Get tindahan by business name."""
-    result = await db.execute(select(Tindahan).where(Tindahan.business_name == name))
-    tindahan = result.scalar_one_or_none()
+    """Get tindahan by business name (the oldest registration if there are duplicates)."""
+    result = await db.execute(
+        select(Tindahan).where(Tindahan.business_name == name).order_by(Tindahan.id).limit(1)
+    )
+    tindahan = result.scalars().first()
     return TindahanResponse.model_validate(tindahan) if tindahan else None
+
+
+def _search_terms(query: str) -> List[str]:
+    """Lowercase words of a search query, stripped of FTS syntax characters."""
+    return re.sub(r"[^\w\s]", " ", query.lower()).split()
+
+
+def _ngrams(term: str, size: int) -> Set[str]:
+    """Overlapping substrings of `size` characters."""
+    return {term[i:i + size] for i in range(len(term) - size + 1)}
+
+
+@lru_cache(maxsize=4096)
+def _trigrams(word: str) -> FrozenSet[str]:
+    """Trigrams of a word, cached since names and streets repeat across rows."""
+    return frozenset(_ngrams(word, 3))
+
+
+def _fuzzy_match(terms: List[str]) -> str:
+    """FTS5 query where every word must share at least one n-gram with the text.
+
+    Longer words use 4-grams so common trigrams do not flood the candidates.
+    """
+    groups = []
+    for term in terms:
+        grams = _ngrams(term, 4 if len(term) >= 7 else 3)
+        groups.append("(" + " OR ".join(f'"{gram}"' for gram in sorted(grams)) + ")")
+    return " AND ".join(groups)
+
+
+def _term_score(term: str, text: str, fuzzy: bool) -> float:
+    """How well one query word matches a lowercased column: word prefix, substring or trigram similarity."""
+    index = text.find(term)
+    if index == 0 or (index > 0 and not text[index - 1].isalnum()):
+        return 1.0
+    if index > 0:
+        return 0.75
+    if not fuzzy:
+        return 0.0
+    grams = _trigrams(term)
+    best = 0.0
+    for word in _search_terms(text):
+        word_grams = _trigrams(word)
+        if word_grams:
+            best = max(best, len(grams & word_grams) / len(grams | word_grams))
+    return best / 2
+
+
+def _search_score(terms: List[str], row, fuzzy: bool) -> float:
+    """Weighted relevance of a candidate row; higher is better."""
+    columns = list(zip(SEARCH_WEIGHTS, (row.business_name.lower(), row.owner_name.lower(), row.address.lower())))
+    return sum(
+        max(weight * _term_score(term, text, fuzzy) for weight, text in columns)
+        for term in terms
+    )
+
+
+async def _fts_candidates(db: AsyncSession, match: str, active_only: bool) -> list:
+    """Up to SEARCH_CANDIDATES rows matching an FTS5 query, with only the searchable columns."""
+    # Limit inside the subquery so the index drives the lookup instead of a scan of tindahan
+    matches = (
+        select(tindahan_fts.c.rowid)
+        .where(literal_column("tindahan_fts").op("MATCH")(match))
+        .limit(SEARCH_CANDIDATES)
+    )
+    query = (
+        select(Tindahan.id, Tindahan.business_name, Tindahan.owner_name, Tindahan.address)
+        .where(Tindahan.id.in_(matches))
+    )
+    if active_only:
+        query = query.where(Tindahan.is_active == True)
+    return (await db.execute(query)).all()
+
+
+async def search_tindahan(db: AsyncSession, query: str, limit: int = 20, active_only: bool = True) -> List[TindahanResponse]:
+    """Ranked search over business name, owner name and address.
+
+    On SQLite every word must appear as a substring (which covers prefixes);
+    if nothing matches, words only need to share n-grams with the text so
+    misspelled names still find the store. Candidates come from the FTS5
+    index and are ranked by prefix, substring and trigram similarity per
+    column. On Postgres, pg_trgm similarity is used instead.
+    """
+    terms = [term for term in _search_terms(query) if len(term) >= 3]
+    if not terms:
+        return []
+
+    if db.get_bind().dialect.name == "postgresql":
+        return await _trigram_search(db, " ".join(terms), limit, active_only)
+
+    fuzzy = False
+    candidates = await _fts_candidates(db, " AND ".join(f'"{term}"' for term in terms), active_only)
+    if not candidates:
+        fuzzy = True
+        candidates = await _fts_candidates(db, _fuzzy_match(terms), active_only)
+    if not candidates:
+        return []
+
+    ranked = sorted(candidates, key=lambda row: (-_search_score(terms, row, fuzzy), row.id))[:limit]
+    result = await db.execute(select(Tindahan).where(Tindahan.id.in_([row.id for row in ranked])))
+    by_id = {tindahan.id: tindahan for tindahan in result.scalars().all()}
+    return [TindahanResponse.model_validate(by_id[row.id]) for row in ranked if row.id in by_id]
+
+
+async def _trigram_search(db: AsyncSession, query: str, limit: int, active_only: bool) -> List[TindahanResponse]:
+    """Ranked pg_trgm similarity search (Postgres)."""
+    searchable = literal_column(POSTGRES_SEARCH_EXPRESSION)
+    statement = (
+        select(Tindahan)
+        .where(searchable.op("%")(query))
+        .order_by(func.similarity(searchable, query).desc())
+        .limit(limit)
+    )
+    if active_only:
+        statement = statement.where(Tindahan.is_active == True)
+    result = await db.execute(statement)
+    return [TindahanResponse.model_validate(tindahan) for tindahan in result.scalars().all()]
+
+
+async def get_nearby_tindahan(
+    db: AsyncSession,
+    latitude: float,
+    longitude: float,
+    radius_m: float = 300,
+    limit: int = 50,
+    business_type: Optional[BusinessType] = None,
+    active_only: bool = True
+) -> List[TindahanNearbyResponse]:
+    """Tindahan within radius_m of a point, nearest first.
+
+    The spatial index (R*Tree on SQLite, a latitude/longitude B-tree
+    elsewhere) returns the coordinates in the enclosing bounding box; exact
+    great-circle distances then drop the corners and order the result.
+    """
+    min_lat, max_lat, min_lon, max_lon = bounding_box(latitude, longitude, radius_m)
+    query = select(Tindahan.id, Tindahan.latitude, Tindahan.longitude)
+    if db.get_bind().dialect.name == "sqlite":
+        in_box = select(tindahan_rtree.c.id).where(
+            tindahan_rtree.c.min_lat <= max_lat, tindahan_rtree.c.max_lat >= min_lat,
+            tindahan_rtree.c.min_lon <= max_lon, tindahan_rtree.c.max_lon >= min_lon,
+        )
+        query = query.where(Tindahan.id.in_(in_box))
+    else:
+        query = query.where(Tindahan.latitude.between(min_lat, max_lat), Tindahan.longitude.between(min_lon, max_lon))
+    if active_only:
+        query = query.where(Tindahan.is_active == True)
+    if business_type is not None:
+        query = query.where(Tindahan.business_type == business_type)
+
+    # Rank on coordinates alone; only the nearest `limit` rows are loaded in full
+    distances = {}
+    for row in (await db.execute(query)).all():
+        distance = haversine_m(latitude, longitude, row.latitude, row.longitude)
+        if distance <= radius_m:
+            distances[row.id] = distance
+    nearest = sorted(distances, key=lambda tindahan_id: (distances[tindahan_id], tindahan_id))[:limit]
+    if not nearest:
+        return []
+
+    rows = {row.id: row for row in (await db.execute(select(*TINDAHAN_RESPONSE_COLUMNS).where(Tindahan.id.in_(nearest)))).all()}
+    return [
+        TindahanNearbyResponse.model_validate({**rows[tindahan_id]._asdict(), "distance_m": round(distances[tindahan_id], 1)})
+        for tindahan_id in nearest
+    ]
+
+
+async def find_out_of_zone_tindahan(
+    db: AsyncSession,
+    boundaries: ZoneBoundaries,
+    limit: int = 100,
+    business_type: Optional[BusinessType] = None,
+    barangay_zone: Optional[str] = None
+) -> List[TindahanOutOfZoneResponse]:
+    """Active tindahan located outside their registered zone, in id order.
+
+    Candidates for UNAUTHORIZED_LOCATION violations. Locations are streamed
+    in batches and checked against the zone polygons; stores in zones
+    without a configured boundary are skipped.
+    """
+    query = select(Tindahan.id, Tindahan.barangay_zone, Tindahan.latitude, Tindahan.longitude).where(
+        Tindahan.is_active == True, Tindahan.latitude.is_not(None), Tindahan.longitude.is_not(None)
+    )
+    if business_type is not None:
+        query = query.where(Tindahan.business_type == business_type)
+    if barangay_zone is not None:
+        query = query.where(Tindahan.barangay_zone == barangay_zone)
+
+    located: Dict[int, Optional[str]] = {}
+    result = await db.stream(query.order_by(Tindahan.id).execution_options(yield_per=LOCATION_SCAN_BATCH_SIZE))
+    try:
+        async for rows in result.partitions():
+            for tindahan_id, zone, latitude, longitude in rows:
+                if boundaries.contains(zone, latitude, longitude) is False:
+                    located[tindahan_id] = boundaries.locate(latitude, longitude)
+            if len(located) >= limit:
+                break
+    finally:
+        await result.close()
+    if not located:
+        return []
+
+    ids = sorted(located)[:limit]
+    rows = (await db.execute(select(*TINDAHAN_RESPONSE_COLUMNS).where(Tindahan.id.in_(ids)).order_by(Tindahan.id))).all()
+    return [
+        TindahanOutOfZoneResponse.model_validate({**row._asdict(), "located_zone": located[row.id]})
+        for row in rows
+    ]
+
+
+async def bulk_create_tindahan(
+    db: AsyncSession,
+    rows: List[Tuple[int, TindahanCreate]],
+    chunk_size: int = BULK_CHUNK_SIZE
+) -> List[TindahanBulkResult]:
+    """Register many tindahan using one executemany INSERT per chunk.
+
+    Each chunk is its own transaction; a failing chunk is rolled back and
+    reported per row without affecting the others.
+    """
+    results: List[TindahanBulkResult] = []
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        now = datetime.utcnow()
+        values = [
+            {
+                **tindahan.model_dump(),
+                "compliance_status": NEW_TINDAHAN_STATUS,
+                "registered_at": now,
+                "updated_at": now,
+            }
+            for _, tindahan in chunk
+        ]
+        try:
+            result = await db.execute(
+                insert(Tindahan).returning(Tindahan.id, sort_by_parameter_order=True),
+                values
+            )
+            ids = result.scalars().all()
+            await apply_tindahan_changes(db, [
+                (None, make_tindahan_snapshot(
+                    value["is_active"], value["compliance_status"], value["permit_expiry_date"], value["barangay_zone"]
+                ))
+                for value in values
+            ])
+            await record_tindahan_events(db, [
+                tindahan_event(tindahan_id, TindahanEventKind.CREATED, tindahan_state(value), now)
+                for tindahan_id, value in zip(ids, values)
+            ])
+            await refresh_compliance_status(db, ids)
+            await db.commit()
+        except SQLAlchemyError as exc:
+            await db.rollback()
+            results.extend(
+                TindahanBulkResult(index=index, success=False, error=str(exc.orig if hasattr(exc, "orig") else exc))
+                for index, _ in chunk
+            )
+            continue
+        await invalidate_tindahan(ids, created=True)
+        results.extend(
+            TindahanBulkResult(index=index, id=tindahan_id, success=True)
+            for (index, _), tindahan_id in zip(chunk, ids)
+        )
+    return results
+
+
+def _counter_snapshot(state: Dict) -> TindahanSnapshot:
+    """Counter snapshot of a tracked-field state."""
+    return make_tindahan_snapshot(
+        state["is_active"], state["compliance_status"], state["permit_expiry_date"], state["barangay_zone"]
+    )
+
+
+async def bulk_update_tindahan(
+    db: AsyncSession,
+    rows: List[Tuple[int, TindahanBulkUpdate]],
+    chunk_size: int = BULK_CHUNK_SIZE
+) -> List[TindahanBulkResult]:
+    """Update many tindahan using one executemany UPDATE per chunk."""
+    results: List[TindahanBulkResult] = []
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        existing = await db.execute(
+            select(Tindahan.id, Tindahan.version, *TINDAHAN_HISTORY_COLUMNS).where(Tindahan.id.in_({tindahan.id for _, tindahan in chunk}))
+        )
+        rows_by_id = {row.id: row for row in existing.all()}
+        current = {tindahan_id: tindahan_state(row._asdict()) for tindahan_id, row in rows_by_id.items()}
+        # Bulk UPDATE by primary key matches on, and raises, the version each entry passes
+        versions = {tindahan_id: row.version for tindahan_id, row in rows_by_id.items()}
+
+        now = datetime.utcnow()
+        values = []
+        changes = []
+        pending = {}
+        moves = {}
+        renewed = set()
+        events = []
+        written = []
+        for index, tindahan in chunk:
+            state = current.get(tindahan.id)
+            if state is None:
+                results.append(TindahanBulkResult(index=index, id=tindahan.id, success=False, error="Tindahan not found"))
+                continue
+            update_data = tindahan.model_dump(exclude_unset=True)
+            values.append({**update_data, "updated_at": now, "version": versions[tindahan.id]})
+            versions[tindahan.id] += 1
+            # A row listed twice in a chunk changes from what its earlier entry wrote
+            before = pending.get(tindahan.id, state)
+            after = {**before, **{field: value for field, value in update_data.items() if field in before}}
+            pending[tindahan.id] = after
+            changes.append((_counter_snapshot(before), _counter_snapshot(after)))
+            moves[tindahan.id] = (state["barangay_zone"], after["barangay_zone"])
+            event_changes = changed_fields(before, after)
+            if event_changes:
+                events.append(tindahan_event(tindahan.id, TindahanEventKind.UPDATED, event_changes, now))
+            if "permit_expiry_date" in update_data and "compliance_status" not in update_data:
+                renewed.add(tindahan.id)
+            written.append((index, tindahan.id))
+        
+        if not values:
+            await db.rollback()
+            continue
+        try:
+            await db.execute(update(Tindahan), values)
+            await apply_tindahan_changes(db, changes)
+            await move_tindahan_violations(db, moves)
+            await record_tindahan_events(db, events)
+            await refresh_compliance_status(db, renewed)
+            await db.commit()
+        except SQLAlchemyError as exc:
+            await db.rollback()
+            results.extend(
+                TindahanBulkResult(index=index, id=tindahan_id, success=False, error=str(exc.orig if hasattr(exc, "orig") else exc))
+                for index, tindahan_id in written
+            )
+            continue
+        await invalidate_tindahan(
+            [tindahan_id for _, tindahan_id in written],
+            membership_changed=any("is_active" in tindahan.model_fields_set for _, tindahan in chunk)
+        )
+        results.extend(TindahanBulkResult(index=index, id=tindahan_id, success=True) for index, tindahan_id in written)
+    return results
@@ -0,0 +1,123 @@
+"""
+Sweep controller for periodic permit expiry and inspection scheduling jobs
+"""
+
+from sqlalchemy import insert, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+from typing import Optional
+from datetime import datetime, timedelta
+import asyncio
+import os
+
+from app.cache import invalidate_tindahan
+from app.models.store import Tindahan, ComplianceStatus
+from app.models.inspection import Inspection, InspectionStatus, InspectionType
+from app.controllers.compliance_controller import PENDING_INSPECTION_STATUSES, apply_inspection_changes, roll_expired_permits
+from app.controllers.status_controller import PERMIT_GRACE_DAYS, refresh_compliance_status
+
+# Rows per sweep transaction; small enough that API writes never wait long for the SQLite lock
+SWEEP_BATCH_SIZE = int(os.getenv("SWEEP_BATCH_SIZE", "500"))
+AUTO_INSPECTOR_NAME = "Unassigned"
+
+
+async def sweep_expired_permits(
+    db: AsyncSession,
+    now: Optional[datetime] = None,
+    batch_size: int = SWEEP_BATCH_SIZE,
+    grace_days: int = PERMIT_GRACE_DAYS
+) -> int:
+    """Re-derive the status of active tindahan whose permits expired; returns the number of rows changed.
+
+    Candidates are COMPLIANT stores with an expired permit and WARNING stores
+    still expired after the grace period; the status rules then decide their
+    new status. Each batch is its own short transaction. The dashboard's
+    running expired permit total is first rolled forward to today.
+    """
+    now = now or datetime.utcnow()
+    await roll_expired_permits(db, now.date())
+    await db.commit()
+    touched = 0
+    escalations = (
+        (ComplianceStatus.WARNING, now - timedelta(days=grace_days)),
+        (ComplianceStatus.COMPLIANT, now),
+    )
+    for from_status, cutoff in escalations:
+        last_seen = None
+        while True:
+            query = (
+                select(Tindahan.id, Tindahan.permit_expiry_date)
+                .where(
+                    Tindahan.is_active == True,
+                    Tindahan.permit_expiry_date < cutoff,
+                    Tindahan.compliance_status == from_status,
+                )
+                .order_by(Tindahan.permit_expiry_date, Tindahan.id)
+                .limit(batch_size)
+            )
+            # Keyset past the previous batch so rows just changed are not scanned again
+            if last_seen is not None:
+                query = query.where(tuple_(Tindahan.permit_expiry_date, Tindahan.id) > last_seen)
+            rows = (await db.execute(query)).all()
+            if not rows:
+                break
+
+            changes = await refresh_compliance_status(db, [row.id for row in rows], now, grace_days)
+            await db.commit()
+            await invalidate_tindahan([change.tindahan_id for change in changes])
+            touched += len(changes)
+            last_seen = tuple_(rows[-1].permit_expiry_date, rows[-1].id)
+            # Let queued API requests take the write lock between batches
+            await asyncio.sleep(0)
+    return touched
+
+
+async def sweep_due_inspections(
+    db: AsyncSession,
+    now: Optional[datetime] = None,
+    batch_size: int = SWEEP_BATCH_SIZE
+) -> int:
+    """Schedule inspections for active tindahan that are due; returns the number created.
+
+    Stores that already have a scheduled or in-progress inspection are skipped.
+    """
+    now = now or datetime.utcnow()
+    has_pending = (
+        select(Inspection.id)
+        .where(Inspection.tindahan_id == Tindahan.id, Inspection.status.in_(PENDING_INSPECTION_STATUSES))
+        .exists()
+    )
+    touched = 0
+    last_seen = None
+    while True:
+        query = (
+            select(Tindahan.id, Tindahan.next_inspection_due)
+            .where(Tindahan.is_active == True, Tindahan.next_inspection_due <= now, ~has_pending)
+            .order_by(Tindahan.next_inspection_due, Tindahan.id)
+            .limit(batch_size)
+        )
+        if last_seen is not None:
+            query = query.where(tuple_(Tindahan.next_inspection_due, Tindahan.id) > last_seen)
+        rows = (await db.execute(query)).all()
+        if not rows:
+            break
+
+        await db.execute(insert(Inspection), [
+            {
+                "tindahan_id": row.id,
+                "inspection_type": InspectionType.ROUTINE,
+                "inspector_name": AUTO_INSPECTOR_NAME,
+                "inspection_date": row.next_inspection_due,
+                "status": InspectionStatus.SCHEDULED,
+                "notes": "Automatically scheduled: inspection due",
+                "created_at": now,
+                "updated_at": now,
+            }
+            for row in rows
+        ])
+        await apply_inspection_changes(db, [(None, InspectionStatus.SCHEDULED)] * len(rows))
+        await db.commit()
+        touched += len(rows)
+        last_seen = tuple_(rows[-1].next_inspection_due, rows[-1].id)
+        await asyncio.sleep(0)
+    return touched
@@ -0,0 +1,322 @@
+"""
+Sync controller for offline-first clients: delta pulls and batched, idempotent pushes
+"""
+
+from contextlib import contextmanager
+from sqlalchemy import delete, event, func, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlmodel import SQLModel, select
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple, Type
+from datetime import datetime, timedelta, timezone
+import asyncio
+import os
+
+from pydantic import ValidationError
+
+from app.models.store import TindahanCreate, TindahanUpdate, TindahanResponse
+from app.models.inspection import InspectionCreate, InspectionUpdate, ViolationCreate, ViolationUpdate, ViolationResponse
+from app.models.sync import (
+    SYNC_TABLES, SyncAction, SyncChange, SyncEntity, SyncPullResponse, SyncPushOperation, SyncPushResponse,
+    SyncPushResult, SyncReceipt, SyncResultStatus, SyncTombstone, InspectionSyncRecord
+)
+from app.controllers.store_controller import create_tindahan, get_tindahan, update_tindahan
+from app.controllers.inspection_controller import (
+    create_inspection, get_inspection, update_inspection, create_violation, get_violation, update_violation
+)
+
+# Changes returned per pull when the client does not ask for fewer
+SYNC_PULL_LIMIT = 1000
+# Days an idempotency key is remembered; clients must push queued work within this window
+SYNC_RECEIPT_RETENTION_DAYS = int(os.getenv("SYNC_RECEIPT_RETENTION_DAYS", "30"))
+# Most idempotency keys kept; the oldest beyond this are forgotten early
+SYNC_RECEIPT_MAX_KEYS = int(os.getenv("SYNC_RECEIPT_MAX_KEYS", "200000"))
+# Receipts deleted per pruning transaction
+SYNC_PRUNE_BATCH_SIZE = 500
+
+SYNC_RECORDS: Dict[SyncEntity, Type[SQLModel]] = {
+    SyncEntity.TINDAHAN: TindahanResponse,
+    SyncEntity.INSPECTION: InspectionSyncRecord,
+    SyncEntity.VIOLATION: ViolationResponse,
+}
+SYNC_PAYLOADS: Dict[SyncAction, Dict[SyncEntity, Type[SQLModel]]] = {
+    SyncAction.CREATE: {
+        SyncEntity.TINDAHAN: TindahanCreate,
+        SyncEntity.INSPECTION: InspectionCreate,
+        SyncEntity.VIOLATION: ViolationCreate,
+    },
+    SyncAction.UPDATE: {
+        SyncEntity.TINDAHAN: TindahanUpdate,
+        SyncEntity.INSPECTION: InspectionUpdate,
+        SyncEntity.VIOLATION: ViolationUpdate,
+    },
+}
+SYNC_CREATES: Dict[SyncEntity, Callable[[AsyncSession, Any], Awaitable[Any]]] = {
+    SyncEntity.TINDAHAN: create_tindahan,
+    SyncEntity.INSPECTION: create_inspection,
+    SyncEntity.VIOLATION: create_violation,
+}
+SYNC_UPDATES: Dict[SyncEntity, Callable[[AsyncSession, int, Any], Awaitable[Any]]] = {
+    SyncEntity.TINDAHAN: update_tindahan,
+    SyncEntity.INSPECTION: update_inspection,
+    SyncEntity.VIOLATION: update_violation,
+}
+SYNC_GETS: Dict[SyncEntity, Callable[[AsyncSession, int], Awaitable[Any]]] = {
+    SyncEntity.TINDAHAN: get_tindahan,
+    SyncEntity.INSPECTION: get_inspection,
+    SyncEntity.VIOLATION: get_violation,
+}
+# What a create that returns None was missing
+SYNC_CREATE_PARENTS = {SyncEntity.INSPECTION: "Tindahan", SyncEntity.VIOLATION: "Inspection"}
+
+
+async def get_sync_version(db: AsyncSession) -> int:
+    """Latest change version; every tindahan, inspection and violation write moves it, from any process."""
+    return (await db.execute(select(func.max(SyncChange.version)))).scalar_one() or 0
+
+
+async def pull_changes(db: AsyncSession, since: int = 0, limit: int = SYNC_PULL_LIMIT) -> SyncPullResponse:
+    """Rows changed after version `since`, oldest change first, at most `limit` of them.
+
+    Deactivated tindahan and deleted rows come back as tombstones. Reads the
+    change index and then the changed rows by id, all in one snapshot.
+    """
+    result = await db.execute(
+        select(SyncChange.entity, SyncChange.entity_id, SyncChange.version, SyncChange.deleted)
+        .where(SyncChange.version > since)
+        .order_by(SyncChange.version)
+        .limit(limit + 1)
+    )
+    changes = result.all()
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+    if not changes:
+        return SyncPullResponse(version=since, has_more=False)
+
+    versions: Dict[SyncEntity, Dict[int, int]] = {entity: {} for entity in SyncEntity}
+    deleted = []
+    for change in changes:
+        if change.deleted:
+            deleted.append((change.version, SyncTombstone(entity=change.entity, id=change.entity_id)))
+        else:
+            versions[SyncEntity(change.entity)][change.entity_id] = change.version
+
+    records: Dict[SyncEntity, List[Any]] = {entity: [] for entity in SyncEntity}
+    for entity, changed in versions.items():
+        if not changed:
+            continue
+        table = SYNC_TABLES[entity].__table__
+        rows = {row.id: row for row in (await db.execute(select(table).where(table.c.id.in_(changed)))).all()}
+        for entity_id, version in changed.items():
+            row = rows.get(entity_id)
+            # A missing row was removed without the delete trigger seeing it; drop it like a delete
+            if row is None or (entity == SyncEntity.TINDAHAN and not row.is_active):
+                deleted.append((version, SyncTombstone(entity=entity, id=entity_id)))
+            else:
+                records[entity].append((version, SYNC_RECORDS[entity].model_validate(dict(row._mapping))))
+
+    def in_change_order(items: List[Any]) -> List[Any]:
+        return [item for _, item in sorted(items, key=lambda item: item[0])]
+
+    return SyncPullResponse(
+        version=changes[-1].version,
+        has_more=has_more,
+        tindahan=in_change_order(records[SyncEntity.TINDAHAN]),
+        inspections=in_change_order(records[SyncEntity.INSPECTION]),
+        violations=in_change_order(records[SyncEntity.VIOLATION]),
+        deleted=in_change_order(deleted),
+    )
+
+
+def _validation_message(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc']) or 'data'}: {error['msg']}"
+        for error in exc.errors()
+    )
+
+
+def _as_stored(value: datetime) -> datetime:
+    """Naive UTC, the form updated_at is stored in."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+@contextmanager
+def _record_created_id(db: AsyncSession, model: Type[SQLModel], receipt: SyncReceipt) -> Iterator[None]:
+    """Copy the id of the `model` row inserted inside the block onto the receipt.
+
+    The receipt row is updated in the flush that inserts the new row, so the
+    controller's own commit writes both together.
+    """
+    def after_flush(session, flush_context):
+        for instance in session.new:
+            if isinstance(instance, model):
+                session.connection().execute(
+                    update(SyncReceipt).where(SyncReceipt.key == receipt.key).values(entity_id=instance.id)
+                )
+                set_committed_value(receipt, "entity_id", instance.id)
+
+    event.listen(db.sync_session, "after_flush", after_flush)
+    try:
+        yield
+    finally:
+        event.remove(db.sync_session, "after_flush", after_flush)
+
+
+async def _apply_operation(
+    db: AsyncSession,
+    operation: SyncPushOperation,
+    applied: Dict[str, Optional[int]]
+) -> SyncPushResult:
+    """Apply one operation through the regular controllers, exactly once per key.
+
+    `applied` maps the keys of applied operations to the row they wrote and
+    gains this operation's key when it is applied.
+    """
+    def outcome(status: SyncResultStatus, **fields: Any) -> SyncPushResult:
+        return SyncPushResult(key=operation.key, status=status, **fields)
+
+    if operation.key in applied:
+        return outcome(SyncResultStatus.DUPLICATE, id=applied[operation.key])
+
+    data = dict(operation.data)
+    for field, key in operation.refs.items():
+        if applied.get(key) is None:
+            return outcome(SyncResultStatus.INVALID, error=f"{field}: unknown operation key '{key}'")
+        data[field] = applied[key]
+    try:
+        payload = SYNC_PAYLOADS[operation.action][operation.entity].model_validate(data)
+    except ValidationError as exc:
+        return outcome(SyncResultStatus.INVALID, error=_validation_message(exc))
+    if operation.action == SyncAction.UPDATE and (operation.id is None or operation.base_updated_at is None):
+        return outcome(SyncResultStatus.INVALID, error="Updates need id and base_updated_at")
+
+    model = SYNC_TABLES[operation.entity]
+    receipt = SyncReceipt(key=operation.key, entity=operation.entity, action=operation.action, entity_id=operation.id)
+    try:
+        # Claiming the key first also takes the write lock, so nothing can
+        # change the row between the conflict check and the update
+        db.add(receipt)
+        await db.flush()
+        if operation.action == SyncAction.UPDATE:
+            current = (
+                await db.execute(select(model).where(model.id == operation.id).with_for_update())
+            ).scalar_one_or_none()
+            if current is None:
+                await db.rollback()
+                return outcome(SyncResultStatus.NOT_FOUND, id=operation.id, error=f"{model.__name__} not found")
+            if current.updated_at != _as_stored(operation.base_updated_at):
+                server_copy = SYNC_RECORDS[operation.entity].model_validate(current).model_dump(mode="json")
+                await db.rollback()
+                return outcome(
+                    SyncResultStatus.CONFLICT, id=operation.id, current=server_copy,
+                    error="Changed on the server since base_updated_at",
+                )
+            written = await SYNC_UPDATES[operation.entity](db, operation.id, payload)
+        else:
+            with _record_created_id(db, model, receipt):
+                written = await SYNC_CREATES[operation.entity](db, payload)
+            if written is None:
+                await db.rollback()
+                parent = SYNC_CREATE_PARENTS.get(operation.entity, model.__name__)
+                return outcome(SyncResultStatus.NOT_FOUND, error=f"{parent} not found")
+    except IntegrityError as exc:
+        await db.rollback()
+        # A concurrent push with the same key got there first
+        existing = (
+            await db.execute(select(SyncReceipt.key, SyncReceipt.entity_id).where(SyncReceipt.key == operation.key))
+        ).first()
+        await db.rollback()
+        if existing is not None:
+            applied[operation.key] = existing.entity_id
+            return outcome(SyncResultStatus.DUPLICATE, id=existing.entity_id)
+        return outcome(SyncResultStatus.FAILED, error=str(exc.orig if hasattr(exc, "orig") else exc))
+    except SQLAlchemyError as exc:
+        await db.rollback()
+        return outcome(SyncResultStatus.FAILED, error=str(exc.orig if hasattr(exc, "orig") else exc))
+
+    applied[operation.key] = written.id
+    return outcome(SyncResultStatus.APPLIED, id=written.id)
+
+
+async def push_changes(db: AsyncSession, operations: List[SyncPushOperation]) -> SyncPushResponse:
+    """Apply offline-queued operations in order, each in its own transaction.
+
+    Every applied operation stores its key with the write, so a retried
+    batch reports earlier operations as duplicates instead of repeating
+    them. Updates are rejected as conflicts when the row's updated_at no
+    longer matches the client's base_updated_at.
+    """
+    keys = {operation.key for operation in operations}
+    keys.update(key for operation in operations for key in operation.refs.values())
+    result = await db.execute(select(SyncReceipt.key, SyncReceipt.entity_id).where(SyncReceipt.key.in_(keys)))
+    applied = {row.key: row.entity_id for row in result.all()}
+    await db.rollback()
+
+    results = [await _apply_operation(db, operation, applied) for operation in operations]
+    return SyncPushResponse(results=results)
+
+
+async def create_once(db: AsyncSession, key: str, entity: SyncEntity, payload: SQLModel) -> Tuple[Optional[Any], bool]:
+    """Create a row through its regular controller once per idempotency key; returns (row, replayed).
+
+    The key is claimed by inserting its receipt in the create's own
+    transaction, so a retry fails that single INSERT on the primary key and
+    gets the row the first request wrote, as it is now, instead of a second
+    row. Returns (None, False) when the row's parent does not exist; the key
+    is then left unclaimed. Raises ValueError when the key was used for
+    another kind of write.
+    """
+    model = SYNC_TABLES[entity]
+    receipt = SyncReceipt(key=key, entity=entity, action=SyncAction.CREATE)
+    try:
+        db.add(receipt)
+        await db.flush()
+        with _record_created_id(db, model, receipt):
+            written = await SYNC_CREATES[entity](db, payload)
+        if written is None:
+            await db.rollback()
+        return written, False
+    except IntegrityError:
+        await db.rollback()
+        existing = (
+            await db.execute(select(SyncReceipt.entity, SyncReceipt.action, SyncReceipt.entity_id).where(SyncReceipt.key == key))
+        ).first()
+        await db.rollback()
+        if existing is None:
+            raise
+    if existing.entity != entity or existing.action != SyncAction.CREATE or existing.entity_id is None:
+        raise ValueError(f"Idempotency-Key '{key}' was already used for a different request")
+    replayed = await SYNC_GETS[entity](db, existing.entity_id)
+    await db.rollback()
+    return replayed, True
+
+
+async def prune_sync_receipts(
+    db: AsyncSession,
+    now: Optional[datetime] = None,
+    retention_days: int = SYNC_RECEIPT_RETENTION_DAYS,
+    max_keys: int = SYNC_RECEIPT_MAX_KEYS,
+    batch_size: int = SYNC_PRUNE_BATCH_SIZE
+) -> int:
+    """Forget idempotency keys older than the retention window, and the oldest beyond `max_keys`; returns the number removed."""
+    cutoff = (now or datetime.utcnow()) - timedelta(days=retention_days)
+    # created_at of the newest key past the cap, found by walking the created_at index from the newest end
+    overflow = (
+        await db.execute(
+            select(SyncReceipt.created_at).order_by(SyncReceipt.created_at.desc()).offset(max_keys).limit(1)
+        )
+    ).scalar_one_or_none()
+    if overflow is not None and overflow >= cutoff:
+        cutoff = overflow + timedelta(microseconds=1)
+    removed = 0
+    while True:
+        expired = select(SyncReceipt.key).where(SyncReceipt.created_at < cutoff).limit(batch_size)
+        result = await db.execute(delete(SyncReceipt).where(SyncReceipt.key.in_(expired)))
+        await db.commit()
+        removed += result.rowcount
+        if result.rowcount < batch_size:
+            return removed
+        await asyncio.sleep(0)
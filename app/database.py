@@ -2,16 +2,163 @@
 Database configuration and connection management
 """
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import event, inspect, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.util import await_only
 from sqlmodel import SQLModel
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator, Dict
+import asyncio
 import os
+import random
+import weakref
+
+# Engine profiles selected with DB_PROFILE. SQLite PRAGMAs are applied on every
+# new connection; pool settings only apply to pooled (non in-memory) databases.
+ENGINE_PROFILES: Dict[str, Dict[str, Any]] = {
+    "development": {
+        "echo": True,
+        "pool_size": 5,
+        "max_overflow": 10,
+        "query_cache_size": 500,
+        "sqlite_pragmas": {"busy_timeout": 5000},
+    },
+    "production": {
+        "echo": False,
+        "pool_size": 10,
+        "max_overflow": 20,
+        "pool_recycle": 1800,
+        "query_cache_size": 1200,
+        "statement_cache_size": 256,
+        "sqlite_pragmas": {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "busy_timeout": 5000,
+            "mmap_size": 268435456,
+            "cache_size": -64000,
+            "temp_store": "MEMORY",
+        },
+    },
+}
 
 # Database configuration
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./brgy_tindahan.db")
-engine = create_async_engine(DATABASE_URL, echo=True)
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL", DATABASE_URL)
+DB_PROFILE = os.getenv("DB_PROFILE", "production")
+# SQLite write transactions: extra attempts to take the write lock once busy_timeout runs out,
+# and the first backoff between attempts (doubled each time, with jitter)
+SQLITE_WRITE_RETRIES = int(os.getenv("SQLITE_WRITE_RETRIES", "3"))
+SQLITE_RETRY_BACKOFF_MS = float(os.getenv("SQLITE_RETRY_BACKOFF_MS", "50"))
+# Alembic migration scripts; an existing database must be at their head revision
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations")
+
+
+def create_engine_for_profile(url: str, profile: str = DB_PROFILE, read_only: bool = False) -> AsyncEngine:
+    """Create an async engine configured from a named engine profile.
+
+    Writable SQLite engines start every transaction with BEGIN IMMEDIATE, so
+    writers from any process queue for the write lock up front instead of
+    failing with "database is locked" when a read turns into a write. Within
+    a process, transactions first queue on an asyncio lock, which hands the
+    database over as soon as the previous writer is done instead of leaving
+    every waiter to SQLite's polling busy handler.
+    """
+    if profile not in ENGINE_PROFILES:
+        raise ValueError(f"Unknown DB_PROFILE '{profile}', expected one of {sorted(ENGINE_PROFILES)}")
+    settings = ENGINE_PROFILES[profile]
+    parsed_url = make_url(url)
+    backend = parsed_url.get_backend_name()
+    in_memory = backend == "sqlite" and parsed_url.database in (None, "", ":memory:")
+
+    options: Dict[str, Any] = {"echo": settings["echo"], "query_cache_size": settings["query_cache_size"]}
+    connect_args: Dict[str, Any] = {}
+    if not in_memory:
+        options.update(pool_size=settings["pool_size"], max_overflow=settings["max_overflow"], pool_pre_ping=backend != "sqlite")
+        if "pool_recycle" in settings:
+            options["pool_recycle"] = settings["pool_recycle"]
+    if "statement_cache_size" in settings:
+        if backend == "sqlite":
+            connect_args["cached_statements"] = settings["statement_cache_size"]
+        elif backend == "postgresql":
+            connect_args["prepared_statement_cache_size"] = settings["statement_cache_size"]
+    if read_only and backend == "postgresql":
+        connect_args["server_settings"] = {"default_transaction_read_only": "on"}
+
+    new_engine = create_async_engine(url, connect_args=connect_args, **options)
+
+    if backend == "sqlite":
+        pragmas = dict(settings["sqlite_pragmas"])
+        if read_only:
+            pragmas["query_only"] = "ON"
+
+        @event.listens_for(new_engine.sync_engine, "connect")
+        def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+            cursor.close()
+            if not read_only:
+                # Let the begin hook below issue BEGIN instead of the driver
+                dbapi_connection.isolation_level = None
+
+        if not read_only:
+            write_locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = weakref.WeakKeyDictionary()
+
+            @event.listens_for(new_engine.sync_engine, "begin")
+            def _begin_immediate(conn):
+                # Held for the transaction only; reads after the commit start a transaction of their own
+                if "write_lock" not in conn.info:
+                    lock = write_locks.setdefault(asyncio.get_running_loop(), asyncio.Lock())
+                    await_only(lock.acquire())
+                    conn.info["write_lock"] = lock
+                try:
+                    _begin_write_transaction(conn)
+                except Exception:
+                    _release_write_lock(conn.info)
+                    raise
+
+            @event.listens_for(new_engine.sync_engine, "commit")
+            @event.listens_for(new_engine.sync_engine, "rollback")
+            def _end_write_transaction(conn):
+                _release_write_lock(conn.info)
+
+            @event.listens_for(new_engine.sync_engine, "checkin")
+            def _release_on_checkin(dbapi_connection, connection_record):
+                # A connection can go back to the pool without either event, e.g. once invalidated
+                _release_write_lock(connection_record.info)
+
+    return new_engine
+
+
+def _release_write_lock(info: Dict[str, Any]) -> None:
+    """Hand the in-process write lock to the next waiting transaction, if this connection holds it."""
+    lock = info.pop("write_lock", None)
+    if lock is not None:
+        lock.release()
+
+
+def _begin_write_transaction(conn) -> None:
+    """BEGIN IMMEDIATE, retried with exponential backoff while another process holds the write lock."""
+    for attempt in range(SQLITE_WRITE_RETRIES + 1):
+        try:
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+            return
+        except OperationalError as exc:
+            if "locked" not in str(exc.orig) or attempt == SQLITE_WRITE_RETRIES:
+                raise
+        # Runs inside the async adapter's greenlet, so this sleeps without blocking the event loop
+        delay = SQLITE_RETRY_BACKOFF_MS / 1000 * 2 ** attempt * random.uniform(0.5, 1.5)
+        await_only(asyncio.sleep(delay))
+
+
+engine = create_engine_for_profile(DATABASE_URL)
+read_engine = create_engine_for_profile(DATABASE_READ_URL, read_only=True)
 async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+async_read_session = sessionmaker(read_engine, class_=AsyncSession, expire_on_commit=False)
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
@@ -20,7 +167,47 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         yield session
 
 
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """Get a read-only database session (replica when DATABASE_READ_URL is set)."""
+    async with async_read_session() as session:
+        yield session
+
+
+def _prepare_schema(sync_conn) -> None:
+    """Create the schema in an empty database and stamp it; otherwise check it is at the migration head."""
+    script = ScriptDirectory(MIGRATIONS_DIR)
+    head = script.get_current_head()
+    migrations = MigrationContext.configure(sync_conn)
+    if not inspect(sync_conn).get_table_names():
+        SQLModel.metadata.create_all(sync_conn)
+        migrations.stamp(script, head)
+        return
+    current = migrations.get_current_revision()
+    if current is None:
+        raise RuntimeError(
+            "Database has tables but no Alembic revision; `alembic stamp` the revision its schema matches, "
+            "then run `alembic upgrade head`"
+        )
+    if current != head:
+        raise RuntimeError(
+            f"Database schema is at revision {current} but the application needs {head}; "
+            "run `alembic upgrade head` or set MIGRATE_ON_STARTUP"
+        )
+
+
 async def init_db() -> None:
-    """Initialize database and create tables."""
+    """Create the schema in a new database, or check that an existing one is fully migrated.
+
+    An empty database gets every table from the models and is stamped with
+    the latest migration, so later migrations apply on top of it. Any other
+    database must already be at that migration; startup stops otherwise
+    rather than serving from a schema the code does not match.
+    """
     async with engine.begin() as conn:
-        await conn.run_sync(SQLModel.metadata.create_all)
+        await conn.run_sync(_prepare_schema)
+
+
+async def warm_up_db() -> None:
+    """Open a pooled read connection, so the first request skips connecting and the connection PRAGMAs."""
+    async with read_engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
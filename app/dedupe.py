@@ -0,0 +1,277 @@
+"""
+Duplicate tindahan detection: blocking and pairwise similarity scoring
+
+Comparing every registration with every other is quadratic, so stores are
+first grouped into blocks that a real duplicate almost always shares with
+its original: the same contact number, permit number, ~50 m map cell,
+house number and street, owner name or business name, always within one
+barangay zone. Names are blocked by phonetic keys so spelling variants
+("Nena"/"Nenya", "Cruz"/"Kruz") land together. Only pairs that share a
+block are scored, and blocks larger than a limit are skipped, since a key
+that many stores share says nothing about any two of them.
+"""
+
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from functools import lru_cache
+from math import cos, floor, radians
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+import os
+
+from app.geo import EARTH_RADIUS_M, haversine_m
+from app.utils.helpers import name_keys, normalize_name, normalize_phone_number
+
+# Lowest similarity reported as a likely duplicate, from 0 to 1
+DUPLICATE_MIN_SCORE = float(os.getenv("DUPLICATE_MIN_SCORE", "0.8"))
+# Blocks with more stores than this are skipped
+DUPLICATE_MAX_BLOCK_SIZE = int(os.getenv("DUPLICATE_MAX_BLOCK_SIZE", "25"))
+# Side of the map cells used for blocking, in meters
+DUPLICATE_CELL_M = 50.0
+
+# Words that describe the kind of store, not which one; left out of name blocking keys
+NAME_STOPWORDS = {
+    "aling", "mang", "ate", "kuya", "ni", "ng", "sa", "at", "and", "the", "ang", "mga",
+    "store", "sari", "tindahan", "mini", "mart", "minimart", "grocery", "kainan", "karinderya", "carinderia",
+    "bigasan", "talipapa", "eatery", "general", "merchandise", "shop", "stall", "food", "cart", "trading",
+}
+ADDRESS_STOPWORDS = {"st", "street", "ave", "avenue", "rd", "road", "blvd", "boulevard", "brgy", "barangay", "purok", "zone"}
+
+# Weight of each kind of evidence in the score; missing evidence is left out rather than counted against a pair
+WEIGHTS = {"name": 0.25, "owner": 0.25, "address": 0.2, "distance": 0.15, "contact": 0.15, "permit": 0.15}
+# Stores this close are at the same spot; this far apart, different ones
+SAME_SPOT_M = 25.0
+DIFFERENT_SPOT_M = 250.0
+
+
+@dataclass
+class StoreRecord:
+    """The fields of an active tindahan that duplicate detection compares, normalized once."""
+    id: int
+    barangay_zone: str
+    name: str
+    brand: str  # The business name without its NAME_STOPWORDS, e.g. "nena" for "Aling Nena's Sari-Sari Store"
+    owner: str
+    address: str
+    contact: str
+    permit: str
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    keys: List[str] = field(default_factory=list, repr=False)
+
+    @classmethod
+    def from_row(cls, row: Any) -> "StoreRecord":
+        name = normalize_name(row.business_name)
+        return cls(
+            id=row.id,
+            barangay_zone=row.barangay_zone,
+            name=name,
+            brand=" ".join(word for word in name.split() if word not in NAME_STOPWORDS),
+            owner=normalize_name(row.owner_name),
+            address=normalize_name(row.address),
+            contact=normalize_phone_number(row.contact_number),
+            permit=normalize_name(row.business_permit_number or "").replace(" ", ""),
+            latitude=row.latitude,
+            longitude=row.longitude,
+        )
+
+    @property
+    def located(self) -> bool:
+        return self.latitude is not None and self.longitude is not None
+
+
+@dataclass
+class DuplicateMatch:
+    """A likely duplicate pair: the earlier registration and the later one."""
+    tindahan_id: int
+    duplicate_id: int
+    barangay_zone: str
+    score: float
+    reasons: List[str]
+
+
+@dataclass
+class DuplicateScanStats:
+    """How much work blocking saved."""
+    stores: int = 0
+    blocks: int = 0
+    skipped_blocks: int = 0
+    candidate_pairs: int = 0
+    matches: int = 0
+
+
+def blocking_keys(store: StoreRecord) -> List[str]:
+    """Block keys of one store, each scoped to its zone."""
+    keys = []
+    if len(store.contact) >= 7:
+        keys.append(f"c:{store.contact}")
+    if store.permit:
+        keys.append(f"p:{store.permit}")
+    if store.located:
+        # Two grids offset by half a cell, so stores a few meters apart on a cell border still meet
+        size = DUPLICATE_CELL_M / (radians(1) * EARTH_RADIUS_M)
+        lon_size = size / max(cos(radians(store.latitude)), 1e-6)
+        for grid, offset in (("g0", 0.0), ("g1", 0.5)):
+            keys.append(f"{grid}:{floor(store.latitude / size + offset)}:{floor(store.longitude / lon_size + offset)}")
+    owner = name_keys(store.owner)
+    if owner:
+        keys.append("o:" + " ".join(owner))
+    name = name_keys(store.name, NAME_STOPWORDS)
+    if name:
+        keys.append("n:" + " ".join(name))
+    words = store.address.split()
+    if words and words[0].isdigit():
+        street = name_keys(" ".join(words[1:]), ADDRESS_STOPWORDS)
+        keys.append(f"a:{words[0]}:" + " ".join(street))
+    return [f"{store.barangay_zone}|{key}" for key in keys]
+
+
+def candidate_pairs(stores: Iterable[StoreRecord], max_block_size: int, stats: DuplicateScanStats) -> Set[Tuple[int, int]]:
+    """Id pairs (lower first) that share at least one block of at most `max_block_size` stores."""
+    blocks: Dict[str, List[int]] = defaultdict(list)
+    for store in stores:
+        store.keys = blocking_keys(store)
+        for key in store.keys:
+            blocks[key].append(store.id)
+
+    pairs: Set[Tuple[int, int]] = set()
+    for members in blocks.values():
+        if len(members) < 2:
+            continue
+        stats.blocks += 1
+        if len(members) > max_block_size:
+            stats.skipped_blocks += 1
+            continue
+        members.sort()
+        for i, first in enumerate(members):
+            for second in members[i + 1:]:
+                pairs.add((first, second))
+    stats.candidate_pairs = len(pairs)
+    return pairs
+
+
+# Registries repeat the same names and streets, so per-string and per-pair work is cached across pairs
+@lru_cache(maxsize=65536)
+def _words(text: str) -> FrozenSet[str]:
+    return frozenset(text.split())
+
+
+@lru_cache(maxsize=65536)
+def _letters(text: str) -> Counter:
+    return Counter(text)
+
+
+@lru_cache(maxsize=65536)
+def _edit_ratio(a: str, b: str) -> float:
+    return SequenceMatcher(None, a, b, autojunk=False).ratio()
+
+
+def text_similarity(a: str, b: str, needed: float = 0.0) -> Optional[float]:
+    """Similarity of two normalized names from 0 to 1: edit similarity, or word containment if higher.
+
+    Containment lets "nena store" match "nena sari sari store". Returns None
+    when cheap upper bounds already show the similarity is below `needed`.
+    """
+    if a == b:
+        return 1.0
+    words_a, words_b = _words(a), _words(b)
+    containment = len(words_a & words_b) / min(len(words_a), len(words_b))
+    # The edit ratio only matters if it can beat both; bounds from the lengths and
+    # shared letters (SequenceMatcher's quick ratios, without building one) usually show it cannot
+    floor = max(containment, needed)
+    size = len(a) + len(b)
+    if 2 * min(len(a), len(b)) / size <= floor or 2 * sum((_letters(a) & _letters(b)).values()) / size <= floor:
+        return containment if containment >= needed else None
+    return max(containment, _edit_ratio(a, b))
+
+
+def _different_houses(a: str, b: str) -> bool:
+    """Whether two normalized addresses start with different house numbers."""
+    first, second = a.split(" ", 1)[0], b.split(" ", 1)[0]
+    return first.isdigit() and second.isdigit() and first != second
+
+
+def score_pair(a: StoreRecord, b: StoreRecord, min_score: float = DUPLICATE_MIN_SCORE) -> Optional[DuplicateMatch]:
+    """Weighted similarity of two stores, or None when it is below `min_score`.
+
+    Cheap exact evidence (contact, permit, distance) is scored first, then
+    the names one by one, stopping as soon as even perfect matches on the
+    rest could not lift the pair over the threshold.
+    """
+    evidence: Dict[str, float] = {}
+    reasons: List[str] = []
+    if a.contact and b.contact:
+        evidence["contact"] = 1.0 if a.contact == b.contact else 0.0
+        if a.contact == b.contact:
+            reasons.append("same contact number")
+    if a.permit and a.permit == b.permit:
+        evidence["permit"] = 1.0
+        reasons.append("same permit number")
+    if a.located and b.located:
+        distance = haversine_m(a.latitude, a.longitude, b.latitude, b.longitude)
+        evidence["distance"] = min(1.0, max(0.0, (DIFFERENT_SPOT_M - distance) / (DIFFERENT_SPOT_M - SAME_SPOT_M)))
+        if distance <= DIFFERENT_SPOT_M / 2:
+            reasons.append(f"{distance:.0f} m apart")
+
+    texts = [
+        (kind, first, second, label)
+        for kind, first, second, label in (
+            # Address first: different house numbers settle most pairs without comparing any text
+            ("address", a.address, b.address, "address"),
+            ("owner", a.owner, b.owner, "owner"),
+            ("name", a.name, b.name, "business name"),
+        )
+        if first and second
+    ]
+    total = sum(WEIGHTS[kind] for kind in evidence) + sum(WEIGHTS[text[0]] for text in texts)
+    if not total:
+        return None
+    # Weighted score still needed, assuming every text feature not yet compared matches perfectly
+    missing = min_score * total - sum(WEIGHTS[kind] * value for kind, value in evidence.items())
+    remaining = sum(WEIGHTS[text[0]] for text in texts)
+    for kind, first, second, label in texts:
+        remaining -= WEIGHTS[kind]
+        needed = (missing - remaining) / WEIGHTS[kind]
+        if needed > 1:
+            return None
+        if kind == "address" and _different_houses(first, second):
+            # Neighbours on one street share most of their address text
+            similarity = 0.0 if needed <= 0 else None
+        else:
+            similarity = text_similarity(first, second, needed)
+        if kind == "name" and a.brand and b.brand:
+            # "Nena's Tindahan" and "Nena Sari-Sari Store" are one store under two descriptions
+            brand = text_similarity(a.brand, b.brand, needed)
+            if brand is not None and (similarity is None or brand > similarity):
+                similarity = brand
+        if similarity is None:
+            return None
+        evidence[kind] = similarity
+        missing -= WEIGHTS[kind] * similarity
+        if similarity >= 0.8:
+            reasons.append(f"{label} {similarity:.0%} similar")
+    score = sum(WEIGHTS[kind] * value for kind, value in evidence.items()) / total
+    if score < min_score:
+        return None
+    first, second = sorted((a.id, b.id))
+    return DuplicateMatch(
+        tindahan_id=first, duplicate_id=second, barangay_zone=a.barangay_zone, score=round(score, 3), reasons=reasons
+    )
+
+
+def find_duplicates(
+    stores: Iterable[StoreRecord],
+    min_score: float = DUPLICATE_MIN_SCORE,
+    max_block_size: int = DUPLICATE_MAX_BLOCK_SIZE
+) -> Tuple[List[DuplicateMatch], DuplicateScanStats]:
+    """Likely duplicate pairs, best first, and how many pairs were compared to find them."""
+    by_id = {store.id: store for store in stores}
+    stats = DuplicateScanStats(stores=len(by_id))
+    matches = []
+    for first, second in candidate_pairs(by_id.values(), max_block_size, stats):
+        match = score_pair(by_id[first], by_id[second], min_score)
+        if match is not None:
+            matches.append(match)
+    matches.sort(key=lambda match: (-match.score, match.tindahan_id, match.duplicate_id))
+    stats.matches = len(matches)
+    return matches, stats
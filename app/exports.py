@@ -0,0 +1,477 @@
+"""
+Streamed export file generation, run in worker processes by the export job runner
+
+Rows are read from a server-side cursor in batches and written straight to
+the output file, so memory stays flat however many rows are exported. CSV,
+XLSX and PDF are written with the standard library only: XLSX as a zip of
+SpreadsheetML parts with inline strings, PDF as fixed-width Courier text.
+"""
+
+from dataclasses import dataclass, field
+from sqlalchemy import case, func
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlmodel import select
+from typing import Any, AsyncIterator, BinaryIO, Callable, Dict, List, Sequence, Tuple
+from datetime import date, datetime
+from enum import Enum
+from xml.sax.saxutils import escape
+import asyncio
+import csv
+import io
+import os
+import re
+import signal
+import zipfile
+
+from app.database import create_engine_for_profile
+from app.models.store import Tindahan
+from app.models.inspection import Inspection, Violation
+from app.models.compliance_report import ComplianceMetrics, ComplianceReport
+from app.models.export import ExportFormat, ExportKind
+
+# Rows fetched from the cursor per batch
+EXPORT_BATCH_SIZE = 1000
+# Permits expiring within this many days are listed as "expiring"
+PERMIT_EXPIRING_DAYS = 30
+
+# (header, column width in characters on PDF pages)
+Column = Tuple[str, int]
+
+_CONTROL_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+@dataclass
+class ExportTable:
+    """One export: a title, a key/value preamble and a stream of row batches."""
+    title: str
+    columns: List[Column]
+    batches: AsyncIterator[Sequence[Sequence[Any]]]
+    preamble: List[Tuple[str, Any]] = field(default_factory=list)
+
+
+def _text(value: Any) -> str:
+    """Render a cell value as text."""
+    if value is None:
+        return ""
+    if isinstance(value, Enum):
+        return str(value.value)
+    if isinstance(value, bool):
+        return "yes" if value else "no"
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d" if value.time() == datetime.min.time() else "%Y-%m-%d %H:%M")
+    if isinstance(value, date):
+        return value.isoformat()
+    return _CONTROL_CHARS.sub(" ", str(value))
+
+
+class CsvExportWriter:
+    """UTF-8 CSV with a BOM so spreadsheet programs detect the encoding."""
+
+    def __init__(self, file: BinaryIO):
+        self._stream = io.TextIOWrapper(file, encoding="utf-8-sig", newline="", write_through=False)
+        self._writer = csv.writer(self._stream)
+
+    def begin(self, table: ExportTable) -> None:
+        for name, value in table.preamble:
+            self._writer.writerow([name, _text(value)])
+        if table.preamble:
+            self._writer.writerow([])
+        self._writer.writerow([header for header, _ in table.columns])
+
+    def write_rows(self, rows: Sequence[Sequence[Any]]) -> None:
+        self._writer.writerows([_text(value) for value in row] for row in rows)
+
+    def close(self) -> None:
+        self._stream.flush()
+        self._stream.detach()
+
+
+_XLSX_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_XLSX_REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_XLSX_PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+_XLSX_BOLD = ' s="1"'
+_XLSX_STATIC_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '<Override PartName="/xl/styles.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+        '</Types>'
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        f'<Relationships xmlns="{_XLSX_PKG_REL_NS}">'
+        f'<Relationship Id="rId1" Type="{_XLSX_REL_NS}/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        f'<Relationships xmlns="{_XLSX_PKG_REL_NS}">'
+        f'<Relationship Id="rId1" Type="{_XLSX_REL_NS}/worksheet" Target="worksheets/sheet1.xml"/>'
+        f'<Relationship Id="rId2" Type="{_XLSX_REL_NS}/styles" Target="styles.xml"/>'
+        '</Relationships>'
+    ),
+    # Style 1 is bold, for the header row and preamble labels
+    "xl/styles.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        f'<styleSheet xmlns="{_XLSX_NS}">'
+        '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+        '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+        '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+        '<fill><patternFill patternType="gray125"/></fill></fills>'
+        '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+        '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+        '<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+        '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/></cellXfs>'
+        '</styleSheet>'
+    ),
+}
+
+
+class XlsxExportWriter:
+    """Single-sheet workbook whose sheet XML is streamed into the zip entry."""
+
+    def __init__(self, file: BinaryIO):
+        self._zip = zipfile.ZipFile(file, "w", zipfile.ZIP_DEFLATED)
+        self._sheet = None
+
+    @staticmethod
+    def _cells(values: Sequence[Any], style: str = "") -> str:
+        cells = []
+        for value in values:
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                cells.append(f"<c{style}><v>{value}</v></c>")
+            else:
+                cells.append(f'<c t="inlineStr"{style}><is><t xml:space="preserve">{escape(_text(value))}</t></is></c>')
+        return "".join(cells)
+
+    def begin(self, table: ExportTable) -> None:
+        sheet_name = escape(re.sub(r"[\[\]:*?/\\]", " ", table.title)[:31])
+        for name, content in _XLSX_STATIC_PARTS.items():
+            self._zip.writestr(name, content)
+        self._zip.writestr("xl/workbook.xml", (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            f'<workbook xmlns="{_XLSX_NS}" xmlns:r="{_XLSX_REL_NS}">'
+            f'<sheets><sheet name="{sheet_name}" sheetId="1" r:id="rId1"/></sheets></workbook>'
+        ))
+
+        self._sheet = self._zip.open("xl/worksheets/sheet1.xml", "w", force_zip64=True)
+        widths = "".join(
+            f'<col min="{index}" max="{index}" width="{width + 2}" customWidth="1"/>'
+            for index, (_, width) in enumerate(table.columns, start=1)
+        )
+        parts = [
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>',
+            f'<worksheet xmlns="{_XLSX_NS}"><cols>{widths}</cols><sheetData>',
+        ]
+        for name, value in table.preamble:
+            parts.append(f"<row>{self._cells([name], _XLSX_BOLD)}{self._cells([value])}</row>")
+        if table.preamble:
+            parts.append("<row/>")
+        parts.append(f"<row>{self._cells([header for header, _ in table.columns], _XLSX_BOLD)}</row>")
+        self._sheet.write("".join(parts).encode())
+
+    def write_rows(self, rows: Sequence[Sequence[Any]]) -> None:
+        self._sheet.write("".join(f"<row>{self._cells(row)}</row>" for row in rows).encode())
+
+    def close(self) -> None:
+        self._sheet.write(b"</sheetData></worksheet>")
+        self._sheet.close()
+        self._zip.close()
+
+
+class PdfExportWriter:
+    """Landscape A4 pages of fixed-width Courier text, written page by page.
+
+    Each finished page is written out immediately; only the object offsets
+    and page object numbers are kept for the cross-reference table and the
+    page tree, which is written last.
+    """
+
+    PAGE_WIDTH = 842
+    PAGE_HEIGHT = 595
+    MARGIN = 28
+    FONT_SIZE = 7
+    LEADING = 9
+    # Courier advances 0.6 em per character
+    LINE_CHARS = int((PAGE_WIDTH - 2 * MARGIN) / (FONT_SIZE * 0.6))
+    PAGE_LINES = int((PAGE_HEIGHT - 2 * MARGIN) / LEADING) - 1
+
+    CATALOG, PAGES, FONT, BOLD_FONT = 1, 2, 3, 4
+
+    def __init__(self, file: BinaryIO):
+        self._file = file
+        self._position = 0
+        self._offsets: Dict[int, int] = {}
+        self._next_object = 5
+        self._page_objects: List[int] = []
+        self._lines: List[Tuple[bool, str]] = []
+        self._title = ""
+        self._header = ""
+
+    def _write(self, data: bytes) -> None:
+        self._file.write(data)
+        self._position += len(data)
+
+    def _object(self, number: int, body: bytes) -> None:
+        self._offsets[number] = self._position
+        self._write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+
+    @staticmethod
+    def _literal(text: str) -> bytes:
+        encoded = text.encode("cp1252", "replace")
+        return b"(" + encoded.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+    def _format_row(self, values: Sequence[Any]) -> str:
+        cells = []
+        for value, (_, width) in zip(values, self._columns):
+            text = _text(value).replace("\n", " ").replace("\r", " ").replace("\t", " ")
+            if len(text) > width:
+                text = text[:width - 1] + "~"
+            cells.append(text.rjust(width) if isinstance(value, (int, float)) and not isinstance(value, bool) else text.ljust(width))
+        return " ".join(cells)[:self.LINE_CHARS].rstrip()
+
+    def begin(self, table: ExportTable) -> None:
+        self._columns = table.columns
+        self._title = table.title
+        self._header = " ".join(header[:width].ljust(width) for header, width in table.columns)[:self.LINE_CHARS]
+        self._write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self._object(self.CATALOG, b"<< /Type /Catalog /Pages %d 0 R >>" % self.PAGES)
+        for number, name in ((self.FONT, b"Courier"), (self.BOLD_FONT, b"Courier-Bold")):
+            self._object(number, b"<< /Type /Font /Subtype /Type1 /BaseFont /%s /Encoding /WinAnsiEncoding >>" % name)
+
+        self._lines.append((True, table.title))
+        self._lines.append((False, ""))
+        label_width = max((len(name) for name, _ in table.preamble), default=0)
+        for name, value in table.preamble:
+            self._lines.append((False, f"{name.ljust(label_width)}  {_text(value)}"[:self.LINE_CHARS]))
+        if table.preamble:
+            self._lines.append((False, ""))
+        self._start_table()
+
+    def _start_table(self) -> None:
+        self._lines.append((True, self._header))
+        self._lines.append((False, "-" * min(len(self._header), self.LINE_CHARS)))
+
+    def write_rows(self, rows: Sequence[Sequence[Any]]) -> None:
+        for row in rows:
+            if len(self._lines) >= self.PAGE_LINES:
+                self._flush_page()
+                self._start_table()
+            self._lines.append((False, self._format_row(row)))
+
+    def _flush_page(self) -> None:
+        top = self.PAGE_HEIGHT - self.MARGIN - self.FONT_SIZE
+        parts = [b"BT %d TL %d %d Td" % (self.LEADING, self.MARGIN, top)]
+        bold = None
+        for is_bold, text in self._lines:
+            if is_bold != bold:
+                parts.append(b"/F%d %d Tf" % (2 if is_bold else 1, self.FONT_SIZE))
+                bold = is_bold
+            parts.append(self._literal(text) + b" Tj T*")
+        footer = f"{self._title} - page {len(self._page_objects) + 1}"
+        parts.append(b"ET BT /F1 %d Tf %d %d Td %s Tj ET" % (self.FONT_SIZE, self.MARGIN, self.MARGIN // 2, self._literal(footer)))
+        content = b"\n".join(parts)
+
+        content_number, page_number = self._next_object, self._next_object + 1
+        self._next_object += 2
+        self._object(content_number, b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content))
+        self._object(page_number, (
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %d %d] /Contents %d 0 R "
+            b"/Resources << /Font << /F1 %d 0 R /F2 %d 0 R >> >> >>"
+        ) % (self.PAGES, self.PAGE_WIDTH, self.PAGE_HEIGHT, content_number, self.FONT, self.BOLD_FONT))
+        self._page_objects.append(page_number)
+        self._lines = []
+
+    def close(self) -> None:
+        self._flush_page()
+        kids = b" ".join(b"%d 0 R" % number for number in self._page_objects)
+        self._object(self.PAGES, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(self._page_objects)))
+
+        xref_offset = self._position
+        entries = [b"0000000000 65535 f \n"] + [b"%010d 00000 n \n" % self._offsets[number] for number in range(1, self._next_object)]
+        self._write(b"xref\n0 %d\n" % self._next_object + b"".join(entries))
+        self._write(
+            b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (self._next_object, self.CATALOG, xref_offset)
+        )
+
+
+EXPORT_WRITERS: Dict[ExportFormat, Callable[[BinaryIO], Any]] = {
+    ExportFormat.CSV: CsvExportWriter,
+    ExportFormat.XLSX: XlsxExportWriter,
+    ExportFormat.PDF: PdfExportWriter,
+}
+
+
+async def _stream_batches(conn: AsyncConnection, query, convert: Callable[[Any], Sequence[Any]]) -> AsyncIterator[List[Sequence[Any]]]:
+    """Run a query on a server-side cursor, yielding converted rows batch by batch."""
+    result = await conn.stream(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+    async for rows in result.partitions():
+        yield [convert(row) for row in rows]
+
+
+async def permit_status_table(conn: AsyncConnection, job: Dict[str, Any], now: datetime) -> ExportTable:
+    """Permit number, dates and days to expiry of every store in scope."""
+    query = select(
+        Tindahan.id, Tindahan.business_name, Tindahan.owner_name, Tindahan.business_type, Tindahan.barangay_zone,
+        Tindahan.address, Tindahan.business_permit_number, Tindahan.permit_issued_date, Tindahan.permit_expiry_date,
+        Tindahan.compliance_status,
+    ).order_by(Tindahan.id)
+    if job["active_only"]:
+        query = query.where(Tindahan.is_active == True)
+    if job["barangay_zone"] is not None:
+        query = query.where(Tindahan.barangay_zone == job["barangay_zone"])
+    today = now.date()
+
+    def convert(row: Any) -> Sequence[Any]:
+        (tindahan_id, business_name, owner_name, business_type, zone, address,
+         permit_number, issued, expiry, compliance_status) = row
+        days_left = (expiry.date() - today).days if expiry is not None else None
+        if days_left is None:
+            permit = "none" if permit_number is None else "no expiry"
+        elif days_left < 0:
+            permit = "expired"
+        elif days_left <= PERMIT_EXPIRING_DAYS:
+            permit = "expiring"
+        else:
+            permit = "valid"
+        return (tindahan_id, business_name, owner_name, business_type, zone, address,
+                permit_number, issued, expiry, days_left, permit, compliance_status)
+
+    scope = job["barangay_zone"] or "all zones"
+    return ExportTable(
+        title=f"Permit status - {scope}",
+        columns=[
+            ("ID", 7), ("Business name", 26), ("Owner", 20), ("Type", 13), ("Zone", 10), ("Address", 28),
+            ("Permit no.", 14), ("Issued", 10), ("Expires", 10), ("Days left", 9), ("Permit", 9), ("Compliance", 10),
+        ],
+        preamble=[("Scope", scope), ("As of", now), ("Active only", job["active_only"])],
+        batches=_stream_batches(conn, query, convert),
+    )
+
+
+async def compliance_report_table(conn: AsyncConnection, job: Dict[str, Any], now: datetime) -> ExportTable:
+    """A stored report's metrics, followed by the stores in its scope with their activity in the period."""
+    report = (await conn.execute(select(ComplianceReport).where(ComplianceReport.id == job["report_id"]))).first()
+    if report is None:
+        raise ValueError(f"Report {job['report_id']} no longer exists")
+    start, end = report.report_period_start, report.report_period_end
+
+    inspections = (
+        select(Inspection.tindahan_id, func.count().label("inspections"))
+        .where(Inspection.inspection_date >= start, Inspection.inspection_date < end)
+        .group_by(Inspection.tindahan_id)
+        .subquery()
+    )
+    violations = (
+        select(
+            Inspection.tindahan_id,
+            func.count().label("violations"),
+            func.sum(case((Violation.is_resolved == False, 1), else_=0)).label("unresolved"),
+        )
+        .select_from(Violation)
+        .join(Inspection, Inspection.id == Violation.inspection_id)
+        .where(Violation.created_at >= start, Violation.created_at < end)
+        .group_by(Inspection.tindahan_id)
+        .subquery()
+    )
+    query = (
+        select(
+            Tindahan.id, Tindahan.business_name, Tindahan.owner_name, Tindahan.barangay_zone,
+            Tindahan.compliance_status, Tindahan.permit_expiry_date, Tindahan.last_inspection_date,
+            func.coalesce(inspections.c.inspections, 0),
+            func.coalesce(violations.c.violations, 0),
+            func.coalesce(violations.c.unresolved, 0),
+        )
+        .outerjoin(inspections, inspections.c.tindahan_id == Tindahan.id)
+        .outerjoin(violations, violations.c.tindahan_id == Tindahan.id)
+        .order_by(Tindahan.id)
+    )
+    if job["active_only"]:
+        query = query.where(Tindahan.is_active == True)
+    if job["barangay_zone"] is not None:
+        query = query.where(Tindahan.barangay_zone == job["barangay_zone"])
+
+    preamble: List[Tuple[str, Any]] = [
+        ("Report", f"#{report.id} ({report.report_type.value})"),
+        ("Period", f"{_text(start)} to {_text(end)}"),
+        ("Zone", report.barangay_zone or "all zones"),
+        ("Generated by", report.generated_by),
+        ("Generated at", report.created_at),
+        ("Summary", report.summary),
+    ]
+    if report.metrics:
+        metrics = ComplianceMetrics.model_validate_json(report.metrics)
+        preamble.extend((name.replace("_", " ").capitalize(), value) for name, value in metrics.model_dump().items())
+    if report.recommendations:
+        preamble.append(("Recommendations", report.recommendations))
+    # Metrics are the stored snapshot; the per-store rows are read now
+    preamble.append(("Store status as of", now))
+
+    return ExportTable(
+        title=f"Compliance report #{report.id}",
+        columns=[
+            ("ID", 7), ("Business name", 30), ("Owner", 24), ("Zone", 12), ("Compliance", 10), ("Permit expires", 14),
+            ("Last inspection", 16), ("Inspections", 11), ("Violations", 10), ("Unresolved", 10),
+        ],
+        preamble=preamble,
+        batches=_stream_batches(conn, query, tuple),
+    )
+
+
+EXPORT_TABLES: Dict[ExportKind, Callable[[AsyncConnection, Dict[str, Any], datetime], Any]] = {
+    ExportKind.PERMIT_STATUS: permit_status_table,
+    ExportKind.COMPLIANCE_REPORT: compliance_report_table,
+}
+
+
+async def write_export(job: Dict[str, Any], path: str, database_url: str) -> Tuple[int, int]:
+    """Write the export file of a job; returns (rows written, file size).
+
+    The file is written under a temporary name and renamed when complete,
+    so a download never sees a partial file.
+    """
+    engine = create_engine_for_profile(database_url, read_only=True)
+    partial_path = f"{path}.partial"
+    rows_written = 0
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        async with engine.connect() as conn:
+            table = await EXPORT_TABLES[ExportKind(job["kind"])](conn, job, datetime.utcnow())
+            with open(partial_path, "wb") as file:
+                writer = EXPORT_WRITERS[ExportFormat(job["format"])](file)
+                writer.begin(table)
+                async for batch in table.batches:
+                    writer.write_rows(batch)
+                    rows_written += len(batch)
+                writer.close()
+        os.replace(partial_path, path)
+    except BaseException:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        raise
+    finally:
+        await engine.dispose()
+    return rows_written, os.path.getsize(path)
+
+
+def run_export(job: Dict[str, Any], path: str, database_url: str) -> Tuple[int, int]:
+    """Process pool entry point: generate one export file on a private event loop."""
+    return asyncio.run(write_export(job, path, database_url))
+
+
+def init_worker(nice: int) -> None:
+    """Process pool initializer: yield the CPU to the web process and leave Ctrl+C to it.
+
+    The parent stops workers itself on shutdown; a terminal interrupt reaching
+    the whole process group would otherwise kill them mid-export.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if nice and hasattr(os, "nice"):
+        os.nice(nice)
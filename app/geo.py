@@ -0,0 +1,200 @@
+"""
+Geospatial helpers: distances, bounding boxes and barangay zone boundaries
+"""
+
+from bisect import bisect_right
+from math import asin, cos, degrees, radians, sin, sqrt
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import json
+import os
+
+from app.models.zone import ZoneBoundarySummary
+
+# GeoJSON FeatureCollection of Polygon/MultiPolygon features whose
+# properties.name matches tindahan.barangay_zone; unset disables zone checks
+ZONE_BOUNDARIES_FILE = os.getenv("ZONE_BOUNDARIES_FILE")
+
+EARTH_RADIUS_M = 6371008.8
+
+# Cells per side of the inside/outside grid precomputed for each zone
+ZONE_GRID_SIZE = 64
+
+Edge = Tuple[float, float, float, float]
+
+
+def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in meters."""
+    dlat = radians(lat2 - lat1)
+    dlon = radians(lon2 - lon1)
+    a = sin(dlat / 2) ** 2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_M * asin(min(1.0, sqrt(a)))
+
+
+def bounding_box(latitude: float, longitude: float, radius_m: float) -> Tuple[float, float, float, float]:
+    """(min_lat, max_lat, min_lon, max_lon) enclosing a circle; clamped, not wrapped at the antimeridian."""
+    dlat = degrees(radius_m / EARTH_RADIUS_M)
+    parallel = cos(radians(latitude))
+    dlon = 180.0 if parallel < 1e-9 else min(180.0, degrees(radius_m / (EARTH_RADIUS_M * parallel)))
+    return (
+        max(-90.0, latitude - dlat), min(90.0, latitude + dlat),
+        max(-180.0, longitude - dlon), min(180.0, longitude + dlon),
+    )
+
+
+class ZonePolygon:
+    """A zone boundary prepared for fast point-in-polygon checks.
+
+    Uses the even-odd rule over every ring, so holes and multi-part zones
+    work. The bounding box is divided into a grid whose cells are classified
+    once as inside, outside or crossed by the boundary; only points in
+    boundary cells are ray-cast, against the edges bucketed into their
+    latitude band.
+    """
+
+    def __init__(self, name: str, rings: Sequence[Sequence[Tuple[float, float]]], grid_size: int = ZONE_GRID_SIZE):
+        self.name = name
+        edges: List[Edge] = []
+        for ring in rings:
+            points = [(float(lat), float(lon)) for lon, lat in ring]
+            if len(points) < 3:
+                raise ValueError(f"Zone '{name}' has a ring with fewer than 3 points")
+            for (lat1, lon1), (lat2, lon2) in zip(points, points[1:] + points[:1]):
+                if lat1 != lat2:
+                    edges.append((lat1, lon1, lat2, lon2))
+        if not edges:
+            raise ValueError(f"Zone '{name}' has no area")
+        self.vertices = sum(len(ring) for ring in rings)
+        self.min_lat = min(min(edge[0], edge[2]) for edge in edges)
+        self.max_lat = max(max(edge[0], edge[2]) for edge in edges)
+        self.min_lon = min(min(edge[1], edge[3]) for edge in edges)
+        self.max_lon = max(max(edge[1], edge[3]) for edge in edges)
+
+        band_count = max(1, len(edges) // 2)
+        self._band_height = (self.max_lat - self.min_lat) / band_count
+        self._bands: List[List[Edge]] = [[] for _ in range(band_count)]
+        for edge in edges:
+            low, high = sorted((edge[0], edge[2]))
+            for band in range(self._band(low), self._band(high) + 1):
+                self._bands[band].append(edge)
+
+        # Cells touched by an edge's bounding box may be crossed by the boundary;
+        # every other cell lies wholly inside or outside, decided by its center
+        self._grid_size = grid_size
+        self._cell_lat = (self.max_lat - self.min_lat) / grid_size
+        self._cell_lon = (self.max_lon - self.min_lon) / grid_size or 1.0
+        boundary = set()
+        for lat1, lon1, lat2, lon2 in edges:
+            first_row, last_row = self._cell(lat1, lat2, self.min_lat, self._cell_lat)
+            first_column, last_column = self._cell(lon1, lon2, self.min_lon, self._cell_lon)
+            boundary.update(
+                (row, column) for row in range(first_row, last_row + 1) for column in range(first_column, last_column + 1)
+            )
+        self._grid: List[Optional[bool]] = []
+        for row in range(grid_size):
+            for column in range(grid_size):
+                if (row, column) in boundary:
+                    self._grid.append(None)
+                else:
+                    center = (self.min_lat + (row + 0.5) * self._cell_lat, self.min_lon + (column + 0.5) * self._cell_lon)
+                    self._grid.append(self._ray_cast(*center))
+
+    def _cell(self, first: float, second: float, origin: float, size: float) -> Tuple[int, int]:
+        """Grid index range covered by the interval between two coordinates."""
+        low, high = sorted((first, second))
+        last = self._grid_size - 1
+        return min(last, max(0, int((low - origin) / size))), min(last, max(0, int((high - origin) / size)))
+
+    def _band(self, latitude: float) -> int:
+        return min(len(self._bands) - 1, max(0, int((latitude - self.min_lat) / self._band_height)))
+
+    def _ray_cast(self, latitude: float, longitude: float) -> bool:
+        inside = False
+        for lat1, lon1, lat2, lon2 in self._bands[self._band(latitude)]:
+            if (lat1 > latitude) != (lat2 > latitude):
+                if longitude < lon1 + (latitude - lat1) * (lon2 - lon1) / (lat2 - lat1):
+                    inside = not inside
+        return inside
+
+    def contains(self, latitude: float, longitude: float) -> bool:
+        if not (self.min_lat <= latitude <= self.max_lat and self.min_lon <= longitude <= self.max_lon):
+            return False
+        last = self._grid_size - 1
+        row = min(last, int((latitude - self.min_lat) / self._cell_lat))
+        column = min(last, int((longitude - self.min_lon) / self._cell_lon))
+        inside = self._grid[row * self._grid_size + column]
+        return self._ray_cast(latitude, longitude) if inside is None else inside
+
+    def summary(self) -> ZoneBoundarySummary:
+        return ZoneBoundarySummary(
+            name=self.name, vertices=self.vertices,
+            min_latitude=self.min_lat, max_latitude=self.max_lat,
+            min_longitude=self.min_lon, max_longitude=self.max_lon,
+        )
+
+
+class ZoneBoundaries:
+    """Configured zone boundaries, looked up by name or by point."""
+
+    def __init__(self, zones: Sequence[ZonePolygon] = ()):
+        self.zones: Dict[str, ZonePolygon] = {zone.name: zone for zone in zones}
+        # Zones sorted by southern edge, so a lookup skips zones entirely north of the point
+        self._by_min_lat = sorted(self.zones.values(), key=lambda zone: zone.min_lat)
+        self._min_lats = [zone.min_lat for zone in self._by_min_lat]
+
+    @classmethod
+    def from_geojson(cls, document: Dict[str, Any]) -> "ZoneBoundaries":
+        """Build from a GeoJSON FeatureCollection with a `name` property per feature."""
+        zones = []
+        for feature in document.get("features", []):
+            name = (feature.get("properties") or {}).get("name")
+            geometry = feature.get("geometry") or {}
+            if not name:
+                raise ValueError("Every zone feature needs a 'name' property")
+            if geometry.get("type") == "Polygon":
+                rings = geometry["coordinates"]
+            elif geometry.get("type") == "MultiPolygon":
+                rings = [ring for polygon in geometry["coordinates"] for ring in polygon]
+            else:
+                raise ValueError(f"Zone '{name}' must be a Polygon or MultiPolygon")
+            zones.append(ZonePolygon(name, rings))
+        return cls(zones)
+
+    @classmethod
+    def load(cls, path: str) -> "ZoneBoundaries":
+        with open(path) as handle:
+            return cls.from_geojson(json.load(handle))
+
+    def __bool__(self) -> bool:
+        return bool(self.zones)
+
+    def locate(self, latitude: float, longitude: float) -> Optional[str]:
+        """Name of the first zone containing the point, if any."""
+        for zone in self._by_min_lat[:bisect_right(self._min_lats, latitude)]:
+            if zone.contains(latitude, longitude):
+                return zone.name
+        return None
+
+    def contains(self, zone_name: str, latitude: float, longitude: float) -> Optional[bool]:
+        """Whether the point lies in the named zone; None if that zone has no boundary."""
+        zone = self.zones.get(zone_name)
+        return None if zone is None else zone.contains(latitude, longitude)
+
+    def summaries(self) -> List[ZoneBoundarySummary]:
+        return [zone.summary() for zone in sorted(self.zones.values(), key=lambda zone: zone.name)]
+
+
+_boundaries: Optional[ZoneBoundaries] = None
+
+
+def get_zone_boundaries() -> ZoneBoundaries:
+    """The configured zone boundaries, loaded from ZONE_BOUNDARIES_FILE on first use."""
+    global _boundaries
+    if _boundaries is None:
+        _boundaries = ZoneBoundaries.load(ZONE_BOUNDARIES_FILE) if ZONE_BOUNDARIES_FILE else ZoneBoundaries()
+    return _boundaries
+
+
+def set_zone_boundaries(boundaries: ZoneBoundaries) -> None:
+    """Replace the active zone boundaries."""
+    global _boundaries
+    _boundaries = boundaries
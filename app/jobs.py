@@ -0,0 +1,147 @@
+"""
+Export job runner: asyncio tasks that feed queued exports to a process pool
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional
+import asyncio
+import logging
+import multiprocessing
+import os
+
+from app.database import async_session, DATABASE_READ_URL
+from app.controllers.export_controller import (
+    EXPORT_MAX_ATTEMPTS, claim_export_job, export_path, finish_export_job, heartbeat_export_job,
+    requeue_export_job, requeue_stale_exports
+)
+from app.exports import init_worker, run_export
+from app.models.export import ExportJob
+
+# Concurrent exports, each in its own worker process; 0 leaves the queue to other processes
+EXPORT_WORKERS = int(os.getenv("EXPORT_WORKERS", "1"))
+# Seconds between queue polls when nothing wakes the runner
+EXPORT_POLL_SECONDS = float(os.getenv("EXPORT_POLL_SECONDS", "5"))
+# Seconds between heartbeats of a running job
+EXPORT_HEARTBEAT_SECONDS = float(os.getenv("EXPORT_HEARTBEAT_SECONDS", "15"))
+# Niceness added to worker processes so exports never starve request handling
+EXPORT_NICE = int(os.getenv("EXPORT_NICE", "10"))
+
+logger = logging.getLogger(__name__)
+
+
+class ExportRunner:
+    """Runs queued export jobs in worker processes, off the event loop.
+
+    Each runner task claims one job at a time from the export_job table and
+    hands it to the process pool, heartbeating while it runs. Jobs left
+    running by a crashed process are requeued once their heartbeat goes
+    stale, so the queue survives restarts.
+    """
+
+    def __init__(self, workers: int, poll_seconds: float, heartbeat_seconds: float, nice: int):
+        self.workers = workers
+        self.poll_seconds = poll_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.nice = nice
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._tasks: List[asyncio.Task] = []
+        self._wake = asyncio.Event()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._tasks)
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        # spawn: a forked child would inherit the event loop and open database connections
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_worker,
+            initargs=(self.nice,),
+        )
+
+    def start(self) -> None:
+        """Start the runner tasks; worker processes are only spawned for the first job."""
+        if self.workers <= 0 or self._tasks:
+            return
+        self._pool = self._new_pool()
+        self._tasks = [
+            asyncio.create_task(self._run_forever(), name=f"export-runner-{number}")
+            for number in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        """Stop claiming jobs. A job still running is requeued by the next start once its heartbeat is stale."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._pool is not None:
+            # Stop a running export too, so shutdown does not wait for it to finish
+            for process in list((self._pool._processes or {}).values()):
+                process.terminate()
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def notify(self) -> None:
+        """Wake idle runner tasks, e.g. right after a job was queued."""
+        self._wake.set()
+
+    async def _claim(self) -> Optional[ExportJob]:
+        async with async_session() as db:
+            await requeue_stale_exports(db)
+            return await claim_export_job(db)
+
+    async def _run_forever(self) -> None:
+        while True:
+            try:
+                job = await self._claim()
+            except Exception:
+                logger.exception("Claiming an export job failed")
+                job = None
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+                continue
+            await self._run(job)
+
+    async def _run(self, job: ExportJob) -> None:
+        """Run one claimed job to completion, heartbeating until the worker returns."""
+        loop = asyncio.get_running_loop()
+        pool = self._pool
+        future = loop.run_in_executor(
+            pool, run_export, job.model_dump(), export_path(job.id, job.format), DATABASE_READ_URL
+        )
+        # If the runner is stopped mid-job nobody awaits the future; retrieve its error so it is not logged
+        future.add_done_callback(lambda done: done.cancelled() or done.exception())
+        while not future.done():
+            await asyncio.wait({future}, timeout=self.heartbeat_seconds)
+            if not future.done():
+                async with async_session() as db:
+                    await heartbeat_export_job(db, job.id)
+
+        async with async_session() as db:
+            try:
+                rows_written, size_bytes = future.result()
+            except BrokenProcessPool:
+                # The worker process died (e.g. killed for memory); retry on a fresh pool
+                logger.error("Export worker died running job %s", job.id)
+                if self._pool is pool:
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    self._pool = self._new_pool()
+                if job.attempts < EXPORT_MAX_ATTEMPTS:
+                    await requeue_export_job(db, job.id)
+                else:
+                    await finish_export_job(db, job.id, error="Export worker process died")
+            except Exception as exc:
+                logger.exception("Export job %s failed", job.id)
+                await finish_export_job(db, job.id, error=str(exc) or type(exc).__name__)
+            else:
+                await finish_export_job(db, job.id, rows_written, size_bytes)
+
+
+export_runner = ExportRunner(EXPORT_WORKERS, EXPORT_POLL_SECONDS, EXPORT_HEARTBEAT_SECONDS, EXPORT_NICE)
@@ -0,0 +1,262 @@
+"""
+Request-level performance metrics in Prometheus text format
+"""
+
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import asyncio
+import functools
+import time
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.profiler import profiler
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Labels, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Metric:
+    """Base for a named metric family with label sets."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+
+    def _key(self, labels: Dict[str, str]) -> Labels:
+        return tuple((name, str(labels.get(name, ""))) for name in self.label_names)
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def expose(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    """Monotonically increasing value."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        super().__init__(name, documentation, label_names)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> Iterable[str]:
+        for key, value in sorted(self._values.items()):
+            yield f"{self.name}{_format_labels(key)} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    """Value that goes up and down."""
+
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    """Cumulative bucketed observations with a running sum and count."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(buckets)
+        self._values: Dict[Labels, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        counts, totals = self._values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+        counts[bisect_left(self.buckets, value)] += 1
+        totals[0] += value
+
+    def samples(self) -> Iterable[str]:
+        for key, (counts, totals) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                bucket_labels = _format_labels(key, f'le="{le}"')
+                yield f"{self.name}_bucket{bucket_labels} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(key)} {_format_value(totals[0])}"
+            yield f"{self.name}_count{_format_labels(key)} {cumulative}"
+
+
+http_requests_total = Counter("http_requests_total", "HTTP requests handled", ("method", "route", "status"))
+http_request_duration_seconds = Histogram(
+    "http_request_duration_seconds", "Time from request start to the end of the response body", ("method", "route")
+)
+http_requests_in_flight = Gauge("http_requests_in_flight", "HTTP requests currently being handled")
+http_response_serialization_seconds = Histogram(
+    "http_response_serialization_seconds", "Time spent validating and encoding the endpoint's return value", ("method", "route")
+)
+db_queries_per_request = Histogram(
+    "db_queries_per_request", "Database statements executed per request", ("method", "route"), QUERY_COUNT_BUCKETS
+)
+db_time_per_request_seconds = Histogram(
+    "db_time_per_request_seconds", "Time spent executing database statements per request", ("method", "route")
+)
+db_query_duration_seconds = Histogram("db_query_duration_seconds", "Duration of single database statements", ("engine",))
+
+REGISTRY: List[Metric] = [
+    http_requests_total,
+    http_request_duration_seconds,
+    http_requests_in_flight,
+    http_response_serialization_seconds,
+    db_queries_per_request,
+    db_time_per_request_seconds,
+    db_query_duration_seconds,
+]
+
+
+def render_metrics() -> str:
+    """Every registered metric in the Prometheus text exposition format."""
+    return "\n".join(metric.expose() for metric in REGISTRY) + "\n"
+
+
+@dataclass
+class RequestStats:
+    """Timings collected while one request is handled."""
+    route: Optional[str] = None
+    queries: int = 0
+    db_seconds: float = 0.0
+    endpoint_done: Optional[float] = None
+    serialization_seconds: float = 0.0
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def instrument_engine(engine: AsyncEngine, name: str) -> None:
+    """Count statements and their time, globally and for the current request."""
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        db_query_duration_seconds.observe(elapsed, engine=name)
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += elapsed
+
+
+class TimedRoute(APIRoute):
+    """API route that records its path template and response serialization time."""
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        super().__init__(path, endpoint, **kwargs)
+        call = self.dependant.call
+
+        def mark_done() -> None:
+            stats = _request_stats.get()
+            if stats is not None:
+                stats.endpoint_done = time.perf_counter()
+
+        if asyncio.iscoroutinefunction(call):
+            @functools.wraps(call)
+            async def timed_call(*args, **kwargs):
+                try:
+                    return await call(*args, **kwargs)
+                finally:
+                    mark_done()
+        else:
+            @functools.wraps(call)
+            def timed_call(*args, **kwargs):
+                try:
+                    return call(*args, **kwargs)
+                finally:
+                    mark_done()
+        self.dependant.call = timed_call
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def timed_handler(request: Request) -> Response:
+            stats = _request_stats.get()
+            if stats is not None:
+                stats.route = self.path_format
+            response = await handler(request)
+            if stats is not None and stats.endpoint_done is not None:
+                stats.serialization_seconds = time.perf_counter() - stats.endpoint_done
+            return response
+
+        return timed_handler
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, in-flight requests and per-request DB usage."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            finished = time.perf_counter()
+            http_requests_in_flight.dec()
+            _request_stats.reset(token)
+
+            method = scope["method"]
+            route = stats.route or "unmatched"
+            duration = finished - started
+            http_requests_total.inc(method=method, route=route, status=str(status))
+            http_request_duration_seconds.observe(duration, method=method, route=route)
+            db_queries_per_request.observe(stats.queries, method=method, route=route)
+            db_time_per_request_seconds.observe(stats.db_seconds, method=method, route=route)
+            if stats.endpoint_done is not None:
+                http_response_serialization_seconds.observe(stats.serialization_seconds, method=method, route=route)
+            profiler.request_finished(method, route, started, finished)
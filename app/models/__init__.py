@@ -4,29 +4,81 @@ Database models for Barangay Tindahan Compliance Tracker
 
 from .store import (
     Tindahan, TindahanCreate, TindahanUpdate, TindahanResponse,
-    BusinessType, ComplianceStatus
+    TindahanBulkUpdate, TindahanBulkResult, TindahanBulkResponse, TindahanListPage,
+    TindahanNearbyResponse, TindahanOutOfZoneResponse, BusinessType, ComplianceStatus
 )
 from .inspection import (
-    Inspection, InspectionCreate, InspectionResponse,
-    Violation, ViolationCreate, ViolationResponse,
+    Inspection, InspectionCreate, InspectionUpdate, InspectionResponse,
+    Violation, ViolationCreate, ViolationUpdate, ViolationResponse,
     InspectionType, InspectionStatus, ViolationType
 )
 from .compliance_report import (
-    ComplianceReport, ComplianceReportCreate, ComplianceReportResponse,
-    ComplianceMetrics, ReportType
+    ComplianceReport, ComplianceReportCreate, ComplianceReportGenerate, ComplianceReportResponse,
+    ComplianceMetrics, ReportType, ComplianceCounter, PermitExpiryCounter,
+    ComplianceStatusChange, ComplianceRecomputeResponse
 )
+from .scheduler import SweepMetrics
+from .cache import CacheStats
+from .zone import ZoneLocation, ZoneBoundarySummary
+from .sync import (
+    SyncChange, SyncReceipt, SyncEntity, SyncAction, SyncResultStatus, InspectionSyncRecord, SyncTombstone,
+    SyncPullResponse, SyncPushOperation, SyncPushRequest, SyncPushResult, SyncPushResponse
+)
+from .export import ExportJob, ExportRequest, ExportJobResponse, ExportKind, ExportFormat, ExportJobStatus
+from .analytics import (
+    ZoneStatusCounter, ZoneViolationCounter, ZoneViolationDaily, ZoneAnalytics, TrendPoint, ZoneTrend,
+    AnalyticsTrends, TrendBucket
+)
+from .history import TindahanEvent, TindahanEventKind, TindahanHistoryEntry, TindahanHistoryPage
+from .planning import InspectionPlanRequest, PlannedStop, InspectorRoute, InspectionPlan
+from .duplicate import (
+    TindahanDuplicate, DuplicateStatus, DuplicateSuggestion, DuplicateScanResponse, DuplicateMergeResponse
+)
+from . import search  # noqa: F401 - registers full-text search DDL on the tindahan table
+from . import spatial  # noqa: F401 - registers the location index DDL on the tindahan table
 
 __all__ = [
     # Tindahan models
     "Tindahan", "TindahanCreate", "TindahanUpdate", "TindahanResponse",
-    "BusinessType", "ComplianceStatus",
+    "TindahanBulkUpdate", "TindahanBulkResult", "TindahanBulkResponse", "TindahanListPage",
+    "TindahanNearbyResponse", "TindahanOutOfZoneResponse", "BusinessType", "ComplianceStatus",
     
     # Inspection models
-    "Inspection", "InspectionCreate", "InspectionResponse",
-    "Violation", "ViolationCreate", "ViolationResponse",
+    "Inspection", "InspectionCreate", "InspectionUpdate", "InspectionResponse",
+    "Violation", "ViolationCreate", "ViolationUpdate", "ViolationResponse",
     "InspectionType", "InspectionStatus", "ViolationType",
     
     # Compliance report models
-    "ComplianceReport", "ComplianceReportCreate", "ComplianceReportResponse",
-    "ComplianceMetrics", "ReportType"
+    "ComplianceReport", "ComplianceReportCreate", "ComplianceReportGenerate", "ComplianceReportResponse",
+    "ComplianceMetrics", "ReportType", "ComplianceCounter", "PermitExpiryCounter",
+    "ComplianceStatusChange", "ComplianceRecomputeResponse",
+    
+    # Scheduler models
+    "SweepMetrics",
+    
+    # Cache models
+    "CacheStats",
+    
+    # Zone models
+    "ZoneLocation", "ZoneBoundarySummary",
+    
+    # Sync models
+    "SyncChange", "SyncReceipt", "SyncEntity", "SyncAction", "SyncResultStatus", "InspectionSyncRecord", "SyncTombstone",
+    "SyncPullResponse", "SyncPushOperation", "SyncPushRequest", "SyncPushResult", "SyncPushResponse",
+    
+    # Export models
+    "ExportJob", "ExportRequest", "ExportJobResponse", "ExportKind", "ExportFormat", "ExportJobStatus",
+    
+    # Analytics models
+    "ZoneStatusCounter", "ZoneViolationCounter", "ZoneViolationDaily", "ZoneAnalytics", "TrendPoint", "ZoneTrend",
+    "AnalyticsTrends", "TrendBucket",
+    
+    # History models
+    "TindahanEvent", "TindahanEventKind", "TindahanHistoryEntry", "TindahanHistoryPage",
+    
+    # Planning models
+    "InspectionPlanRequest", "PlannedStop", "InspectorRoute", "InspectionPlan",
+    
+    # Duplicate models
+    "TindahanDuplicate", "DuplicateStatus", "DuplicateSuggestion", "DuplicateScanResponse", "DuplicateMergeResponse"
 ]
@@ -0,0 +1,92 @@
+"""
+Zone analytics models: incrementally maintained rollups and their responses
+"""
+
+from sqlalchemy import Index
+from sqlmodel import SQLModel, Field
+from typing import Dict, List, Optional
+from datetime import date
+from enum import Enum
+
+from app.models.store import ComplianceStatus
+from app.models.inspection import ViolationType
+
+
+class TrendBucket(str, Enum):
+    """Time bucket of a trend series."""
+    DAY = "day"
+    WEEK = "week"  # ISO weeks, starting on Monday
+    MONTH = "month"
+
+
+class ZoneStatusCounter(SQLModel, table=True):
+    """Number of active tindahan per zone and compliance status."""
+    __tablename__ = "zone_status_counter"
+
+    barangay_zone: str = Field(primary_key=True, max_length=50)
+    compliance_status: ComplianceStatus = Field(primary_key=True)
+    count: int = Field(default=0, description="Active tindahan in this zone with this status")
+
+
+class ZoneViolationCounter(SQLModel, table=True):
+    """Violations per zone, type and severity."""
+    __tablename__ = "zone_violation_counter"
+
+    barangay_zone: str = Field(primary_key=True, max_length=50)
+    violation_type: ViolationType = Field(primary_key=True)
+    severity: int = Field(primary_key=True)
+    recorded: int = Field(default=0, description="Violations recorded")
+    resolved: int = Field(default=0, description="Violations resolved")
+    resolution_seconds: int = Field(default=0, description="Total time to resolution of the resolved violations")
+
+
+class ZoneViolationDaily(SQLModel, table=True):
+    """Violation activity per zone and day.
+
+    A violation counts as recorded on the day it was created and as resolved
+    on the day it was resolved, so a row can hold both kinds of events.
+    """
+    __tablename__ = "zone_violation_daily"
+    __table_args__ = (
+        Index("ix_zone_violation_daily_day", "day"),
+    )
+
+    barangay_zone: str = Field(primary_key=True, max_length=50)
+    day: date = Field(primary_key=True)
+    recorded: int = Field(default=0, description="Violations recorded on this day")
+    resolved: int = Field(default=0, description="Violations resolved on this day")
+    resolution_seconds: int = Field(default=0, description="Total time to resolution of the violations resolved on this day")
+
+
+class ZoneAnalytics(SQLModel):
+    """Per-zone breakdown of stores and violations."""
+    barangay_zone: str
+    total_tindahan: int = Field(description="Active tindahan in the zone")
+    tindahan_by_status: Dict[ComplianceStatus, int]
+    violations_recorded: int
+    violations_resolved: int
+    violations_by_type: Dict[ViolationType, int]
+    violations_by_severity: Dict[int, int]
+    avg_resolution_hours: Optional[float] = Field(description="Mean time to resolution of the resolved violations")
+
+
+class TrendPoint(SQLModel):
+    """Violation activity in one time bucket."""
+    period_start: date
+    violations_recorded: int
+    violations_resolved: int
+    avg_resolution_hours: Optional[float]
+
+
+class ZoneTrend(SQLModel):
+    """Trend series of one zone."""
+    barangay_zone: str
+    points: List[TrendPoint]
+
+
+class AnalyticsTrends(SQLModel):
+    """Time-bucketed violation activity per zone."""
+    bucket: TrendBucket
+    date_from: date
+    date_to: date
+    zones: List[ZoneTrend]
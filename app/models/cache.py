@@ -0,0 +1,17 @@
+"""
+Cache models for the tindahan read cache
+"""
+
+from sqlmodel import SQLModel, Field
+
+
+class CacheStats(SQLModel):
+    """Counters for the tindahan read cache."""
+    backend: str = Field(description="Cache backend name")
+    hits: int = Field(default=0, description="Reads served from the cache")
+    misses: int = Field(default=0, description="Reads that went to the database")
+    evictions: int = Field(default=0, description="Entries dropped for size or TTL")
+    invalidations: int = Field(default=0, description="Entries dropped because the data changed")
+    entries: int = Field(default=0, description="Entries currently cached")
+    max_entries: int = Field(default=0, description="Size bound")
+    ttl_seconds: float = Field(default=0.0, description="Time-to-live of an entry")
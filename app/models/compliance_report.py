@@ -2,11 +2,14 @@
 Compliance report model for barangay monitoring
 """
 
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field
 from typing import Optional, List
-from datetime import datetime
+from datetime import date, datetime
 from enum import Enum
 
+from app.models.store import ComplianceStatus
+
 
 class ReportType(str, Enum):
     """Types of compliance reports."""
@@ -45,6 +48,10 @@ class ComplianceReportBase(SQLModel):
 
 class ComplianceReport(ComplianceReportBase, table=True):
     """Compliance report database model."""
+    __table_args__ = (
+        Index("ix_compliancereport_type_zone_period", "report_type", "barangay_zone", "report_period_start"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     metrics: Optional[str] = Field(default=None, description="JSON string of compliance metrics")
     created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -56,6 +63,17 @@ class ComplianceReportCreate(ComplianceReportBase):
     metrics: Optional[ComplianceMetrics] = Field(default=None)
 
 
+class ComplianceReportGenerate(SQLModel):
+    """Request to generate and store a compliance report snapshot."""
+    report_type: ReportType = Field(description="Type of report")
+    report_period_start: datetime = Field(description="Start of reporting period (any date inside the month/quarter/year for calendar reports)")
+    report_period_end: Optional[datetime] = Field(default=None, description="End of reporting period (exclusive); required for non-calendar reports")
+    barangay_zone: Optional[str] = Field(default=None, max_length=50, description="Specific zone (if applicable)")
+    generated_by: str = Field(max_length=100, description="Name of person who generated report")
+    summary: Optional[str] = Field(default=None, max_length=1000, description="Report summary; generated from the metrics if omitted")
+    recommendations: Optional[str] = Field(default=None, max_length=1000, description="Recommendations for improvement")
+
+
 class ComplianceReportResponse(ComplianceReportBase):
     """Compliance report response model."""
     id: int
@@ -65,3 +83,33 @@ class ComplianceReportResponse(ComplianceReportBase):
 
     class Config:
         from_attributes = True
+
+
+class ComplianceCounter(SQLModel, table=True):
+    """Incrementally maintained dashboard counter."""
+    __tablename__ = "compliance_counter"
+
+    name: str = Field(primary_key=True, max_length=50, description="Counter name")
+    value: int = Field(default=0, description="Current counter value")
+
+
+class PermitExpiryCounter(SQLModel, table=True):
+    """Number of active tindahan whose permit expires on a given day."""
+    __tablename__ = "permit_expiry_counter"
+
+    expiry_date: date = Field(primary_key=True, description="Permit expiry day")
+    count: int = Field(default=0, description="Active tindahan expiring on this day")
+
+
+class ComplianceStatusChange(SQLModel):
+    """A tindahan whose compliance status was changed by the status rules."""
+    tindahan_id: int
+    from_status: ComplianceStatus
+    to_status: ComplianceStatus
+
+
+class ComplianceRecomputeResponse(SQLModel):
+    """Result of re-deriving the status of every active tindahan."""
+    scanned: int = Field(description="Active tindahan evaluated")
+    changed: int = Field(description="Tindahan whose status changed")
+    changes: List[ComplianceStatusChange]
@@ -0,0 +1,70 @@
+"""
+Duplicate tindahan models: suggested merges found by the duplicate scan and their responses
+"""
+
+from sqlalchemy import Index, UniqueConstraint
+from sqlmodel import SQLModel, Field
+from typing import List, Optional
+from datetime import datetime
+from enum import Enum
+
+from .store import TindahanResponse
+
+
+class DuplicateStatus(str, Enum):
+    """Where a suggested merge stands."""
+    SUGGESTED = "suggested"
+    MERGED = "merged"
+    DISMISSED = "dismissed"  # Reviewed and kept apart; later scans do not suggest the pair again
+
+
+class TindahanDuplicate(SQLModel, table=True):
+    """A pair of registrations that the duplicate scan thinks are the same store.
+
+    `tindahan_id` is the earlier registration, which a merge keeps by default.
+    """
+    __tablename__ = "tindahan_duplicate"
+    __table_args__ = (
+        UniqueConstraint("tindahan_id", "duplicate_id", name="uq_tindahan_duplicate_pair"),
+        Index("ix_tindahan_duplicate_status_score", "status", "score"),
+        Index("ix_tindahan_duplicate_duplicate_id", "duplicate_id"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    tindahan_id: int = Field(foreign_key="tindahan.id")
+    duplicate_id: int = Field(foreign_key="tindahan.id")
+    barangay_zone: str = Field(max_length=50)
+    score: float = Field(description="Similarity from 0 to 1")
+    reasons: str = Field(description="JSON array of the evidence behind the score")
+    status: DuplicateStatus = Field(default=DuplicateStatus.SUGGESTED)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class DuplicateSuggestion(SQLModel):
+    """A suggested merge with both registrations."""
+    id: int
+    score: float
+    reasons: List[str]
+    status: DuplicateStatus
+    created_at: datetime
+    tindahan: TindahanResponse = Field(description="The earlier registration")
+    duplicate: TindahanResponse = Field(description="The later registration")
+
+
+class DuplicateScanResponse(SQLModel):
+    """Outcome of one duplicate scan."""
+    stores: int = Field(description="Active stores compared")
+    candidate_pairs: int = Field(description="Pairs that shared a block and were scored")
+    skipped_blocks: int = Field(description="Blocks too large to compare pairwise")
+    suggested: int = Field(description="Pairs currently suggested for merging")
+    added: int = Field(description="Suggestions new in this scan")
+    removed: int = Field(description="Earlier suggestions that no longer match")
+    duration_seconds: float
+
+
+class DuplicateMergeResponse(SQLModel):
+    """Outcome of merging a duplicate into the registration that is kept."""
+    kept: TindahanResponse
+    merged_id: int = Field(description="The deactivated duplicate")
+    inspections_moved: int = Field(description="Inspections re-pointed to the kept registration")
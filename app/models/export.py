@@ -0,0 +1,90 @@
+"""
+Export job models for queued report and permit-status downloads
+"""
+
+from sqlalchemy import Index
+from sqlmodel import SQLModel, Field
+from typing import Optional
+from datetime import datetime
+from enum import Enum
+
+
+class ExportKind(str, Enum):
+    """What an export contains."""
+    PERMIT_STATUS = "permit_status"  # Permit details and expiry of every store in scope
+    COMPLIANCE_REPORT = "compliance_report"  # A stored report's metrics plus its per-store breakdown
+
+
+class ExportFormat(str, Enum):
+    """File formats an export can be written in."""
+    CSV = "csv"
+    XLSX = "xlsx"
+    PDF = "pdf"
+
+
+class ExportJobStatus(str, Enum):
+    """Lifecycle of an export job."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    EXPIRED = "expired"  # Completed, but the file has been removed after the retention period
+
+
+class ExportRequest(SQLModel):
+    """Request to generate an export file."""
+    kind: ExportKind = Field(description="What to export")
+    format: ExportFormat = Field(default=ExportFormat.CSV, description="File format")
+    barangay_zone: Optional[str] = Field(default=None, max_length=50, description="Only stores in this zone")
+    active_only: bool = Field(default=True, description="Skip deactivated stores")
+    report_id: Optional[int] = Field(default=None, description="Stored report to export; required for compliance_report")
+    requested_by: Optional[str] = Field(default=None, max_length=100, description="Who asked for the export")
+
+
+class ExportJob(SQLModel, table=True):
+    """A queued export; the table is the durable queue."""
+    __tablename__ = "export_job"
+    __table_args__ = (
+        Index("ix_export_job_status_id", "status", "id"),
+        Index("ix_export_job_status_finished_at", "status", "finished_at"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    kind: ExportKind = Field(description="What to export")
+    format: ExportFormat = Field(description="File format")
+    barangay_zone: Optional[str] = Field(default=None, max_length=50)
+    active_only: bool = Field(default=True)
+    report_id: Optional[int] = Field(default=None)
+    requested_by: Optional[str] = Field(default=None, max_length=100)
+    status: ExportJobStatus = Field(default=ExportJobStatus.QUEUED, description="Where the job is in its lifecycle")
+    attempts: int = Field(default=0, description="Times a worker has started the job")
+    rows_written: Optional[int] = Field(default=None, description="Data rows in the finished file")
+    size_bytes: Optional[int] = Field(default=None, description="Size of the finished file")
+    error: Optional[str] = Field(default=None, max_length=1000, description="Why the last attempt failed")
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = Field(default=None)
+    heartbeat_at: Optional[datetime] = Field(default=None, description="Last sign of life from the worker running the job")
+    finished_at: Optional[datetime] = Field(default=None)
+
+
+class ExportJobResponse(SQLModel):
+    """Export job status for polling."""
+    id: int
+    kind: ExportKind
+    format: ExportFormat
+    barangay_zone: Optional[str]
+    active_only: bool
+    report_id: Optional[int]
+    requested_by: Optional[str]
+    status: ExportJobStatus
+    attempts: int
+    rows_written: Optional[int]
+    size_bytes: Optional[int]
+    error: Optional[str]
+    created_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+    download_url: Optional[str] = Field(default=None, description="Where to fetch the file once completed")
+
+    class Config:
+        from_attributes = True
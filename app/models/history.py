@@ -0,0 +1,59 @@
+"""
+Tindahan change history models: an append-only event stream and its responses
+"""
+
+from sqlalchemy import Index, text
+from sqlmodel import SQLModel, Field
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+from enum import Enum
+
+
+class TindahanEventKind(str, Enum):
+    """What a history event records."""
+    CREATED = "created"  # Registration; holds every field
+    UPDATED = "updated"
+    DEACTIVATED = "deactivated"
+    STATUS_DERIVED = "status_derived"  # Compliance status set by the status rules
+    SNAPSHOT = "snapshot"  # Older events of one month folded together; holds every field known at the end of it
+
+
+class TindahanEvent(SQLModel, table=True):
+    """One change to a tindahan, written in the same transaction as the change.
+
+    Only the fields that changed are stored, with their new values, as
+    compact JSON. Rows are never updated except by compaction, which turns
+    the last event of a month into a snapshot and deletes the others.
+    """
+    __tablename__ = "tindahan_event"
+    __table_args__ = (
+        Index("ix_tindahan_event_tindahan_id_id", "tindahan_id", "id"),
+        Index(
+            "ix_tindahan_event_uncompacted_created_at", "created_at",
+            sqlite_where=text("kind != 'SNAPSHOT'"), postgresql_where=text("kind != 'SNAPSHOT'")
+        ),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    tindahan_id: int = Field(foreign_key="tindahan.id")
+    kind: TindahanEventKind
+    changes: str = Field(description="JSON object of the changed fields and their new values")
+    actor: Optional[str] = Field(default=None, max_length=100, description="Who made the change, from the X-Actor header")
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class TindahanHistoryEntry(SQLModel):
+    """One change in a tindahan's history."""
+    id: int
+    kind: TindahanEventKind
+    actor: Optional[str]
+    created_at: datetime
+    changes: Dict[str, Any] = Field(description="Changed fields and their new values; every known field for created and snapshot")
+    previous: Dict[str, Any] = Field(description="Values the changed fields had before, where the history holds them")
+
+
+class TindahanHistoryPage(SQLModel):
+    """A page of a tindahan's history, newest change first."""
+    tindahan_id: int
+    events: List[TindahanHistoryEntry]
+    next_before_id: Optional[int] = Field(description="Pass as `before_id` for older changes; null on the last page")
@@ -2,7 +2,8 @@
 Inspection model for barangay compliance monitoring
 """
 
-from sqlmodel import SQLModel, Field
+from sqlalchemy import Index
+from sqlmodel import SQLModel, Field, Relationship
 from typing import Optional, List
 from datetime import datetime
 from enum import Enum
@@ -50,9 +51,16 @@ class InspectionBase(SQLModel):
 
 class Inspection(InspectionBase, table=True):
     """Inspection database model."""
+    __table_args__ = (
+        Index("ix_inspection_tindahan_id_inspection_date", "tindahan_id", "inspection_date"),
+        Index("ix_inspection_status_inspection_date", "status", "inspection_date"),
+        Index("ix_inspection_inspector_name_inspection_date", "inspector_name", "inspection_date"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+    violations: List["Violation"] = Relationship()
 
 
 class ViolationBase(SQLModel):
@@ -68,6 +76,13 @@ class ViolationBase(SQLModel):
 
 class Violation(ViolationBase, table=True):
     """Violation database model."""
+    __table_args__ = (
+        Index("ix_violation_inspection_id_is_resolved", "inspection_id", "is_resolved"),
+        Index("ix_violation_is_resolved_severity", "is_resolved", "severity"),
+        Index("ix_violation_violation_type_severity", "violation_type", "severity"),
+        Index("ix_violation_created_at", "created_at"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -83,6 +98,25 @@ class ViolationCreate(ViolationBase):
     pass
 
 
+class InspectionUpdate(SQLModel):
+    """Inspection update model."""
+    inspection_type: Optional[InspectionType] = Field(default=None)
+    inspector_name: Optional[str] = Field(default=None, max_length=100)
+    inspection_date: Optional[datetime] = Field(default=None)
+    status: Optional[InspectionStatus] = Field(default=None)
+    notes: Optional[str] = Field(default=None, max_length=1000)
+
+
+class ViolationUpdate(SQLModel):
+    """Violation update model."""
+    violation_type: Optional[ViolationType] = Field(default=None)
+    description: Optional[str] = Field(default=None, max_length=500)
+    severity: Optional[int] = Field(default=None, ge=1, le=5)
+    is_resolved: Optional[bool] = Field(default=None)
+    resolution_notes: Optional[str] = Field(default=None, max_length=500)
+    resolution_date: Optional[datetime] = Field(default=None)
+
+
 class InspectionResponse(InspectionBase):
     """Inspection response model."""
     id: int
@@ -102,3 +136,6 @@ class ViolationResponse(ViolationBase):
 
     class Config:
         from_attributes = True
+
+
+InspectionResponse.model_rebuild()
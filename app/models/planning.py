@@ -0,0 +1,69 @@
+"""
+Inspection planning models: daily inspector routes for scheduled inspections
+"""
+
+from pydantic import field_validator
+from sqlmodel import SQLModel, Field
+from typing import List, Optional
+from datetime import date, datetime
+
+from .inspection import InspectionType
+
+# Bounds of one planning request
+MAX_PLAN_INSPECTORS = 200
+MAX_PLAN_DAYS = 31
+MAX_STOPS_PER_DAY = 100
+
+
+class InspectionPlanRequest(SQLModel):
+    """Who is available, for how long, and how many visits one inspector makes a day."""
+    inspectors: List[str] = Field(min_length=1, max_length=MAX_PLAN_INSPECTORS, description="Names of the available inspectors")
+    start_date: Optional[date] = Field(default=None, description="First day of the plan; today when omitted")
+    days: int = Field(default=5, ge=1, le=MAX_PLAN_DAYS, description="Working days to plan")
+    stops_per_day: int = Field(default=15, ge=1, le=MAX_STOPS_PER_DAY, description="Inspections one inspector makes a day")
+    zones: Optional[List[str]] = Field(default=None, description="Only plan stores in these barangay zones")
+    apply: bool = Field(default=False, description="Assign the planned inspector and day to the inspections")
+
+    @field_validator("inspectors")
+    @classmethod
+    def distinct_names(cls, inspectors: List[str]) -> List[str]:
+        names = list(dict.fromkeys(name.strip() for name in inspectors if name.strip()))
+        if not names:
+            raise ValueError("At least one inspector name is required")
+        if any(len(name) > 100 for name in names):
+            raise ValueError("Inspector names are at most 100 characters")
+        return names
+
+
+class PlannedStop(SQLModel):
+    """One visit on a route, in visiting order."""
+    inspection_id: int
+    tindahan_id: int
+    business_name: str
+    barangay_zone: str
+    inspection_type: InspectionType
+    due: datetime = Field(description="Inspection date the inspection was scheduled for")
+    latitude: Optional[float]
+    longitude: Optional[float]
+    leg_m: Optional[float] = Field(description="Distance from the previous stop; null for the first stop and stops without coordinates")
+
+
+class InspectorRoute(SQLModel):
+    """One inspector's visits on one day."""
+    inspector_name: str
+    day: date
+    zones: List[str] = Field(description="Zones visited, most visits first")
+    distance_m: float = Field(description="Straight-line length of the route between stops with coordinates")
+    stops: List[PlannedStop]
+
+
+class InspectionPlan(SQLModel):
+    """Daily routes for the scheduled inspections due within the plan."""
+    start_date: date
+    days: int
+    candidates: int = Field(description="Scheduled inspections due by the last day")
+    planned: int
+    unplanned_inspection_ids: List[int] = Field(description="Due inspections left over for lack of capacity, most urgent first")
+    distance_m: float
+    applied: bool
+    routes: List[InspectorRoute]
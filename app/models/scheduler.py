@@ -0,0 +1,20 @@
+"""
+Scheduler models for background compliance sweeps
+"""
+
+from sqlmodel import SQLModel, Field
+from typing import Optional
+from datetime import datetime
+
+
+class SweepMetrics(SQLModel):
+    """Run statistics for one background sweep."""
+    name: str = Field(description="Sweep name")
+    runs: int = Field(default=0, description="Number of completed runs")
+    failures: int = Field(default=0, description="Number of runs that raised an error")
+    last_run_at: Optional[datetime] = Field(default=None, description="When the last run started")
+    last_duration_seconds: float = Field(default=0.0, description="Duration of the last run")
+    total_duration_seconds: float = Field(default=0.0, description="Total time spent in this sweep")
+    last_rows_touched: int = Field(default=0, description="Rows written by the last run")
+    total_rows_touched: int = Field(default=0, description="Rows written across all runs")
+    last_error: Optional[str] = Field(default=None, description="Error from the last run, if any")
@@ -0,0 +1,61 @@
+"""
+Search index DDL for tindahan names, owners and addresses
+"""
+
+from sqlalchemy import DDL, event
+
+from .store import Tindahan
+
+# SQLite: external-content FTS5 table with a trigram tokenizer, kept in sync by
+# triggers so every write path (single, bulk, sweeps, raw SQL) updates it.
+SQLITE_SEARCH_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS tindahan_fts USING fts5(
+        business_name, owner_name, address,
+        content='tindahan', content_rowid='id', tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tindahan_fts_ai AFTER INSERT ON tindahan BEGIN
+        INSERT INTO tindahan_fts(rowid, business_name, owner_name, address)
+        VALUES (new.id, new.business_name, new.owner_name, new.address);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tindahan_fts_ad AFTER DELETE ON tindahan BEGIN
+        INSERT INTO tindahan_fts(tindahan_fts, rowid, business_name, owner_name, address)
+        VALUES ('delete', old.id, old.business_name, old.owner_name, old.address);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tindahan_fts_au AFTER UPDATE OF business_name, owner_name, address ON tindahan BEGIN
+        INSERT INTO tindahan_fts(tindahan_fts, rowid, business_name, owner_name, address)
+        VALUES ('delete', old.id, old.business_name, old.owner_name, old.address);
+        INSERT INTO tindahan_fts(rowid, business_name, owner_name, address)
+        VALUES (new.id, new.business_name, new.owner_name, new.address);
+    END
+    """,
+]
+
+SQLITE_SEARCH_DROP_DDL = [
+    "DROP TRIGGER IF EXISTS tindahan_fts_au",
+    "DROP TRIGGER IF EXISTS tindahan_fts_ad",
+    "DROP TRIGGER IF EXISTS tindahan_fts_ai",
+    "DROP TABLE IF EXISTS tindahan_fts",
+]
+
+# Postgres: pg_trgm GIN index over the searchable text
+POSTGRES_SEARCH_EXPRESSION = "(business_name || ' ' || owner_name || ' ' || address)"
+POSTGRES_SEARCH_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    f"CREATE INDEX IF NOT EXISTS ix_tindahan_search_trgm ON tindahan USING gin ({POSTGRES_SEARCH_EXPRESSION} gin_trgm_ops)",
+]
+
+POSTGRES_SEARCH_DROP_DDL = [
+    "DROP INDEX IF EXISTS ix_tindahan_search_trgm",
+]
+
+for statement in SQLITE_SEARCH_DDL:
+    event.listen(Tindahan.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+for statement in POSTGRES_SEARCH_DDL:
+    event.listen(Tindahan.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
@@ -0,0 +1,59 @@
+"""
+Spatial index DDL for tindahan locations
+"""
+
+from sqlalchemy import DDL, event
+
+from .store import Tindahan
+
+# SQLite: R*Tree over (latitude, longitude) points, keyed by tindahan id and kept
+# in sync by triggers so every write path (single, bulk, raw SQL) updates it.
+# R*Tree stores 32-bit floats and rounds boxes outward, so it is used as a
+# bounding-box prefilter and exact distances are computed on the candidates.
+SQLITE_SPATIAL_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS tindahan_rtree USING rtree(
+        id, min_lat, max_lat, min_lon, max_lon
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tindahan_rtree_ai AFTER INSERT ON tindahan
+    WHEN new.latitude IS NOT NULL AND new.longitude IS NOT NULL BEGIN
+        INSERT INTO tindahan_rtree VALUES (new.id, new.latitude, new.latitude, new.longitude, new.longitude);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tindahan_rtree_ad AFTER DELETE ON tindahan BEGIN
+        DELETE FROM tindahan_rtree WHERE id = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tindahan_rtree_au AFTER UPDATE OF latitude, longitude ON tindahan BEGIN
+        DELETE FROM tindahan_rtree WHERE id = old.id;
+        INSERT INTO tindahan_rtree
+        SELECT new.id, new.latitude, new.latitude, new.longitude, new.longitude
+        WHERE new.latitude IS NOT NULL AND new.longitude IS NOT NULL;
+    END
+    """,
+]
+
+SQLITE_SPATIAL_DROP_DDL = [
+    "DROP TRIGGER IF EXISTS tindahan_rtree_au",
+    "DROP TRIGGER IF EXISTS tindahan_rtree_ad",
+    "DROP TRIGGER IF EXISTS tindahan_rtree_ai",
+    "DROP TABLE IF EXISTS tindahan_rtree",
+]
+
+# Other databases: a B-tree on (latitude, longitude) narrows the bounding box by latitude
+POSTGRES_SPATIAL_DDL = [
+    "CREATE INDEX IF NOT EXISTS ix_tindahan_latitude_longitude ON tindahan (latitude, longitude) WHERE latitude IS NOT NULL",
+]
+
+POSTGRES_SPATIAL_DROP_DDL = [
+    "DROP INDEX IF EXISTS ix_tindahan_latitude_longitude",
+]
+
+for statement in SQLITE_SPATIAL_DDL:
+    event.listen(Tindahan.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+for statement in POSTGRES_SPATIAL_DDL:
+    event.listen(Tindahan.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
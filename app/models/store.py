@@ -2,8 +2,10 @@
 Tindahan model for barangay compliance monitoring
 """
 
+from sqlalchemy import Index, text
+from sqlalchemy.orm import declared_attr
 from sqlmodel import SQLModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from enum import Enum
 
@@ -34,10 +36,27 @@ class TindahanBase(SQLModel):
     contact_number: Optional[str] = Field(default=None, max_length=20, description="Contact number")
     barangay_zone: str = Field(max_length=50, description="Barangay zone/section")
     is_active: bool = Field(default=True, description="Whether business is currently operating")
+    latitude: Optional[float] = Field(default=None, ge=-90, le=90, description="Latitude of the stall or store (WGS84)")
+    longitude: Optional[float] = Field(default=None, ge=-180, le=180, description="Longitude of the stall or store (WGS84)")
 
 
 class Tindahan(TindahanBase, table=True):
     """Tindahan database model for compliance tracking."""
+    __table_args__ = (
+        Index("ix_tindahan_is_active_id", "is_active", "id"),
+        Index("ix_tindahan_is_active_compliance_status", "is_active", "compliance_status"),
+        Index("ix_tindahan_barangay_zone_compliance_status", "barangay_zone", "compliance_status"),
+        Index("ix_tindahan_business_name", "business_name"),
+        Index(
+            "ix_tindahan_active_permit_expiry_date", "permit_expiry_date",
+            sqlite_where=text("is_active = 1"), postgresql_where=text("is_active")
+        ),
+        Index(
+            "ix_tindahan_active_next_inspection_due", "next_inspection_due",
+            sqlite_where=text("is_active = 1"), postgresql_where=text("is_active")
+        ),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     business_permit_number: Optional[str] = Field(default=None, max_length=50, description="Barangay business permit number")
     permit_issued_date: Optional[datetime] = Field(default=None, description="Date permit was issued")
@@ -47,6 +66,12 @@ class Tindahan(TindahanBase, table=True):
     next_inspection_due: Optional[datetime] = Field(default=None, description="Next inspection due date")
     registered_at: datetime = Field(default_factory=datetime.utcnow, description="Date registered with barangay")
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+    version: int = Field(default=1, sa_column_kwargs={"server_default": text("1")}, description="Row version, raised by every write")
+
+    @declared_attr
+    def __mapper_args__(cls):
+        # ORM updates match on the version they loaded and raise StaleDataError when it moved
+        return {"version_id_col": cls.__table__.c.version}
 
 
 class TindahanCreate(TindahanBase):
@@ -64,6 +89,8 @@ class TindahanUpdate(SQLModel):
     address: Optional[str] = Field(default=None, max_length=200)
     contact_number: Optional[str] = Field(default=None, max_length=20)
     barangay_zone: Optional[str] = Field(default=None, max_length=50)
+    latitude: Optional[float] = Field(default=None, ge=-90, le=90)
+    longitude: Optional[float] = Field(default=None, ge=-180, le=180)
     business_permit_number: Optional[str] = Field(default=None, max_length=50)
     permit_issued_date: Optional[datetime] = Field(default=None)
     permit_expiry_date: Optional[datetime] = Field(default=None)
@@ -82,6 +109,46 @@ class TindahanResponse(TindahanBase):
     next_inspection_due: Optional[datetime]
     registered_at: datetime
     updated_at: datetime
+    version: int = Field(description="Send back as If-Match to update only this version")
 
     class Config:
         from_attributes = True
+
+
+class TindahanNearbyResponse(TindahanResponse):
+    """Tindahan found near a point."""
+    distance_m: float = Field(description="Great-circle distance from the query point in meters")
+
+
+class TindahanOutOfZoneResponse(TindahanResponse):
+    """Tindahan whose location lies outside its registered barangay zone."""
+    located_zone: Optional[str] = Field(default=None, description="Zone that contains the location, if any")
+
+
+class TindahanBulkUpdate(TindahanUpdate):
+    """Single row of a bulk tindahan update."""
+    id: int = Field(description="ID of the tindahan to update")
+
+
+class TindahanBulkResult(SQLModel):
+    """Outcome of one row in a bulk tindahan operation."""
+    index: int = Field(description="Position of the row in the submitted batch")
+    id: Optional[int] = Field(default=None, description="ID of the created or updated tindahan")
+    success: bool = Field(description="Whether the row was written")
+    error: Optional[str] = Field(default=None, description="Validation or write error")
+
+
+class TindahanBulkResponse(SQLModel):
+    """Summary of a bulk tindahan operation."""
+    total: int
+    succeeded: int
+    failed: int
+    results: List[TindahanBulkResult]
+
+
+class TindahanListPage(SQLModel):
+    """A page of tindahan already encoded as a JSON array of TindahanResponse."""
+    body: bytes = Field(description="UTF-8 JSON array, identical to serializing List[TindahanResponse]")
+    count: int = Field(description="Rows in the page")
+    last_id: Optional[int] = Field(default=None, description="ID of the last row, for the next cursor")
+    etag: str = Field(description="Weak ETag over the ids and updated_at of the page")
@@ -0,0 +1,204 @@
+"""
+Sync models for offline-first clients: change versions, pulls and batched pushes
+"""
+
+from sqlalchemy import DDL, Index, event
+from sqlmodel import SQLModel, Field
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+from enum import Enum
+
+from .store import Tindahan, TindahanResponse
+from .inspection import Inspection, InspectionBase, Violation, ViolationResponse
+
+# Most operations accepted in one push
+MAX_SYNC_OPERATIONS = 500
+
+
+class SyncEntity(str, Enum):
+    """Tables exposed to sync clients."""
+    TINDAHAN = "tindahan"
+    INSPECTION = "inspection"
+    VIOLATION = "violation"
+
+
+class SyncAction(str, Enum):
+    """Offline-queued write actions."""
+    CREATE = "create"
+    UPDATE = "update"
+
+
+class SyncResultStatus(str, Enum):
+    """Outcome of one pushed operation."""
+    APPLIED = "applied"  # Written now
+    DUPLICATE = "duplicate"  # Key seen before; nothing written again
+    CONFLICT = "conflict"  # Row changed on the server since the client read it
+    NOT_FOUND = "not_found"  # Row (or the row it refers to) does not exist
+    INVALID = "invalid"  # Data failed validation or a reference is unknown
+    FAILED = "failed"  # Database error; safe to retry with the same key
+
+
+class SyncChange(SQLModel, table=True):
+    """Latest change version of each synced row, maintained by triggers."""
+    __tablename__ = "sync_change"
+    __table_args__ = (
+        Index("ix_sync_change_version", "version", unique=True),
+    )
+
+    entity: str = Field(primary_key=True, max_length=20, description="Table of the changed row")
+    entity_id: int = Field(primary_key=True, description="Id of the changed row")
+    version: int = Field(description="Global change version, increasing with every write")
+    deleted: bool = Field(default=False, description="Row was hard-deleted")
+
+
+class SyncReceipt(SQLModel, table=True):
+    """Idempotency key of an applied push operation, written with the change itself."""
+    __tablename__ = "sync_receipt"
+    __table_args__ = (
+        Index("ix_sync_receipt_created_at", "created_at"),
+    )
+
+    key: str = Field(primary_key=True, max_length=64, description="Client-generated idempotency key")
+    entity: SyncEntity = Field(description="Table written")
+    action: SyncAction = Field(description="Action applied")
+    entity_id: Optional[int] = Field(default=None, description="Id of the created or updated row")
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class InspectionSyncRecord(InspectionBase):
+    """Inspection row as sent to sync clients; violations sync separately."""
+    id: int
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class SyncTombstone(SQLModel):
+    """A row the client should drop: a deactivated tindahan or a deleted row."""
+    entity: SyncEntity
+    id: int
+
+
+class SyncPullResponse(SQLModel):
+    """Rows changed since a version, oldest change first."""
+    version: int = Field(description="Pass as `since` in the next pull")
+    has_more: bool = Field(description="More changes are waiting; pull again right away")
+    tindahan: List[TindahanResponse] = []
+    inspections: List[InspectionSyncRecord] = []
+    violations: List[ViolationResponse] = []
+    deleted: List[SyncTombstone] = []
+
+
+class SyncPushOperation(SQLModel):
+    """One offline-queued create or update."""
+    key: str = Field(min_length=1, max_length=64, description="Idempotency key; a retried operation keeps its key")
+    entity: SyncEntity
+    action: SyncAction
+    id: Optional[int] = Field(default=None, description="Row to update")
+    base_updated_at: Optional[datetime] = Field(
+        default=None, description="updated_at of the row when the client last read it; required for updates"
+    )
+    data: Dict[str, Any] = Field(default_factory=dict, description="Create or update fields")
+    refs: Dict[str, str] = Field(
+        default_factory=dict,
+        description="Fields that point at rows created offline: field name -> key of the create operation",
+    )
+
+
+class SyncPushRequest(SQLModel):
+    """A batch of offline-queued operations, applied in order."""
+    operations: List[SyncPushOperation] = Field(max_length=MAX_SYNC_OPERATIONS)
+
+
+class SyncPushResult(SQLModel):
+    """Outcome of one pushed operation."""
+    key: str
+    status: SyncResultStatus
+    id: Optional[int] = Field(default=None, description="Id of the created or updated row")
+    error: Optional[str] = None
+    current: Optional[Dict[str, Any]] = Field(default=None, description="Server copy of the row on a conflict")
+
+
+class SyncPushResponse(SQLModel):
+    """Per-operation results, in request order."""
+    results: List[SyncPushResult]
+
+
+# SQLite: every insert, update and delete stamps the row with the next version.
+# Writers are serialized by the database lock, so versions commit in order and
+# a client that has seen version N has seen every change up to N.
+def _sqlite_sync_triggers(table: str) -> List[str]:
+    next_version = "(SELECT coalesce(max(version), 0) + 1 FROM sync_change)"
+    return [
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_sync_ai AFTER INSERT ON {table} BEGIN
+            INSERT OR REPLACE INTO sync_change (entity, entity_id, version, deleted)
+            VALUES ('{table}', new.id, {next_version}, 0);
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_sync_au AFTER UPDATE ON {table} BEGIN
+            INSERT OR REPLACE INTO sync_change (entity, entity_id, version, deleted)
+            VALUES ('{table}', new.id, {next_version}, 0);
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_sync_ad AFTER DELETE ON {table} BEGIN
+            INSERT OR REPLACE INTO sync_change (entity, entity_id, version, deleted)
+            VALUES ('{table}', old.id, {next_version}, 1);
+        END
+        """,
+    ]
+
+
+def _sqlite_sync_drop(table: str) -> List[str]:
+    return [f"DROP TRIGGER IF EXISTS {table}_sync_{suffix}" for suffix in ("au", "ad", "ai")]
+
+
+# Postgres: one trigger function; the table lock makes concurrent writers take
+# versions in commit order, as SQLite's single writer does
+POSTGRES_SYNC_FUNCTION = """
+    CREATE OR REPLACE FUNCTION sync_record_change() RETURNS trigger AS $$
+    BEGIN
+        LOCK TABLE sync_change IN EXCLUSIVE MODE;
+        INSERT INTO sync_change (entity, entity_id, version, deleted)
+        VALUES (
+            TG_ARGV[0],
+            CASE WHEN TG_OP = 'DELETE' THEN OLD.id ELSE NEW.id END,
+            (SELECT coalesce(max(version), 0) + 1 FROM sync_change),
+            TG_OP = 'DELETE'
+        )
+        ON CONFLICT (entity, entity_id) DO UPDATE SET version = excluded.version, deleted = excluded.deleted;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """
+
+
+def _postgres_sync_triggers(table: str) -> List[str]:
+    return [
+        POSTGRES_SYNC_FUNCTION,
+        f"DROP TRIGGER IF EXISTS {table}_sync ON {table}",
+        f"""
+        CREATE TRIGGER {table}_sync AFTER INSERT OR UPDATE OR DELETE ON {table}
+        FOR EACH ROW EXECUTE FUNCTION sync_record_change('{table}')
+        """,
+    ]
+
+
+SYNC_TABLES = {SyncEntity.TINDAHAN: Tindahan, SyncEntity.INSPECTION: Inspection, SyncEntity.VIOLATION: Violation}
+
+SQLITE_SYNC_DDL = [statement for model in SYNC_TABLES.values() for statement in _sqlite_sync_triggers(model.__tablename__)]
+SQLITE_SYNC_DROP_DDL = [statement for model in SYNC_TABLES.values() for statement in _sqlite_sync_drop(model.__tablename__)]
+POSTGRES_SYNC_DDL = [statement for model in SYNC_TABLES.values() for statement in _postgres_sync_triggers(model.__tablename__)]
+POSTGRES_SYNC_DROP_DDL = [
+    f"DROP TRIGGER IF EXISTS {model.__tablename__}_sync ON {model.__tablename__}" for model in SYNC_TABLES.values()
+] + ["DROP FUNCTION IF EXISTS sync_record_change()"]
+
+for model in SYNC_TABLES.values():
+    for statement in _sqlite_sync_triggers(model.__tablename__):
+        event.listen(model.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+    for statement in _postgres_sync_triggers(model.__tablename__):
+        event.listen(model.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
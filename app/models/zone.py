@@ -0,0 +1,23 @@
+"""
+Zone boundary models for location checks
+"""
+
+from sqlmodel import SQLModel, Field
+from typing import Optional
+
+
+class ZoneLocation(SQLModel):
+    """Which configured barangay zone contains a point."""
+    latitude: float
+    longitude: float
+    zone: Optional[str] = Field(default=None, description="Containing zone, or null if outside every configured zone")
+
+
+class ZoneBoundarySummary(SQLModel):
+    """A configured barangay zone boundary."""
+    name: str = Field(description="Zone name, matching tindahan.barangay_zone")
+    vertices: int = Field(description="Number of boundary vertices")
+    min_latitude: float
+    max_latitude: float
+    min_longitude: float
+    max_longitude: float
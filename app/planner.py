@@ -0,0 +1,274 @@
+"""
+Inspection route planning: assigns due inspections to inspectors' daily routes
+
+A greedy heuristic rather than an exact solver, so a few thousand
+inspections plan in well under a second. Each day takes the most urgent due
+inspections up to the inspectors' capacity, packs them into routes zone by
+zone, and orders every route by nearest neighbour followed by 2-opt.
+Distances are straight lines; stops without coordinates keep their place in
+the route's zone and are visited last.
+"""
+
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from math import cos, hypot, radians
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.geo import EARTH_RADIUS_M, haversine_m
+from app.models.inspection import InspectionType
+
+# Lower ranks are visited first; ties go to the inspection that has waited longest
+INSPECTION_PRIORITY = {
+    InspectionType.EMERGENCY: 0,
+    InspectionType.COMPLAINT: 1,
+    InspectionType.FOLLOW_UP: 2,
+    InspectionType.RENEWAL: 3,
+    InspectionType.ROUTINE: 4,
+}
+# Improvement passes of 2-opt over one route
+TWO_OPT_PASSES = 8
+
+
+@dataclass
+class Visit:
+    """A scheduled inspection waiting for a route."""
+    inspection_id: int
+    tindahan_id: int
+    business_name: str
+    barangay_zone: str
+    inspection_type: InspectionType
+    due: datetime
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    # Local projection in metres, set by plan_routes
+    x: Optional[float] = field(default=None, repr=False)
+    y: Optional[float] = field(default=None, repr=False)
+
+    @property
+    def urgency(self) -> Tuple[int, datetime, int]:
+        return INSPECTION_PRIORITY.get(self.inspection_type, len(INSPECTION_PRIORITY)), self.due, self.inspection_id
+
+    @property
+    def located(self) -> bool:
+        return self.x is not None
+
+
+@dataclass
+class Route:
+    """One inspector's visits on one day, in visiting order."""
+    inspector_name: str
+    day: date
+    visits: List[Visit]
+
+    @property
+    def legs(self) -> List[Optional[float]]:
+        """Distance from the previous located stop to each stop; None for the first and unlocated stops."""
+        legs: List[Optional[float]] = []
+        previous: Optional[Visit] = None
+        for visit in self.visits:
+            if not visit.located:
+                legs.append(None)
+                continue
+            legs.append(
+                haversine_m(previous.latitude, previous.longitude, visit.latitude, visit.longitude)
+                if previous is not None else None
+            )
+            previous = visit
+        return legs
+
+    @property
+    def distance_m(self) -> float:
+        return sum(leg for leg in self.legs if leg is not None)
+
+    @property
+    def zones(self) -> List[str]:
+        return [zone for zone, _ in Counter(visit.barangay_zone for visit in self.visits).most_common()]
+
+
+def _project(visits: Sequence[Visit]) -> None:
+    """Equirectangular projection around the visits' mean latitude; accurate to well under 1% across a city."""
+    located = [visit for visit in visits if visit.latitude is not None and visit.longitude is not None]
+    if not located:
+        return
+    scale = radians(1) * EARTH_RADIUS_M
+    parallel = cos(radians(sum(visit.latitude for visit in located) / len(located)))
+    for visit in located:
+        visit.x = visit.longitude * scale * parallel
+        visit.y = visit.latitude * scale
+
+
+def _gap(a: Visit, b: Visit) -> float:
+    return hypot(a.x - b.x, a.y - b.y)
+
+
+def _nearest_neighbour(visits: Sequence[Visit], start: Optional[Visit] = None) -> List[Visit]:
+    """Located visits chained from `start` (the most urgent by default) to the closest unvisited one; unlocated last."""
+    remaining = [visit for visit in visits if visit.located]
+    unlocated = sorted((visit for visit in visits if not visit.located), key=lambda visit: visit.urgency)
+    if not remaining:
+        return unlocated
+    current = start if start is not None and start.located else min(remaining, key=lambda visit: visit.urgency)
+    remaining.remove(current)
+    chain = [current]
+    while remaining:
+        index = min(range(len(remaining)), key=lambda i: _gap(current, remaining[i]))
+        current = remaining[index]
+        remaining[index] = remaining[-1]
+        remaining.pop()
+        chain.append(current)
+    return chain + unlocated
+
+
+def _two_opt(chain: List[Visit]) -> List[Visit]:
+    """Shorten an open path by reversing segments while that helps; the first stop stays first."""
+    path = [visit for visit in chain if visit.located]
+    tail = [visit for visit in chain if not visit.located]
+    for _ in range(TWO_OPT_PASSES):
+        improved = False
+        for i in range(1, len(path) - 1):
+            for j in range(i + 1, len(path)):
+                # Replace edges (i-1, i) and (j, j+1) with (i-1, j) and (i, j+1)
+                before = _gap(path[i - 1], path[i])
+                after = _gap(path[i - 1], path[j])
+                if j + 1 < len(path):
+                    before += _gap(path[j], path[j + 1])
+                    after += _gap(path[i], path[j + 1])
+                if after < before - 1e-6:
+                    path[i:j + 1] = path[i:j + 1][::-1]
+                    improved = True
+        if not improved:
+            break
+    return path + tail
+
+
+def _select(eligible: List[Visit], capacity: int) -> List[Visit]:
+    """The `capacity` most urgent visits by inspection type.
+
+    The last type that only partly fits is filled from zones already in the
+    selection first, then from the zones with the most such visits, so the
+    day's routes stay compact.
+    """
+    eligible.sort(key=lambda visit: visit.urgency)
+    if len(eligible) <= capacity:
+        return eligible
+    tiers: Dict[int, List[Visit]] = defaultdict(list)
+    for visit in eligible:
+        tiers[visit.urgency[0]].append(visit)
+    selected: List[Visit] = []
+    for rank in sorted(tiers):
+        tier = tiers[rank]
+        room = capacity - len(selected)
+        if len(tier) > room:
+            chosen = {visit.barangay_zone for visit in selected}
+            sizes = Counter(visit.barangay_zone for visit in tier)
+            tier = sorted(tier, key=lambda visit: (
+                visit.barangay_zone not in chosen, -sizes[visit.barangay_zone], visit.barangay_zone, visit.urgency
+            ))
+        selected.extend(tier[:room])
+        if len(selected) >= capacity:
+            break
+    return selected
+
+
+def _partition(selected: Sequence[Visit], stops_per_day: int) -> List[List[Visit]]:
+    """Split a day's visits into routes of at most `stops_per_day`, keeping zones together.
+
+    Each zone is chained by proximity and cut into full routes; the zones'
+    leftovers are then chained across neighbouring zones and cut again.
+    """
+    by_zone: Dict[str, List[Visit]] = defaultdict(list)
+    for visit in selected:
+        by_zone[visit.barangay_zone].append(visit)
+
+    routes: List[List[Visit]] = []
+    leftovers: Dict[str, List[Visit]] = {}
+    for zone in sorted(by_zone):
+        chain = _nearest_neighbour(by_zone[zone])
+        full = len(chain) - len(chain) % stops_per_day
+        routes.extend(chain[start:start + stops_per_day] for start in range(0, full, stops_per_day))
+        if full < len(chain):
+            leftovers[zone] = chain[full:]
+
+    # Visit the zones' leftovers in proximity order of their first located stop
+    order: List[str] = []
+    pending = sorted(leftovers)
+    current: Optional[Visit] = None
+    while pending:
+        def distance(zone: str) -> float:
+            head = leftovers[zone][0]
+            if current is None or not current.located or not head.located:
+                return 0.0
+            return _gap(current, head)
+        zone = min(pending, key=distance)
+        pending.remove(zone)
+        order.append(zone)
+        current = next((visit for visit in reversed(leftovers[zone]) if visit.located), current)
+    rest = [visit for zone in order for visit in leftovers[zone]]
+    routes.extend(rest[start:start + stops_per_day] for start in range(0, len(rest), stops_per_day))
+    return routes
+
+
+def _order(visits: Sequence[Visit]) -> List[Visit]:
+    """Visiting order: nearest neighbour from the most urgent stop, improved by 2-opt."""
+    return _two_opt(_nearest_neighbour(visits))
+
+
+def _assign(
+    groups: List[List[Visit]],
+    inspectors: Sequence[str],
+    previous_zone: Dict[str, str],
+    day: date
+) -> List[Route]:
+    """Give each route an inspector, preferring whoever worked its main zone the day before."""
+    free = list(inspectors)
+    routes: List[Route] = []
+    for visits in sorted(groups, key=len, reverse=True):
+        route = Route(inspector_name="", day=day, visits=visits)
+        zone = route.zones[0]
+        inspector = next((name for name in free if previous_zone.get(name) == zone), free[0])
+        free.remove(inspector)
+        route.inspector_name = inspector
+        routes.append(route)
+    return routes
+
+
+def working_days(start: date, days: int) -> List[date]:
+    """`days` consecutive weekdays from `start`, skipping Saturdays and Sundays."""
+    result: List[date] = []
+    day = start
+    while len(result) < days:
+        if day.weekday() < 5:
+            result.append(day)
+        day += timedelta(days=1)
+    return result
+
+
+def plan_routes(
+    visits: Iterable[Visit],
+    inspectors: Sequence[str],
+    days: Sequence[date],
+    stops_per_day: int
+) -> Tuple[List[Route], List[Visit]]:
+    """Routes for each inspector and day, and the visits that did not fit, most urgent first.
+
+    A visit can be planned on or after the day it is due; overdue visits are
+    due at once.
+    """
+    pending = list(visits)
+    _project(pending)
+    capacity = len(inspectors) * stops_per_day
+    previous_zone: Dict[str, str] = {}
+    routes: List[Route] = []
+    for day in days:
+        eligible = [visit for visit in pending if visit.due.date() <= day]
+        selected = _select(eligible, capacity)
+        if not selected:
+            continue
+        day_routes = _assign([_order(group) for group in _partition(selected, stops_per_day)], inspectors, previous_zone, day)
+        previous_zone = {route.inspector_name: route.zones[0] for route in day_routes}
+        routes.extend(sorted(day_routes, key=lambda route: inspectors.index(route.inspector_name)))
+        planned = {visit.inspection_id for visit in selected}
+        pending = [visit for visit in pending if visit.inspection_id not in planned]
+    pending.sort(key=lambda visit: visit.urgency)
+    return routes, pending
@@ -0,0 +1,108 @@
+"""
+Opt-in sampling profiler that dumps stacks of slow requests
+"""
+
+from collections import Counter, deque
+from datetime import datetime
+from types import FrameType
+from typing import Deque, Optional, Tuple
+import logging
+import os
+import re
+import sys
+import threading
+import time
+
+# Requests slower than this many milliseconds get a profile; unset disables sampling
+PROFILE_SLOW_REQUESTS_MS = os.getenv("PROFILE_SLOW_REQUESTS_MS")
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+# Seconds of samples kept in memory; requests longer than this get a truncated profile
+PROFILE_WINDOW_SECONDS = 60
+
+logger = logging.getLogger(__name__)
+
+
+def _fold(frame: Optional[FrameType]) -> str:
+    """Render a stack root-first in the collapsed format used by flamegraph tools."""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class SlowRequestProfiler:
+    """Samples the event loop thread's stack and writes the samples of slow requests.
+
+    A background thread records the loop thread's stack every interval into a
+    ring buffer. When a request finishes above the threshold, the samples taken
+    while it ran are written as a `.folded` file (one "stack count" per line),
+    readable by flamegraph.pl, speedscope or inferno. Requests run concurrently
+    on one loop, so a profile can include work from overlapping requests.
+    """
+
+    def __init__(self, threshold_ms: Optional[float], interval_ms: float, directory: str):
+        self.threshold_seconds = threshold_ms / 1000 if threshold_ms is not None else None
+        self.interval_seconds = interval_ms / 1000
+        self.directory = directory
+        self._samples: Deque[Tuple[float, str]] = deque(maxlen=int(PROFILE_WINDOW_SECONDS / self.interval_seconds))
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._target: Optional[int] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._thread is not None
+
+    def start(self) -> None:
+        """Start sampling the calling thread (the event loop), if a threshold is configured."""
+        if self.threshold_seconds is None or self._thread is not None:
+            return
+        self._target = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="slow-request-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling and drop buffered samples."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self._samples.clear()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            frame = sys._current_frames().get(self._target)
+            if frame is not None:
+                self._samples.append((time.perf_counter(), _fold(frame)))
+
+    def request_finished(self, method: str, route: str, started: float, finished: float) -> Optional[str]:
+        """Write a profile if the request was slow; returns the file path."""
+        if self._thread is None or finished - started < self.threshold_seconds:
+            return None
+        stacks = Counter(stack for taken, stack in list(self._samples) if started <= taken <= finished)
+        if not stacks:
+            return None
+
+        os.makedirs(self.directory, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+        duration_ms = int((finished - started) * 1000)
+        path = os.path.join(
+            self.directory,
+            f"{datetime.utcnow():%Y%m%dT%H%M%S%f}-{method}-{slug}-{duration_ms}ms.folded"
+        )
+        with open(path, "w") as output:
+            output.writelines(f"{stack} {count}\n" for stack, count in stacks.most_common())
+        logger.warning("Slow request %s %s took %dms; profile written to %s", method, route, duration_ms, path)
+        return path
+
+
+profiler = SlowRequestProfiler(
+    float(PROFILE_SLOW_REQUESTS_MS) if PROFILE_SLOW_REQUESTS_MS else None,
+    PROFILE_INTERVAL_MS,
+    PROFILE_DIR,
+)
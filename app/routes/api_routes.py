@@ -2,62 +2,423 @@
 API routes for Barangay Tindahan Tracker
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Optional
+from sqlalchemy.orm.exc import StaleDataError
+from sqlmodel import SQLModel
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Type
+from datetime import date, datetime
+import anyio
+import csv
+import io
+import json
+import os
 
-from app.database import get_db
+from app.database import get_db, get_read_db, async_read_session
 from app.controllers.store_controller import (
-    create_tindahan, get_tindahan, get_tindahan_list, update_tindahan, delete_tindahan
+    create_tindahan, get_tindahan, get_tindahan_list_json, update_tindahan, delete_tindahan,
+    stream_tindahan, bulk_create_tindahan, bulk_update_tindahan, search_tindahan,
+    get_nearby_tindahan, find_out_of_zone_tindahan
 )
-from app.models.store import TindahanCreate, TindahanUpdate, TindahanResponse
+from app.controllers.inspection_controller import (
+    create_inspection, get_inspection, get_inspection_list, update_inspection, cancel_inspection,
+    create_violation, get_violation, get_violation_list, update_violation
+)
+from app.controllers.compliance_controller import get_compliance_metrics
+from app.controllers.status_controller import recompute_compliance_statuses
+from app.controllers.analytics_controller import get_zone_analytics, get_zone_trends
+from app.controllers.history_controller import HISTORY_PAGE_LIMIT, get_tindahan_history
+from app.controllers.planning_controller import apply_inspection_plan, plan_inspections
+from app.controllers.duplicate_controller import dismiss_duplicate, get_duplicate_suggestions, merge_duplicate, scan_duplicates
+from app.controllers.report_controller import generate_report, get_report, get_report_list
+from app.controllers.sync_controller import SYNC_PULL_LIMIT, create_once, pull_changes, push_changes
+from app.controllers.export_controller import (
+    MEDIA_TYPES, enqueue_export, export_filename, export_path, export_response, get_export_job, get_export_job_list
+)
+from app.jobs import export_runner
+from app.scheduler import get_sweep_metrics
+from app.models.store import (
+    TindahanCreate, TindahanUpdate, TindahanResponse,
+    TindahanBulkUpdate, TindahanBulkResult, TindahanBulkResponse,
+    TindahanNearbyResponse, TindahanOutOfZoneResponse, BusinessType
+)
+from app.models.inspection import (
+    InspectionCreate, InspectionUpdate, InspectionResponse, InspectionStatus,
+    ViolationCreate, ViolationUpdate, ViolationResponse, ViolationType
+)
+from app.models.compliance_report import (
+    ComplianceMetrics, ComplianceRecomputeResponse, ComplianceReportGenerate, ComplianceReportResponse, ReportType
+)
+from app.models.planning import InspectionPlan, InspectionPlanRequest
+from app.models.duplicate import DuplicateMergeResponse, DuplicateScanResponse, DuplicateSuggestion
+from app.models.analytics import AnalyticsTrends, TrendBucket, ZoneAnalytics
+from app.models.history import TindahanHistoryPage
+from app.models.scheduler import SweepMetrics
+from app.models.sync import SyncEntity, SyncPullResponse, SyncPushRequest, SyncPushResponse
+from app.models.export import ExportJobResponse, ExportJobStatus, ExportRequest
+from app.cache import get_cache
+from app.metrics import TimedRoute
+from app.models.cache import CacheStats
+from app.models.zone import ZoneLocation, ZoneBoundarySummary
+from app.geo import get_zone_boundaries
+from app.dedupe import DUPLICATE_MIN_SCORE
+from app.utils.helpers import (
+    encode_cursor, decode_cursor, make_etag, http_date, is_not_modified, parse_byte_range, parse_if_match, version_etag
+)
+
+router = APIRouter(tags=["api"], route_class=TimedRoute)
+
+# Largest search radius for nearby queries, in meters
+MAX_NEARBY_RADIUS_M = 5000
+# Most changes returned by one sync pull
+MAX_SYNC_PULL_LIMIT = 5000
+# Most events returned by one history page
+MAX_HISTORY_PAGE_LIMIT = 500
+# Bytes read from disk per chunk when streaming an export file
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+IDEMPOTENCY_KEY_HEADER = Header(
+    None, alias="Idempotency-Key", min_length=1, max_length=64,
+    description="Client-generated key; a retry with the same key returns the first request's row instead of writing again",
+)
+
+
+def _not_modified(request: Request, headers: Dict[str, str], etag: str, last_modified: Optional[datetime]) -> Optional[Response]:
+    """Add validators to the response headers; return a 304 if the client's copy is current."""
+    headers["ETag"] = etag
+    headers["Cache-Control"] = "no-cache"
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    if is_not_modified(request.headers, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    return None
 
-router = APIRouter(tags=["api"])
+
+async def _create_once(db: AsyncSession, response: Response, key: str, entity: SyncEntity, payload: SQLModel) -> Any:
+    """Create once per Idempotency-Key; a retry gets the row the first request created, marked as a replay."""
+    try:
+        created, replayed = await create_once(db, key, entity, payload)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return created
 
 
 # Tindahan routes
-@router.post("/tindahan", response_model=TindahanResponse, tags=["tindahan"])
+@router.post("/tindahan", response_model=TindahanResponse, status_code=201, tags=["tindahan"])
 async def create_tindahan_endpoint(
     tindahan: TindahanCreate,
+    response: Response,
+    idempotency_key: Optional[str] = IDEMPOTENCY_KEY_HEADER,
     db: AsyncSession = Depends(get_db)
 ) -> TindahanResponse:
-    """Register a new tindahan."""
-    return await create_tindahan(db, tindahan)
+    """Register a new tindahan; send an Idempotency-Key so a retry cannot register it twice."""
+    if idempotency_key:
+        created = await _create_once(db, response, idempotency_key, SyncEntity.TINDAHAN, tindahan)
+    else:
+        created = await create_tindahan(db, tindahan)
+    if not created:
+        raise HTTPException(status_code=404, detail="Tindahan not found")
+    response.headers["ETag"] = version_etag(created.version)
+    return created
 
 
 @router.get("/tindahan", response_model=List[TindahanResponse], tags=["tindahan"])
 async def get_tindahan_endpoint(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     active_only: bool = Query(True),
-    db: AsyncSession = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous X-Next-Cursor header"),
+    db: AsyncSession = Depends(get_read_db)
+) -> Response:
+    """Get all registered tindahan with pagination.
+
+    Full pages carry an X-Next-Cursor header; pass it back as `cursor` to
+    fetch the next page by keyset instead of offset. The ETag covers the ids
+    and updated_at of the page, so If-None-Match returns 304 while it is
+    unchanged.
+    """
+    after_id = None
+    if cursor:
+        try:
+            after_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    
+    page = await get_tindahan_list_json(db, skip, limit, active_only, after_id)
+    headers = {}
+    if page.count == limit:
+        headers["X-Next-Cursor"] = encode_cursor(page.last_id)
+    # No Last-Modified: rows leaving the page do not show up in updated_at
+    not_modified = _not_modified(request, headers, page.etag, None)
+    if not_modified:
+        return not_modified
+    # The body is already List[TindahanResponse] JSON; returning it directly skips re-validation
+    return Response(content=page.body, media_type="application/json", headers=headers)
+
+
+async def _export_tindahan_rows(export_format: str, active_only: bool) -> AsyncIterator[bytes]:
+    """Serialize streamed tindahan batches as NDJSON or CSV chunks."""
+    columns = list(TindahanResponse.model_fields)
+    if export_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        yield buffer.getvalue().encode()
+    
+    async with async_read_session() as db:
+        async for batch in stream_tindahan(db, active_only):
+            if export_format == "csv":
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                for tindahan in batch:
+                    row = tindahan.model_dump(mode="json")
+                    writer.writerow(["" if row[column] is None else row[column] for column in columns])
+                yield buffer.getvalue().encode()
+            else:
+                yield "".join(tindahan.model_dump_json() + "\n" for tindahan in batch).encode()
+
+
+@router.get("/tindahan/search", response_model=List[TindahanResponse], tags=["tindahan"])
+async def search_tindahan_endpoint(
+    q: str = Query(..., min_length=3, description="Words to match in business name, owner name or address"),
+    limit: int = Query(20, ge=1, le=100),
+    active_only: bool = Query(True),
+    db: AsyncSession = Depends(get_read_db)
 ) -> List[TindahanResponse]:
-    """Get all registered tindahan with pagination."""
-    return await get_tindahan_list(db, skip, limit, active_only)
+    """Ranked prefix and fuzzy search over tindahan."""
+    return await search_tindahan(db, q, limit, active_only)
+
+
+@router.get("/tindahan/nearby", response_model=List[TindahanNearbyResponse], tags=["tindahan"])
+async def nearby_tindahan_endpoint(
+    lat: float = Query(..., ge=-90, le=90, description="Latitude of the inspector"),
+    lon: float = Query(..., ge=-180, le=180, description="Longitude of the inspector"),
+    radius_m: float = Query(300, gt=0, le=MAX_NEARBY_RADIUS_M, description="Search radius in meters"),
+    limit: int = Query(50, ge=1, le=500),
+    business_type: Optional[BusinessType] = Query(None),
+    active_only: bool = Query(True),
+    db: AsyncSession = Depends(get_read_db)
+) -> List[TindahanNearbyResponse]:
+    """Tindahan within a radius of a point, nearest first."""
+    return await get_nearby_tindahan(db, lat, lon, radius_m, limit, business_type, active_only)
+
+
+@router.get("/tindahan/out-of-zone", response_model=List[TindahanOutOfZoneResponse], tags=["tindahan"])
+async def out_of_zone_tindahan_endpoint(
+    limit: int = Query(100, ge=1, le=1000),
+    business_type: Optional[BusinessType] = Query(None),
+    barangay_zone: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_read_db)
+) -> List[TindahanOutOfZoneResponse]:
+    """Active tindahan located outside their registered zone (possible unauthorized locations)."""
+    boundaries = get_zone_boundaries()
+    if not boundaries:
+        raise HTTPException(status_code=503, detail="Zone boundaries are not configured")
+    return await find_out_of_zone_tindahan(db, boundaries, limit, business_type, barangay_zone)
+
+
+@router.get("/tindahan/duplicates", response_model=List[DuplicateSuggestion], tags=["tindahan"])
+async def duplicate_tindahan_endpoint(
+    barangay_zone: Optional[str] = Query(None),
+    min_score: float = Query(DUPLICATE_MIN_SCORE, ge=0, le=1),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_read_db)
+) -> List[DuplicateSuggestion]:
+    """Pairs of registrations that look like the same store, most similar first."""
+    return await get_duplicate_suggestions(db, barangay_zone, min_score, skip, limit)
+
+
+@router.post("/tindahan/duplicates/scan", response_model=DuplicateScanResponse, tags=["tindahan"])
+async def scan_duplicate_tindahan_endpoint(db: AsyncSession = Depends(get_db)) -> DuplicateScanResponse:
+    """Compare all active stores now instead of waiting for the scheduled scan."""
+    return await scan_duplicates(db)
+
+
+@router.post("/tindahan/duplicates/{suggestion_id}/merge", response_model=DuplicateMergeResponse, tags=["tindahan"])
+async def merge_duplicate_tindahan_endpoint(
+    suggestion_id: int,
+    keep_id: Optional[int] = Query(None, description="Registration to keep; defaults to the earlier one"),
+    db: AsyncSession = Depends(get_db)
+) -> DuplicateMergeResponse:
+    """Merge a suggested duplicate into the kept registration, moving its inspections over."""
+    try:
+        merged = await merge_duplicate(db, suggestion_id, keep_id)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if not merged:
+        raise HTTPException(status_code=404, detail="Duplicate suggestion not found")
+    return merged
+
+
+@router.post("/tindahan/duplicates/{suggestion_id}/dismiss", response_model=DuplicateSuggestion, tags=["tindahan"])
+async def dismiss_duplicate_tindahan_endpoint(
+    suggestion_id: int,
+    db: AsyncSession = Depends(get_db)
+) -> DuplicateSuggestion:
+    """Mark a suggested pair as separate stores so later scans leave it out."""
+    try:
+        dismissed = await dismiss_duplicate(db, suggestion_id)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if not dismissed:
+        raise HTTPException(status_code=404, detail="Duplicate suggestion not found")
+    return dismissed
+
+
+@router.get("/tindahan/export", tags=["tindahan"])
+async def export_tindahan_endpoint(
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    active_only: bool = Query(True)
+) -> StreamingResponse:
+    """Stream every registered tindahan as NDJSON or CSV."""
+    media_type = "text/csv" if export_format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        _export_tindahan_rows(export_format, active_only),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=tindahan.{export_format}"}
+    )
+
+
+async def _read_bulk_rows(request: Request) -> List[Dict[str, Any]]:
+    """Read bulk rows from a JSON array, a raw CSV body or an uploaded CSV file."""
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=400, detail="Expected a CSV upload in the 'file' field")
+        text = (await upload.read()).decode("utf-8-sig")
+    elif content_type.startswith("text/csv"):
+        text = (await request.body()).decode("utf-8-sig")
+    else:
+        try:
+            rows = await request.json()
+        except json.JSONDecodeError:
+            raise HTTPException(status_code=400, detail="Request body must be a JSON array or CSV")
+        if not isinstance(rows, list):
+            raise HTTPException(status_code=400, detail="Request body must be a JSON array")
+        return rows
+    
+    # Empty CSV cells mean "not provided" so model defaults apply
+    return [
+        {field: value for field, value in row.items() if field and value not in (None, "")}
+        for row in csv.DictReader(io.StringIO(text))
+    ]
+
+
+def _validate_bulk_rows(
+    rows: List[Dict[str, Any]],
+    model: Type[Any]
+) -> Tuple[List[Tuple[int, Any]], List[TindahanBulkResult]]:
+    """Validate rows against a model, splitting them into valid rows and errors."""
+    valid = []
+    errors = []
+    for index, row in enumerate(rows):
+        try:
+            valid.append((index, model.model_validate(row)))
+        except ValidationError as exc:
+            message = "; ".join(
+                f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}"
+                for error in exc.errors()
+            )
+            errors.append(TindahanBulkResult(index=index, success=False, error=message))
+    return valid, errors
+
+
+def _bulk_response(results: List[TindahanBulkResult]) -> TindahanBulkResponse:
+    """Summarize per-row bulk results in submission order."""
+    results = sorted(results, key=lambda result: result.index)
+    succeeded = sum(1 for result in results if result.success)
+    return TindahanBulkResponse(
+        total=len(results),
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+        results=results
+    )
+
+
+@router.post("/tindahan/bulk", response_model=TindahanBulkResponse, tags=["tindahan"])
+async def bulk_create_tindahan_endpoint(
+    request: Request,
+    db: AsyncSession = Depends(get_db)
+) -> TindahanBulkResponse:
+    """Register many tindahan from a JSON array or CSV upload."""
+    valid, errors = _validate_bulk_rows(await _read_bulk_rows(request), TindahanCreate)
+    return _bulk_response(errors + await bulk_create_tindahan(db, valid))
+
+
+@router.patch("/tindahan/bulk", response_model=TindahanBulkResponse, tags=["tindahan"])
+async def bulk_update_tindahan_endpoint(
+    request: Request,
+    db: AsyncSession = Depends(get_db)
+) -> TindahanBulkResponse:
+    """Update many tindahan from a JSON array or CSV upload; each row needs an `id`."""
+    valid, errors = _validate_bulk_rows(await _read_bulk_rows(request), TindahanBulkUpdate)
+    return _bulk_response(errors + await bulk_update_tindahan(db, valid))
 
 
 @router.get("/tindahan/{tindahan_id}", response_model=TindahanResponse, tags=["tindahan"])
 async def get_tindahan_by_id_endpoint(
     tindahan_id: int,
-    db: AsyncSession = Depends(get_db)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db)
 ) -> TindahanResponse:
-    """Get a specific tindahan by ID."""
+    """Get a specific tindahan by ID; supports If-None-Match and If-Modified-Since.
+
+    The ETag names the row version; send it back as If-Match when updating.
+    """
     tindahan = await get_tindahan(db, tindahan_id)
     if not tindahan:
         raise HTTPException(status_code=404, detail="Tindahan not found")
+    headers = {}
+    not_modified = _not_modified(request, headers, version_etag(tindahan.version), tindahan.updated_at)
+    if not_modified:
+        return not_modified
+    response.headers.update(headers)
     return tindahan
 
 
+@router.get("/tindahan/{tindahan_id}/history", response_model=TindahanHistoryPage, tags=["tindahan"])
+async def get_tindahan_history_endpoint(
+    tindahan_id: int,
+    limit: int = Query(HISTORY_PAGE_LIMIT, ge=1, le=MAX_HISTORY_PAGE_LIMIT),
+    before_id: Optional[int] = Query(None, description="`next_before_id` of the previous page"),
+    db: AsyncSession = Depends(get_read_db)
+) -> TindahanHistoryPage:
+    """Who changed what on a tindahan, newest change first; older months are compacted into snapshots."""
+    history = await get_tindahan_history(db, tindahan_id, limit, before_id)
+    if history is None:
+        raise HTTPException(status_code=404, detail="Tindahan not found")
+    return history
+
+
 @router.put("/tindahan/{tindahan_id}", response_model=TindahanResponse, tags=["tindahan"])
 async def update_tindahan_endpoint(
     tindahan_id: int,
     tindahan_update: TindahanUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None, description="ETag of the version being changed; 412 if the row has changed since"),
     db: AsyncSession = Depends(get_db)
 ) -> TindahanResponse:
-    """Update a tindahan registration."""
-    tindahan = await update_tindahan(db, tindahan_id, tindahan_update)
+    """Update a tindahan registration; with If-Match, only if nobody else changed it first."""
+    try:
+        expected_version = parse_if_match(if_match)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    try:
+        tindahan = await update_tindahan(db, tindahan_id, tindahan_update, expected_version)
+    except StaleDataError:
+        raise HTTPException(status_code=412, detail="Tindahan was changed since this version; fetch it again and reapply the change")
     if not tindahan:
         raise HTTPException(status_code=404, detail="Tindahan not found")
+    response.headers["ETag"] = version_etag(tindahan.version)
     return tindahan
 
 
@@ -71,3 +432,395 @@ async def delete_tindahan_endpoint(
     if not success:
         raise HTTPException(status_code=404, detail="Tindahan not found")
     return {"message": "Tindahan deactivated successfully"}
+
+
+# Inspection routes
+@router.post("/inspections", response_model=InspectionResponse, status_code=201, tags=["inspections"])
+async def create_inspection_endpoint(
+    inspection: InspectionCreate,
+    response: Response,
+    idempotency_key: Optional[str] = IDEMPOTENCY_KEY_HEADER,
+    db: AsyncSession = Depends(get_db)
+) -> InspectionResponse:
+    """Schedule a new inspection; send an Idempotency-Key so a retry cannot schedule it twice."""
+    if idempotency_key:
+        created = await _create_once(db, response, idempotency_key, SyncEntity.INSPECTION, inspection)
+    else:
+        created = await create_inspection(db, inspection)
+    if not created:
+        raise HTTPException(status_code=404, detail="Tindahan not found")
+    return created
+
+
+@router.get("/inspections", response_model=List[InspectionResponse], tags=["inspections"])
+async def get_inspections_endpoint(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    tindahan_id: Optional[int] = Query(None),
+    inspector_name: Optional[str] = Query(None),
+    status: Optional[InspectionStatus] = Query(None),
+    date_from: Optional[datetime] = Query(None),
+    date_to: Optional[datetime] = Query(None),
+    min_severity: Optional[int] = Query(None, ge=1, le=5, description="Only inspections with a violation of at least this severity"),
+    db: AsyncSession = Depends(get_read_db)
+) -> List[InspectionResponse]:
+    """Get inspections with their violations."""
+    return await get_inspection_list(
+        db, skip, limit, tindahan_id, inspector_name, status, date_from, date_to, min_severity
+    )
+
+
+@router.post("/inspections/plan", response_model=InspectionPlan, tags=["inspections"])
+async def plan_inspections_endpoint(
+    plan_request: InspectionPlanRequest,
+    db: AsyncSession = Depends(get_read_db),
+    write_db: AsyncSession = Depends(get_db)
+) -> InspectionPlan:
+    """Plan daily routes for the scheduled inspections, most urgent first; `apply` assigns them."""
+    plan = await plan_inspections(db, plan_request)
+    if plan_request.apply:
+        plan = await apply_inspection_plan(write_db, plan)
+    return plan
+
+
+@router.get("/inspections/{inspection_id}", response_model=InspectionResponse, tags=["inspections"])
+async def get_inspection_by_id_endpoint(
+    inspection_id: int,
+    db: AsyncSession = Depends(get_read_db)
+) -> InspectionResponse:
+    """Get a specific inspection by ID."""
+    inspection = await get_inspection(db, inspection_id)
+    if not inspection:
+        raise HTTPException(status_code=404, detail="Inspection not found")
+    return inspection
+
+
+@router.put("/inspections/{inspection_id}", response_model=InspectionResponse, tags=["inspections"])
+async def update_inspection_endpoint(
+    inspection_id: int,
+    inspection_update: InspectionUpdate,
+    db: AsyncSession = Depends(get_db)
+) -> InspectionResponse:
+    """Update an inspection's status or findings."""
+    inspection = await update_inspection(db, inspection_id, inspection_update)
+    if not inspection:
+        raise HTTPException(status_code=404, detail="Inspection not found")
+    return inspection
+
+
+@router.delete("/inspections/{inspection_id}", tags=["inspections"])
+async def cancel_inspection_endpoint(
+    inspection_id: int,
+    db: AsyncSession = Depends(get_db)
+):
+    """Cancel an inspection."""
+    success = await cancel_inspection(db, inspection_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Inspection not found")
+    return {"message": "Inspection cancelled successfully"}
+
+
+# Violation routes
+@router.post("/violations", response_model=ViolationResponse, status_code=201, tags=["violations"])
+async def create_violation_endpoint(
+    violation: ViolationCreate,
+    response: Response,
+    idempotency_key: Optional[str] = IDEMPOTENCY_KEY_HEADER,
+    db: AsyncSession = Depends(get_db)
+) -> ViolationResponse:
+    """Record a new violation; send an Idempotency-Key so a retry cannot record it twice."""
+    if idempotency_key:
+        created = await _create_once(db, response, idempotency_key, SyncEntity.VIOLATION, violation)
+    else:
+        created = await create_violation(db, violation)
+    if not created:
+        raise HTTPException(status_code=404, detail="Inspection not found")
+    return created
+
+
+@router.get("/violations", response_model=List[ViolationResponse], tags=["violations"])
+async def get_violations_endpoint(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    tindahan_id: Optional[int] = Query(None),
+    inspection_id: Optional[int] = Query(None),
+    violation_type: Optional[ViolationType] = Query(None),
+    is_resolved: Optional[bool] = Query(None),
+    min_severity: Optional[int] = Query(None, ge=1, le=5),
+    date_from: Optional[datetime] = Query(None),
+    date_to: Optional[datetime] = Query(None),
+    db: AsyncSession = Depends(get_read_db)
+) -> List[ViolationResponse]:
+    """Get recorded violations."""
+    return await get_violation_list(
+        db, skip, limit, tindahan_id, inspection_id, violation_type, is_resolved, min_severity, date_from, date_to
+    )
+
+
+@router.get("/violations/{violation_id}", response_model=ViolationResponse, tags=["violations"])
+async def get_violation_by_id_endpoint(
+    violation_id: int,
+    db: AsyncSession = Depends(get_read_db)
+) -> ViolationResponse:
+    """Get a specific violation by ID."""
+    violation = await get_violation(db, violation_id)
+    if not violation:
+        raise HTTPException(status_code=404, detail="Violation not found")
+    return violation
+
+
+@router.put("/violations/{violation_id}", response_model=ViolationResponse, tags=["violations"])
+async def update_violation_endpoint(
+    violation_id: int,
+    violation_update: ViolationUpdate,
+    db: AsyncSession = Depends(get_db)
+) -> ViolationResponse:
+    """Update a violation or record its resolution."""
+    violation = await update_violation(db, violation_id, violation_update)
+    if not violation:
+        raise HTTPException(status_code=404, detail="Violation not found")
+    return violation
+
+
+# Compliance routes
+@router.get("/compliance/metrics", response_model=ComplianceMetrics, tags=["compliance"])
+async def get_compliance_metrics_endpoint(
+    db: AsyncSession = Depends(get_read_db)
+) -> ComplianceMetrics:
+    """Get dashboard compliance metrics from the maintained counters."""
+    return await get_compliance_metrics(db)
+
+
+@router.post("/compliance/recompute", response_model=ComplianceRecomputeResponse, tags=["compliance"])
+async def recompute_compliance_statuses_endpoint(
+    db: AsyncSession = Depends(get_db)
+) -> ComplianceRecomputeResponse:
+    """Re-derive every active store's compliance status from its open violations and permit, e.g. after a rule change."""
+    return await recompute_compliance_statuses(db)
+
+
+# Analytics routes
+@router.get("/analytics/zones", response_model=List[ZoneAnalytics], tags=["analytics"])
+async def get_zone_analytics_endpoint(
+    barangay_zone: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_read_db)
+) -> List[ZoneAnalytics]:
+    """Stores by compliance status and violations by type, severity and resolution time, per zone."""
+    return await get_zone_analytics(db, barangay_zone)
+
+
+@router.get("/analytics/trends", response_model=AnalyticsTrends, tags=["analytics"])
+async def get_zone_trends_endpoint(
+    bucket: TrendBucket = Query(TrendBucket.DAY),
+    date_from: Optional[date] = Query(None, description="Defaults to the last 30 days, 12 weeks or 12 months"),
+    date_to: Optional[date] = Query(None, description="Defaults to today (UTC)"),
+    barangay_zone: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_read_db)
+) -> AnalyticsTrends:
+    """Violations recorded and resolved, and mean resolution time, per zone and day, week or month."""
+    try:
+        return await get_zone_trends(db, bucket, date_from, date_to, barangay_zone)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+# Report routes
+@router.post("/reports", response_model=ComplianceReportResponse, tags=["reports"])
+async def generate_report_endpoint(
+    request: ComplianceReportGenerate,
+    db: AsyncSession = Depends(get_db)
+) -> ComplianceReportResponse:
+    """Generate and store a compliance report snapshot."""
+    try:
+        return await generate_report(db, request)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+@router.get("/reports", response_model=List[ComplianceReportResponse], tags=["reports"])
+async def get_reports_endpoint(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    report_type: Optional[ReportType] = Query(None),
+    barangay_zone: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_read_db)
+) -> List[ComplianceReportResponse]:
+    """Get generated reports."""
+    return await get_report_list(db, skip, limit, report_type, barangay_zone)
+
+
+@router.get("/reports/{report_id}", response_model=ComplianceReportResponse, tags=["reports"])
+async def get_report_by_id_endpoint(
+    report_id: int,
+    db: AsyncSession = Depends(get_read_db)
+) -> ComplianceReportResponse:
+    """Get a specific report by ID."""
+    report = await get_report(db, report_id)
+    if not report:
+        raise HTTPException(status_code=404, detail="Report not found")
+    return report
+
+
+# Sync routes
+@router.get("/sync", response_model=SyncPullResponse, tags=["sync"])
+async def pull_sync_endpoint(
+    since: int = Query(0, ge=0, description="`version` from the previous pull; 0 for a full download"),
+    limit: int = Query(SYNC_PULL_LIMIT, ge=1, le=MAX_SYNC_PULL_LIMIT),
+    db: AsyncSession = Depends(get_read_db)
+) -> SyncPullResponse:
+    """Tindahan, inspections and violations changed since a version, with tombstones for deactivated stores."""
+    return await pull_changes(db, since, limit)
+
+
+@router.post("/sync", response_model=SyncPushResponse, tags=["sync"])
+async def push_sync_endpoint(
+    batch: SyncPushRequest,
+    db: AsyncSession = Depends(get_db)
+) -> SyncPushResponse:
+    """Apply a batch of offline-queued creates and updates; retried keys are not applied twice."""
+    return await push_changes(db, batch.operations)
+
+
+# Export routes
+@router.post("/exports", response_model=ExportJobResponse, status_code=202, tags=["exports"])
+async def create_export_endpoint(
+    request: ExportRequest,
+    response: Response,
+    db: AsyncSession = Depends(get_db)
+) -> ExportJobResponse:
+    """Queue a CSV, XLSX or PDF export; poll the returned job until it is completed."""
+    try:
+        job = await enqueue_export(db, request)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if not job:
+        raise HTTPException(status_code=404, detail="Report not found")
+    export_runner.notify()
+    response.headers["Location"] = f"/api/v1/exports/{job.id}"
+    return export_response(job)
+
+
+@router.get("/exports", response_model=List[ExportJobResponse], tags=["exports"])
+async def get_exports_endpoint(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    status: Optional[ExportJobStatus] = Query(None),
+    db: AsyncSession = Depends(get_read_db)
+) -> List[ExportJobResponse]:
+    """Get export jobs, newest first."""
+    return [export_response(job) for job in await get_export_job_list(db, skip, limit, status)]
+
+
+@router.get("/exports/{job_id}", response_model=ExportJobResponse, tags=["exports"])
+async def get_export_endpoint(
+    job_id: int,
+    db: AsyncSession = Depends(get_read_db)
+) -> ExportJobResponse:
+    """Get the status of an export job."""
+    job = await get_export_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Export not found")
+    return export_response(job)
+
+
+async def _read_file_range(path: str, start: int, end: int) -> AsyncIterator[bytes]:
+    """Read bytes start..end (inclusive) of a file in chunks, off the event loop."""
+    async with await anyio.open_file(path, "rb") as file:
+        await file.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = await file.read(min(EXPORT_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+@router.get("/exports/{job_id}/download", tags=["exports"])
+async def download_export_endpoint(
+    job_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_read_db)
+) -> Response:
+    """Stream a finished export file from disk.
+
+    Supports single byte ranges, so interrupted downloads can resume with
+    `Range` (and `If-Range` with the ETag, to restart if the file changed).
+    """
+    job = await get_export_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Export not found")
+    if job.status in (ExportJobStatus.QUEUED, ExportJobStatus.RUNNING):
+        raise HTTPException(status_code=409, detail=f"Export is still {job.status.value}")
+    if job.status == ExportJobStatus.FAILED:
+        raise HTTPException(status_code=409, detail=f"Export failed: {job.error}")
+    path = export_path(job.id, job.format)
+    try:
+        size = os.stat(path).st_size
+    except FileNotFoundError:
+        raise HTTPException(status_code=410, detail="Export file has expired")
+
+    etag = f'"export-{job.id}-{size}"'
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": etag,
+        "Content-Disposition": f"attachment; filename={export_filename(job)}",
+    }
+    if job.finished_at is not None:
+        headers["Last-Modified"] = http_date(job.finished_at)
+    if is_not_modified(request.headers, etag, None):
+        return Response(status_code=304, headers=headers)
+
+    byte_range = None
+    if_range = request.headers.get("if-range")
+    # A stale If-Range validator means the client's partial copy is outdated: send the whole file
+    if if_range is None or if_range.strip() == etag:
+        try:
+            byte_range = parse_byte_range(request.headers.get("range"), size)
+        except ValueError:
+            headers["Content-Range"] = f"bytes */{size}"
+            return Response(status_code=416, headers=headers)
+
+    status_code = 200
+    start, end = 0, size - 1
+    if byte_range is not None:
+        status_code = 206
+        start, end = byte_range
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        _read_file_range(path, start, end),
+        status_code=status_code,
+        media_type=MEDIA_TYPES[job.format],
+        headers=headers,
+    )
+
+
+# Zone routes
+@router.get("/zones", response_model=List[ZoneBoundarySummary], tags=["zones"])
+async def get_zones_endpoint() -> List[ZoneBoundarySummary]:
+    """Configured barangay zone boundaries."""
+    return get_zone_boundaries().summaries()
+
+
+@router.get("/zones/locate", response_model=ZoneLocation, tags=["zones"])
+async def locate_zone_endpoint(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180)
+) -> ZoneLocation:
+    """Find the configured zone containing a point."""
+    return ZoneLocation(latitude=lat, longitude=lon, zone=get_zone_boundaries().locate(lat, lon))
+
+
+# Cache routes
+@router.get("/cache/metrics", response_model=CacheStats, tags=["cache"])
+async def get_cache_metrics_endpoint() -> CacheStats:
+    """Hit, miss and eviction counters for the tindahan read cache."""
+    return get_cache().stats()
+
+
+# Scheduler routes
+@router.get("/scheduler/metrics", response_model=List[SweepMetrics], tags=["scheduler"])
+async def get_scheduler_metrics_endpoint() -> List[SweepMetrics]:
+    """Get run statistics for the background compliance sweeps."""
+    return get_sweep_metrics()
@@ -1,38 +1,122 @@
 """
 Web routes for serving HTML templates
+
+The dashboard figures and the tindahan grid are rendered on the server, so
+phones get finished HTML instead of fetching JSON and building the page in
+the browser. Rendered fragments are cached per data version.
 """
 
-from fastapi import APIRouter, Request
+from enum import Enum
+from fastapi import APIRouter, Depends, Query, Request
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
+from markupsafe import Markup
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Awaitable, Callable, Dict, Optional, Type, TypeVar
+
+from app.cache import get_cache
+from app.database import get_read_db
+from app.controllers.compliance_controller import get_compliance_metrics
+from app.controllers.store_controller import get_tindahan_page
+from app.controllers.sync_controller import get_sync_version
+from app.metrics import TimedRoute
+from app.models.store import BusinessType, ComplianceStatus
+from app.templating import get_templates
+
+# Stores per page of the tindahan grid
+WEB_PAGE_SIZE = 24
+
+router = APIRouter(route_class=TimedRoute)
+
+E = TypeVar("E", bound=Enum)
+
 
-templates = Jinja2Templates(directory="app/templates")
+def _choice(enum: Type[E], value: Optional[str]) -> Optional[E]:
+    """A filter form value as an enum member; the empty "All" option and unknown values mean no filter."""
+    try:
+        return enum(value) if value else None
+    except ValueError:
+        return None
 
-router = APIRouter()
+
+async def render_fragment(
+    db: AsyncSession,
+    template: str,
+    params: Dict[str, Any],
+    load: Callable[[], Awaitable[Dict[str, Any]]]
+) -> Markup:
+    """Render a template fragment from `params` and the data `load` returns, cached per data version.
+
+    The sync change version moves with every tindahan, inspection and
+    violation write in any worker, so a write makes the next request render
+    afresh instead of hitting the copy cached under the old version. The
+    version is read before the data: a write landing in between only makes
+    the cached copy newer than its key.
+    """
+    version = await get_sync_version(db)
+    key = f"page:{template}:{version}:" + "&".join(f"{name}={value}" for name, value in sorted(params.items()))
+    cache = get_cache()
+    cached = await cache.get(key)
+    if cached is not None:
+        return Markup(cached)
+
+    generation = await cache.generation()
+    html = get_templates().get_template(template).render(**params, **await load())
+    await cache.set(key, html, [], generation)
+    return Markup(html)
 
 
 @router.get("/", response_class=HTMLResponse)
-async def home(request: Request):
+async def home(request: Request, db: AsyncSession = Depends(get_read_db)):
     """Home page."""
-    return templates.TemplateResponse("index.html", {
+    async def load() -> Dict[str, Any]:
+        return {"metrics": await get_compliance_metrics(db)}
+
+    return get_templates().TemplateResponse("index.html", {
         "request": request,
-        "title": "Barangay Tindahan Compliance Tracker"
+        "title": "Barangay Tindahan Compliance Tracker",
+        "stats": await render_fragment(db, "_dashboard_stats.html", {}, load),
     })
 
 
 @router.get("/tindahan", response_class=HTMLResponse)
-async def tindahan_page(request: Request):
-    """Tindahan registration and management page."""
-    return templates.TemplateResponse("tindahan.html", {
+async def tindahan_page(
+    request: Request,
+    page: int = Query(1, ge=1),
+    zone: Optional[str] = Query(None, max_length=100),
+    status: Optional[str] = Query(None),
+    business_type: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Tindahan registration and management page, one filtered page of the grid at a time."""
+    compliance_status = _choice(ComplianceStatus, status)
+    kind = _choice(BusinessType, business_type)
+    # Filters as they appear in the page links, without the empty ones
+    filters = {
+        name: value for name, value in (
+            ("zone", zone.strip() if zone else None),
+            ("status", compliance_status.value if compliance_status else None),
+            ("business_type", kind.value if kind else None),
+        ) if value
+    }
+
+    async def load() -> Dict[str, Any]:
+        tindahan, has_next = await get_tindahan_page(db, page, WEB_PAGE_SIZE, filters.get("zone"), compliance_status, kind)
+        return {"tindahan": tindahan, "has_next": has_next}
+
+    return get_templates().TemplateResponse("tindahan.html", {
         "request": request,
-        "title": "Manage Tindahan"
+        "title": "Manage Tindahan",
+        "filters": filters,
+        "statuses": list(ComplianceStatus),
+        "business_types": list(BusinessType),
+        "grid": await render_fragment(db, "_tindahan_grid.html", {"page": page, "filters": filters}, load),
     })
 
 
 @router.get("/inspections", response_class=HTMLResponse)
 async def inspections_page(request: Request):
     """Compliance inspections page."""
-    return templates.TemplateResponse("inspections.html", {
+    return get_templates().TemplateResponse("inspections.html", {
         "request": request,
         "title": "Compliance Inspections"
     })
@@ -41,7 +125,7 @@ async def inspections_page(request: Request):
 @router.get("/violations", response_class=HTMLResponse)
 async def violations_page(request: Request):
     """Violations tracking page."""
-    return templates.TemplateResponse("violations.html", {
+    return get_templates().TemplateResponse("violations.html", {
         "request": request,
         "title": "Violation Tracking"
     })
@@ -50,7 +134,7 @@ async def violations_page(request: Request):
 @router.get("/reports", response_class=HTMLResponse)
 async def reports_page(request: Request):
     """Compliance reports page."""
-    return templates.TemplateResponse("reports.html", {
+    return get_templates().TemplateResponse("reports.html", {
         "request": request,
         "title": "Compliance Reports"
     })
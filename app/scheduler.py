@@ -0,0 +1,98 @@
+"""
+In-process asyncio scheduler for periodic compliance sweeps
+"""
+
+from typing import Awaitable, Callable, Dict, List, Optional
+from datetime import datetime
+import asyncio
+import logging
+import os
+import time
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import async_session
+from app.controllers.sweep_controller import sweep_due_inspections, sweep_expired_permits
+from app.controllers.sync_controller import prune_sync_receipts
+from app.controllers.export_controller import expire_exports
+from app.controllers.history_controller import compact_tindahan_history
+from app.controllers.duplicate_controller import sweep_duplicate_tindahan
+from app.models.scheduler import SweepMetrics
+from app.workers import sweep_leader
+
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "true").lower() in ("1", "true", "yes")
+SCHEDULER_INTERVAL_SECONDS = float(os.getenv("SCHEDULER_INTERVAL_SECONDS", "300"))
+
+logger = logging.getLogger(__name__)
+
+# Sweeps run one after another so they never compete with each other for the write lock
+SWEEPS: Dict[str, Callable[[AsyncSession], Awaitable[int]]] = {
+    "expired_permits": sweep_expired_permits,
+    "due_inspections": sweep_due_inspections,
+    "sync_receipts": prune_sync_receipts,
+    "expired_exports": expire_exports,
+    "history_compaction": compact_tindahan_history,
+    "duplicate_tindahan": sweep_duplicate_tindahan,
+}
+
+_metrics: Dict[str, SweepMetrics] = {name: SweepMetrics(name=name) for name in SWEEPS}
+
+
+def get_sweep_metrics() -> List[SweepMetrics]:
+    """Current run statistics for every sweep."""
+    return [metrics.model_copy() for metrics in _metrics.values()]
+
+
+async def run_sweeps() -> None:
+    """Run every sweep once, recording duration and rows touched."""
+    for name, sweep in SWEEPS.items():
+        metrics = _metrics[name]
+        metrics.last_run_at = datetime.utcnow()
+        started = time.perf_counter()
+        rows = 0
+        try:
+            async with async_session() as db:
+                rows = await sweep(db)
+            metrics.last_error = None
+        except Exception as exc:
+            logger.exception("Sweep %s failed", name)
+            metrics.failures += 1
+            metrics.last_error = str(exc)
+        duration = time.perf_counter() - started
+
+        metrics.runs += 1
+        metrics.last_duration_seconds = duration
+        metrics.total_duration_seconds += duration
+        metrics.last_rows_touched = rows
+        metrics.total_rows_touched += rows
+
+
+async def _run_forever(interval: float) -> None:
+    """Run the sweeps every `interval` seconds until cancelled.
+
+    With several workers only the one holding the sweep lock runs them; the
+    others check again every interval and take over if the leader exits.
+    """
+    while True:
+        if sweep_leader.try_acquire():
+            await run_sweeps()
+        await asyncio.sleep(interval)
+
+
+def start_scheduler(interval: float = SCHEDULER_INTERVAL_SECONDS) -> Optional[asyncio.Task]:
+    """Start the sweep loop in the background, unless disabled by SCHEDULER_ENABLED."""
+    if not SCHEDULER_ENABLED:
+        return None
+    return asyncio.create_task(_run_forever(interval), name="compliance-sweeps")
+
+
+async def stop_scheduler(task: Optional[asyncio.Task]) -> None:
+    """Cancel the sweep loop and wait for it to finish."""
+    if task is None:
+        return
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    sweep_leader.release()
@@ -0,0 +1,80 @@
+"""
+Startup sequencing: what a worker needs before serving, and what fast startup leaves until after
+"""
+
+from typing import Optional
+import asyncio
+import logging
+import os
+
+from app.database import async_session, init_db, warm_up_db
+from app.controllers.compliance_controller import ensure_compliance_counters
+from app.geo import get_zone_boundaries
+from app.jobs import export_runner
+from app.profiler import profiler
+from app.scheduler import start_scheduler, stop_scheduler
+from app.templating import precompile_templates
+from app.workers import run_once, start_cache_sync, stop_cache_sync
+
+# Serve as soon as the database is ready and load the rest afterwards (scale-to-zero machines)
+FAST_STARTUP = os.getenv("FAST_STARTUP", "false").lower() in ("1", "true", "yes")
+# Seconds fast startup leaves the CPU to the requests that woke the machine before loading the rest
+DEFERRED_START_SECONDS = 2.0
+
+logger = logging.getLogger(__name__)
+
+
+async def prepare_database() -> None:
+    """Schema, counters and a warm connection: everything the first request needs."""
+    # One worker at a time
+    async with run_once():
+        await init_db()
+        async with async_session() as db:
+            await ensure_compliance_counters(db)
+    await warm_up_db()
+
+
+def warm_caches() -> None:
+    """Parse ZONE_BOUNDARIES_FILE and compile the page templates ahead of the requests that use them."""
+    get_zone_boundaries()
+    precompile_templates()
+
+
+class BackgroundServices:
+    """The scheduler, cache sync, export runner and profiler of one worker."""
+
+    def __init__(self):
+        self._scheduler_task: Optional[asyncio.Task] = None
+        self._cache_sync_task: Optional[asyncio.Task] = None
+        self._deferred_task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._scheduler_task = start_scheduler()
+        self._cache_sync_task = start_cache_sync()
+        export_runner.start()
+        profiler.start()
+
+    def start_deferred(self, delay: float = DEFERRED_START_SECONDS) -> None:
+        """Warm the caches and start the services `delay` seconds from now.
+
+        A bad ZONE_BOUNDARIES_FILE is then logged here and fails the zone
+        routes, rather than failing startup.
+        """
+        async def run() -> None:
+            await asyncio.sleep(delay)
+            try:
+                warm_caches()
+            except Exception:
+                logger.exception("Warming caches after startup failed")
+            self.start()
+
+        self._deferred_task = asyncio.create_task(run(), name="deferred-start")
+
+    async def stop(self) -> None:
+        if self._deferred_task is not None:
+            self._deferred_task.cancel()
+            await asyncio.gather(self._deferred_task, return_exceptions=True)
+        profiler.stop()
+        await export_runner.stop()
+        await stop_cache_sync(self._cache_sync_task)
+        await stop_scheduler(self._scheduler_task)
@@ -0,0 +1,72 @@
+"""
+Page templates shared by the web routes, created on first use and compiled ahead of requests,
+and the static assets they link to
+"""
+
+from functools import lru_cache
+from starlette.staticfiles import StaticFiles
+from typing import TYPE_CHECKING, Optional
+import hashlib
+import os
+
+if TYPE_CHECKING:
+    from fastapi.templating import Jinja2Templates
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+# Directory for compiled template bytecode, filled at image build by `python -m app.templating`; unset compiles in memory only
+TEMPLATE_CACHE_DIR = os.getenv("TEMPLATE_CACHE_DIR")
+# Seconds browsers may reuse a static asset requested without a content version
+STATIC_MAX_AGE_SECONDS = int(os.getenv("STATIC_MAX_AGE_SECONDS", "3600"))
+
+_templates: Optional["Jinja2Templates"] = None
+
+
+@lru_cache(maxsize=None)
+def static_url(path: str) -> str:
+    """URL of a file under app/static, versioned by its content so it can be cached for good."""
+    with open(os.path.join(STATIC_DIR, path), "rb") as handle:
+        version = hashlib.sha1(handle.read()).hexdigest()[:12]
+    return f"/static/{path}?v={version}"
+
+
+class CachedStaticFiles(StaticFiles):
+    """Static files with Cache-Control: immutable for versioned URLs, revalidated after a while otherwise."""
+
+    async def get_response(self, path: str, scope):
+        response = await super().get_response(path, scope)
+        if response.status_code in (200, 304):
+            if b"v=" in scope.get("query_string", b""):
+                response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+            else:
+                response.headers["Cache-Control"] = f"public, max-age={STATIC_MAX_AGE_SECONDS}"
+        return response
+
+
+def get_templates() -> "Jinja2Templates":
+    """The shared template environment; Jinja2 is imported here so API-only workers never load it."""
+    global _templates
+    if _templates is None:
+        from fastapi.templating import Jinja2Templates
+        from jinja2 import FileSystemBytecodeCache
+
+        bytecode_cache = None
+        if TEMPLATE_CACHE_DIR:
+            os.makedirs(TEMPLATE_CACHE_DIR, exist_ok=True)
+            bytecode_cache = FileSystemBytecodeCache(TEMPLATE_CACHE_DIR)
+        _templates = Jinja2Templates(directory=TEMPLATE_DIR, bytecode_cache=bytecode_cache)
+        _templates.env.globals["static_url"] = static_url
+    return _templates
+
+
+def precompile_templates() -> int:
+    """Compile every page template into the environment's cache, and the bytecode cache if set; returns how many."""
+    env = get_templates().env
+    names = env.list_templates(extensions=["html"])
+    for name in names:
+        env.get_template(name)
+    return len(names)
+
+
+if __name__ == "__main__":
+    print(f"Compiled {precompile_templates()} templates into {TEMPLATE_CACHE_DIR or 'memory'}")
@@ -2,9 +2,15 @@
 Helper utility functions
 """
 
-from datetime import datetime
-from typing import Any, Dict, Optional
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import base64
+import hashlib
+import json
 import re
+import unicodedata
 
 
 def format_currency(amount: float) -> str:
@@ -17,10 +23,14 @@ def format_date(date: datetime) -> str:
     return date.strftime("%B %d, %Y at %I:%M %p")
 
 
+def digits_only(text: str) -> str:
+    """Remove all non-digit characters."""
+    return re.sub(r'\D', '', text)
+
+
 def validate_phone_number(phone: str) -> bool:
     """Validate Philippine phone number format."""
-    # Remove all non-digit characters
-    digits = re.sub(r'\D', '', phone)
+    digits = digits_only(phone)
     
     # Check if it's a valid Philippine mobile number
     # Should start with 09 and be 11 digits total
@@ -35,6 +45,53 @@ def validate_phone_number(phone: str) -> bool:
     return False
 
 
+def normalize_phone_number(phone: Optional[str]) -> str:
+    """Digits of a Philippine number in local form, so 0917 123 4567 and +63 917-123-4567 compare equal."""
+    digits = digits_only(phone or "")
+    if len(digits) == 12 and digits.startswith('63'):
+        digits = '0' + digits[2:]
+    return digits
+
+
+def normalize_name(text: str) -> str:
+    """Lowercase words without accents, possessives or punctuation; "Aling Nena's Sari-Sari" -> "aling nena sari sari"."""
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode().lower()
+    text = re.sub(r"['`](s\b)?", '', text)
+    return ' '.join(re.sub(r'[^a-z0-9]+', ' ', text).split())
+
+
+# Spellings that sound alike in Filipino names, rewritten before coding
+_PHONETIC_SPELLINGS = [('ph', 'f'), ('qu', 'k'), ('ch', 'ts'), ('c', 'k'), ('z', 's'), ('v', 'b'), ('j', 'h'), ('ny', 'n'), ('y', 'i')]
+_PHONETIC_CODES = {letter: code for letters, code in (('bfp', '1'), ('gkqsx', '2'), ('dt', '3'), ('l', '4'), ('mn', '5'), ('r', '6')) for letter in letters}
+
+
+@lru_cache(maxsize=8192)
+def phonetic_key(word: str) -> str:
+    """Soundex-style key of one normalized word, tuned so common Filipino spelling variants share it.
+
+    "Cruz" and "Kruz", "Josefina" and "Hosefina", "Nena" and "Nenya" get
+    the same key; digits are kept as they are.
+    """
+    if not word or word.isdigit():
+        return word
+    for spelling, sound in _PHONETIC_SPELLINGS:
+        word = word.replace(spelling, sound)
+    key = word[0]
+    previous = _PHONETIC_CODES.get(word[0], '')
+    for letter in word[1:]:
+        code = _PHONETIC_CODES.get(letter, '')
+        if code and code != previous:
+            key += code
+        previous = code
+    return (key + '000')[:4]
+
+
+def name_keys(text: str, stopwords: Iterable[str] = ()) -> List[str]:
+    """Sorted, distinct phonetic keys of the words of a name, leaving out `stopwords`."""
+    ignored = set(stopwords)
+    return sorted({phonetic_key(word) for word in normalize_name(text).split() if word not in ignored})
+
+
 def sanitize_input(text: str) -> str:
     """Sanitize user input to prevent XSS."""
     if not text:
@@ -84,3 +141,99 @@ def paginate_results(items: list, page: int = 1, per_page: int = 20) -> Dict[str
             "has_prev": page > 1
         }
     }
+
+
+def encode_cursor(last_id: int) -> str:
+    """Encode the last seen row id as an opaque pagination cursor."""
+    payload = json.dumps({"id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """Decode a pagination cursor back to the last seen row id."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        last_id = json.loads(base64.urlsafe_b64decode(padded.encode()))["id"]
+    except (ValueError, KeyError, TypeError) as exc:
+        raise ValueError("Invalid pagination cursor") from exc
+    if not isinstance(last_id, int) or last_id < 0:
+        raise ValueError("Invalid pagination cursor")
+    return last_id
+
+
+def make_etag(versions: Iterable[Tuple[int, datetime]]) -> str:
+    """Weak ETag for a set of rows, derived from their ids and updated_at."""
+    digest = hashlib.sha1()
+    for row_id, updated_at in versions:
+        digest.update(f"{row_id}:{updated_at.isoformat()};".encode())
+    return f'W/"{digest.hexdigest()[:20]}"'
+
+
+def version_etag(version: int) -> str:
+    """Strong ETag naming one version of a row."""
+    return f'"{version}"'
+
+
+def parse_if_match(header: Optional[str]) -> Optional[int]:
+    """Row version named by an If-Match header; None when it is absent or `*`.
+
+    Only a single strong tag as sent by version_etag is accepted; weak tags
+    can never match under If-Match.
+    """
+    if header is None or header.strip() == "*":
+        return None
+    match = re.fullmatch(r'\s*"(\d{1,18})"\s*', header)
+    if match is None:
+        raise ValueError('If-Match must be a single ETag of the row, such as "3"')
+    return int(match.group(1))
+
+
+def http_date(value: datetime) -> str:
+    """Format a naive UTC datetime as an HTTP date."""
+    return format_datetime(value.replace(tzinfo=timezone.utc, microsecond=0), usegmt=True)
+
+
+def is_not_modified(headers: Any, etag: str, last_modified: Optional[datetime]) -> bool:
+    """Evaluate If-None-Match / If-Modified-Since; If-None-Match wins when both are sent."""
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        # Weak comparison: W/ prefixes are ignored
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return etag.removeprefix("W/") in candidates
+
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return last_modified.replace(tzinfo=timezone.utc, microsecond=0) <= since
+
+
+def parse_byte_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Resolve a single-range `Range: bytes=...` header to inclusive (first, last) offsets.
+
+    Returns None when the whole body should be sent: no header, a header
+    that does not parse, or several ranges. Raises ValueError when the range
+    lies outside the body (416 Range Not Satisfiable).
+    """
+    match = re.fullmatch(r"\s*bytes\s*=\s*(\d*)-(\d*)\s*", header or "", re.IGNORECASE)
+    if match is None or match.group(1) == match.group(2) == "":
+        return None
+    first, last = match.groups()
+    if not first:
+        # Suffix range: the last N bytes
+        if int(last) == 0 or size == 0:
+            raise ValueError("Unsatisfiable range")
+        return max(size - int(last), 0), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise ValueError("Unsatisfiable range")
+    return start, min(int(last), size - 1) if last else size - 1
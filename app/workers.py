@@ -0,0 +1,163 @@
+"""
+Multi-worker coordination: run-once startup, a single sweep leader and cross-worker cache invalidation
+"""
+
+from contextlib import asynccontextmanager
+from sqlmodel import select
+from typing import AsyncIterator, Optional
+import asyncio
+import hashlib
+import logging
+import os
+import sys
+import tempfile
+
+try:
+    import fcntl
+except ImportError:  # Windows: no multi-worker serving, so the locks are not needed
+    fcntl = None
+
+from app.cache import CACHE_BACKEND, invalidate_tindahan
+from app.controllers.sync_controller import get_sync_version
+from app.database import DATABASE_URL, async_read_session
+from app.models.store import Tindahan
+from app.models.sync import SyncChange
+
+# Worker processes serving requests; read by uvicorn (and gunicorn) as the default worker count
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+# Directory for the lock files shared by the workers of one deployment
+LOCK_DIR = os.getenv("LOCK_DIR", tempfile.gettempdir())
+# Apply Alembic migrations at startup, once, before any worker touches the schema
+MIGRATE_ON_STARTUP = os.getenv("MIGRATE_ON_STARTUP", "false").lower() in ("1", "true", "yes")
+# Seconds between checks for tindahan written by other workers; 0 disables (the default with one worker)
+CACHE_SYNC_SECONDS = float(os.getenv("CACHE_SYNC_SECONDS", "1" if WEB_CONCURRENCY > 1 else "0"))
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic.ini")
+
+logger = logging.getLogger(__name__)
+
+
+class ProcessLock:
+    """Advisory file lock shared by the worker processes of one database.
+
+    The operating system releases it when the holding process exits, so a
+    crashed worker never leaves it held.
+    """
+
+    def __init__(self, name: str):
+        digest = hashlib.sha1(DATABASE_URL.encode()).hexdigest()[:12]
+        self.path = os.path.join(LOCK_DIR, f"brgy-tindahan-{digest}-{name}.lock")
+        self._fd: Optional[int] = None
+        self.held = False
+
+    def _open(self) -> int:
+        if self._fd is None:
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        return self._fd
+
+    def try_acquire(self) -> bool:
+        """Take the lock if it is free (or already ours); never waits."""
+        if fcntl is None or self.held:
+            self.held = True
+            return True
+        try:
+            fcntl.flock(self._open(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+        self.held = True
+        return True
+
+    async def acquire(self) -> None:
+        """Wait for the lock in a thread, leaving the event loop free."""
+        if fcntl is not None and not self.held:
+            await asyncio.to_thread(fcntl.flock, self._open(), fcntl.LOCK_EX)
+        self.held = True
+
+    def release(self) -> None:
+        if fcntl is not None and self.held:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self.held = False
+
+
+startup_lock = ProcessLock("startup")
+sweep_leader = ProcessLock("sweeps")
+
+
+async def run_migrations() -> None:
+    """alembic upgrade head, in a child process so Alembic's logging setup leaves the server's alone."""
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, "-m", "alembic", "-c", ALEMBIC_INI, "upgrade", "head", cwd=os.path.dirname(ALEMBIC_INI)
+    )
+    if await process.wait() != 0:
+        raise RuntimeError(f"alembic upgrade head failed with exit code {process.returncode}")
+
+
+@asynccontextmanager
+async def run_once() -> AsyncIterator[None]:
+    """Serialize startup work across workers; migrations, if enabled, run first.
+
+    Workers take turns, so only the first one does real work and the rest
+    find the schema and counters already in place.
+    """
+    await startup_lock.acquire()
+    try:
+        if MIGRATE_ON_STARTUP:
+            await run_migrations()
+        yield
+    finally:
+        startup_lock.release()
+
+
+async def _latest_version() -> int:
+    async with async_read_session() as db:
+        return await get_sync_version(db)
+
+
+async def _follow_tindahan_changes(interval: float) -> None:
+    """Drop cached reads of tindahan changed since the last check, by any worker.
+
+    Each worker invalidates its own cache on the writes it makes; this picks
+    up the rest from the sync change versions. Lists are dropped whenever a
+    store changed, as the version alone does not say whether it was added or
+    deactivated.
+    """
+    since: Optional[int] = None
+    while True:
+        try:
+            if since is None:
+                since = await _latest_version()
+            await asyncio.sleep(interval)
+            async with async_read_session() as db:
+                result = await db.execute(
+                    select(SyncChange.entity, SyncChange.entity_id, SyncChange.version)
+                    .where(SyncChange.version > since)
+                    .order_by(SyncChange.version)
+                )
+                changes = result.all()
+            if not changes:
+                continue
+            since = changes[-1].version
+            ids = [entity_id for entity, entity_id, _ in changes if entity == Tindahan.__tablename__]
+            if ids:
+                await invalidate_tindahan(ids, membership_changed=True, created=True)
+        except Exception:
+            logger.exception("Following tindahan changes for the read cache failed")
+            await asyncio.sleep(interval)
+
+
+def start_cache_sync(interval: float = CACHE_SYNC_SECONDS) -> Optional[asyncio.Task]:
+    """Start following other workers' writes, unless disabled or there is no cache to keep fresh."""
+    if interval <= 0 or CACHE_BACKEND == "none":
+        return None
+    return asyncio.create_task(_follow_tindahan_changes(interval), name="cache-sync")
+
+
+async def stop_cache_sync(task: Optional[asyncio.Task]) -> None:
+    """Cancel the cache follower and wait for it to finish."""
+    if task is None:
+        return
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
@@ -0,0 +1,3 @@
+"""
+Benchmarks and performance checks for Barangay Tindahan Tracker
+"""
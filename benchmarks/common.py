@@ -0,0 +1,98 @@
+"""
+Shared helpers for the benchmark suite: scratch databases, percentiles and result files
+"""
+
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from typing import Any, Dict, List, Sequence
+
+from benchmarks.seed import ZONES_FILE
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def prepare_database(seed_file: str) -> str:
+    """Copy a cached seed database to a scratch file that a run may modify."""
+    path = os.path.join(tempfile.mkdtemp(prefix="bench_"), "bench.db")
+    shutil.copyfile(seed_file, path)
+    return path
+
+
+def configure_app(database_path: str, cache_backend: str = "memory") -> None:
+    """Point the app at a scratch database; must run before any app module is imported."""
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{database_path}"
+    os.environ["ZONE_BOUNDARIES_FILE"] = ZONES_FILE
+    os.environ.pop("DATABASE_READ_URL", None)
+    os.environ["DB_PROFILE"] = "production"
+    os.environ["SCHEDULER_ENABLED"] = "false"
+    os.environ["CACHE_BACKEND"] = cache_backend
+
+
+def percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def summarize(seconds: List[float]) -> Dict[str, float]:
+    """Latency summary in milliseconds."""
+    values = sorted(seconds)
+    total = sum(values)
+    return {
+        "count": len(values),
+        "mean_ms": round(total / len(values) * 1000, 4) if values else 0.0,
+        "p50_ms": round(percentile(values, 0.50) * 1000, 4),
+        "p95_ms": round(percentile(values, 0.95) * 1000, 4),
+        "p99_ms": round(percentile(values, 0.99) * 1000, 4),
+        "max_ms": round(values[-1] * 1000, 4) if values else 0.0,
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def environment() -> Dict[str, str]:
+    """Where a result was measured, so comparisons across machines are recognizable."""
+    return {
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "processor": platform.machine(),
+        "cpu_count": str(os.cpu_count()),
+    }
+
+
+def save_results(suite: str, parameters: Dict[str, Any], results: Dict[str, Any], output: str = None) -> str:
+    """Write a result file that benchmarks.compare can diff; returns its path."""
+    timestamp = datetime.utcnow()
+    document = {
+        "suite": suite,
+        "timestamp": timestamp.isoformat() + "Z",
+        "environment": environment(),
+        "parameters": parameters,
+        "results": results,
+    }
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{suite}-{timestamp:%Y%m%dT%H%M%S}-{document['environment']['git_commit']}.json")
+    with open(output, "w") as handle:
+        json.dump(document, handle, indent=2, sort_keys=True)
+    print(f"Results written to {output}", file=sys.stderr)
+    return output
@@ -0,0 +1,71 @@
+"""
+Compare two benchmark result files and flag regressions
+
+Matches results by name and compares a latency metric (p50 by default);
+exits with status 1 if any shared result is slower than the baseline by
+more than the threshold.
+
+Usage: python -m benchmarks.compare baseline.json candidate.json [--metric p95_ms] [--threshold 10]
+"""
+
+import argparse
+import json
+import sys
+from typing import Any, Dict, List, Tuple
+
+
+def load(path: str) -> Dict[str, Any]:
+    with open(path) as handle:
+        return json.load(handle)
+
+
+def compare(baseline: Dict[str, Any], candidate: Dict[str, Any], metric: str, threshold: float) -> Tuple[List[str], List[str]]:
+    """Format one line per shared result; returns (lines, names of regressions)."""
+    lines: List[str] = []
+    regressions: List[str] = []
+    base_results, new_results = baseline["results"], candidate["results"]
+    width = max((len(name) for name in base_results), default=0)
+    for name in sorted(set(base_results) & set(new_results)):
+        before = base_results[name].get(metric)
+        after = new_results[name].get(metric)
+        if not before or after is None:
+            continue
+        change = (after - before) / before * 100
+        marker = ""
+        if change > threshold:
+            marker = "  REGRESSION"
+            regressions.append(name)
+        elif change < -threshold:
+            marker = "  improved"
+        lines.append(f"{name:<{width}}  {before:>10.3f} -> {after:>10.3f}  {change:+7.1f}%{marker}")
+    for name in sorted(set(base_results) ^ set(new_results)):
+        lines.append(f"{name:<{width}}  only in {'baseline' if name in base_results else 'candidate'}")
+    return lines, regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--metric", default="p50_ms", help="Result field to compare (lower is better)")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Allowed slowdown in percent")
+    args = parser.parse_args()
+
+    baseline, candidate = load(args.baseline), load(args.candidate)
+    for label, document in (("baseline", baseline), ("candidate", candidate)):
+        environment = document.get("environment", {})
+        print(f"{label}: {document.get('suite')} @ {environment.get('git_commit')} ({document.get('timestamp')})")
+    if baseline.get("parameters") != candidate.get("parameters"):
+        print("warning: runs used different parameters; results may not be comparable")
+
+    lines, regressions = compare(baseline, candidate, args.metric, args.threshold)
+    print(f"\n{args.metric} (threshold {args.threshold:g}%)")
+    print("\n".join(lines))
+    if regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,186 @@
+"""
+Duplicate detection benchmark: recall, false suggestions and compared pairs on a large registry
+
+Copies a fixed sample of the seed's active stores as re-registrations with
+the variations field staff produce (respelled names, another store word,
+reformatted or missing phone numbers, abbreviated streets, a few meters of
+GPS drift, no permit), then scans every active store. Reports how many
+planted pairs were suggested, how many other pairs were, how many pairs
+blocking compared against all pairs within a zone, and the time taken by
+the scoring engine and by the whole scan. Results are written as JSON for
+benchmarks.compare.
+
+Usage: python -m benchmarks.dedupe [--stores 100000] [--duplicates 1000] [--output results.json]
+"""
+
+import argparse
+import random
+import sqlite3
+import sys
+import time
+
+from benchmarks.common import configure_app, prepare_database, save_results, summarize
+from benchmarks.seed import ensure_seeded
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--stores", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--duplicates", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default=None)
+    return parser.parse_args()
+
+
+# Spelling variants seen in hand-written registrations
+RESPELLINGS = [("C", "K"), ("c", "k"), ("J", "H"), ("z", "s"), ("s", "z"), ("ñ", "ny"), ("na", "nya"), ("o", "u"), ("e", "i")]
+STREET_FORMS = [(" St", " Street"), (" Ave", " Avenue"), (" Rd", " Road"), (" Blvd", " Boulevard")]
+
+
+def _respell(rng: random.Random, name: str) -> str:
+    """The name with one spelling variant or typo, or unchanged."""
+    roll = rng.random()
+    if roll < 0.4:
+        options = [(old, new) for old, new in RESPELLINGS if old in name]
+        if options:
+            old, new = rng.choice(options)
+            return name.replace(old, new, 1)
+    if roll < 0.6 and len(name) > 4:
+        # Two neighbouring letters swapped
+        index = rng.randrange(1, len(name) - 2)
+        return name[:index] + name[index + 1] + name[index] + name[index + 2:]
+    return name
+
+
+def _variant(rng: random.Random, row: dict) -> dict:
+    """A re-registration of the same store as someone else might type it."""
+    first, _, word = row["business_name"].partition("'s ")
+    name = _respell(rng, first)
+    business_name = rng.choice([f"{name}'s {word}", f"Aling {name}'s {word}", f"{name} {rng.choice(['Store', 'Sari-Sari Store', word])}"])
+    address = row["address"]
+    for short, long in STREET_FORMS:
+        if address.endswith(short) and rng.random() < 0.5:
+            address = address[:-len(short)] + long
+    contact = row["contact_number"]
+    if contact and rng.random() < 0.5:
+        contact = rng.choice([f"+63 {contact[1:4]} {contact[4:7]} {contact[7:]}", f"{contact[:4]}-{contact[4:7]}-{contact[7:]}"])
+    elif contact and rng.random() < 0.4:
+        contact = None
+    latitude, longitude = row["latitude"], row["longitude"]
+    if latitude is not None:
+        if rng.random() < 0.2:
+            latitude = longitude = None
+        else:
+            latitude += rng.uniform(-0.00015, 0.00015)
+            longitude += rng.uniform(-0.00015, 0.00015)
+    return {
+        **row,
+        "business_name": business_name,
+        "owner_name": _respell(rng, row["owner_name"]),
+        "address": address,
+        "contact_number": contact,
+        "latitude": latitude,
+        "longitude": longitude,
+        "business_permit_number": None,
+        "permit_issued_date": None,
+        "permit_expiry_date": None,
+    }
+
+
+def plant_duplicates(database_path: str, count: int, seed: int) -> set:
+    """Insert re-registrations of `count` active stores picked by a fixed scatter; returns the (original, copy) id pairs."""
+    rng = random.Random(seed)
+    with sqlite3.connect(database_path) as conn:
+        conn.row_factory = sqlite3.Row
+        rows = [dict(row) for row in conn.execute(
+            "SELECT * FROM tindahan WHERE is_active = 1 ORDER BY id * 7919 % 100003, id LIMIT ?", (count,)
+        )]
+        planted = set()
+        for row in rows:
+            original = row.pop("id")
+            copy = _variant(rng, row)
+            columns = ", ".join(copy)
+            cursor = conn.execute(
+                f"INSERT INTO tindahan ({columns}) VALUES ({', '.join('?' for _ in copy)})", list(copy.values())
+            )
+            planted.add((original, cursor.lastrowid))
+    return planted
+
+
+ARGS = parse_args() if __name__ == "__main__" else None
+if ARGS is not None:
+    DATABASE_PATH = prepare_database(ensure_seeded(ARGS.stores, ARGS.seed))
+    PLANTED = plant_duplicates(DATABASE_PATH, ARGS.duplicates, ARGS.seed)
+    configure_app(DATABASE_PATH)
+
+import asyncio
+from collections import Counter
+from typing import Any, Dict, List
+
+from sqlmodel import select
+
+from app.database import async_session, init_db
+from app.dedupe import find_duplicates
+from app.controllers.duplicate_controller import _load_stores, scan_duplicates
+from app.models.duplicate import DuplicateStatus, TindahanDuplicate
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    await init_db()
+    stores = await _load_stores()
+    zone_sizes = Counter(store.barangay_zone for store in stores)
+    all_pairs = sum(size * (size - 1) // 2 for size in zone_sizes.values())
+
+    engine_seconds: List[float] = []
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        matches, stats = find_duplicates(stores)
+        engine_seconds.append(time.perf_counter() - started)
+
+    async with async_session() as db:
+        started = time.perf_counter()
+        scan = await scan_duplicates(db)
+        scan_seconds = time.perf_counter() - started
+        result = await db.execute(
+            select(TindahanDuplicate.tindahan_id, TindahanDuplicate.duplicate_id)
+            .where(TindahanDuplicate.status == DuplicateStatus.SUGGESTED)
+        )
+        suggested = set(map(tuple, result.all()))
+
+    found = len(PLANTED & suggested)
+    results = {
+        "engine": summarize(engine_seconds),
+        "scan_seconds": round(scan_seconds, 3),
+        "detection": {
+            "stores": stats.stores,
+            "planted": len(PLANTED),
+            "found": found,
+            "recall": round(found / len(PLANTED), 4) if PLANTED else None,
+            "other_suggestions": len(suggested - PLANTED),
+            "candidate_pairs": stats.candidate_pairs,
+            "pairs_within_zones": all_pairs,
+            "skipped_blocks": stats.skipped_blocks,
+        },
+    }
+    print(
+        f"{stats.stores} stores: {found}/{len(PLANTED)} planted duplicates found, "
+        f"{len(suggested - PLANTED)} other suggestions; {stats.candidate_pairs} pairs scored of {all_pairs} within zones",
+        file=sys.stderr,
+    )
+    print(
+        f"engine p50 {results['engine']['p50_ms']:.0f} ms, full scan {scan_seconds * 1000:.0f} ms "
+        f"({scan.added} suggestions written)",
+        file=sys.stderr,
+    )
+    return results
+
+
+def main(args: argparse.Namespace) -> str:
+    results = asyncio.run(run(args))
+    parameters = {"stores": args.stores, "seed": args.seed, "duplicates": args.duplicates, "repeat": args.repeat}
+    return save_results(f"dedupe-{args.stores}", parameters, results, args.output)
+
+
+if __name__ == "__main__":
+    main(ARGS)
@@ -0,0 +1,68 @@
+"""
+Write-throughput benchmark for the database engine profiles
+
+Registers tindahan one transaction at a time (the create_tindahan hot path)
+against a fresh SQLite file for each profile in app.database.ENGINE_PROFILES.
+
+Usage: python -m benchmarks.engine_profiles [--rows 2000] [--concurrency 4]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from typing import Dict
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from sqlmodel import SQLModel
+
+from app.database import ENGINE_PROFILES, create_engine_for_profile
+from app.controllers.store_controller import create_tindahan
+from app.models.store import TindahanCreate, BusinessType
+
+
+async def run_profile(profile: str, rows: int, concurrency: int) -> Dict[str, float]:
+    """Time `rows` single-row registrations under one engine profile."""
+    path = os.path.join(tempfile.mkdtemp(prefix=f"bench_{profile}_"), "bench.db")
+    engine = create_engine_for_profile(f"sqlite+aiosqlite:///{path}", profile)
+    engine.echo = False
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+    async def worker(offset: int) -> None:
+        async with session_factory() as db:
+            for index in range(offset, rows, concurrency):
+                await create_tindahan(db, TindahanCreate(
+                    business_name=f"Tindahan {index}",
+                    owner_name=f"Owner {index}",
+                    business_type=BusinessType.TINDAHAN,
+                    address=f"{index} Mabini St.",
+                    barangay_zone=f"Zone {index % 7}",
+                ))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(offset) for offset in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    await engine.dispose()
+    return {"rows": rows, "seconds": round(elapsed, 3), "rows_per_second": round(rows / elapsed, 1)}
+
+
+async def main(rows: int, concurrency: int) -> None:
+    """Benchmark every profile and print a comparison."""
+    results = {profile: await run_profile(profile, rows, concurrency) for profile in ENGINE_PROFILES}
+    baseline = min(result["rows_per_second"] for result in results.values())
+    for profile, result in results.items():
+        speedup = result["rows_per_second"] / baseline
+        print(f"{profile:<12} {result['rows']:>7} rows  {result['seconds']:>8.3f}s  "
+              f"{result['rows_per_second']:>9.1f} rows/s  x{speedup:.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.concurrency))
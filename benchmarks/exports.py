@@ -0,0 +1,118 @@
+"""
+Export generation benchmark: throughput and peak memory per kind and format
+
+Runs every export the way the job runner does, in a fresh spawned worker
+process, once scoped to a single zone and once over the whole barangay.
+Peak RSS of the worker should stay flat as the row count grows. Results are
+written as JSON for benchmarks.compare.
+
+Usage: python -m benchmarks.exports [--stores 100000] [--output results.json]
+"""
+
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Tuple
+
+from benchmarks.common import configure_app, prepare_database, save_results
+from benchmarks.seed import ensure_seeded
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--stores", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--formats", default="csv,xlsx,pdf")
+    parser.add_argument("--output", default=None)
+    return parser.parse_args()
+
+
+ARGS = parse_args() if __name__ == "__main__" else None
+if ARGS is not None:
+    configure_app(prepare_database(ensure_seeded(ARGS.stores, ARGS.seed)))
+
+import asyncio
+import multiprocessing
+from datetime import datetime
+
+from app.database import DATABASE_URL, async_session, init_db
+from app.controllers.report_controller import generate_report
+from app.exports import run_export
+from app.models.compliance_report import ComplianceReportGenerate, ReportType
+from app.models.export import ExportFormat, ExportKind
+from benchmarks.seed import ZONES
+
+
+def _peak_rss_mb() -> float:
+    """High-water RSS of this process; ru_maxrss would include the parent's from before exec."""
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _measured_export(job: Dict[str, Any], path: str, database_url: str) -> Tuple[int, int, float, float, float]:
+    """Worker side: (rows, bytes, seconds, RSS before and peak RSS in MB) of one export."""
+    baseline = _peak_rss_mb()
+    started = time.perf_counter()
+    rows, size = run_export(job, path, database_url)
+    elapsed = time.perf_counter() - started
+    return rows, size, elapsed, baseline, _peak_rss_mb()
+
+
+def _job(kind: ExportKind, export_format: ExportFormat, zone: str = None, report_id: int = None) -> Dict[str, Any]:
+    return {"kind": kind, "format": export_format, "barangay_zone": zone, "active_only": True, "report_id": report_id}
+
+
+async def _report_id() -> int:
+    async with async_session() as db:
+        report = await generate_report(db, ComplianceReportGenerate(
+            report_type=ReportType.MONTHLY, report_period_start=datetime.utcnow().replace(day=1), generated_by="benchmark",
+        ))
+    return report.id
+
+
+def main(args: argparse.Namespace) -> str:
+    asyncio.run(init_db())
+    report_id = asyncio.run(_report_id())
+    output_dir = tempfile.mkdtemp(prefix="bench_exports_")
+    context = multiprocessing.get_context("spawn")
+
+    results: Dict[str, Any] = {}
+    for export_format in (ExportFormat(name) for name in args.formats.split(",")):
+        for kind in ExportKind:
+            for scope, zone in (("zone", ZONES[0]), ("all", None)):
+                job = _job(kind, export_format, zone, report_id if kind == ExportKind.COMPLIANCE_REPORT else None)
+                path = os.path.join(output_dir, f"{kind.value}-{scope}.{export_format.value}")
+                # A fresh process per export, so peak RSS is that export's own
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                    rows, size, elapsed, baseline_mb, peak_mb = pool.submit(_measured_export, job, path, DATABASE_URL).result()
+                os.remove(path)
+                name = f"{kind.value}[{export_format.value},{scope}]"
+                results[name] = {
+                    "rows": rows,
+                    "size_bytes": size,
+                    "seconds": round(elapsed, 3),
+                    "rows_per_sec": round(rows / elapsed) if elapsed else 0,
+                    "baseline_rss_mb": round(baseline_mb, 1),
+                    "peak_rss_mb": round(peak_mb, 1),
+                }
+                print(
+                    f"{name:45} {rows:>8} rows {elapsed:7.2f}s {baseline_mb:6.1f} MB after import, {peak_mb:6.1f} MB peak",
+                    file=sys.stderr,
+                )
+
+    parameters = {"stores": args.stores, "seed": args.seed, "formats": args.formats}
+    return save_results(f"exports-{args.stores}", parameters, results, args.output)
+
+
+if __name__ == "__main__":
+    main(ARGS)
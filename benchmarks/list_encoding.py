@@ -0,0 +1,117 @@
+"""
+Byte-for-byte check and benchmark of the lean tindahan list path
+
+Encodes the same pages twice: through the ORM path (get_tindahan_list, then
+FastAPI's response_model validation and JSONResponse) and through
+get_tindahan_list_json. Fails if any body differs, then times both with the
+read cache disabled. Results are written as JSON for benchmarks.compare.
+
+Usage: python -m benchmarks.list_encoding [--stores 10000] [--iterations 50]
+"""
+
+import argparse
+import sys
+import time
+
+from benchmarks.common import configure_app, prepare_database, save_results, summarize
+from benchmarks.seed import ensure_seeded
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--stores", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--output", default=None)
+    return parser.parse_args()
+
+
+ARGS = parse_args() if __name__ == "__main__" else None
+if ARGS is not None:
+    configure_app(prepare_database(ensure_seeded(ARGS.stores, ARGS.seed)), "none")
+
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from sqlalchemy import update
+
+from app.database import async_session, engine, read_engine
+from app.controllers.store_controller import get_tindahan_list, get_tindahan_list_json
+from app.models.store import Tindahan, TindahanResponse
+
+# (skip, limit, active_only, after_id)
+PAGES: List[Tuple[int, int, bool, Optional[int]]] = [
+    (0, 1, True, None),
+    (0, 100, True, None),
+    (0, 1000, True, None),
+    (0, 1000, False, None),
+    (500, 100, False, None),
+    (0, 100, True, 5000),
+]
+
+response_field = create_response_field(name="Response_get_tindahan", type_=List[TindahanResponse])
+
+
+async def orm_body(skip: int, limit: int, active_only: bool, after_id: Optional[int]) -> bytes:
+    """The body the list route produced before the lean path."""
+    async with async_session() as db:
+        tindahan_list = await get_tindahan_list(db, skip, limit, active_only, after_id)
+    content = await serialize_response(field=response_field, response_content=tindahan_list, is_coroutine=True)
+    return JSONResponse(content).body
+
+
+async def lean_body(skip: int, limit: int, active_only: bool, after_id: Optional[int]) -> bytes:
+    async with async_session() as db:
+        page = await get_tindahan_list_json(db, skip, limit, active_only, after_id)
+    return page.body
+
+
+async def add_edge_cases() -> None:
+    """Give a few rows text and timestamps that stress JSON encoding."""
+    async with async_session() as db:
+        await db.execute(update(Tindahan).where(Tindahan.id == 2).values(
+            business_name='Niño\'s "Tindahan" \\ 🛒', address="Purok 1\nSitio Malinis\t", contact_number=None,
+            updated_at=datetime(2026, 1, 2, 3, 4, 5, 123456),
+        ))
+        await db.execute(update(Tindahan).where(Tindahan.id == 3).values(
+            owner_name="Ma. Teresa Dela Cruz-Ñiguez", permit_issued_date=None, permit_expiry_date=None,
+        ))
+        await db.commit()
+
+
+async def main(args: argparse.Namespace) -> int:
+    await add_edge_cases()
+    mismatches = 0
+    for page in PAGES:
+        orm, lean = await orm_body(*page), await lean_body(*page)
+        if orm != lean:
+            mismatches += 1
+            print(f"MISMATCH {page}: {len(orm)} vs {len(lean)} bytes", file=sys.stderr)
+    if mismatches:
+        return 1
+    print(f"{len(PAGES)} pages encode identically")
+
+    results: Dict[str, Any] = {}
+    for limit in (100, 1000):
+        for name, encode in (("orm", orm_body), ("lean", lean_body)):
+            timings = []
+            for _ in range(args.iterations):
+                started = time.perf_counter()
+                await encode(0, limit, True, None)
+                timings.append(time.perf_counter() - started)
+            summary = summarize(timings)
+            summary["us_per_row"] = round(summary["mean_ms"] * 1000 / limit, 4)
+            results[f"list[{name},{limit}]"] = summary
+            print(f"list[{name},{limit}]  p50 {summary['p50_ms']:>8.3f}ms  p99 {summary['p99_ms']:>8.3f}ms  {summary['us_per_row']:>7.2f}us/row")
+    await engine.dispose()
+    await read_engine.dispose()
+    save_results(f"list_encoding-{args.stores}", {"stores": args.stores, "seed": args.seed, "iterations": args.iterations}, results, args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(ARGS)))
@@ -0,0 +1,204 @@
+"""
+In-process ASGI load driver for the /api/v1 routes
+
+Drives the full application (middleware, routing, validation, database)
+through httpx's ASGI transport, so no server or network is involved. Each
+database size runs in its own process against a copy of a seeded database;
+every route is loaded in turn by concurrent clients and reported as
+throughput plus p50/p95/p99 latency. Results are written as JSON for
+benchmarks.compare.
+
+Usage: python -m benchmarks.load [--sizes 10000,100000,1000000] [--requests 500] [--concurrency 16]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict
+
+from benchmarks.common import configure_app, prepare_database, save_results, summarize
+from benchmarks.seed import ensure_seeded
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="Comma-separated store counts")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--requests", type=int, default=500, help="Requests per route")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent clients per route")
+    parser.add_argument("--routes", default=None, help="Comma-separated subset of route names")
+    parser.add_argument("--cache-backend", default="memory", help="CACHE_BACKEND for the app under test")
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--worker", type=int, default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--worker-output", default=None, help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+ARGS = parse_args() if __name__ == "__main__" else None
+if ARGS is not None and ARGS.worker is not None:
+    configure_app(prepare_database(ensure_seeded(ARGS.worker, ARGS.seed)), ARGS.cache_backend)
+
+    import asyncio
+    import random
+    from datetime import datetime, timedelta
+    from typing import Callable, List, Optional, Tuple
+    from urllib.parse import quote_plus
+
+    import httpx
+
+    from benchmarks.seed import INSPECTORS, ZONE_CELL, ZONE_COLUMNS, ZONE_ORIGIN, ZONE_ROWS, ZONES
+    from main import app
+
+    # Route name -> (share of --requests, builder of (method, path, json body) per request)
+    Request = Tuple[str, str, Optional[dict]]
+
+    def route_plan(stores: int, rng: random.Random) -> Dict[str, Tuple[float, Callable[[int], Request]]]:
+        return {
+            "GET /tindahan": (1.0, lambda i: ("GET", f"/api/v1/tindahan?skip={rng.randint(0, 50) * 100}&limit=100", None)),
+            "GET /tindahan?cursor": (1.0, lambda i: ("GET", f"/api/v1/tindahan?limit=100&skip=0&cursor={_cursor(rng.randint(1, stores))}", None)),
+            "GET /tindahan/{id}": (1.0, lambda i: ("GET", f"/api/v1/tindahan/{rng.randint(1, stores)}", None)),
+            "GET /tindahan/search": (1.0, lambda i: ("GET", f"/api/v1/tindahan/search?q={rng.choice(SEARCH_TERMS)}", None)),
+            "GET /tindahan/nearby": (1.0, lambda i: ("GET", f"/api/v1/tindahan/nearby?{_point(rng)}&radius_m=300", None)),
+            "GET /inspections": (1.0, lambda i: ("GET", f"/api/v1/inspections?tindahan_id={rng.randint(1, stores)}", None)),
+            "GET /violations": (1.0, lambda i: ("GET", f"/api/v1/violations?is_resolved=false&min_severity=4&limit=100", None)),
+            "GET /compliance/metrics": (1.0, lambda i: ("GET", "/api/v1/compliance/metrics", None)),
+            "GET / (page)": (1.0, lambda i: ("GET", "/", None)),
+            "GET /tindahan (page)": (1.0, lambda i: ("GET", f"/tindahan?zone={quote_plus(rng.choice(ZONES))}&page={rng.randint(1, 20)}", None)),
+            "PUT /tindahan/{id}": (1.0, lambda i: ("PUT", f"/api/v1/tindahan/{rng.randint(1, stores)}", {"contact_number": f"09{i:09d}"})),
+            "POST /tindahan": (1.0, lambda i: ("POST", "/api/v1/tindahan", _registration(rng, i))),
+            "POST /inspections": (1.0, lambda i: ("POST", "/api/v1/inspections", {
+                "tindahan_id": rng.randint(1, stores),
+                "inspection_type": "routine",
+                "inspector_name": rng.choice(INSPECTORS),
+                "inspection_date": (datetime(2026, 1, 1) + timedelta(days=rng.randint(0, 90))).isoformat(),
+            })),
+            # Zone reports aggregate a whole zone; far fewer requests keep the run short
+            "POST /reports": (0.05, lambda i: ("POST", "/api/v1/reports", {
+                "report_type": "zone_specific",
+                "report_period_start": "2025-01-01T00:00:00",
+                "report_period_end": "2026-01-01T00:00:00",
+                "barangay_zone": rng.choice(ZONES),
+                "generated_by": "Benchmark",
+            })),
+        }
+
+    SEARCH_TERMS = ["maria", "sari-sari", "santos", "rizal", "karinderia", "bautsta"]
+
+    def _cursor(after_id: int) -> str:
+        from app.utils.helpers import encode_cursor
+        return encode_cursor(after_id)
+
+    def _point(rng: random.Random) -> str:
+        latitude = ZONE_ORIGIN[0] + rng.random() * ZONE_ROWS * ZONE_CELL[0]
+        longitude = ZONE_ORIGIN[1] + rng.random() * ZONE_COLUMNS * ZONE_CELL[1]
+        return f"lat={latitude:.6f}&lon={longitude:.6f}"
+
+    def _registration(rng: random.Random, index: int) -> dict:
+        return {
+            "business_name": f"Load Test Store {index}",
+            "owner_name": f"Owner {index}",
+            "business_type": "tindahan",
+            "address": f"{index} Rizal St",
+            "barangay_zone": rng.choice(ZONES),
+            "permit_expiry_date": "2027-01-01T00:00:00",
+        }
+
+    async def load_route(client: httpx.AsyncClient, build: Callable[[int], Request], requests: int, concurrency: int) -> Dict[str, Any]:
+        """Send `requests` requests from `concurrency` clients; summarize latency and throughput."""
+        timings: List[float] = []
+        statuses: Dict[str, int] = {}
+        errors = 0
+        next_index = iter(range(requests))
+
+        async def client_loop() -> None:
+            nonlocal errors
+            for index in next_index:
+                method, path, body = build(index)
+                started = time.perf_counter()
+                response = await client.request(method, path, json=body)
+                timings.append(time.perf_counter() - started)
+                statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+                if response.status_code >= 400:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        summary = summarize(timings)
+        summary.update(
+            throughput_rps=round(len(timings) / elapsed, 2), concurrency=concurrency, errors=errors, statuses=statuses
+        )
+        return summary
+
+    async def run_worker(args: argparse.Namespace) -> Dict[str, Any]:
+        rng = random.Random(args.seed)
+        plan = route_plan(args.worker, rng)
+        selected = args.routes.split(",") if args.routes else list(plan)
+        results: Dict[str, Any] = {}
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+                for name in selected:
+                    share, build = plan[name]
+                    requests = max(1, int(args.requests * share))
+                    # Warm up connections, statement caches and the read cache outside the measurement
+                    for index in range(min(10, requests)):
+                        method, path, body = build(-index - 1)
+                        await client.request(method, path, json=body)
+                    results[name] = await load_route(client, build, requests, min(args.concurrency, requests))
+                    print(
+                        f"{args.worker:>8} rows  {name:<24} {results[name]['throughput_rps']:>9.1f} req/s  "
+                        f"p50 {results[name]['p50_ms']:>8.2f}ms  p95 {results[name]['p95_ms']:>8.2f}ms  "
+                        f"p99 {results[name]['p99_ms']:>8.2f}ms  errors {results[name]['errors']}",
+                        file=sys.stderr
+                    )
+        return results
+
+
+def run_size(args: argparse.Namespace, stores: int) -> Dict[str, Any]:
+    """Load one database size in a fresh interpreter so app settings and caches start clean."""
+    ensure_seeded(stores, args.seed)
+    handle, output = tempfile.mkstemp(prefix="bench_load_", suffix=".json")
+    os.close(handle)
+    command = [
+        sys.executable, "-m", "benchmarks.load", "--worker", str(stores), "--worker-output", output,
+        "--seed", str(args.seed), "--requests", str(args.requests), "--concurrency", str(args.concurrency),
+        "--cache-backend", args.cache_backend,
+    ]
+    if args.routes:
+        command += ["--routes", args.routes]
+    try:
+        subprocess.run(command, check=True)
+        with open(output) as handle:
+            return json.load(handle)
+    finally:
+        os.remove(output)
+
+
+def main(args: argparse.Namespace) -> None:
+    if args.worker is not None:
+        results = asyncio.run(run_worker(args))
+        with open(args.worker_output, "w") as handle:
+            json.dump(results, handle)
+        return
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    results: Dict[str, Any] = {}
+    for stores in sizes:
+        started = time.perf_counter()
+        for route, summary in run_size(args, stores).items():
+            results[f"{stores}:{route}"] = summary
+        print(f"{stores} rows loaded in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    parameters = {
+        "sizes": sizes, "seed": args.seed, "requests": args.requests, "concurrency": args.concurrency,
+        "routes": args.routes, "cache_backend": args.cache_backend,
+    }
+    save_results("load", parameters, results, args.output)
+
+
+if __name__ == "__main__":
+    main(ARGS)
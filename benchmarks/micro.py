@@ -0,0 +1,211 @@
+"""
+Micro-benchmarks for the store controller and response validation
+
+Times every public store_controller function against a seeded database, each
+call in its own session as a request would make it, and times
+TindahanResponse.model_validate over large result sets of ORM rows and row
+mappings. Results are written as JSON for benchmarks.compare.
+
+Usage: python -m benchmarks.micro [--stores 10000] [--iterations 200] [--output results.json]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+from benchmarks.common import configure_app, prepare_database, save_results, summarize
+from benchmarks.seed import ensure_seeded
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--stores", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--iterations", type=int, default=200, help="Calls per single-row benchmark")
+    parser.add_argument("--bulk-iterations", type=int, default=5, help="Calls per bulk benchmark")
+    parser.add_argument("--validate-sizes", default="1000,10000,100000", help="Result set sizes for model_validate")
+    parser.add_argument("--output", default=None)
+    return parser.parse_args()
+
+
+ARGS = parse_args() if __name__ == "__main__" else None
+if ARGS is not None:
+    configure_app(prepare_database(ensure_seeded(ARGS.stores, ARGS.seed)))
+
+import asyncio
+from contextlib import aclosing
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List
+
+from sqlmodel import select
+
+from app.cache import LRUCache, NullCache, set_cache_backend
+from app.database import async_session, engine, read_engine
+from app.geo import get_zone_boundaries
+from app.controllers import store_controller
+from app.models.store import Tindahan, TindahanCreate, TindahanUpdate, TindahanBulkUpdate, TindahanResponse, BusinessType
+from benchmarks.seed import ZONE_CELL, ZONE_COLUMNS, ZONE_ORIGIN, ZONE_ROWS, ZONES
+
+STREAM_ROWS = 5000
+BULK_ROWS = 1000
+
+
+def _registration(index: int) -> TindahanCreate:
+    return TindahanCreate(
+        business_name=f"Benchmark Store {index}",
+        owner_name=f"Owner {index}",
+        business_type=BusinessType.TINDAHAN,
+        address=f"{index} Rizal St",
+        barangay_zone=ZONES[index % len(ZONES)],
+        permit_expiry_date=datetime(2027, 1, 1) + timedelta(days=index % 365),
+    )
+
+
+async def _time(call: Callable[[int], Awaitable[Any]], iterations: int, rows_per_call: int = 1) -> Dict[str, Any]:
+    """Run call(i) in a fresh session per iteration and summarize the latencies."""
+    timings: List[float] = []
+    for index in range(iterations):
+        started = time.perf_counter()
+        await call(index)
+        timings.append(time.perf_counter() - started)
+    summary = summarize(timings)
+    summary["ops_per_sec"] = round(iterations / sum(timings), 2) if timings else 0.0
+    if rows_per_call > 1:
+        summary["rows_per_call"] = rows_per_call
+        summary["us_per_row"] = round(summary["mean_ms"] * 1000 / rows_per_call, 4)
+    return summary
+
+
+def _in_session(function: Callable[..., Awaitable[Any]]) -> Callable[[int], Awaitable[Any]]:
+    """Adapt `function(db, i)` to open its own session per call."""
+    async def call(index: int) -> Any:
+        async with async_session() as db:
+            return await function(db, index)
+    return call
+
+
+async def _stream_first_rows(db, index: int) -> int:
+    seen = 0
+    async with aclosing(store_controller.stream_tindahan(db)) as batches:
+        async for batch in batches:
+            seen += len(batch)
+            if seen >= STREAM_ROWS:
+                break
+    return seen
+
+
+async def controller_benchmarks(stores: int, iterations: int, bulk_iterations: int) -> Dict[str, Any]:
+    """Time each store_controller entry point."""
+    rng = random.Random(7)
+    ids = [rng.randint(1, stores) for _ in range(iterations)]
+    async with async_session() as db:
+        result = await db.execute(select(Tindahan.business_name).where(Tindahan.id.in_(ids[:50])))
+        names = result.scalars().all()
+    deep_skip = max(0, int(stores * 0.9) - 100)
+    # Points spread over the seeded zone grid for nearby searches
+    points = [
+        (ZONE_ORIGIN[0] + rng.random() * ZONE_ROWS * ZONE_CELL[0], ZONE_ORIGIN[1] + rng.random() * ZONE_COLUMNS * ZONE_CELL[1])
+        for _ in range(iterations)
+    ]
+    boundaries = get_zone_boundaries()
+    results: Dict[str, Any] = {}
+
+    set_cache_backend(NullCache())
+    uncached = {
+        "get_tindahan": lambda db, i: store_controller.get_tindahan(db, ids[i]),
+        "get_tindahan_list[first_page]": lambda db, i: store_controller.get_tindahan_list(db, 0, 100),
+        "get_tindahan_list[deep_offset]": lambda db, i: store_controller.get_tindahan_list(db, deep_skip, 100),
+        "get_tindahan_list[deep_cursor]": lambda db, i: store_controller.get_tindahan_list(db, 0, 100, True, deep_skip),
+        "get_tindahan_list_json[first_page]": lambda db, i: store_controller.get_tindahan_list_json(db, 0, 100),
+        "get_tindahan_list_json[max_page]": lambda db, i: store_controller.get_tindahan_list_json(db, 0, 1000),
+        "get_tindahan_by_name": lambda db, i: store_controller.get_tindahan_by_name(db, names[i % len(names)]),
+        "search_tindahan[exact]": lambda db, i: store_controller.search_tindahan(db, "Maria Santos"),
+        "search_tindahan[fuzzy]": lambda db, i: store_controller.search_tindahan(db, "Karinderia Bautsta"),
+        "get_nearby_tindahan[300m]": lambda db, i: store_controller.get_nearby_tindahan(db, *points[i], 300),
+        "get_nearby_tindahan[1km,limit500]": lambda db, i: store_controller.get_nearby_tindahan(db, *points[i], 1000, 500),
+        "find_out_of_zone_tindahan[100]": lambda db, i: store_controller.find_out_of_zone_tindahan(db, boundaries, 100),
+        "update_tindahan": lambda db, i: store_controller.update_tindahan(db, ids[i], TindahanUpdate(contact_number=f"09{i:09d}")),
+        "create_tindahan": lambda db, i: store_controller.create_tindahan(db, _registration(i)),
+        "delete_tindahan": lambda db, i: store_controller.delete_tindahan(db, ids[i]),
+    }
+    for name, function in uncached.items():
+        results[name] = await _time(_in_session(function), iterations)
+    results["stream_tindahan"] = await _time(
+        _in_session(_stream_first_rows), max(1, iterations // 20), STREAM_ROWS
+    )
+
+    # Bulk writes of BULK_ROWS rows per call, in the endpoints' chunk size
+    async def bulk_create(db, i):
+        rows = [(index, _registration(i * BULK_ROWS + index)) for index in range(BULK_ROWS)]
+        return await store_controller.bulk_create_tindahan(db, rows)
+
+    async def bulk_update(db, i):
+        rows = [
+            (index, TindahanBulkUpdate(id=rng.randint(1, stores), contact_number=f"09{index:09d}"))
+            for index in range(BULK_ROWS)
+        ]
+        return await store_controller.bulk_update_tindahan(db, rows)
+
+    results["bulk_create_tindahan"] = await _time(_in_session(bulk_create), bulk_iterations, BULK_ROWS)
+    results["bulk_update_tindahan"] = await _time(_in_session(bulk_update), bulk_iterations, BULK_ROWS)
+
+    # Read-through cache hits: warm once, then every call is served from memory
+    set_cache_backend(LRUCache())
+    hot_ids = ids[:20]
+    for tindahan_id in hot_ids:
+        async with async_session() as db:
+            await store_controller.get_tindahan(db, tindahan_id)
+    async with async_session() as db:
+        await store_controller.get_tindahan_list(db, 0, 100)
+    results["get_tindahan[cached]"] = await _time(
+        _in_session(lambda db, i: store_controller.get_tindahan(db, hot_ids[i % len(hot_ids)])), iterations
+    )
+    results["get_tindahan_list[first_page,cached]"] = await _time(
+        _in_session(lambda db, i: store_controller.get_tindahan_list(db, 0, 100)), iterations
+    )
+    return results
+
+
+async def validate_benchmarks(sizes: List[int], repeats: int = 3) -> Dict[str, Any]:
+    """Time TindahanResponse.model_validate over large ORM and mapping result sets."""
+    results: Dict[str, Any] = {}
+    for size in sizes:
+        async with async_session() as db:
+            result = await db.execute(select(Tindahan).order_by(Tindahan.id).limit(size))
+            orm_rows = result.scalars().all()
+            result = await db.execute(select(Tindahan.__table__).order_by(Tindahan.id).limit(size))
+            mappings = [dict(row._mapping) for row in result]
+        if len(orm_rows) < size:
+            print(f"Skipping model_validate[{size}]: only {len(orm_rows)} rows seeded", file=sys.stderr)
+            continue
+
+        for kind, rows in (("orm", orm_rows), ("mapping", mappings)):
+            async def validate(index: int, rows=rows) -> None:
+                [TindahanResponse.model_validate(row) for row in rows]
+            results[f"model_validate[{kind},{size}]"] = await _time(validate, repeats, size)
+    return results
+
+
+async def main(args: argparse.Namespace) -> str:
+    sizes = [int(size) for size in args.validate_sizes.split(",") if size]
+    results: Dict[str, Any] = {}
+    results.update(await controller_benchmarks(args.stores, args.iterations, args.bulk_iterations))
+    results.update(await validate_benchmarks(sizes))
+    await engine.dispose()
+    await read_engine.dispose()
+
+    width = max(len(name) for name in results)
+    for name, summary in results.items():
+        per_row = f"  {summary['us_per_row']:>9.2f}us/row" if "us_per_row" in summary else ""
+        print(f"{name:<{width}}  p50 {summary['p50_ms']:>9.3f}ms  p99 {summary['p99_ms']:>9.3f}ms{per_row}")
+    parameters = {
+        "stores": args.stores, "seed": args.seed, "iterations": args.iterations,
+        "bulk_iterations": args.bulk_iterations, "validate_sizes": sizes,
+    }
+    return save_results(f"micro-{args.stores}", parameters, results, args.output)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(ARGS))
@@ -0,0 +1,134 @@
+"""
+Inspection planner benchmark: planning time and route length for a large backlog
+
+Leaves a fixed sample of the seed's scheduled inspections open, cancels the
+rest, and plans them for a team of inspectors. Reports the solver's own time,
+the whole controller call including the candidate query, and total route
+length against a naive plan that deals the same daily visits out round-robin
+in urgency order. Results are written as JSON for benchmarks.compare.
+
+Usage: python -m benchmarks.planning [--inspections 5000] [--inspectors 30] [--output results.json]
+"""
+
+import argparse
+import sqlite3
+import sys
+import time
+
+from benchmarks.common import configure_app, prepare_database, save_results, summarize
+from benchmarks.seed import ensure_seeded
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--stores", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--inspections", type=int, default=5000)
+    parser.add_argument("--inspectors", type=int, default=30)
+    parser.add_argument("--days", type=int, default=10)
+    parser.add_argument("--stops-per-day", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", default=None)
+    return parser.parse_args()
+
+
+def keep_scheduled(database_path: str, count: int) -> None:
+    """Cancel all but `count` scheduled inspections of active stores, picked by a fixed scatter of ids."""
+    with sqlite3.connect(database_path) as conn:
+        conn.execute(
+            """
+            UPDATE inspection SET status = 'CANCELLED'
+            WHERE status = 'SCHEDULED' AND id NOT IN (
+                SELECT inspection.id FROM inspection JOIN tindahan ON tindahan.id = inspection.tindahan_id
+                WHERE inspection.status = 'SCHEDULED' AND tindahan.is_active = 1
+                ORDER BY inspection.id * 7919 % 100003, inspection.id
+                LIMIT ?
+            )
+            """,
+            (count,),
+        )
+
+
+ARGS = parse_args() if __name__ == "__main__" else None
+if ARGS is not None:
+    DATABASE_PATH = prepare_database(ensure_seeded(ARGS.stores, ARGS.seed))
+    keep_scheduled(DATABASE_PATH, ARGS.inspections)
+    configure_app(DATABASE_PATH)
+
+import asyncio
+from datetime import date, timedelta
+from typing import Any, Dict, List
+
+from app.database import async_read_session, init_db
+from app.controllers.planning_controller import _load_visits, plan_inspections
+from app.models.planning import InspectionPlanRequest
+from app.planner import Route, plan_routes, working_days
+
+
+def round_robin_distance(routes: List[Route], inspectors: int) -> float:
+    """Length of the same days' visits dealt to inspectors one by one in urgency order, unreordered."""
+    total = 0.0
+    for day in sorted({route.day for route in routes}):
+        visits = sorted((visit for route in routes if route.day == day for visit in route.visits), key=lambda visit: visit.urgency)
+        for offset in range(inspectors):
+            total += Route(inspector_name="", day=day, visits=visits[offset::inspectors]).distance_m
+    return total
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    await init_db()
+    inspectors = [f"Inspector {number}" for number in range(1, args.inspectors + 1)]
+    start = date.today()
+    days = working_days(start, args.days)
+    request = InspectionPlanRequest(inspectors=inspectors, start_date=start, days=args.days, stops_per_day=args.stops_per_day)
+
+    solver_seconds: List[float] = []
+    controller_seconds: List[float] = []
+    async with async_read_session() as db:
+        for _ in range(args.repeat):
+            visits = await _load_visits(db, days[-1] + timedelta(days=1), None)
+            started = time.perf_counter()
+            routes, unplanned = plan_routes(visits, inspectors, days, args.stops_per_day)
+            solver_seconds.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            plan = await plan_inspections(db, request)
+            controller_seconds.append(time.perf_counter() - started)
+
+    naive_m = round_robin_distance(routes, args.inspectors)
+    results = {
+        "solver": summarize(solver_seconds),
+        "controller": summarize(controller_seconds),
+        "plan": {
+            "candidates": plan.candidates,
+            "planned": plan.planned,
+            "unplanned": len(plan.unplanned_inspection_ids),
+            "routes": len(plan.routes),
+            "distance_km": round(plan.distance_m / 1000, 1),
+            "round_robin_distance_km": round(naive_m / 1000, 1),
+        },
+    }
+    print(
+        f"{plan.candidates} candidates, {plan.planned} planned into {len(plan.routes)} routes, "
+        f"{len(plan.unplanned_inspection_ids)} left over",
+        file=sys.stderr,
+    )
+    print(
+        f"solver p50 {results['solver']['p50_ms']:.0f} ms, controller p50 {results['controller']['p50_ms']:.0f} ms; "
+        f"{plan.distance_m / 1000:.1f} km routed vs {naive_m / 1000:.1f} km round-robin",
+        file=sys.stderr,
+    )
+    return results
+
+
+def main(args: argparse.Namespace) -> str:
+    results = asyncio.run(run(args))
+    parameters = {
+        "stores": args.stores, "seed": args.seed, "inspections": args.inspections, "inspectors": args.inspectors,
+        "days": args.days, "stops_per_day": args.stops_per_day, "repeat": args.repeat,
+    }
+    return save_results(f"planning-{args.inspections}", parameters, results, args.output)
+
+
+if __name__ == "__main__":
+    main(ARGS)
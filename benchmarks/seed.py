@@ -0,0 +1,319 @@
+"""
+Deterministic data generator for benchmarks
+
+Seeds a fresh SQLite database with N tindahan plus their inspections and
+violations. Zones follow a Zipf-like skew (a few dense zones hold most
+stores), compliance status follows permit expiry, and violations cluster on
+stores that are already flagged, so filters and aggregates see realistic
+selectivity. Stores are mapped inside their zone's polygon except for some
+roaming vendors, and the polygons are written to benchmarks/data/zones.geojson.
+The same --stores and --seed always produce the same rows.
+
+Usage: python -m benchmarks.seed --stores 100000 [--seed 42] [--out path.db]
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional
+
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.schema import CreateTable
+from sqlmodel import SQLModel
+
+from app.models import Tindahan, Inspection, Violation
+from app.models.store import BusinessType, ComplianceStatus
+from app.models.inspection import InspectionStatus, InspectionType, ViolationType
+from app.controllers.compliance_controller import rebuild_compliance_counters
+
+# Bump when the generated data changes, so cached seed files are rebuilt
+GENERATOR_VERSION = 2
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+ZONES_FILE = os.path.join(DATA_DIR, "zones.geojson")
+CHUNK_SIZE = 5000
+
+ZONES = [f"Zone {index}" for index in range(1, 13)]
+ZONE_WEIGHTS = [1 / (rank ** 0.9) for rank in range(1, len(ZONES) + 1)]
+
+# Zones tile a 3 x 4 grid of roughly 3 km cells; shared borders are jagged
+# (the same jitter on both sides) so point-in-polygon sees realistic outlines
+ZONE_ROWS, ZONE_COLUMNS = 3, 4
+ZONE_ORIGIN = (14.5500, 120.9600)
+ZONE_CELL = (0.0270, 0.0280)
+BORDER_POINTS = 24
+BORDER_JITTER = 0.08
+MOBILE_TYPES = {BusinessType.FOOD_CART, BusinessType.STREET_HAWKER, BusinessType.PEDDLER}
+
+FIRST_NAMES = [
+    "Maria", "Jose", "Juan", "Ana", "Pedro", "Rosa", "Carlos", "Liza", "Ramon", "Elena", "Nena", "Tomas",
+    "Ligaya", "Bayani", "Dolores", "Andres", "Corazon", "Emilio", "Imelda", "Rogelio", "Teresita", "Danilo",
+    "Marites", "Rodel", "Gloria", "Ernesto", "Luzviminda", "Fernando", "Divina", "Arnel",
+]
+LAST_NAMES = [
+    "Santos", "Reyes", "Cruz", "Bautista", "Ocampo", "Garcia", "Mendoza", "Torres", "Villanueva", "Ramos",
+    "Aquino", "Dizon", "Manalo", "Castillo", "Flores", "Gonzales", "Navarro", "Pascual", "Salazar", "Tolentino",
+]
+STORE_WORDS = ["Sari-Sari", "Store", "Mini Mart", "Kainan", "Bigasan", "Grocery", "Talipapa", "Karinderya", "Tindahan"]
+STREETS = [
+    "Rizal St", "Mabini St", "Bonifacio Ave", "Luna St", "Del Pilar St", "Quezon Blvd", "Burgos St",
+    "Aguinaldo Rd", "Magsaysay Ave", "Jacinto St", "Lapu-Lapu St", "Silang St",
+]
+INSPECTORS = [f"{first} {last}" for first, last in zip(FIRST_NAMES[::2], LAST_NAMES)]
+
+BUSINESS_TYPES = [BusinessType.TINDAHAN, BusinessType.FOOD_CART, BusinessType.STREET_HAWKER, BusinessType.PEDDLER, BusinessType.OTHER]
+BUSINESS_TYPE_WEIGHTS = [55, 15, 15, 10, 5]
+STATUSES = [ComplianceStatus.COMPLIANT, ComplianceStatus.WARNING, ComplianceStatus.VIOLATION, ComplianceStatus.SUSPENDED]
+STATUS_WEIGHTS_VALID = [85, 10, 4, 1]
+STATUS_WEIGHTS_EXPIRED = [5, 50, 35, 10]
+INSPECTIONS_PER_STORE = [0, 1, 2, 3, 4]
+INSPECTIONS_PER_STORE_WEIGHTS = [10, 35, 30, 15, 10]
+PAST_INSPECTION_STATUSES = [InspectionStatus.COMPLETED, InspectionStatus.CANCELLED, InspectionStatus.SCHEDULED, InspectionStatus.IN_PROGRESS]
+PAST_INSPECTION_STATUS_WEIGHTS = [80, 10, 8, 2]
+SEVERITY_WEIGHTS = [30, 30, 20, 13, 7]
+
+
+def schema_fingerprint() -> str:
+    """Short hash of the table DDL and generator version, so cached seed files are rebuilt when either changes."""
+    ddl = "".join(str(CreateTable(table)) for table in SQLModel.metadata.sorted_tables)
+    return hashlib.sha1(f"{GENERATOR_VERSION}:{ddl}".encode()).hexdigest()[:8]
+
+
+def seed_path(stores: int, seed: int) -> str:
+    """Cache location of a seeded database."""
+    return os.path.join(DATA_DIR, f"seed-{stores}-s{seed}-{schema_fingerprint()}.db")
+
+
+def _border_offset(line: str, index: int, point: int) -> float:
+    """Deterministic jitter of a border point, shared by the zones on both sides.
+
+    Tapers to zero at the cell corners so crossing borders never intersect.
+    """
+    if point in (0, BORDER_POINTS):
+        return 0.0
+    digest = hashlib.sha1(f"{line}:{index}:{point}".encode()).digest()
+    return (digest[0] / 255 - 0.5) * 2 * BORDER_JITTER * math.sin(math.pi * point / BORDER_POINTS)
+
+
+def _border(row: int, column: int, horizontal: bool) -> List[tuple]:
+    """Points (lat, lon) of the grid border starting at a cell corner, west-to-east or south-to-north."""
+    lat0, lon0 = ZONE_ORIGIN
+    cell_lat, cell_lon = ZONE_CELL
+    points = []
+    for point in range(BORDER_POINTS + 1):
+        step = point / BORDER_POINTS
+        if horizontal:
+            offset = _border_offset("h", row * 100 + column, point) if 0 < row < ZONE_ROWS else 0.0
+            points.append((lat0 + (row + offset) * cell_lat, lon0 + (column + step) * cell_lon))
+        else:
+            offset = _border_offset("v", row * 100 + column, point) if 0 < column < ZONE_COLUMNS else 0.0
+            points.append((lat0 + (row + step) * cell_lat, lon0 + (column + offset) * cell_lon))
+    return points
+
+
+def zone_boundaries() -> dict:
+    """GeoJSON FeatureCollection of the seeded zones, for ZONE_BOUNDARIES_FILE."""
+    features = []
+    for index, name in enumerate(ZONES):
+        row, column = divmod(index, ZONE_COLUMNS)
+        ring = (
+            _border(row, column, True)
+            + _border(row, column + 1, False)[1:]
+            + _border(row + 1, column, True)[::-1][1:]
+            + _border(row, column, False)[::-1][1:]
+        )
+        features.append({
+            "type": "Feature",
+            "properties": {"name": name},
+            "geometry": {"type": "Polygon", "coordinates": [[[lon, lat] for lat, lon in ring]]},
+        })
+    return {"type": "FeatureCollection", "features": features}
+
+
+def _location(rng: random.Random, zone: str) -> tuple:
+    """A point well inside a zone's cell, clear of the jagged borders."""
+    row, column = divmod(ZONES.index(zone), ZONE_COLUMNS)
+    margin = BORDER_JITTER + 0.02
+    return (
+        round(ZONE_ORIGIN[0] + (row + rng.uniform(margin, 1 - margin)) * ZONE_CELL[0], 7),
+        round(ZONE_ORIGIN[1] + (column + rng.uniform(margin, 1 - margin)) * ZONE_CELL[1], 7),
+    )
+
+
+def _chunks(rows: Iterator[dict], size: int = CHUNK_SIZE) -> Iterator[List[dict]]:
+    chunk: List[dict] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _stores(rng: random.Random, count: int, now: datetime) -> Iterator[dict]:
+    for store_id in range(1, count + 1):
+        registered = now - timedelta(days=rng.randint(30, 3650))
+        issued = registered + timedelta(days=rng.randint(0, 30))
+        expiry = now + timedelta(days=rng.randint(-365, 730))
+        status = rng.choices(STATUSES, STATUS_WEIGHTS_EXPIRED if expiry < now else STATUS_WEIGHTS_VALID)[0]
+        first = rng.choice(FIRST_NAMES)
+        business_type = rng.choices(BUSINESS_TYPES, BUSINESS_TYPE_WEIGHTS)[0]
+        zone = rng.choices(ZONES, ZONE_WEIGHTS)[0]
+        # Most stores are mapped inside their zone; some vendors roam into another one
+        latitude = longitude = None
+        if rng.random() < 0.95:
+            located = rng.choice(ZONES) if business_type in MOBILE_TYPES and rng.random() < 0.15 else zone
+            latitude, longitude = _location(rng, located)
+        yield {
+            "id": store_id,
+            "business_name": f"{first}'s {rng.choice(STORE_WORDS)}",
+            "owner_name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "business_type": business_type,
+            "address": f"{rng.randint(1, 999)} {rng.choice(STREETS)}",
+            "contact_number": f"09{rng.randint(100000000, 999999999)}" if rng.random() < 0.7 else None,
+            "barangay_zone": zone,
+            "is_active": rng.random() < 0.95,
+            "latitude": latitude,
+            "longitude": longitude,
+            "business_permit_number": f"BP-{issued.year}-{store_id:07d}",
+            "permit_issued_date": issued,
+            "permit_expiry_date": expiry,
+            "compliance_status": status,
+            "last_inspection_date": None,
+            "next_inspection_due": now + timedelta(days=rng.randint(-60, 180)),
+            "registered_at": registered,
+            "updated_at": registered,
+        }
+
+
+def _inspections(rng: random.Random, stores: int, now: datetime, completed: Dict[int, bool]) -> Iterator[dict]:
+    inspection_id = 0
+    for store_id in range(1, stores + 1):
+        for _ in range(rng.choices(INSPECTIONS_PER_STORE, INSPECTIONS_PER_STORE_WEIGHTS)[0]):
+            inspection_id += 1
+            inspection_date = now + timedelta(days=rng.randint(-730, 60), hours=rng.randint(8, 17))
+            if inspection_date > now:
+                status = InspectionStatus.SCHEDULED
+            else:
+                status = rng.choices(PAST_INSPECTION_STATUSES, PAST_INSPECTION_STATUS_WEIGHTS)[0]
+            completed[inspection_id] = status == InspectionStatus.COMPLETED
+            yield {
+                "id": inspection_id,
+                "tindahan_id": store_id,
+                "inspection_type": rng.choices(list(InspectionType), [60, 15, 15, 8, 2])[0],
+                "inspector_name": rng.choice(INSPECTORS),
+                "inspection_date": inspection_date,
+                "status": status,
+                "notes": None,
+                "created_at": min(inspection_date, now),
+                "updated_at": min(inspection_date, now),
+            }
+
+
+def _violations(rng: random.Random, completed: Dict[int, bool], store_of: Dict[int, int], status_of: Dict[int, ComplianceStatus], now: datetime) -> Iterator[dict]:
+    violation_id = 0
+    for inspection_id, is_completed in completed.items():
+        if not is_completed:
+            continue
+        # Stores already flagged collect most violations
+        flagged = status_of[store_of[inspection_id]] != ComplianceStatus.COMPLIANT
+        for _ in range(rng.choices([0, 1, 2, 3], [20, 35, 30, 15] if flagged else [80, 15, 4, 1])[0]):
+            violation_id += 1
+            created = now - timedelta(days=rng.randint(0, 730))
+            resolved = rng.random() < 0.6
+            yield {
+                "id": violation_id,
+                "inspection_id": inspection_id,
+                "violation_type": rng.choice(list(ViolationType)),
+                "description": "Seeded violation",
+                "severity": rng.choices([1, 2, 3, 4, 5], SEVERITY_WEIGHTS)[0],
+                "is_resolved": resolved,
+                "resolution_notes": "Corrected on site" if resolved else None,
+                "resolution_date": created + timedelta(days=rng.randint(1, 60)) if resolved else None,
+                "created_at": created,
+                "updated_at": created,
+            }
+
+
+async def seed_database(path: str, stores: int, seed: int = 42) -> Dict[str, int]:
+    """Create a fresh database at `path` and fill it; returns row counts per table."""
+    if os.path.exists(path):
+        os.remove(path)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _fast_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=OFF")
+        cursor.execute("PRAGMA cache_size=-200000")
+        cursor.close()
+
+    rng = random.Random(seed)
+    # Fixed reference time so the same seed yields the same rows on any day
+    now = datetime(2026, 1, 1)
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+    counts = {"tindahan": 0, "inspection": 0, "violation": 0}
+    status_of: Dict[int, ComplianceStatus] = {}
+    store_of: Dict[int, int] = {}
+    completed: Dict[int, bool] = {}
+    async with engine.begin() as conn:
+        for chunk in _chunks(_stores(rng, stores, now)):
+            await conn.execute(insert(Tindahan), chunk)
+            status_of.update((row["id"], row["compliance_status"]) for row in chunk)
+            counts["tindahan"] += len(chunk)
+        for chunk in _chunks(_inspections(rng, stores, now, completed)):
+            await conn.execute(insert(Inspection), chunk)
+            store_of.update((row["id"], row["tindahan_id"]) for row in chunk)
+            counts["inspection"] += len(chunk)
+        for chunk in _chunks(_violations(rng, completed, store_of, status_of, now)):
+            await conn.execute(insert(Violation), chunk)
+            counts["violation"] += len(chunk)
+
+    async with sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)() as db:
+        await rebuild_compliance_counters(db)
+    async with engine.connect() as conn:
+        await conn.exec_driver_sql("ANALYZE")
+    await engine.dispose()
+    return counts
+
+
+def ensure_seeded(stores: int, seed: int = 42, path: Optional[str] = None) -> str:
+    """Return a seeded database for (stores, seed), generating and caching it if missing."""
+    path = path or seed_path(stores, seed)
+    os.makedirs(DATA_DIR, exist_ok=True)
+    with open(ZONES_FILE, "w") as handle:
+        json.dump(zone_boundaries(), handle)
+    if os.path.exists(path):
+        return path
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    # Build under a temporary name so an interrupted run never leaves a partial cache hit
+    partial = f"{path}.partial"
+    started = time.perf_counter()
+    counts = asyncio.run(seed_database(partial, stores, seed))
+    for suffix in ("-wal", "-shm"):
+        if os.path.exists(partial + suffix):
+            os.remove(partial + suffix)
+    os.replace(partial, path)
+    print(f"Seeded {path} in {time.perf_counter() - started:.1f}s: {counts}")
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--stores", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default=None, help="Database file (default: cached under benchmarks/data/)")
+    args = parser.parse_args()
+    print(ensure_seeded(args.stores, args.seed, args.out))
@@ -0,0 +1,141 @@
+"""
+Cold-start benchmark: import time and time to first response of a fresh server
+
+Starts `uvicorn main:app` again and again on a copy of a seeded database,
+alternating standard and fast startup (FAST_STARTUP), and times from process
+start to the first answered /health, then the first page and first API
+request after it. The server is probed over a raw socket so the client adds
+no import or TLS setup of its own to the measurement. The import profile
+(`python -X importtime -c "import main"`) is summed per top-level package to
+show where the import time goes.
+
+Usage: python -m benchmarks.startup [--runs 10] [--stores 10000] [--target-ms 300]
+"""
+
+import argparse
+import collections
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from benchmarks.common import configure_app, prepare_database, save_results, summarize
+from benchmarks.seed import ensure_seeded
+
+# Requests timed after the first /health, in order
+FIRST_REQUESTS = [("first page", "/"), ("first api", "/api/v1/tindahan?limit=20")]
+MODES = {"standard": "false", "fast": "true"}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=10, help="Cold starts per mode")
+    parser.add_argument("--stores", type=int, default=10000, help="Seeded database size")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--target-ms", type=float, default=300, help="Time-to-first-response goal")
+    parser.add_argument("--output", default=None)
+    return parser.parse_args()
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _get(port: int, path: str, deadline: float) -> int:
+    """GET over a plain socket, retrying the connection until the server listens; returns the status code."""
+    while True:
+        try:
+            sock = socket.create_connection(("127.0.0.1", port))
+            break
+        except OSError:
+            if time.perf_counter() > deadline:
+                raise RuntimeError("Server did not start in time")
+            time.sleep(0.005)
+    with sock:
+        sock.sendall(f"GET {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n".encode())
+        response = b""
+        while chunk := sock.recv(65536):
+            response += chunk
+    return int(response.split(b" ", 2)[1])
+
+
+def cold_start(fast: str) -> Dict[str, float]:
+    """Start one server and time its first responses, in seconds."""
+    port = _free_port()
+    env = dict(os.environ, FAST_STARTUP=fast, LOCK_DIR=tempfile.mkdtemp(prefix="bench_locks_"))
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    try:
+        statuses = {"/health": _get(port, "/health", started + 120)}
+        timings = {"first response": time.perf_counter() - started}
+        for name, path in FIRST_REQUESTS:
+            request_started = time.perf_counter()
+            statuses[path] = _get(port, path, request_started + 120)
+            timings[name] = time.perf_counter() - request_started
+        failed = {path: status for path, status in statuses.items() if status != 200}
+        if failed:
+            raise RuntimeError(f"Unexpected responses: {failed}")
+        return timings
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def import_profile() -> Dict[str, float]:
+    """Self import time of `main` summed per top-level package (app modules per module), in milliseconds."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"], capture_output=True, text=True, check=True
+    )
+    totals: Dict[str, float] = collections.Counter()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        package = ".".join(name.split(".")[:3]) if name.startswith("app.") else name.split(".")[0]
+        totals[package] += int(self_us) / 1000
+    return {package: round(ms, 1) for package, ms in sorted(totals.items(), key=lambda item: -item[1])}
+
+
+def main(args: argparse.Namespace) -> None:
+    configure_app(prepare_database(ensure_seeded(args.stores, args.seed)))
+    # Served pages go through the template bytecode cache, as in the image
+    os.environ["TEMPLATE_CACHE_DIR"] = tempfile.mkdtemp(prefix="bench_templates_")
+    subprocess.run([sys.executable, "-m", "app.templating"], check=True, stdout=subprocess.DEVNULL)
+
+    profile = import_profile()
+    print(f"import main: {sum(profile.values()):.0f}ms", file=sys.stderr)
+    for package, ms in list(profile.items())[:10]:
+        print(f"  {ms:>8.1f}ms  {package}", file=sys.stderr)
+
+    samples: Dict[str, Dict[str, List[float]]] = {mode: collections.defaultdict(list) for mode in MODES}
+    # Alternate the modes so machine noise hits both alike; the first start of all warms the OS caches
+    cold_start(MODES["standard"])
+    for _ in range(args.runs):
+        for mode, fast in MODES.items():
+            for name, seconds in cold_start(fast).items():
+                samples[mode][name].append(seconds)
+
+    results: Dict[str, Any] = {"import_ms": profile}
+    for mode, timings in samples.items():
+        for name, values in timings.items():
+            summary = summarize(values)
+            results[f"{mode}:{name}"] = summary
+            print(f"{mode:<9} {name:<15} p50 {summary['p50_ms']:>9.1f}ms  p95 {summary['p95_ms']:>9.1f}ms", file=sys.stderr)
+    first = results["fast:first response"]["p50_ms"]
+    verdict = "met" if first <= args.target_ms else "missed"
+    print(f"Fast startup first response p50 {first:.0f}ms: {args.target_ms:.0f}ms target {verdict}", file=sys.stderr)
+    parameters = {"runs": args.runs, "stores": args.stores, "seed": args.seed, "target_ms": args.target_ms}
+    save_results("startup", parameters, results, args.output)
+
+
+if __name__ == "__main__":
+    main(parse_args())
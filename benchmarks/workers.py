@@ -0,0 +1,186 @@
+"""
+Multi-worker scaling benchmark: real uvicorn servers with 1..N worker processes
+
+For each worker count, starts `uvicorn main:app --workers N` on a copy of a
+seeded database and drives it over HTTP from separate client processes for
+a fixed time. The read phase shows how read throughput scales with worker
+processes (and so with cores); the mixed phase has every worker writing at
+once and counts failed requests, which must stay at zero. Results are
+written as JSON for benchmarks.compare.
+
+The clients share the machine with the server, so leave them cores of their
+own (or run them elsewhere) when measuring scaling.
+
+Usage: python -m benchmarks.workers [--workers 1,2,4] [--stores 100000] [--seconds 10] [--clients 2] [--concurrency 16]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Tuple
+
+import httpx
+
+from benchmarks.common import configure_app, prepare_database, save_results, summarize
+from benchmarks.seed import ensure_seeded
+
+# Share of requests per route in each phase
+READ_MIX = [("GET /tindahan/{id}", 4), ("GET /tindahan", 2), ("GET /inspections", 2), ("GET /compliance/metrics", 1)]
+MIXED_MIX = READ_MIX + [("PUT /tindahan/{id}", 2)]
+
+
+def parse_args() -> argparse.Namespace:
+    cores = os.cpu_count() or 1
+    default_workers = sorted({1, 2} | {2 ** power for power in range(cores.bit_length()) if 2 ** power <= cores})
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", default=",".join(map(str, default_workers)), help="Comma-separated worker counts")
+    parser.add_argument("--stores", type=int, default=100000, help="Seeded database size")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--seconds", type=float, default=10, help="Measured duration of each phase")
+    parser.add_argument("--clients", type=int, default=max(2, cores // 2), help="Client processes")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent requests per client process")
+    parser.add_argument("--cache-backend", default="memory", help="CACHE_BACKEND for the servers under test")
+    parser.add_argument("--output", default=None)
+    return parser.parse_args()
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _request(rng: random.Random, route: str, stores: int, index: int) -> Tuple[str, str, Any]:
+    if route == "GET /tindahan/{id}":
+        return "GET", f"/api/v1/tindahan/{rng.randint(1, stores)}", None
+    if route == "GET /tindahan":
+        return "GET", f"/api/v1/tindahan?skip={rng.randint(0, 50) * 100}&limit=100", None
+    if route == "GET /inspections":
+        return "GET", f"/api/v1/inspections?tindahan_id={rng.randint(1, stores)}", None
+    if route == "GET /compliance/metrics":
+        return "GET", "/api/v1/compliance/metrics", None
+    return "PUT", f"/api/v1/tindahan/{rng.randint(1, stores)}", {"contact_number": f"09{index % 10 ** 9:09d}"}
+
+
+def run_client(base_url: str, mix: List[Tuple[str, int]], stores: int, seconds: float, concurrency: int, seed: int) -> Dict[str, Any]:
+    """One client process: `concurrency` connections sending requests from `mix` for `seconds`."""
+    rng = random.Random(seed)
+    routes = [route for route, weight in mix for _ in range(weight)]
+    timings: List[float] = []
+    failures: Dict[str, int] = {}
+
+    async def connection(client: httpx.AsyncClient, deadline: float) -> None:
+        index = 0
+        while time.perf_counter() < deadline:
+            method, path, body = _request(rng, rng.choice(routes), stores, seed * 1000003 + index)
+            index += 1
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body)
+                status = response.status_code
+            except httpx.HTTPError as exc:
+                status = type(exc).__name__
+            timings.append(time.perf_counter() - started)
+            if not isinstance(status, int) or status >= 400:
+                failures[str(status)] = failures.get(str(status), 0) + 1
+
+    async def main() -> None:
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+            deadline = time.perf_counter() + seconds
+            await asyncio.gather(*(connection(client, deadline) for _ in range(concurrency)))
+
+    asyncio.run(main())
+    return {"timings": timings, "failures": failures}
+
+
+def run_phase(args: argparse.Namespace, base_url: str, mix: List[Tuple[str, int]], seed: int) -> Dict[str, Any]:
+    """Drive the server from --clients processes at once and merge their results."""
+    with multiprocessing.get_context("spawn").Pool(args.clients) as pool:
+        started = time.perf_counter()
+        outcomes = pool.starmap(run_client, [
+            (base_url, mix, args.stores, args.seconds, args.concurrency, seed + client)
+            for client in range(args.clients)
+        ])
+        elapsed = time.perf_counter() - started
+    timings = [timing for outcome in outcomes for timing in outcome["timings"]]
+    failures: Dict[str, int] = {}
+    for outcome in outcomes:
+        for status, count in outcome["failures"].items():
+            failures[status] = failures.get(status, 0) + count
+    summary = summarize(timings)
+    summary.update(throughput_rps=round(len(timings) / elapsed, 2), failures=failures)
+    return summary
+
+
+def start_server(workers: int, port: int) -> subprocess.Popen:
+    """Start uvicorn with `workers` processes and wait until it answers /health."""
+    env = dict(os.environ, WEB_CONCURRENCY=str(workers), LOCK_DIR=tempfile.mkdtemp(prefix="bench_locks_"))
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    deadline = time.perf_counter() + 120
+    while time.perf_counter() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Server exited with code {server.returncode}")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                # /health answers as soon as one worker is up; give the rest time to finish startup
+                time.sleep(1 + workers * 0.5)
+                return server
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    server.kill()
+    raise RuntimeError("Server did not start within 120s")
+
+
+def stop_server(server: subprocess.Popen) -> None:
+    server.send_signal(signal.SIGINT)
+    try:
+        server.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        server.kill()
+        server.wait()
+
+
+def main(args: argparse.Namespace) -> None:
+    seed_file = ensure_seeded(args.stores, args.seed)
+    counts = [int(count) for count in args.workers.split(",") if count]
+    results: Dict[str, Any] = {}
+    for workers in counts:
+        configure_app(prepare_database(seed_file), args.cache_backend)
+        port = _free_port()
+        server = start_server(workers, port)
+        try:
+            base_url = f"http://127.0.0.1:{port}"
+            for phase, mix in (("read", READ_MIX), ("mixed", MIXED_MIX)):
+                summary = run_phase(args, base_url, mix, args.seed)
+                results[f"{workers}:{phase}"] = summary
+                baseline = results.get(f"1:{phase}")
+                scaling = f"  x{summary['throughput_rps'] / baseline['throughput_rps']:.2f}" if baseline else ""
+                print(
+                    f"{workers:>3} workers  {phase:<6} {summary['throughput_rps']:>9.1f} req/s{scaling}  "
+                    f"p50 {summary['p50_ms']:>8.2f}ms  p99 {summary['p99_ms']:>8.2f}ms  failures {summary['failures'] or 0}",
+                    file=sys.stderr
+                )
+        finally:
+            stop_server(server)
+    parameters = {
+        "workers": counts, "stores": args.stores, "seed": args.seed, "seconds": args.seconds,
+        "clients": args.clients, "concurrency": args.concurrency, "cache_backend": args.cache_backend,
+    }
+    save_results("workers", parameters, results, args.output)
+
+
+if __name__ == "__main__":
+    main(parse_args())
@@ -7,21 +7,34 @@ A Vibecamp Creation
 
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.database import init_db
+from app.database import engine, read_engine
+from app.startup import FAST_STARTUP, BackgroundServices, prepare_database, warm_caches
+from app.workers import WEB_CONCURRENCY
+from app.audit import ActorMiddleware
+from app.compression import CompressionMiddleware
+from app.metrics import MetricsMiddleware, TimedRoute, instrument_engine, render_metrics
 from app.routes import api_router, web_router
+from app.templating import STATIC_DIR, CachedStaticFiles
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Manage application lifespan."""
     # Startup
-    await init_db()
+    await prepare_database()
+    services = BackgroundServices()
+    if FAST_STARTUP:
+        services.start_deferred()
+    else:
+        # Parse ZONE_BOUNDARIES_FILE now so a bad file fails startup, not a request
+        warm_caches()
+        services.start()
     yield
     # Shutdown
+    await services.stop()
 
 
 app = FastAPI(
@@ -31,6 +44,9 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Label app-level routes (/health, /metrics) in the request metrics too
+app.router.route_class = TimedRoute
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -40,9 +56,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Mount static files and templates
-app.mount("/static", StaticFiles(directory="app/static"), name="static")
-templates = Jinja2Templates(directory="app/templates")
+# gzip for text responses
+app.add_middleware(CompressionMiddleware)
+
+# X-Actor header, recorded on the tindahan history events a request writes
+app.add_middleware(ActorMiddleware)
+
+# Request latency, in-flight and per-request DB metrics
+app.add_middleware(MetricsMiddleware)
+instrument_engine(engine, "primary")
+instrument_engine(read_engine, "read")
+
+# Mount static files; page templates are shared from app/templating.py
+app.mount("/static", CachedStaticFiles(directory=STATIC_DIR), name="static")
 
 # Include routers
 app.include_router(web_router)
@@ -55,6 +81,13 @@ async def health_check():
     return {"status": "healthy", "message": "Barangay Tindahan Compliance Tracker is running"}
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Request and database metrics in the Prometheus text format."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Several workers need the app as an import string so each process can load it
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, workers=WEB_CONCURRENCY)
@@ -0,0 +1,101 @@
+"""initial schema
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-17 18:46:55.798929
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('compliance_counter',
+    sa.Column('name', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('value', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.create_table('compliancereport',
+    sa.Column('report_type', sa.Enum('MONTHLY', 'QUARTERLY', 'ANNUAL', 'ZONE_SPECIFIC', 'VIOLATION_SUMMARY', 'PERMIT_STATUS', name='reporttype'), nullable=False),
+    sa.Column('report_period_start', sa.DateTime(), nullable=False),
+    sa.Column('report_period_end', sa.DateTime(), nullable=False),
+    sa.Column('barangay_zone', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('generated_by', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('summary', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('recommendations', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('metrics', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('permit_expiry_counter',
+    sa.Column('expiry_date', sa.Date(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('expiry_date')
+    )
+    op.create_table('tindahan',
+    sa.Column('business_name', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('owner_name', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('business_type', sa.Enum('TINDAHAN', 'STREET_HAWKER', 'PEDDLER', 'FOOD_CART', 'OTHER', name='businesstype'), nullable=False),
+    sa.Column('address', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('contact_number', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('barangay_zone', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('business_permit_number', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('permit_issued_date', sa.DateTime(), nullable=True),
+    sa.Column('permit_expiry_date', sa.DateTime(), nullable=True),
+    sa.Column('compliance_status', sa.Enum('COMPLIANT', 'WARNING', 'VIOLATION', 'SUSPENDED', name='compliancestatus'), nullable=False),
+    sa.Column('last_inspection_date', sa.DateTime(), nullable=True),
+    sa.Column('next_inspection_due', sa.DateTime(), nullable=True),
+    sa.Column('registered_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('inspection',
+    sa.Column('tindahan_id', sa.Integer(), nullable=False),
+    sa.Column('inspection_type', sa.Enum('ROUTINE', 'COMPLAINT', 'FOLLOW_UP', 'RENEWAL', 'EMERGENCY', name='inspectiontype'), nullable=False),
+    sa.Column('inspector_name', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('inspection_date', sa.DateTime(), nullable=False),
+    sa.Column('status', sa.Enum('SCHEDULED', 'IN_PROGRESS', 'COMPLETED', 'CANCELLED', name='inspectionstatus'), nullable=False),
+    sa.Column('notes', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['tindahan_id'], ['tindahan.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('violation',
+    sa.Column('inspection_id', sa.Integer(), nullable=False),
+    sa.Column('violation_type', sa.Enum('NO_PERMIT', 'EXPIRED_PERMIT', 'UNAUTHORIZED_LOCATION', 'UNSANITARY_CONDITIONS', 'NOISE_VIOLATION', 'BLOCKING_TRAFFIC', 'OVERPRICING', 'UNAUTHORIZED_PRODUCTS', 'OTHER', name='violationtype'), nullable=False),
+    sa.Column('description', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('severity', sa.Integer(), nullable=False),
+    sa.Column('is_resolved', sa.Boolean(), nullable=False),
+    sa.Column('resolution_notes', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('resolution_date', sa.DateTime(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['inspection_id'], ['inspection.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('violation')
+    op.drop_table('inspection')
+    op.drop_table('tindahan')
+    op.drop_table('permit_expiry_counter')
+    op.drop_table('compliancereport')
+    op.drop_table('compliance_counter')
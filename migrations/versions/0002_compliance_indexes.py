@@ -0,0 +1,54 @@
+"""compliance indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 18:47:04.400243
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Databases created by init_db() after this revision already have the indexes
+    with op.batch_alter_table('inspection', schema=None) as batch_op:
+        batch_op.create_index('ix_inspection_status_inspection_date', ['status', 'inspection_date'], unique=False, if_not_exists=True)
+        batch_op.create_index('ix_inspection_tindahan_id_inspection_date', ['tindahan_id', 'inspection_date'], unique=False, if_not_exists=True)
+
+    with op.batch_alter_table('tindahan', schema=None) as batch_op:
+        batch_op.create_index('ix_tindahan_active_next_inspection_due', ['next_inspection_due'], unique=False, if_not_exists=True, sqlite_where=sa.text('is_active = 1'), postgresql_where=sa.text('is_active'))
+        batch_op.create_index('ix_tindahan_active_permit_expiry_date', ['permit_expiry_date'], unique=False, if_not_exists=True, sqlite_where=sa.text('is_active = 1'), postgresql_where=sa.text('is_active'))
+        batch_op.create_index('ix_tindahan_barangay_zone_compliance_status', ['barangay_zone', 'compliance_status'], unique=False, if_not_exists=True)
+        batch_op.create_index('ix_tindahan_business_name', ['business_name'], unique=False, if_not_exists=True)
+        batch_op.create_index('ix_tindahan_is_active_compliance_status', ['is_active', 'compliance_status'], unique=False, if_not_exists=True)
+        batch_op.create_index('ix_tindahan_is_active_id', ['is_active', 'id'], unique=False, if_not_exists=True)
+
+    with op.batch_alter_table('violation', schema=None) as batch_op:
+        batch_op.create_index('ix_violation_inspection_id_is_resolved', ['inspection_id', 'is_resolved'], unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('violation', schema=None) as batch_op:
+        batch_op.drop_index('ix_violation_inspection_id_is_resolved')
+
+    with op.batch_alter_table('tindahan', schema=None) as batch_op:
+        batch_op.drop_index('ix_tindahan_is_active_id')
+        batch_op.drop_index('ix_tindahan_is_active_compliance_status')
+        batch_op.drop_index('ix_tindahan_business_name')
+        batch_op.drop_index('ix_tindahan_barangay_zone_compliance_status')
+        batch_op.drop_index('ix_tindahan_active_permit_expiry_date', sqlite_where=sa.text('is_active = 1'), postgresql_where=sa.text('is_active'))
+        batch_op.drop_index('ix_tindahan_active_next_inspection_due', sqlite_where=sa.text('is_active = 1'), postgresql_where=sa.text('is_active'))
+
+    with op.batch_alter_table('inspection', schema=None) as batch_op:
+        batch_op.drop_index('ix_inspection_tindahan_id_inspection_date')
+        batch_op.drop_index('ix_inspection_status_inspection_date')
@@ -0,0 +1,37 @@
+"""inspection and violation filter indexes
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 18:50:26.528180
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('inspection', schema=None) as batch_op:
+        batch_op.create_index('ix_inspection_inspector_name_inspection_date', ['inspector_name', 'inspection_date'], unique=False, if_not_exists=True)
+
+    with op.batch_alter_table('violation', schema=None) as batch_op:
+        batch_op.create_index('ix_violation_is_resolved_severity', ['is_resolved', 'severity'], unique=False, if_not_exists=True)
+        batch_op.create_index('ix_violation_violation_type_severity', ['violation_type', 'severity'], unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('violation', schema=None) as batch_op:
+        batch_op.drop_index('ix_violation_violation_type_severity')
+        batch_op.drop_index('ix_violation_is_resolved_severity')
+
+    with op.batch_alter_table('inspection', schema=None) as batch_op:
+        batch_op.drop_index('ix_inspection_inspector_name_inspection_date')
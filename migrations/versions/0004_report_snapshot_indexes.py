@@ -0,0 +1,35 @@
+"""report snapshot indexes
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 18:52:31.492556
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('compliancereport', schema=None) as batch_op:
+        batch_op.create_index('ix_compliancereport_type_zone_period', ['report_type', 'barangay_zone', 'report_period_start'], unique=False, if_not_exists=True)
+
+    with op.batch_alter_table('violation', schema=None) as batch_op:
+        batch_op.create_index('ix_violation_created_at', ['created_at'], unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('violation', schema=None) as batch_op:
+        batch_op.drop_index('ix_violation_created_at')
+
+    with op.batch_alter_table('compliancereport', schema=None) as batch_op:
+        batch_op.drop_index('ix_compliancereport_type_zone_period')
@@ -0,0 +1,45 @@
+"""tindahan full-text search
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 20:14:08.113902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+from app.models.search import (
+    SQLITE_SEARCH_DDL, SQLITE_SEARCH_DROP_DDL, POSTGRES_SEARCH_DDL, POSTGRES_SEARCH_DROP_DDL
+)
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for statement in SQLITE_SEARCH_DDL:
+            op.execute(statement)
+        # Index rows that existed before the sync triggers
+        op.execute("INSERT INTO tindahan_fts(tindahan_fts) VALUES('rebuild')")
+    elif dialect == 'postgresql':
+        for statement in POSTGRES_SEARCH_DDL:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for statement in SQLITE_SEARCH_DROP_DDL:
+            op.execute(statement)
+    elif dialect == 'postgresql':
+        for statement in POSTGRES_SEARCH_DROP_DDL:
+            op.execute(statement)
@@ -0,0 +1,62 @@
+"""tindahan location and spatial index
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 21:32:47.205318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+from app.models.search import SQLITE_SEARCH_DDL
+from app.models.spatial import (
+    SQLITE_SPATIAL_DDL, SQLITE_SPATIAL_DROP_DDL, POSTGRES_SPATIAL_DDL, POSTGRES_SPATIAL_DROP_DDL
+)
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('tindahan', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('latitude', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('longitude', sa.Float(), nullable=True))
+
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for statement in SQLITE_SPATIAL_DDL:
+            op.execute(statement)
+        # Index rows that existed before the sync triggers
+        op.execute(
+            "INSERT INTO tindahan_rtree SELECT id, latitude, latitude, longitude, longitude FROM tindahan "
+            "WHERE latitude IS NOT NULL AND longitude IS NOT NULL"
+        )
+    elif dialect == 'postgresql':
+        for statement in POSTGRES_SPATIAL_DDL:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for statement in SQLITE_SPATIAL_DROP_DDL:
+            op.execute(statement)
+    elif dialect == 'postgresql':
+        for statement in POSTGRES_SPATIAL_DROP_DDL:
+            op.execute(statement)
+
+    with op.batch_alter_table('tindahan', schema=None) as batch_op:
+        batch_op.drop_column('longitude')
+        batch_op.drop_column('latitude')
+
+    if dialect == 'sqlite':
+        # Batch mode rebuilds the table on SQLite, which drops its triggers
+        for statement in SQLITE_SEARCH_DDL:
+            op.execute(statement)
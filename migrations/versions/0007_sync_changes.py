@@ -0,0 +1,81 @@
+"""sync change versions and push receipts
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 23:05:41.630187
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+from app.models.sync import SQLITE_SYNC_DDL, SQLITE_SYNC_DROP_DDL, POSTGRES_SYNC_DDL, POSTGRES_SYNC_DROP_DDL
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('sync_change',
+    sa.Column('entity', sqlmodel.sql.sqltypes.AutoString(length=20), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('deleted', sa.Boolean(), nullable=False),
+    sa.PrimaryKeyConstraint('entity', 'entity_id')
+    )
+    with op.batch_alter_table('sync_change', schema=None) as batch_op:
+        batch_op.create_index('ix_sync_change_version', ['version'], unique=True)
+
+    op.create_table('sync_receipt',
+    sa.Column('key', sqlmodel.sql.sqltypes.AutoString(length=64), nullable=False),
+    sa.Column('entity', sa.Enum('TINDAHAN', 'INSPECTION', 'VIOLATION', name='syncentity'), nullable=False),
+    sa.Column('action', sa.Enum('CREATE', 'UPDATE', name='syncaction'), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('key')
+    )
+    with op.batch_alter_table('sync_receipt', schema=None) as batch_op:
+        batch_op.create_index('ix_sync_receipt_created_at', ['created_at'], unique=False)
+
+    # Version existing rows in the order they were last written, before the triggers take over
+    op.execute(
+        "INSERT INTO sync_change (entity, entity_id, version, deleted) "
+        "SELECT entity, id, row_number() OVER (ORDER BY updated_at, entity, id), false FROM ("
+        "SELECT 'tindahan' AS entity, id, updated_at FROM tindahan "
+        "UNION ALL SELECT 'inspection', id, updated_at FROM inspection "
+        "UNION ALL SELECT 'violation', id, updated_at FROM violation"
+        ") AS existing"
+    )
+
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for statement in SQLITE_SYNC_DDL:
+            op.execute(statement)
+    elif dialect == 'postgresql':
+        for statement in POSTGRES_SYNC_DDL:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for statement in SQLITE_SYNC_DROP_DDL:
+            op.execute(statement)
+    elif dialect == 'postgresql':
+        for statement in POSTGRES_SYNC_DROP_DDL:
+            op.execute(statement)
+
+    with op.batch_alter_table('sync_receipt', schema=None) as batch_op:
+        batch_op.drop_index('ix_sync_receipt_created_at')
+
+    op.drop_table('sync_receipt')
+    with op.batch_alter_table('sync_change', schema=None) as batch_op:
+        batch_op.drop_index('ix_sync_change_version')
+
+    op.drop_table('sync_change')
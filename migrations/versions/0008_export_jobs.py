@@ -0,0 +1,52 @@
+"""export job queue
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17 23:48:12.904316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('export_job',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.Enum('PERMIT_STATUS', 'COMPLIANCE_REPORT', name='exportkind'), nullable=False),
+    sa.Column('format', sa.Enum('CSV', 'XLSX', 'PDF', name='exportformat'), nullable=False),
+    sa.Column('barangay_zone', sqlmodel.sql.sqltypes.AutoString(length=50), nullable=True),
+    sa.Column('active_only', sa.Boolean(), nullable=False),
+    sa.Column('report_id', sa.Integer(), nullable=True),
+    sa.Column('requested_by', sqlmodel.sql.sqltypes.AutoString(length=100), nullable=True),
+    sa.Column('status', sa.Enum('QUEUED', 'RUNNING', 'COMPLETED', 'FAILED', 'EXPIRED', name='exportjobstatus'), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('rows_written', sa.Integer(), nullable=True),
+    sa.Column('size_bytes', sa.Integer(), nullable=True),
+    sa.Column('error', sqlmodel.sql.sqltypes.AutoString(length=1000), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('heartbeat_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('export_job', schema=None) as batch_op:
+        batch_op.create_index('ix_export_job_status_id', ['status', 'id'], unique=False)
+        batch_op.create_index('ix_export_job_status_finished_at', ['status', 'finished_at'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('export_job', schema=None) as batch_op:
+        batch_op.drop_index('ix_export_job_status_finished_at')
+        batch_op.drop_index('ix_export_job_status_id')
+
+    op.drop_table('export_job')
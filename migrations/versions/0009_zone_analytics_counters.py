@@ -0,0 +1,59 @@
+"""zone analytics counters
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 10:21:37.518042
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Both tables are filled on the next application start by ensure_compliance_counters.
+    # The enum types already exist on PostgreSQL since 0001, so they are not created again.
+    op.create_table('zone_status_counter',
+    sa.Column('barangay_zone', sqlmodel.sql.sqltypes.AutoString(length=50), nullable=False),
+    sa.Column('compliance_status', postgresql.ENUM('COMPLIANT', 'WARNING', 'VIOLATION', 'SUSPENDED', name='compliancestatus', create_type=False), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('barangay_zone', 'compliance_status')
+    )
+    op.create_table('zone_violation_counter',
+    sa.Column('barangay_zone', sqlmodel.sql.sqltypes.AutoString(length=50), nullable=False),
+    sa.Column('violation_type', postgresql.ENUM('NO_PERMIT', 'EXPIRED_PERMIT', 'UNAUTHORIZED_LOCATION', 'UNSANITARY_CONDITIONS', 'NOISE_VIOLATION', 'BLOCKING_TRAFFIC', 'OVERPRICING', 'UNAUTHORIZED_PRODUCTS', 'OTHER', name='violationtype', create_type=False), nullable=False),
+    sa.Column('severity', sa.Integer(), nullable=False),
+    sa.Column('recorded', sa.Integer(), nullable=False),
+    sa.Column('resolved', sa.Integer(), nullable=False),
+    sa.Column('resolution_seconds', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('barangay_zone', 'violation_type', 'severity')
+    )
+    op.create_table('zone_violation_daily',
+    sa.Column('barangay_zone', sqlmodel.sql.sqltypes.AutoString(length=50), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('recorded', sa.Integer(), nullable=False),
+    sa.Column('resolved', sa.Integer(), nullable=False),
+    sa.Column('resolution_seconds', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('barangay_zone', 'day')
+    )
+    with op.batch_alter_table('zone_violation_daily', schema=None) as batch_op:
+        batch_op.create_index('ix_zone_violation_daily_day', ['day'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('zone_violation_daily', schema=None) as batch_op:
+        batch_op.drop_index('ix_zone_violation_daily_day')
+
+    op.drop_table('zone_violation_daily')
+    op.drop_table('zone_violation_counter')
+    op.drop_table('zone_status_counter')
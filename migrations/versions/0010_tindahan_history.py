@@ -0,0 +1,44 @@
+"""tindahan change history
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18 14:02:51.773120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0010'
+down_revision: Union[str, None] = '0009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # History starts with this revision; stores registered before it have no created event
+    op.create_table('tindahan_event',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('tindahan_id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.Enum('CREATED', 'UPDATED', 'DEACTIVATED', 'STATUS_DERIVED', 'SNAPSHOT', name='tindahaneventkind'), nullable=False),
+    sa.Column('changes', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('actor', sqlmodel.sql.sqltypes.AutoString(length=100), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['tindahan_id'], ['tindahan.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('tindahan_event', schema=None) as batch_op:
+        batch_op.create_index('ix_tindahan_event_tindahan_id_id', ['tindahan_id', 'id'], unique=False)
+        batch_op.create_index('ix_tindahan_event_uncompacted_created_at', ['created_at'], unique=False, sqlite_where=sa.text("kind != 'SNAPSHOT'"), postgresql_where=sa.text("kind != 'SNAPSHOT'"))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('tindahan_event', schema=None) as batch_op:
+        batch_op.drop_index('ix_tindahan_event_uncompacted_created_at', sqlite_where=sa.text("kind != 'SNAPSHOT'"), postgresql_where=sa.text("kind != 'SNAPSHOT'"))
+        batch_op.drop_index('ix_tindahan_event_tindahan_id_id')
+
+    op.drop_table('tindahan_event')
@@ -0,0 +1,43 @@
+"""tindahan row version
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18 19:47:12.408531
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.models.search import SQLITE_SEARCH_DDL
+from app.models.spatial import SQLITE_SPATIAL_DDL
+from app.models.sync import SQLITE_SYNC_DDL
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0011'
+down_revision: Union[str, None] = '0010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing rows start at version 1, as new registrations do
+    with op.batch_alter_table('tindahan', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), server_default=sa.text('1'), nullable=False))
+
+    if op.get_bind().dialect.name == 'sqlite':
+        # Batch mode rebuilds the table on SQLite, which drops its triggers
+        for statement in SQLITE_SEARCH_DDL + SQLITE_SPATIAL_DDL + SQLITE_SYNC_DDL:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('tindahan', schema=None) as batch_op:
+        batch_op.drop_column('version')
+
+    if op.get_bind().dialect.name == 'sqlite':
+        # Batch mode rebuilds the table on SQLite, which drops its triggers
+        for statement in SQLITE_SEARCH_DDL + SQLITE_SPATIAL_DDL + SQLITE_SYNC_DDL:
+            op.execute(statement)
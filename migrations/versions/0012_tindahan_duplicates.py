@@ -0,0 +1,49 @@
+"""tindahan duplicate suggestions
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-19 10:26:43.905187
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0012'
+down_revision: Union[str, None] = '0011'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Filled by the duplicate scan sweep; existing stores are compared on its first run
+    op.create_table('tindahan_duplicate',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('tindahan_id', sa.Integer(), nullable=False),
+    sa.Column('duplicate_id', sa.Integer(), nullable=False),
+    sa.Column('barangay_zone', sqlmodel.sql.sqltypes.AutoString(length=50), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.Column('reasons', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('status', sa.Enum('SUGGESTED', 'MERGED', 'DISMISSED', name='duplicatestatus'), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['duplicate_id'], ['tindahan.id'], ),
+    sa.ForeignKeyConstraint(['tindahan_id'], ['tindahan.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('tindahan_id', 'duplicate_id', name='uq_tindahan_duplicate_pair')
+    )
+    with op.batch_alter_table('tindahan_duplicate', schema=None) as batch_op:
+        batch_op.create_index('ix_tindahan_duplicate_duplicate_id', ['duplicate_id'], unique=False)
+        batch_op.create_index('ix_tindahan_duplicate_status_score', ['status', 'score'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('tindahan_duplicate', schema=None) as batch_op:
+        batch_op.drop_index('ix_tindahan_duplicate_status_score')
+        batch_op.drop_index('ix_tindahan_duplicate_duplicate_id')
+
+    op.drop_table('tindahan_duplicate')
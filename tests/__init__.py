@@ -0,0 +1,3 @@
+"""
+Tests for Barangay Tindahan Tracker
+"""
@@ -0,0 +1,45 @@
+"""
+Shared fixtures: a scratch SQLite database that the app's sessions and cache use for one test module
+"""
+
+import httpx
+import pytest
+import pytest_asyncio
+
+from app import database
+from app.cache import LRUCache, get_cache, set_cache_backend
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def database_engine(tmp_path_factory):
+    """Write engine of a scratch database with the full schema, shared by the tests of one module.
+
+    The app's engines and session factories are pointed at it, and the read
+    cache starts empty, so nothing carries over from another module.
+    """
+    url = f"sqlite+aiosqlite:///{tmp_path_factory.mktemp('db') / 'test.db'}"
+    engine = database.create_engine_for_profile(url)
+    read_engine = database.create_engine_for_profile(url, read_only=True)
+    cache = get_cache()
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(database, "engine", engine)
+        patch.setattr(database, "read_engine", read_engine)
+        patch.setitem(database.async_session.kw, "bind", engine)
+        patch.setitem(database.async_read_session.kw, "bind", read_engine)
+        set_cache_backend(LRUCache())
+        try:
+            await database.init_db()
+            yield engine
+        finally:
+            set_cache_backend(cache)
+            await engine.dispose()
+            await read_engine.dispose()
+
+
+@pytest_asyncio.fixture(loop_scope="module")
+async def client(database_engine):
+    """HTTP client for the API, served in-process against the scratch database."""
+    from main import app
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+        yield http
@@ -0,0 +1,154 @@
+"""
+Bulk tindahan writes: invalid rows fail alone, a failing chunk rolls back whole, and the counters follow
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlmodel import select
+
+from app.database import async_session
+from app.controllers import compliance_controller, store_controller
+from app.models.analytics import ZoneViolationCounter, ZoneViolationDaily
+from app.models.compliance_report import ComplianceCounter
+from app.models.store import BusinessType, Tindahan, TindahanBulkUpdate, TindahanCreate
+
+pytestmark = pytest.mark.asyncio(loop_scope="module")
+
+
+def _row(name: str, **fields) -> dict:
+    return {
+        "business_name": name,
+        "owner_name": "Dolores Ramos",
+        "business_type": "tindahan",
+        "address": "18 Burgos St.",
+        "barangay_zone": "Zone 8",
+        **fields,
+    }
+
+
+async def _counters(db):
+    """Every maintained counter row, leaving out rows that count nothing."""
+    rows = {}
+    for model in (ComplianceCounter, ZoneViolationCounter, ZoneViolationDaily):
+        keys = {column.name for column in model.__table__.primary_key}
+        result = await db.execute(select(model).execution_options(populate_existing=True))
+        rows[model.__tablename__] = sorted(
+            tuple(sorted(values.items()))
+            for values in (row.model_dump() for row in result.scalars().all())
+            if any(value for name, value in values.items() if name not in keys)
+        )
+    return rows
+
+
+async def _assert_counters_rebuild(db):
+    maintained = await _counters(db)
+    await compliance_controller.rebuild_compliance_counters(db)
+    await db.commit()
+    assert maintained == await _counters(db)
+
+
+async def _names(db, names):
+    result = await db.execute(select(Tindahan.business_name).where(Tindahan.business_name.in_(names)))
+    return set(result.scalars().all())
+
+
+async def test_invalid_rows_fail_alone(client):
+    async with async_session() as db:
+        await compliance_controller.ensure_compliance_counters(db)
+        await db.commit()
+    created = await client.post("/api/v1/tindahan/bulk", json=[
+        _row("Bulk Valid 1"),
+        {key: value for key, value in _row("Bulk No Owner").items() if key != "owner_name"},
+        _row("Bulk Valid 2", permit_expiry_date=(datetime.utcnow() - timedelta(days=3)).isoformat()),
+    ])
+    assert created.status_code == 200
+    body = created.json()
+    assert (body["total"], body["succeeded"], body["failed"]) == (3, 2, 1)
+    results = body["results"]
+    assert [result["index"] for result in results] == [0, 1, 2]
+    assert results[1]["success"] is False and "owner_name" in results[1]["error"]
+    assert results[0]["success"] and results[2]["success"]
+
+    updated = await client.patch("/api/v1/tindahan/bulk", json=[
+        {"id": results[0]["id"], "owner_name": "Dolores Ramos-Cruz"},
+        {"id": 999999, "owner_name": "Nobody"},
+        {"owner_name": "No Id"},
+        {"id": results[2]["id"], "barangay_zone": "Zone 9"},
+    ])
+    body = updated.json()
+    assert (body["total"], body["succeeded"], body["failed"]) == (4, 2, 2)
+    assert body["results"][1]["error"] == "Tindahan not found"
+    assert "id" in body["results"][2]["error"]
+    assert (await client.get(f"/api/v1/tindahan/{results[0]['id']}")).json()["owner_name"] == "Dolores Ramos-Cruz"
+    assert (await client.get(f"/api/v1/tindahan/{results[2]['id']}")).json()["barangay_zone"] == "Zone 9"
+
+    async with async_session() as db:
+        await _assert_counters_rebuild(db)
+
+
+async def test_failed_create_chunk_rolls_back_whole(database_engine):
+    expired = datetime.utcnow() - timedelta(days=60)
+    rows = [
+        TindahanCreate.model_validate(_row("Chunk Create 0", permit_expiry_date=expired)),
+        TindahanCreate.model_validate(_row("Chunk Create 1")),
+        # Passes as far as the database, which refuses it
+        TindahanCreate.model_construct(**{**_row("Chunk Create 2"), "business_name": None, "business_type": BusinessType.TINDAHAN}),
+        TindahanCreate.model_validate(_row("Chunk Create 3", permit_expiry_date=expired)),
+        TindahanCreate.model_validate(_row("Chunk Create 4")),
+    ]
+    async with async_session() as db:
+        await compliance_controller.ensure_compliance_counters(db)
+        await db.commit()
+        results = await store_controller.bulk_create_tindahan(db, list(enumerate(rows)), chunk_size=2)
+
+        assert [result.success for result in sorted(results, key=lambda result: result.index)] == [
+            True, True, False, False, True
+        ]
+        # The valid row sharing a chunk with the refused one is rolled back with it
+        failed = [result for result in results if not result.success]
+        assert all(result.id is None and result.error for result in failed)
+        assert await _names(db, [f"Chunk Create {n}" for n in range(5)]) == {
+            "Chunk Create 0", "Chunk Create 1", "Chunk Create 4"
+        }
+        await _assert_counters_rebuild(db)
+
+
+async def test_failed_update_chunk_rolls_back_whole(database_engine):
+    async with async_session() as db:
+        await compliance_controller.ensure_compliance_counters(db)
+        await db.commit()
+        stores = [
+            await store_controller.create_tindahan(db, TindahanCreate.model_validate(_row(f"Chunk Update {n}")))
+            for n in range(4)
+        ]
+        expired = datetime.utcnow() - timedelta(days=60)
+        rows = [
+            TindahanBulkUpdate(id=stores[0].id, barangay_zone="Zone 10"),
+            TindahanBulkUpdate(id=stores[1].id, permit_expiry_date=expired),
+            TindahanBulkUpdate(id=stores[2].id, business_name=None),
+            TindahanBulkUpdate(id=stores[3].id, barangay_zone="Zone 10", permit_expiry_date=expired),
+        ]
+        results = sorted(
+            await store_controller.bulk_update_tindahan(db, list(enumerate(rows)), chunk_size=2),
+            key=lambda result: result.index,
+        )
+        assert [result.success for result in results] == [True, True, False, False]
+        assert [result.id for result in results] == [store.id for store in stores]
+
+        current = {
+            row.id: row for row in (
+                await db.execute(
+                    select(Tindahan).where(Tindahan.id.in_([store.id for store in stores]))
+                    .execution_options(populate_existing=True)
+                )
+            ).scalars().all()
+        }
+        assert current[stores[0].id].barangay_zone == "Zone 10"
+        assert current[stores[1].id].permit_expiry_date == expired
+        assert current[stores[2].id].business_name == "Chunk Update 2"
+        # Untouched by its failed chunk, though its own change was valid
+        assert current[stores[3].id].barangay_zone == "Zone 8"
+        assert current[stores[3].id].permit_expiry_date is None
+        assert current[stores[3].id].version == stores[3].version
+        await _assert_counters_rebuild(db)
@@ -0,0 +1,146 @@
+"""
+Read cache: a read after a write sees the write, whether this worker or another one made it
+"""
+
+import asyncio
+import re
+
+import pytest
+from sqlalchemy import text
+
+from app import workers
+from app.cache import get_cache
+from app.database import async_read_session, async_session
+from app.controllers import compliance_controller, store_controller
+from app.models.store import TindahanCreate, TindahanUpdate, BusinessType
+from app.routes.web_routes import render_fragment
+
+pytestmark = pytest.mark.asyncio(loop_scope="module")
+
+
+def _tindahan(name: str) -> TindahanCreate:
+    return TindahanCreate(
+        business_name=name,
+        owner_name="Carmen Lopez",
+        business_type=BusinessType.TINDAHAN,
+        address="5 Del Pilar St.",
+        barangay_zone="Zone 5",
+    )
+
+
+async def _detail(tindahan_id: int):
+    async with async_read_session() as db:
+        return await store_controller.get_tindahan(db, tindahan_id)
+
+
+async def _list_ids(limit: int = 1000):
+    async with async_read_session() as db:
+        return [tindahan.id for tindahan in await store_controller.get_tindahan_list(db, limit=limit)]
+
+
+async def _write_elsewhere(tindahan_id: int, owner_name: str) -> None:
+    """Change a row the way another worker would: straight to the database, leaving this cache alone."""
+    async with async_session() as db:
+        await db.execute(
+            text("UPDATE tindahan SET owner_name = :owner_name, version = version + 1 WHERE id = :id"),
+            {"owner_name": owner_name, "id": tindahan_id},
+        )
+        await db.commit()
+
+
+async def test_detail_read_after_write_is_fresh(database_engine):
+    async with async_session() as db:
+        store = await store_controller.create_tindahan(db, _tindahan("Detail Store"))
+    assert (await _detail(store.id)).owner_name == "Carmen Lopez"
+    assert (await _detail(store.id)).owner_name == "Carmen Lopez"
+    hits = get_cache().stats().hits
+
+    async with async_session() as db:
+        await store_controller.update_tindahan(db, store.id, TindahanUpdate(owner_name="Carmen Lopez-Reyes"))
+    fresh = await _detail(store.id)
+    assert fresh.owner_name == "Carmen Lopez-Reyes"
+    assert fresh.version == store.version + 1
+    assert get_cache().stats().hits == hits
+
+
+async def test_list_read_after_write_is_fresh(database_engine):
+    async with async_session() as db:
+        store = await store_controller.create_tindahan(db, _tindahan("Listed Store"))
+    assert store.id in await _list_ids()
+
+    # A new registration lands on the last page
+    async with async_session() as db:
+        added = await store_controller.create_tindahan(db, _tindahan("Added Store"))
+    assert added.id in await _list_ids()
+
+    # A deactivated one leaves the active-only pages
+    async with async_session() as db:
+        await store_controller.delete_tindahan(db, store.id)
+    ids = await _list_ids()
+    assert store.id not in ids
+    assert added.id in ids
+
+
+async def test_stats_read_after_write_is_fresh(database_engine):
+    renders = 0
+
+    async def render() -> int:
+        async def load():
+            nonlocal renders
+            renders += 1
+            async with async_read_session() as metrics_db:
+                return {"metrics": await compliance_controller.get_compliance_metrics(metrics_db)}
+
+        async with async_read_session() as db:
+            html = await render_fragment(db, "_dashboard_stats.html", {}, load)
+        return int(re.search(r'id="total-tindahan">(\d+)<', html).group(1))
+
+    async with async_session() as db:
+        await compliance_controller.ensure_compliance_counters(db)
+        await db.commit()
+    before = await render()
+    assert await render() == before
+    assert renders == 1
+
+    async with async_session() as db:
+        store = await store_controller.create_tindahan(db, _tindahan("Counted Store"))
+    assert await render() == before + 1
+    assert renders == 2
+
+    # Another worker's write moves the sync change version, so the fragment is rendered again
+    await _write_elsewhere(store.id, "Another Worker")
+    await render()
+    assert renders == 3
+
+
+async def test_read_started_before_an_invalidation_is_not_cached(database_engine):
+    cache = get_cache()
+    generation = await cache.generation()
+    await cache.invalidate(["tindahan:0"])
+    await cache.set("stale-read", "loaded before the write", [], generation)
+    assert await cache.get("stale-read") is None
+
+
+async def test_other_workers_writes_invalidate_through_change_versions(database_engine):
+    async with async_session() as db:
+        store = await store_controller.create_tindahan(db, _tindahan("Shared Store"))
+    assert (await _detail(store.id)).owner_name == "Carmen Lopez"
+    assert store.id in await _list_ids()
+
+    follower = workers.start_cache_sync(interval=0.01)
+    assert follower is not None
+    try:
+        # Let the follower take the current version as its starting point
+        await asyncio.sleep(0.2)
+        await _write_elsewhere(store.id, "Another Worker")
+        # Until the follower sees the change, this worker still serves its cached copy
+        for _ in range(200):
+            if (await _detail(store.id)).owner_name == "Another Worker":
+                break
+            await asyncio.sleep(0.02)
+    finally:
+        await workers.stop_cache_sync(follower)
+
+    fresh = await _detail(store.id)
+    assert fresh.owner_name == "Another Worker"
+    assert fresh.version == store.version + 1
@@ -0,0 +1,78 @@
+"""
+Response compression: text is gzipped, binary files and byte ranges pass through untouched
+"""
+
+import json
+
+import httpx
+import pytest
+import pytest_asyncio
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from app.compression import CompressionMiddleware
+
+pytestmark = pytest.mark.asyncio(loop_scope="module")
+
+ROWS = [{"id": n, "business_name": f"Tindahan {n}", "barangay_zone": "Zone 1"} for n in range(100)]
+CSV = "".join(f"{row['id']},{row['business_name']},{row['barangay_zone']}\n" for row in ROWS).encode()
+XLSX = b"PK\x03\x04" + bytes(range(256)) * 8
+XLSX_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+async def _ndjson():
+    for row in ROWS:
+        yield (json.dumps(row) + "\n").encode()
+
+
+app = CompressionMiddleware(Starlette(routes=[
+    Route("/json", lambda request: JSONResponse(ROWS)),
+    Route("/small", lambda request: JSONResponse(ROWS[0])),
+    Route("/ndjson", lambda request: StreamingResponse(_ndjson(), media_type="application/x-ndjson")),
+    Route("/xlsx", lambda request: Response(XLSX, media_type=XLSX_TYPE)),
+    Route("/csv", lambda request: Response(CSV, media_type="text/csv", headers={"Accept-Ranges": "bytes"})),
+    Route("/partial", lambda request: Response(
+        CSV[:1000], status_code=206, media_type="text/csv", headers={"Content-Range": f"bytes 0-999/{len(CSV)}"}
+    )),
+]))
+
+
+@pytest_asyncio.fixture(loop_scope="module")
+async def client():
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+        yield http
+
+
+@pytest.mark.parametrize("path", ["/json", "/ndjson"])
+async def test_text_is_gzipped(client, path):
+    response = await client.get(path, headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "accept-encoding" in response.headers["vary"].lower()
+    assert [json.loads(line) for line in response.text.splitlines()] == (
+        [ROWS] if path == "/json" else ROWS
+    )
+
+
+@pytest.mark.parametrize("path, body", [
+    ("/small", json.dumps(ROWS[0], separators=(",", ":")).encode()),
+    ("/xlsx", XLSX),
+    ("/csv", CSV),
+    ("/partial", CSV[:1000]),
+], ids=["small", "xlsx", "accept-ranges", "partial"])
+async def test_small_binary_and_ranged_responses_pass_through(client, path, body):
+    response = await client.get(path, headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert response.content == body
+
+
+async def test_range_request_is_not_gzipped(client):
+    response = await client.get("/json", headers={"Accept-Encoding": "gzip", "Range": "bytes=0-99"})
+    assert "content-encoding" not in response.headers
+    assert response.json() == ROWS
+
+
+async def test_client_without_gzip_gets_identity(client):
+    response = await client.get("/json", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert response.json() == ROWS
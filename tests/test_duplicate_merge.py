@@ -0,0 +1,120 @@
+"""
+Duplicate merges: children follow the kept registration, its own fields win, and the counters follow
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func
+from sqlmodel import select
+
+from app.database import async_session
+from app.controllers import compliance_controller, duplicate_controller, inspection_controller, store_controller
+from app.models.analytics import ZoneViolationCounter, ZoneViolationDaily
+from app.models.compliance_report import ComplianceCounter
+from app.models.inspection import Inspection, InspectionCreate, InspectionType, Violation, ViolationCreate, ViolationType
+from app.models.store import BusinessType, ComplianceStatus, TindahanCreate
+
+pytestmark = pytest.mark.asyncio(loop_scope="module")
+
+
+async def _counters(db):
+    """Every maintained counter row, leaving out rows that count nothing."""
+    rows = {}
+    for model in (ComplianceCounter, ZoneViolationCounter, ZoneViolationDaily):
+        keys = {column.name for column in model.__table__.primary_key}
+        result = await db.execute(select(model).execution_options(populate_existing=True))
+        rows[model.__tablename__] = sorted(
+            tuple(sorted(values.items()))
+            for values in (row.model_dump() for row in result.scalars().all())
+            if any(value for name, value in values.items() if name not in keys)
+        )
+    return rows
+
+
+async def _inspect(db, tindahan_id: int, severities):
+    inspection = await inspection_controller.create_inspection(db, InspectionCreate(
+        tindahan_id=tindahan_id,
+        inspection_type=InspectionType.ROUTINE,
+        inspector_name="Inspector",
+        inspection_date=datetime.utcnow(),
+    ))
+    for severity in severities:
+        await inspection_controller.create_violation(db, ViolationCreate(
+            inspection_id=inspection.id,
+            violation_type=ViolationType.UNSANITARY_CONDITIONS,
+            description="Found on inspection",
+            severity=severity,
+        ))
+    return inspection
+
+
+async def test_merge_moves_children_and_fills_blanks(database_engine):
+    permit_expiry = datetime.utcnow() + timedelta(days=200)
+    async with async_session() as db:
+        await compliance_controller.ensure_compliance_counters(db)
+        keep = await store_controller.create_tindahan(db, TindahanCreate(
+            business_name="Aling Mering Sari-Sari Store",
+            owner_name="Mering Dizon",
+            business_type=BusinessType.TINDAHAN,
+            address="44 Mabini St.",
+            barangay_zone="Zone 7",
+            business_permit_number="BP-2026-0044",
+            permit_issued_date=permit_expiry - timedelta(days=365),
+            permit_expiry_date=permit_expiry,
+        ))
+        duplicate = await store_controller.create_tindahan(db, TindahanCreate(
+            business_name="Aling Mering Sari Sari Store",
+            owner_name="Mering Dizon",
+            business_type=BusinessType.TINDAHAN,
+            address="44 Mabini Street",
+            contact_number="09998887777",
+            barangay_zone="Zone 7",
+            latitude=14.5995,
+            longitude=120.9842,
+            business_permit_number="BP-2025-0107",
+            permit_issued_date=permit_expiry - timedelta(days=500),
+            permit_expiry_date=permit_expiry - timedelta(days=135),
+        ))
+        kept_inspection = await _inspect(db, keep.id, [1])
+        moved_inspection = await _inspect(db, duplicate.id, [4, 2])
+
+        await duplicate_controller.scan_duplicates(db)
+        suggestion = next(
+            suggestion for suggestion in await duplicate_controller.get_duplicate_suggestions(db)
+            if (suggestion.tindahan.id, suggestion.duplicate.id) == (keep.id, duplicate.id)
+        )
+        merged = await duplicate_controller.merge_duplicate(db, suggestion.id)
+
+        assert merged.merged_id == duplicate.id
+        assert merged.inspections_moved == 1
+        kept = merged.kept
+        assert kept.id == keep.id
+        # The kept registration's own values stay; blank groups are filled from the duplicate
+        assert (kept.business_permit_number, kept.permit_expiry_date) == ("BP-2026-0044", permit_expiry)
+        assert kept.contact_number == "09998887777"
+        assert (kept.latitude, kept.longitude) == (14.5995, 120.9842)
+        # The moved severity 4 violation now counts against the kept store
+        assert kept.compliance_status == ComplianceStatus.VIOLATION
+
+        gone = await store_controller.get_tindahan(db, duplicate.id)
+        assert gone.is_active is False
+
+        inspections = await db.execute(select(Inspection.id, Inspection.tindahan_id).where(
+            Inspection.id.in_([kept_inspection.id, moved_inspection.id])
+        ))
+        assert {row.id: row.tindahan_id for row in inspections.all()} == {
+            kept_inspection.id: keep.id, moved_inspection.id: keep.id
+        }
+        violations = await db.execute(
+            select(func.count()).select_from(Violation)
+            .join(Inspection, Inspection.id == Violation.inspection_id)
+            .where(Inspection.tindahan_id == duplicate.id)
+        )
+        assert violations.scalar_one() == 0
+        assert len((await inspection_controller.get_inspection(db, moved_inspection.id)).violations) == 2
+
+        maintained = await _counters(db)
+        await compliance_controller.rebuild_compliance_counters(db)
+        await db.commit()
+        assert maintained == await _counters(db)
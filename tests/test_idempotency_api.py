@@ -0,0 +1,92 @@
+"""
+Idempotent creates and conditional updates: Idempotency-Key replays and If-Match preconditions
+"""
+
+import pytest
+from sqlalchemy import func, select
+
+from app.database import async_session
+from app.models.store import Tindahan
+
+pytestmark = pytest.mark.asyncio(loop_scope="module")
+
+TINDAHAN = {
+    "business_name": "Mang Jose General Merchandise",
+    "owner_name": "Jose Reyes",
+    "business_type": "tindahan",
+    "address": "3 Bonifacio St.",
+    "barangay_zone": "Zone 3",
+}
+
+
+async def _tindahan_count(business_name: str) -> int:
+    async with async_session() as db:
+        result = await db.execute(select(func.count()).select_from(Tindahan).where(Tindahan.business_name == business_name))
+        return result.scalar_one()
+
+
+async def test_retry_with_same_key_replays_first_response(client):
+    payload = {**TINDAHAN, "business_name": "Replay Store"}
+    first = await client.post("/api/v1/tindahan", json=payload, headers={"Idempotency-Key": "replay-1"})
+    retry = await client.post("/api/v1/tindahan", json=payload, headers={"Idempotency-Key": "replay-1"})
+
+    assert first.status_code == retry.status_code == 201
+    assert "Idempotent-Replayed" not in first.headers
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.json() == first.json()
+    assert retry.headers["ETag"] == first.headers["ETag"]
+    assert await _tindahan_count("Replay Store") == 1
+
+
+async def test_reused_key_never_writes_a_second_row(client):
+    first = await client.post(
+        "/api/v1/tindahan", json={**TINDAHAN, "business_name": "First Body"}, headers={"Idempotency-Key": "reuse-1"}
+    )
+    # Same endpoint, different body: the key already stands for the first row
+    changed = await client.post(
+        "/api/v1/tindahan", json={**TINDAHAN, "business_name": "Second Body"}, headers={"Idempotency-Key": "reuse-1"}
+    )
+    assert changed.status_code == 201
+    assert changed.headers["Idempotent-Replayed"] == "true"
+    assert changed.json()["id"] == first.json()["id"]
+    assert changed.json()["business_name"] == "First Body"
+    assert await _tindahan_count("Second Body") == 0
+
+    # A different kind of write under the same key is refused
+    inspection = await client.post("/api/v1/inspections", json={
+        "tindahan_id": first.json()["id"],
+        "inspection_type": "routine",
+        "inspector_name": "Inspector Santos",
+        "inspection_date": "2026-03-02T09:30:00",
+    }, headers={"Idempotency-Key": "reuse-1"})
+    assert inspection.status_code == 422
+    assert "reuse-1" in inspection.json()["detail"]
+
+
+async def test_update_with_stale_if_match_is_refused(client):
+    created = await client.post("/api/v1/tindahan", json={**TINDAHAN, "business_name": "Stale Store"})
+    stale = created.headers["ETag"]
+    moved = await client.put(f"/api/v1/tindahan/{created.json()['id']}", json={"owner_name": "Someone Else"})
+    assert moved.status_code == 200
+    assert moved.headers["ETag"] != stale
+
+    response = await client.put(
+        f"/api/v1/tindahan/{created.json()['id']}", json={"owner_name": "Lost Update"}, headers={"If-Match": stale}
+    )
+    assert response.status_code == 412
+    current = await client.get(f"/api/v1/tindahan/{created.json()['id']}")
+    assert current.json()["owner_name"] == "Someone Else"
+    assert current.headers["ETag"] == moved.headers["ETag"]
+
+
+async def test_update_with_current_if_match_succeeds(client):
+    created = await client.post("/api/v1/tindahan", json={**TINDAHAN, "business_name": "Current Store"})
+    current = (await client.get(f"/api/v1/tindahan/{created.json()['id']}")).headers["ETag"]
+
+    response = await client.put(
+        f"/api/v1/tindahan/{created.json()['id']}", json={"owner_name": "Jose Reyes Jr."}, headers={"If-Match": current}
+    )
+    assert response.status_code == 200
+    assert response.json()["owner_name"] == "Jose Reyes Jr."
+    assert response.json()["version"] == created.json()["version"] + 1
+    assert response.headers["ETag"] == f'"{response.json()["version"]}"'
@@ -0,0 +1,36 @@
+"""
+Startup schema check: a new database is created and stamped, an unmigrated one is refused
+"""
+
+import pytest
+from alembic.script import ScriptDirectory
+from sqlalchemy import text
+
+from app import database
+
+pytestmark = pytest.mark.asyncio(loop_scope="module")
+
+
+async def _revision(engine) -> str:
+    async with engine.connect() as conn:
+        return (await conn.execute(text("SELECT version_num FROM alembic_version"))).scalar_one()
+
+
+async def test_new_database_is_stamped_at_head(database_engine):
+    head = ScriptDirectory(database.MIGRATIONS_DIR).get_current_head()
+    assert await _revision(database_engine) == head
+    # Starting again on the same database only checks the revision
+    await database.init_db()
+    assert await _revision(database_engine) == head
+
+
+async def test_database_behind_head_is_refused(database_engine):
+    head = await _revision(database_engine)
+    async with database_engine.begin() as conn:
+        await conn.execute(text("UPDATE alembic_version SET version_num = '0001'"))
+    try:
+        with pytest.raises(RuntimeError, match="revision 0001"):
+            await database.init_db()
+    finally:
+        async with database_engine.begin() as conn:
+            await conn.execute(text("UPDATE alembic_version SET version_num = :head"), {"head": head})
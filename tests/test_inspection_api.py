@@ -0,0 +1,68 @@
+"""
+Inspection API: creating inspections in any status, and stamping the tindahan when one completes
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select
+
+from app.controllers.inspection_controller import INSPECTION_INTERVAL_DAYS
+from app.database import async_session
+from app.models.inspection import Inspection
+
+pytestmark = pytest.mark.asyncio(loop_scope="module")
+
+TINDAHAN = {
+    "business_name": "Aling Nena's Sari-Sari Store",
+    "owner_name": "Nena Cruz",
+    "business_type": "tindahan",
+    "address": "7 Rizal St.",
+    "barangay_zone": "Zone 2",
+}
+
+
+async def _inspection_count(tindahan_id: int) -> int:
+    async with async_session() as db:
+        result = await db.execute(select(func.count()).select_from(Inspection).where(Inspection.tindahan_id == tindahan_id))
+        return result.scalar_one()
+
+
+@pytest.mark.parametrize("status", ["completed", "cancelled", "scheduled"])
+async def test_create_inspection_in_any_status(client, status):
+    tindahan = (await client.post("/api/v1/tindahan", json=TINDAHAN)).json()
+    response = await client.post("/api/v1/inspections", json={
+        "tindahan_id": tindahan["id"],
+        "inspection_type": "routine",
+        "inspector_name": "Inspector Santos",
+        "inspection_date": datetime.utcnow().isoformat(),
+        "status": status,
+    })
+    assert response.status_code == 201
+    assert response.json()["id"] is not None
+    assert response.json()["status"] == status
+    assert await _inspection_count(tindahan["id"]) == 1
+
+
+@pytest.mark.parametrize("created_completed", [True, False], ids=["create", "update"])
+async def test_completed_inspection_stamps_tindahan(client, created_completed):
+    tindahan = (await client.post("/api/v1/tindahan", json=TINDAHAN)).json()
+    # Read it once so a stale cached detail would show up below
+    assert (await client.get(f"/api/v1/tindahan/{tindahan['id']}")).json()["last_inspection_date"] is None
+
+    inspection_date = datetime(2026, 3, 2, 9, 30)
+    inspection = (await client.post("/api/v1/inspections", json={
+        "tindahan_id": tindahan["id"],
+        "inspection_type": "routine",
+        "inspector_name": "Inspector Santos",
+        "inspection_date": inspection_date.isoformat(),
+        "status": "completed" if created_completed else "scheduled",
+    })).json()
+    if not created_completed:
+        response = await client.put(f"/api/v1/inspections/{inspection['id']}", json={"status": "completed"})
+        assert response.status_code == 200
+
+    stamped = (await client.get(f"/api/v1/tindahan/{tindahan['id']}")).json()
+    assert stamped["last_inspection_date"] == inspection_date.isoformat()
+    assert stamped["next_inspection_due"] == (inspection_date + timedelta(days=INSPECTION_INTERVAL_DAYS)).isoformat()
+    assert stamped["version"] > tindahan["version"]
@@ -0,0 +1,90 @@
+"""
+N+1 query guard for the list controllers
+
+Seeds a scratch SQLite database, runs each list controller at several page
+sizes and fails if the number of SQL statements grows with the page size.
+"""
+
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event
+
+from app.database import async_session
+from app.controllers import duplicate_controller, inspection_controller, store_controller
+from app.models.duplicate import TindahanDuplicate
+from app.models.store import TindahanCreate, BusinessType
+from app.models.inspection import InspectionCreate, InspectionType, ViolationCreate, ViolationType
+
+pytestmark = pytest.mark.asyncio(loop_scope="module")
+
+PAGE_SIZES = (1, 10, 100)
+SEED_STORES = 100
+SEED_VIOLATIONS_PER_INSPECTION = 3
+
+# name -> (controller call for a page size, expected statements per call)
+CASES: Dict[str, Tuple[Callable[[Any, int], Awaitable[Any]], int]] = {
+    "get_tindahan_list": (lambda db, limit: store_controller.get_tindahan_list(db, 0, limit), 1),
+    "get_tindahan_list_json": (lambda db, limit: store_controller.get_tindahan_list_json(db, 0, limit), 1),
+    "get_inspection_list": (lambda db, limit: inspection_controller.get_inspection_list(db, 0, limit), 2),
+    "get_violation_list": (lambda db, limit: inspection_controller.get_violation_list(db, 0, limit), 1),
+    "get_duplicate_suggestions": (lambda db, limit: duplicate_controller.get_duplicate_suggestions(db, limit=limit), 2),
+}
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def seeded_engine(database_engine):
+    """The scratch database with one inspection and a few violations per store, and a suggested merge per pair of neighbouring stores."""
+    async with async_session() as db:
+        await store_controller.bulk_create_tindahan(db, [
+            (index, TindahanCreate(
+                business_name=f"Tindahan {index}",
+                owner_name=f"Owner {index}",
+                business_type=BusinessType.TINDAHAN,
+                address=f"{index} Luna St.",
+                barangay_zone=f"Zone {index % 4}",
+            ))
+            for index in range(SEED_STORES)
+        ])
+        for tindahan_id in range(1, SEED_STORES + 1):
+            inspection = await inspection_controller.create_inspection(db, InspectionCreate(
+                tindahan_id=tindahan_id,
+                inspection_type=InspectionType.ROUTINE,
+                inspector_name="Inspector",
+                inspection_date=datetime.utcnow(),
+            ))
+            for severity in range(1, SEED_VIOLATIONS_PER_INSPECTION + 1):
+                await inspection_controller.create_violation(db, ViolationCreate(
+                    inspection_id=inspection.id,
+                    violation_type=ViolationType.OTHER,
+                    description="Seeded violation",
+                    severity=severity,
+                ))
+        db.add_all(
+            TindahanDuplicate(tindahan_id=tindahan_id, duplicate_id=tindahan_id + 1, barangay_zone="Zone 1", score=0.9, reasons="[]")
+            for tindahan_id in range(1, SEED_STORES)
+        )
+        await db.commit()
+    return database_engine
+
+
+@pytest.mark.parametrize("limit", PAGE_SIZES)
+@pytest.mark.parametrize("run, expected", list(CASES.values()), ids=list(CASES))
+async def test_query_count_is_constant(seeded_engine, run, expected, limit):
+    statements = 0
+
+    def count(conn, cursor, statement, *args):
+        nonlocal statements
+        # The BEGIN IMMEDIATE that opens every write-engine transaction is not a query
+        if not statement.startswith("BEGIN"):
+            statements += 1
+
+    event.listen(seeded_engine.sync_engine, "before_cursor_execute", count)
+    try:
+        async with async_session() as db:
+            await run(db, limit)
+    finally:
+        event.remove(seeded_engine.sync_engine, "before_cursor_execute", count)
+    assert statements == expected
@@ -0,0 +1,346 @@
+"""
+EXPLAIN QUERY PLAN regression check for controller queries
+
+Runs every controller query against a scratch SQLite database, captures the
+SQL it emits and fails if any statement plans a full table scan. The cases
+run in order against one database, so later ones find the rows that
+earlier ones wrote (a generated report, a claimed export job).
+"""
+
+import re
+import sqlite3
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, List, Set, Tuple
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event
+from sqlmodel import select
+
+from app.database import async_session
+from app.geo import ZoneBoundaries
+from app.controllers import (
+    compliance_controller, inspection_controller, report_controller, store_controller, sweep_controller,
+    sync_controller, export_controller, analytics_controller, status_controller, history_controller,
+    planning_controller, duplicate_controller
+)
+from app.models.store import Tindahan, TindahanCreate, TindahanUpdate, TindahanBulkUpdate, BusinessType, ComplianceStatus
+from app.models.inspection import (
+    InspectionCreate, InspectionUpdate, InspectionStatus, InspectionType,
+    ViolationCreate, ViolationUpdate, ViolationType
+)
+from app.models.compliance_report import ComplianceReportGenerate, ReportType
+from app.models.sync import SyncAction, SyncEntity, SyncPushOperation
+from app.models.export import ExportJobStatus, ExportKind, ExportRequest
+from app.models.analytics import TrendBucket
+from app.models.planning import InspectionPlanRequest
+from app.models.duplicate import TindahanDuplicate
+
+pytestmark = pytest.mark.asyncio(loop_scope="module")
+
+# "SCAN tindahan" is a full table scan; "SCAN tindahan USING [COVERING] INDEX ..." is not
+FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+
+Case = Tuple[str, Callable[[Any], Awaitable[Any]], Set[str]]
+
+
+def _zone_boundaries() -> ZoneBoundaries:
+    """Five zones as latitude bands over the sample stores, so most stores lie outside their own zone."""
+    features = []
+    for index in range(5):
+        south, north = 14.58 + index * 0.01, 14.58 + (index + 1) * 0.01
+        ring = [[120.98, south], [121.1, south], [121.1, north], [120.98, north], [120.98, south]]
+        features.append({
+            "type": "Feature",
+            "properties": {"name": f"Zone {index}"},
+            "geometry": {"type": "Polygon", "coordinates": [ring]},
+        })
+    return ZoneBoundaries.from_geojson({"type": "FeatureCollection", "features": features})
+
+
+def _sample_tindahan(index: int) -> TindahanCreate:
+    """Build a registration for seeding the scratch database."""
+    return TindahanCreate(
+        business_name=f"Tindahan {index}",
+        owner_name=f"Owner {index}",
+        business_type=BusinessType.TINDAHAN,
+        address=f"{index} Rizal St.",
+        barangay_zone=f"Zone {index % 5}",
+        permit_expiry_date=datetime.utcnow() + timedelta(days=index - 10),
+        latitude=14.58 + index * 0.001,
+        longitude=120.99 + index * 0.001,
+    )
+
+
+def _sample_inspection(tindahan_id: int) -> InspectionCreate:
+    """Build an inspection for seeding the scratch database."""
+    return InspectionCreate(
+        tindahan_id=tindahan_id,
+        inspection_type=InspectionType.ROUTINE,
+        inspector_name=f"Inspector {tindahan_id % 3}",
+        inspection_date=datetime.utcnow(),
+    )
+
+
+def _sample_violation(inspection_id: int) -> ViolationCreate:
+    """Build a violation for seeding the scratch database."""
+    return ViolationCreate(
+        inspection_id=inspection_id,
+        violation_type=ViolationType.NOISE_VIOLATION,
+        description="Loud karaoke after curfew",
+        severity=inspection_id % 5 + 1,
+    )
+
+
+def _report_request(report_type: ReportType, zone: str = None) -> ComplianceReportGenerate:
+    """Build a report request covering last year."""
+    return ComplianceReportGenerate(
+        report_type=report_type,
+        report_period_start=datetime(datetime.utcnow().year - 1, 2, 1),
+        report_period_end=datetime(datetime.utcnow().year - 1, 3, 1),
+        barangay_zone=zone,
+        generated_by="Query plan check",
+    )
+
+
+async def _update_if_match(db) -> None:
+    """Update a tindahan at the version it currently has."""
+    version = (await db.execute(select(Tindahan.version).where(Tindahan.id == 5))).scalar_one()
+    await db.rollback()
+    await store_controller.update_tindahan(db, 5, TindahanUpdate(contact_number="09171234567"), version)
+
+
+def _plan_request(zones: List[str] = None) -> InspectionPlanRequest:
+    """Build a two-inspector plan for the next two working days."""
+    return InspectionPlanRequest(inspectors=["Inspector 1", "Inspector 2"], days=2, stops_per_day=3, zones=zones)
+
+
+async def _apply_plan(db) -> None:
+    """Plan, then write the plan back."""
+    await planning_controller.apply_inspection_plan(db, await planning_controller.plan_inspections(db, _plan_request()))
+
+
+async def _suggest_duplicate(db, tindahan_id: int, duplicate_id: int) -> int:
+    """Record a suggested merge of two stores, as a scan would."""
+    suggestion = TindahanDuplicate(tindahan_id=tindahan_id, duplicate_id=duplicate_id, barangay_zone="Zone 1", score=0.9, reasons="[]")
+    db.add(suggestion)
+    await db.commit()
+    return suggestion.id
+
+
+async def _merge_duplicate(db) -> None:
+    """Merge a store that has an inspection and a violation into another."""
+    await duplicate_controller.merge_duplicate(db, await _suggest_duplicate(db, 31, 6))
+
+
+async def _dismiss_duplicate(db) -> None:
+    await duplicate_controller.dismiss_duplicate(db, await _suggest_duplicate(db, 36, 41))
+
+
+async def _drain(iterator) -> None:
+    """Consume an async iterator so its queries run."""
+    async for _ in iterator:
+        pass
+
+
+CASES: List[Case] = [
+    ("create_tindahan", lambda db: store_controller.create_tindahan(db, _sample_tindahan(0)), set()),
+    ("get_tindahan", lambda db: store_controller.get_tindahan(db, 1), set()),
+    ("get_tindahan_list(active_only)", lambda db: store_controller.get_tindahan_list(db, 0, 10, True), set()),
+    ("get_tindahan_list(cursor)", lambda db: store_controller.get_tindahan_list(db, 0, 10, False, 5), set()),
+    # Unfiltered first page walks rowid order and stops at LIMIT
+    ("get_tindahan_list(all)", lambda db: store_controller.get_tindahan_list(db, 0, 10, False), {"tindahan"}),
+    ("get_tindahan_list_json(active_only)", lambda db: store_controller.get_tindahan_list_json(db, 0, 10, True), set()),
+    ("get_tindahan_list_json(cursor)", lambda db: store_controller.get_tindahan_list_json(db, 0, 10, False, 5), set()),
+    ("get_tindahan_page", lambda db: store_controller.get_tindahan_page(db, 2, 5), set()),
+    ("get_tindahan_page(zone, status)", lambda db: store_controller.get_tindahan_page(
+        db, 1, 5, "Zone 1", ComplianceStatus.COMPLIANT
+    ), set()),
+    ("get_tindahan_page(business_type)", lambda db: store_controller.get_tindahan_page(db, 1, 5, business_type=BusinessType.TINDAHAN), set()),
+    ("stream_tindahan(active_only)", lambda db: _drain(store_controller.stream_tindahan(db, True)), set()),
+    ("get_tindahan_by_name", lambda db: store_controller.get_tindahan_by_name(db, "Tindahan 3"), set()),
+    ("get_nearby_tindahan", lambda db: store_controller.get_nearby_tindahan(db, 14.59, 121.0, 500), set()),
+    (
+        "find_out_of_zone_tindahan",
+        lambda db: store_controller.find_out_of_zone_tindahan(db, _zone_boundaries()),
+        set(),
+    ),
+    ("search_tindahan", lambda db: store_controller.search_tindahan(db, "Tindahan"), set()),
+    ("search_tindahan(fuzzy)", lambda db: store_controller.search_tindahan(db, "Tindhan"), set()),
+    (
+        "update_tindahan",
+        lambda db: store_controller.update_tindahan(db, 2, TindahanUpdate(compliance_status=ComplianceStatus.WARNING)),
+        set(),
+    ),
+    ("update_tindahan(if-match)", _update_if_match, set()),
+    ("delete_tindahan", lambda db: store_controller.delete_tindahan(db, 3), set()),
+    ("bulk_create_tindahan", lambda db: store_controller.bulk_create_tindahan(db, [(0, _sample_tindahan(1))]), set()),
+    (
+        "bulk_update_tindahan",
+        lambda db: store_controller.bulk_update_tindahan(db, [(0, TindahanBulkUpdate(id=4, is_active=False))]),
+        set(),
+    ),
+    ("create_inspection", lambda db: inspection_controller.create_inspection(db, _sample_inspection(1)), set()),
+    ("get_inspection", lambda db: inspection_controller.get_inspection(db, 1), set()),
+    ("get_inspection_list(tindahan)", lambda db: inspection_controller.get_inspection_list(db, tindahan_id=1), set()),
+    (
+        "get_inspection_list(inspector, dates)",
+        lambda db: inspection_controller.get_inspection_list(
+            db, inspector_name="Inspector 1", date_from=datetime.utcnow() - timedelta(days=30)
+        ),
+        set(),
+    ),
+    (
+        "get_inspection_list(status, severity)",
+        lambda db: inspection_controller.get_inspection_list(db, status=InspectionStatus.SCHEDULED, min_severity=3),
+        set(),
+    ),
+    (
+        "update_inspection",
+        lambda db: inspection_controller.update_inspection(db, 2, InspectionUpdate(status=InspectionStatus.COMPLETED)),
+        set(),
+    ),
+    ("cancel_inspection", lambda db: inspection_controller.cancel_inspection(db, 3), set()),
+    ("plan_inspections", lambda db: planning_controller.plan_inspections(db, _plan_request()), set()),
+    ("plan_inspections(zones)", lambda db: planning_controller.plan_inspections(db, _plan_request(["Zone 1"])), set()),
+    ("apply_inspection_plan", _apply_plan, set()),
+    ("create_violation", lambda db: inspection_controller.create_violation(db, _sample_violation(1)), set()),
+    ("get_violation", lambda db: inspection_controller.get_violation(db, 1), set()),
+    ("get_violation_list(tindahan)", lambda db: inspection_controller.get_violation_list(db, tindahan_id=1), set()),
+    ("get_violation_list(inspection)", lambda db: inspection_controller.get_violation_list(db, inspection_id=1), set()),
+    (
+        "get_violation_list(open, severity)",
+        lambda db: inspection_controller.get_violation_list(db, is_resolved=False, min_severity=4),
+        set(),
+    ),
+    (
+        "get_violation_list(type)",
+        lambda db: inspection_controller.get_violation_list(db, violation_type=ViolationType.NOISE_VIOLATION),
+        set(),
+    ),
+    ("update_violation", lambda db: inspection_controller.update_violation(db, 2, ViolationUpdate(is_resolved=True)), set()),
+    ("generate_report(monthly)", lambda db: report_controller.generate_report(db, _report_request(ReportType.MONTHLY)), set()),
+    (
+        "generate_report(zone)",
+        lambda db: report_controller.generate_report(db, _report_request(ReportType.ZONE_SPECIFIC, "Zone 1")),
+        set(),
+    ),
+    ("generate_report(annual)", lambda db: report_controller.generate_report(db, _report_request(ReportType.ANNUAL)), set()),
+    ("get_report", lambda db: report_controller.get_report(db, 1), set()),
+    (
+        "get_report_list(type)",
+        lambda db: report_controller.get_report_list(db, report_type=ReportType.MONTHLY, barangay_zone="Zone 1"),
+        set(),
+    ),
+    ("sweep_expired_permits", sweep_controller.sweep_expired_permits, set()),
+    ("sweep_due_inspections", sweep_controller.sweep_due_inspections, set()),
+    ("get_sync_version", sync_controller.get_sync_version, set()),
+    ("pull_changes", lambda db: sync_controller.pull_changes(db, 10, 20), set()),
+    (
+        "push_changes",
+        lambda db: sync_controller.push_changes(db, [
+            SyncPushOperation(key="plan-create", entity=SyncEntity.TINDAHAN, action=SyncAction.CREATE, data=_sample_tindahan(2).model_dump(mode="json")),
+            SyncPushOperation(
+                key="plan-update", entity=SyncEntity.TINDAHAN, action=SyncAction.UPDATE, id=6,
+                base_updated_at=datetime(2020, 1, 1), data={"contact_number": "09171234567"},
+            ),
+        ]),
+        set(),
+    ),
+    ("create_once", lambda db: sync_controller.create_once(db, "plan-once", SyncEntity.TINDAHAN, _sample_tindahan(3)), set()),
+    (
+        "create_once(replay)",
+        lambda db: sync_controller.create_once(db, "plan-once", SyncEntity.TINDAHAN, _sample_tindahan(3)),
+        set(),
+    ),
+    ("prune_sync_receipts", sync_controller.prune_sync_receipts, set()),
+    (
+        "enqueue_export",
+        lambda db: export_controller.enqueue_export(db, ExportRequest(kind=ExportKind.COMPLIANCE_REPORT, report_id=1)),
+        set(),
+    ),
+    ("claim_export_job", export_controller.claim_export_job, set()),
+    ("heartbeat_export_job", lambda db: export_controller.heartbeat_export_job(db, 1), set()),
+    (
+        "requeue_stale_exports",
+        lambda db: export_controller.requeue_stale_exports(db, datetime.utcnow() + timedelta(hours=1)),
+        set(),
+    ),
+    ("get_export_job_list(status)", lambda db: export_controller.get_export_job_list(db, status=ExportJobStatus.COMPLETED), set()),
+    ("expire_exports", export_controller.expire_exports, set()),
+    # The counter table holds a handful of rows and is read whole by design
+    ("get_compliance_metrics", compliance_controller.get_compliance_metrics, {"compliance_counter"}),
+    (
+        "rebuild_compliance_counters",
+        compliance_controller.rebuild_compliance_counters,
+        {"compliance_counter", "permit_expiry_counter", "zone_status_counter", "zone_violation_counter", "violation"},
+    ),
+    ("refresh_compliance_status", lambda db: status_controller.refresh_compliance_status(db, [1, 2]), set()),
+    ("recompute_compliance_statuses", status_controller.recompute_compliance_statuses, set()),
+    # Zone totals read the whole (small) counter tables by design
+    ("get_zone_analytics", analytics_controller.get_zone_analytics, {"zone_status_counter", "zone_violation_counter"}),
+    ("get_zone_analytics(zone)", lambda db: analytics_controller.get_zone_analytics(db, "Zone 1"), set()),
+    ("get_zone_trends(day)", analytics_controller.get_zone_trends, set()),
+    (
+        "get_zone_trends(month,zone)",
+        lambda db: analytics_controller.get_zone_trends(db, TrendBucket.MONTH, barangay_zone="Zone 1"),
+        set(),
+    ),
+    ("get_tindahan_history", lambda db: history_controller.get_tindahan_history(db, 1), set()),
+    ("get_tindahan_history(before)", lambda db: history_controller.get_tindahan_history(db, 1, 2, 1000), set()),
+    (
+        "compact_tindahan_history",
+        lambda db: history_controller.compact_tindahan_history(db, datetime.utcnow() + timedelta(days=365)),
+        set(),
+    ),
+    # A scan compares every active store against the suggestions it already made
+    ("scan_duplicates", duplicate_controller.scan_duplicates, {"tindahan", "tindahan_duplicate"}),
+    ("get_duplicate_suggestions", duplicate_controller.get_duplicate_suggestions, set()),
+    ("get_duplicate_suggestions(zone)", lambda db: duplicate_controller.get_duplicate_suggestions(db, "Zone 1"), set()),
+    ("merge_duplicate", _merge_duplicate, set()),
+    ("dismiss_duplicate", _dismiss_duplicate, set()),
+]
+
+
+def _explain(database_path: str, statement: str, parameters: Any) -> List[str]:
+    """Return the EXPLAIN QUERY PLAN detail lines for a statement."""
+    with sqlite3.connect(database_path) as conn:
+        rows = conn.execute(f"EXPLAIN QUERY PLAN {statement}", parameters or ()).fetchall()
+    return [row[-1] for row in rows]
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def seeded_engine(database_engine):
+    """The scratch database with stores, inspections, violations and counters to plan against."""
+    async with async_session() as db:
+        await store_controller.bulk_create_tindahan(db, [(i, _sample_tindahan(i)) for i in range(50)])
+        for tindahan_id in range(1, 21):
+            inspection = await inspection_controller.create_inspection(db, _sample_inspection(tindahan_id))
+            await inspection_controller.create_violation(db, _sample_violation(inspection.id))
+        await inspection_controller.update_inspection(db, 5, InspectionUpdate(status=InspectionStatus.COMPLETED))
+        await compliance_controller.ensure_compliance_counters(db)
+    return database_engine
+
+
+@pytest.mark.parametrize("run, allowed_scans", [case[1:] for case in CASES], ids=[case[0] for case in CASES])
+async def test_query_plan_uses_indexes(seeded_engine, run, allowed_scans):
+    captured: List[Tuple[str, Any]] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE", "WITH")):
+            captured.append((statement, parameters[0] if executemany else parameters))
+
+    event.listen(seeded_engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        async with async_session() as db:
+            await run(db)
+    finally:
+        event.remove(seeded_engine.sync_engine, "before_cursor_execute", capture)
+
+    scans = []
+    for statement, parameters in captured:
+        for detail in _explain(seeded_engine.url.database, statement, parameters):
+            match = FULL_SCAN.match(detail)
+            if match and match.group(1) not in allowed_scans:
+                scans.append(f"{detail}\n    {' '.join(statement.split())}")
+    assert not scans, "Full table scans detected:\n" + "\n".join(scans)
@@ -0,0 +1,156 @@
+"""
+Compliance status rules: the SQL and Python statements agree, and the incremental and chunked paths derive the same status
+"""
+
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+import pytest
+from sqlalchemy import func
+from sqlmodel import select
+
+from app.database import async_session
+from app.controllers import compliance_controller, inspection_controller, status_controller, store_controller
+from app.controllers.inspection_controller import INSPECTION_INTERVAL_DAYS
+from app.controllers.status_controller import PERMIT_GRACE_DAYS, VIOLATION_SEVERITY
+from app.models.analytics import ZoneViolationCounter, ZoneViolationDaily
+from app.models.compliance_report import ComplianceCounter
+from app.models.inspection import (
+    Inspection, InspectionCreate, InspectionStatus, InspectionType, Violation, ViolationCreate, ViolationType
+)
+from app.models.store import BusinessType, ComplianceStatus, Tindahan, TindahanCreate, TindahanUpdate
+
+pytestmark = pytest.mark.asyncio(loop_scope="module")
+
+CASES = {
+    "in good standing": ({}, ComplianceStatus.COMPLIANT),
+    "permit expired within grace": ({"permit_expired_days": 5}, ComplianceStatus.WARNING),
+    "permit expired past grace": ({"permit_expired_days": PERMIT_GRACE_DAYS + 5}, ComplianceStatus.VIOLATION),
+    "minor open violation": ({"violations": [(VIOLATION_SEVERITY - 1, False)]}, ComplianceStatus.WARNING),
+    "severe open violation": ({"violations": [(VIOLATION_SEVERITY, False)]}, ComplianceStatus.VIOLATION),
+    "resolved violations": ({"violations": [(5, True), (1, True)]}, ComplianceStatus.COMPLIANT),
+    # The schedule is not one of the rules: an overdue visit alone leaves the status as it is
+    "overdue inspection": ({"inspection_overdue_days": 20}, ComplianceStatus.COMPLIANT),
+    "overdue inspection and expired permit": (
+        {"inspection_overdue_days": 20, "permit_expired_days": 5}, ComplianceStatus.WARNING
+    ),
+    "suspended by hand": ({"suspended": True, "violations": [(5, False)]}, ComplianceStatus.SUSPENDED),
+}
+
+
+async def _counters(db):
+    """Every maintained counter row, leaving out rows that count nothing."""
+    rows = {}
+    for model in (ComplianceCounter, ZoneViolationCounter, ZoneViolationDaily):
+        keys = {column.name for column in model.__table__.primary_key}
+        result = await db.execute(select(model).execution_options(populate_existing=True))
+        rows[model.__tablename__] = sorted(
+            tuple(sorted(values.items()))
+            for values in (row.model_dump() for row in result.scalars().all())
+            if any(value for name, value in values.items() if name not in keys)
+        )
+    return rows
+
+
+async def _setup_store(
+    db,
+    name: str,
+    permit_expired_days: Optional[int] = None,
+    violations: List[Tuple[int, bool]] = (),
+    inspection_overdue_days: Optional[int] = None,
+    suspended: bool = False
+) -> int:
+    now = datetime.utcnow()
+    store = await store_controller.create_tindahan(db, TindahanCreate(
+        business_name=name,
+        owner_name="Tess Villanueva",
+        business_type=BusinessType.TINDAHAN,
+        address="9 Quezon Ave.",
+        barangay_zone="Zone 6",
+        permit_expiry_date=now - timedelta(days=permit_expired_days) if permit_expired_days is not None else now + timedelta(days=365),
+    ))
+    if inspection_overdue_days is not None:
+        # Completed long enough ago that the next visit is past due
+        await inspection_controller.create_inspection(db, InspectionCreate(
+            tindahan_id=store.id,
+            inspection_type=InspectionType.ROUTINE,
+            inspector_name="Inspector",
+            inspection_date=now - timedelta(days=INSPECTION_INTERVAL_DAYS + inspection_overdue_days),
+            status=InspectionStatus.COMPLETED,
+        ))
+    if violations:
+        inspection = await inspection_controller.create_inspection(db, InspectionCreate(
+            tindahan_id=store.id,
+            inspection_type=InspectionType.ROUTINE,
+            inspector_name="Inspector",
+            inspection_date=now,
+        ))
+        for severity, resolved in violations:
+            await inspection_controller.create_violation(db, ViolationCreate(
+                inspection_id=inspection.id,
+                violation_type=ViolationType.OTHER,
+                description="Found on inspection",
+                severity=severity,
+                is_resolved=resolved,
+            ))
+    if suspended:
+        await store_controller.update_tindahan(db, store.id, TindahanUpdate(compliance_status=ComplianceStatus.SUSPENDED))
+    return store.id
+
+
+async def _status(db, tindahan_id: int) -> ComplianceStatus:
+    result = await db.execute(
+        select(Tindahan.compliance_status).where(Tindahan.id == tindahan_id).execution_options(populate_existing=True)
+    )
+    return result.scalar_one()
+
+
+async def _misstate(db, tindahan_id: int, expected: ComplianceStatus) -> None:
+    """Set a status the rules do not give, so re-deriving has to change it; a suspension stays."""
+    if expected != ComplianceStatus.SUSPENDED:
+        wrong = ComplianceStatus.WARNING if expected == ComplianceStatus.COMPLIANT else ComplianceStatus.COMPLIANT
+        await store_controller.update_tindahan(db, tindahan_id, TindahanUpdate(compliance_status=wrong))
+
+
+@pytest.mark.parametrize("setup, expected", CASES.values(), ids=CASES.keys())
+async def test_status_rules(database_engine, setup, expected):
+    async with async_session() as db:
+        await compliance_controller.ensure_compliance_counters(db)
+        tindahan_id = await _setup_store(db, "Rules Store", **setup)
+        # Registration and violation writes already derive the status incrementally
+        assert await _status(db, tindahan_id) == expected
+
+        now = datetime.utcnow()
+        open_severity = (
+            select(func.max(Violation.severity))
+            .join(Inspection, Inspection.id == Violation.inspection_id)
+            .where(Inspection.tindahan_id == Tindahan.id, Violation.is_resolved == False)
+            .scalar_subquery()
+        )
+        derived = status_controller.derived_status_expression(open_severity, now)
+        row = (
+            await db.execute(
+                select(Tindahan.compliance_status, Tindahan.permit_expiry_date, open_severity.label("open_severity"), derived)
+                .where(Tindahan.id == tindahan_id)
+            )
+        ).one()
+        in_python = status_controller.derive_compliance_status(
+            row.compliance_status, row.open_severity, row.permit_expiry_date, now
+        )
+        assert row[3] == in_python == expected
+        await db.commit()
+
+        await _misstate(db, tindahan_id, expected)
+        await status_controller.refresh_compliance_status(db, [tindahan_id], now)
+        await db.commit()
+        refreshed = await _status(db, tindahan_id)
+
+        await _misstate(db, tindahan_id, expected)
+        await status_controller.recompute_compliance_statuses(db, now, chunk_size=3)
+        recomputed = await _status(db, tindahan_id)
+        assert refreshed == recomputed == expected
+
+        maintained = await _counters(db)
+        await compliance_controller.rebuild_compliance_counters(db)
+        await db.commit()
+        assert maintained == await _counters(db)
@@ -0,0 +1,88 @@
+"""
+Offline sync: conflicting and repeated pushes, and pulls paged by change version
+"""
+
+import pytest
+from sqlalchemy import func, select
+
+from app.database import async_session
+from app.controllers import store_controller, sync_controller
+from app.models.store import Tindahan, TindahanCreate, TindahanUpdate, BusinessType
+from app.models.sync import SyncAction, SyncEntity, SyncPushOperation, SyncResultStatus
+
+pytestmark = pytest.mark.asyncio(loop_scope="module")
+
+
+def _tindahan(name: str) -> TindahanCreate:
+    return TindahanCreate(
+        business_name=name,
+        owner_name="Liza Aquino",
+        business_type=BusinessType.TINDAHAN,
+        address="21 Luna St.",
+        barangay_zone="Zone 4",
+    )
+
+
+async def test_stale_push_is_a_conflict_and_keeps_the_server_copy(database_engine):
+    async with async_session() as db:
+        store = await store_controller.create_tindahan(db, _tindahan("Conflict Store"))
+        # Another client gets its change in after this one read the row
+        server = await store_controller.update_tindahan(db, store.id, TindahanUpdate(owner_name="Server Owner"))
+        assert server.updated_at != store.updated_at
+
+        stale = SyncPushOperation(
+            key="stale-1", entity=SyncEntity.TINDAHAN, action=SyncAction.UPDATE,
+            id=store.id, base_updated_at=store.updated_at, data={"owner_name": "Offline Owner"},
+        )
+        (result,) = (await sync_controller.push_changes(db, [stale])).results
+        assert result.status == SyncResultStatus.CONFLICT
+        assert result.current["owner_name"] == "Server Owner"
+        assert (await store_controller.get_tindahan(db, store.id)).owner_name == "Server Owner"
+
+        # Rebased on the server copy, under a new key, the same change goes in
+        rebased = stale.model_copy(update={"key": "stale-2", "base_updated_at": server.updated_at})
+        (result,) = (await sync_controller.push_changes(db, [rebased])).results
+        assert result.status == SyncResultStatus.APPLIED
+        assert (await store_controller.get_tindahan(db, store.id)).owner_name == "Offline Owner"
+
+
+async def test_repeated_operation_key_is_applied_once(database_engine):
+    create = SyncPushOperation(
+        key="create-once", entity=SyncEntity.TINDAHAN, action=SyncAction.CREATE,
+        data=_tindahan("Pushed Twice").model_dump(mode="json"),
+    )
+    async with async_session() as db:
+        first = (await sync_controller.push_changes(db, [create, create])).results
+        retried = (await sync_controller.push_changes(db, [create])).results
+        count = (
+            await db.execute(select(func.count()).select_from(Tindahan).where(Tindahan.business_name == "Pushed Twice"))
+        ).scalar_one()
+
+    assert [result.status for result in first] == [SyncResultStatus.APPLIED, SyncResultStatus.DUPLICATE]
+    assert retried[0].status == SyncResultStatus.DUPLICATE
+    assert first[0].id == first[1].id == retried[0].id
+    assert count == 1
+
+
+async def test_pull_pages_through_every_change_in_version_order(database_engine):
+    async with async_session() as db:
+        since = await sync_controller.get_sync_version(db)
+        created = [await store_controller.create_tindahan(db, _tindahan(f"Paged Store {n}")) for n in range(5)]
+        # Changing a row again moves it to the end; it is pulled once, with its latest data
+        await store_controller.update_tindahan(db, created[0].id, TindahanUpdate(owner_name="Changed Last"))
+        latest = await sync_controller.get_sync_version(db)
+
+        pages = []
+        while True:
+            page = await sync_controller.pull_changes(db, since, limit=2)
+            pages.append(page)
+            assert page.version > since
+            since = page.version
+            if not page.has_more:
+                break
+
+    assert [len(page.tindahan) for page in pages] == [2, 2, 1]
+    pulled = [tindahan for page in pages for tindahan in page.tindahan]
+    assert [tindahan.id for tindahan in pulled] == [store.id for store in created[1:]] + [created[0].id]
+    assert pulled[-1].owner_name == "Changed Last"
+    assert pages[-1].version == latest
@@ -0,0 +1,73 @@
+"""
+Violation resolution: reopening clears the resolution date, and the counters follow
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlmodel import select
+
+from app.database import async_session
+from app.controllers import compliance_controller, inspection_controller, store_controller
+from app.models.analytics import ZoneViolationCounter, ZoneViolationDaily
+from app.models.compliance_report import ComplianceCounter
+from app.models.store import TindahanCreate, BusinessType
+from app.models.inspection import InspectionCreate, InspectionType, ViolationCreate, ViolationUpdate, ViolationType
+
+pytestmark = pytest.mark.asyncio(loop_scope="module")
+
+
+async def _counters(db):
+    """Every maintained violation counter, leaving out rows that count nothing."""
+    rows = {}
+    for model in (ComplianceCounter, ZoneViolationCounter, ZoneViolationDaily):
+        keys = {column.name for column in model.__table__.primary_key}
+        result = await db.execute(select(model).execution_options(populate_existing=True))
+        rows[model.__tablename__] = sorted(
+            tuple(sorted(values.items()))
+            for values in (row.model_dump() for row in result.scalars().all())
+            if any(value for name, value in values.items() if name not in keys)
+        )
+    return rows
+
+
+async def test_reopened_violation_has_no_resolution_date(database_engine):
+    async with async_session() as db:
+        await compliance_controller.ensure_compliance_counters(db)
+        store = await store_controller.create_tindahan(db, TindahanCreate(
+            business_name="Tindahan ni Aling Rosa",
+            owner_name="Rosa Santos",
+            business_type=BusinessType.TINDAHAN,
+            address="12 Mabini St.",
+            barangay_zone="Zone 1",
+        ))
+        inspection = await inspection_controller.create_inspection(db, InspectionCreate(
+            tindahan_id=store.id,
+            inspection_type=InspectionType.ROUTINE,
+            inspector_name="Inspector",
+            inspection_date=datetime.utcnow(),
+        ))
+        violation = await inspection_controller.create_violation(db, ViolationCreate(
+            inspection_id=inspection.id,
+            violation_type=ViolationType.OTHER,
+            description="Expired food on display",
+            severity=2,
+        ))
+
+        first = datetime.utcnow() - timedelta(days=3)
+        resolved = await inspection_controller.update_violation(
+            db, violation.id, ViolationUpdate(is_resolved=True, resolution_date=first)
+        )
+        assert resolved.resolution_date == first
+
+        reopened = await inspection_controller.update_violation(db, violation.id, ViolationUpdate(is_resolved=False))
+        assert reopened.resolution_date is None
+
+        # Resolving again is stamped now, not with the first resolution's date
+        resolved_again = await inspection_controller.update_violation(db, violation.id, ViolationUpdate(is_resolved=True))
+        assert resolved_again.resolution_date > first
+
+        maintained = await _counters(db)
+        await compliance_controller.rebuild_compliance_counters(db)
+        await db.commit()
+        assert maintained == await _counters(db)